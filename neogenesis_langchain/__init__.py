@@ -153,6 +153,14 @@ except ImportError as e:
     MABConfig = None
     create_mab_manager = None
 
+# 共享MAB收敛器
+from .converger_registry import (
+    MABConvergerRegistry,
+    get_converger_registry,
+    get_shared_mab_converger,
+    borrow_shared_mab_converger
+)
+
 __all__ = [
     # 核心工具
     "NeogenesisThinkingSeedTool",
@@ -210,6 +218,12 @@ __all__ = [
     "MABAlgorithm", 
     "MABConfig",
     "create_mab_manager",
+    
+    # 共享MAB收敛器
+    "MABConvergerRegistry",
+    "get_converger_registry",
+    "get_shared_mab_converger",
+    "borrow_shared_mab_converger",
 ]
 
 # 模块信息
@@ -33,6 +33,7 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from neogenesis_system.meta_mab.controller import MainController
 from .tools import get_all_neogenesis_tools, create_neogenesis_toolset
+from .converger_registry import get_converger_registry, get_shared_mab_converger, DEFAULT_NAMESPACE
 from .chains.chains import create_neogenesis_decision_chain
 from .state.state_management import NeogenesisStateManager, DecisionStage
 
@@ -58,7 +59,9 @@ class NeogenesisAdapter:
                  llm_client=None,
                  web_search_client=None,
                  enable_state_management: bool = True,
-                 storage_path: str = "./neogenesis_state"):
+                 storage_path: str = "./neogenesis_state",
+                 mab_namespace: str = DEFAULT_NAMESPACE,
+                 mab_snapshot_path: Optional[str] = None):
         """
         初始化适配器
         
@@ -69,11 +72,21 @@ class NeogenesisAdapter:
             web_search_client: 网络搜索客户端
             enable_state_management: 是否启用状态管理
             storage_path: 状态存储路径
+            mab_namespace: MAB收敛器命名空间（工具与链共享该命名空间的学习状态）
+            mab_snapshot_path: MAB快照路径（可选，启用共享收敛器的持久化）
         """
         self.api_key = api_key
         self.search_engine = search_engine
         self.llm_client = llm_client
         self.web_search_client = web_search_client
+        self.mab_namespace = mab_namespace
+        
+        # 共享MAB收敛器：先于工具创建，使快照路径在首次创建时生效；适配器持有一次引用，close() 时释放
+        try:
+            self.mab_converger = get_shared_mab_converger(mab_namespace, snapshot_path=mab_snapshot_path)
+        except Exception as e:
+            self.mab_converger = None
+            logger.warning(f"⚠️ 共享MAB收敛器加载失败: {e}")
         
         # 初始化Neogenesis原生控制器（用于混合模式）
         try:
@@ -112,7 +125,8 @@ class NeogenesisAdapter:
                 api_key=self.api_key,
                 search_engine=self.search_engine,
                 llm_client=self.llm_client,
-                web_search_client=self.web_search_client
+                web_search_client=self.web_search_client,
+                mab_namespace=self.mab_namespace
             )
         
         return self._tools_cache
@@ -143,7 +157,8 @@ class NeogenesisAdapter:
                 search_engine=self.search_engine,
                 llm_client=self.llm_client,
                 web_search_client=self.web_search_client,
-                chain_type=chain_type
+                chain_type=chain_type,
+                mab_namespace=self.mab_namespace
             )
         
         return self._chains_cache[chain_type]
@@ -361,6 +376,22 @@ class NeogenesisAdapter:
             "tools_results": results
         }
     
+    def close(self):
+        """释放适配器持有的共享MAB收敛器引用（最后一个引用释放时写入最终快照），可重复调用"""
+        if self.mab_converger is None:
+            return
+        self.mab_converger = None
+        self._tools_cache = None
+        self._chains_cache = {}
+        get_converger_registry().release(self.mab_namespace)
+        logger.info("🔗 NeogenesisAdapter 已关闭")
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
     def get_system_status(self) -> Dict[str, Any]:
         """
         获取系统状态
@@ -498,7 +498,7 @@ class HighPerformanceDecisionChain(SmartCoordinatedChain):
         
         # 性能优化配置
         self.enable_async = True
-        self.coordinator.result_cache = {}  # 重置缓存
+        self.coordinator.result_cache.clear()  # 重置缓存
         
         logger.info("⚡ HighPerformanceDecisionChain 初始化完成")
     
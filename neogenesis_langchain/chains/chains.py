@@ -42,6 +42,7 @@ from ..tools import (
     NeogenesisIdeaVerificationTool,
     NeogenesisFiveStageDecisionTool
 )
+from ..converger_registry import DEFAULT_NAMESPACE
 
 try:
     from ..execution.coordinators import NeogenesisToolCoordinator, ExecutionContext, ExecutionMode
@@ -115,6 +116,7 @@ class NeogenesisDecisionChain(Chain):
         search_engine: str = "duckduckgo",
         llm_client=None,
         web_search_client=None,
+        mab_namespace: str = DEFAULT_NAMESPACE,
         **kwargs
     ):
         # 初始化工具
@@ -131,7 +133,8 @@ class NeogenesisDecisionChain(Chain):
         )
         mab_decision_tool = NeogenesisMABDecisionTool(
             api_key=api_key,
-            llm_client=llm_client
+            llm_client=llm_client,
+            mab_namespace=mab_namespace
         )
         verification_tool = NeogenesisIdeaVerificationTool(
             search_engine=search_engine
@@ -291,6 +294,7 @@ class NeogenesisFiveStageChain(Chain):
         search_engine: str = "duckduckgo",
         llm_client=None,
         web_search_client=None,
+        mab_namespace: str = DEFAULT_NAMESPACE,
         **kwargs
     ):
         # 初始化所有必需的工具
@@ -308,7 +312,8 @@ class NeogenesisFiveStageChain(Chain):
         )
         mab_decision_tool = NeogenesisMABDecisionTool(
             api_key=api_key,
-            llm_client=llm_client
+            llm_client=llm_client,
+            mab_namespace=mab_namespace
         )
         
         super().__init__(
@@ -486,7 +491,8 @@ def create_neogenesis_decision_chain(
     search_engine: str = "duckduckgo",
     llm_client=None,
     web_search_client=None,
-    chain_type: str = "basic"
+    chain_type: str = "basic",
+    mab_namespace: str = DEFAULT_NAMESPACE
 ) -> Chain:
     """
     创建Neogenesis决策链
@@ -497,6 +503,7 @@ def create_neogenesis_decision_chain(
         llm_client: LLM客户端
         web_search_client: 网络搜索客户端
         chain_type: 链类型（"basic" 或 "five_stage"）
+        mab_namespace: MAB收敛器命名空间
         
     Returns:
         决策链实例
@@ -506,14 +513,16 @@ def create_neogenesis_decision_chain(
             api_key=api_key,
             search_engine=search_engine,
             llm_client=llm_client,
-            web_search_client=web_search_client
+            web_search_client=web_search_client,
+            mab_namespace=mab_namespace
         )
     else:
         return NeogenesisDecisionChain(
             api_key=api_key,
             search_engine=search_engine,
             llm_client=llm_client,
-            web_search_client=web_search_client
+            web_search_client=web_search_client,
+            mab_namespace=mab_namespace
         )
 
 def create_custom_neogenesis_chain(
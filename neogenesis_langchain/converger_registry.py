@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Neogenesis System - Shared MABConverger Registry
+进程级 MABConverger 注册表：同一命名空间下的所有工具、链与适配器共享同一个收敛器
+
+- 收敛器在首次使用时创建（初始化开销只付一次），之后的获取是一次字典查找
+- 不同命名空间相互隔离（例如按租户或按场景区分学习状态）
+- 引用计数：每次 get() 计一次引用，release() 减一，最后一个引用释放时才停止并移除收敛器；
+  生命周期不明确的使用者（如 LangChain 工具）用 borrow() 借用，不计引用也不需要释放，
+  收敛器保留到持有引用者全部释放或进程退出
+- 可选持久化：指定快照路径后，创建时从快照热启动，并在后台定期保存；
+  进程退出或 release()/shutdown() 时写入最终快照
+"""
+
+import atexit
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_NAMESPACE = "default"
+
+
+def _default_factory():
+    """默认工厂：核心系统的 MABConverger"""
+    from neogenesis_system.cognitive_engine.mab_converger import MABConverger
+    return MABConverger()
+
+
+class MABConvergerRegistry:
+    """按命名空间共享 MABConverger 的注册表（线程安全）"""
+
+    def __init__(self, factory: Callable[[], Any] = None):
+        """
+        初始化注册表
+
+        Args:
+            factory: 创建收敛器的工厂函数（默认创建核心系统的 MABConverger）
+        """
+        self.factory = factory or _default_factory
+        self._convergers: Dict[str, Any] = {}
+        self._snapshot_paths: Dict[str, str] = {}
+        self._refcounts: Dict[str, int] = {}
+        self._creation_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._atexit_registered = False
+
+    def get(self,
+            namespace: str = DEFAULT_NAMESPACE,
+            snapshot_path: Optional[str] = None,
+            snapshot_interval: float = 300.0) -> Any:
+        """
+        获取命名空间对应的收敛器（不存在时创建），并增加一次引用
+
+        Args:
+            namespace: 命名空间
+            snapshot_path: 快照文件路径（仅在首次创建时生效；None 表示不持久化）
+            snapshot_interval: 后台快照间隔（秒），<= 0 时只在释放时保存
+
+        Returns:
+            共享的收敛器实例
+        """
+        return self._acquire(namespace, snapshot_path, snapshot_interval, counted=True)
+
+    def borrow(self,
+               namespace: str = DEFAULT_NAMESPACE,
+               snapshot_path: Optional[str] = None,
+               snapshot_interval: float = 300.0) -> Any:
+        """
+        借用命名空间对应的收敛器（不存在时创建），不增加引用，借用者不调用 release()
+
+        参数与 get() 相同。
+        """
+        return self._acquire(namespace, snapshot_path, snapshot_interval, counted=False)
+
+    def _acquire(self, namespace: str, snapshot_path: Optional[str], snapshot_interval: float,
+                 counted: bool) -> Any:
+        """获取或创建收敛器；counted 为 True 时增加一次引用"""
+        converger = self._convergers.get(namespace)
+        if converger is None:
+            with self._lock:
+                creation_lock = self._creation_locks.setdefault(namespace, threading.Lock())
+
+            # 按命名空间串行化创建：不同命名空间的初始化互不阻塞
+            with creation_lock:
+                converger = self._convergers.get(namespace)
+                if converger is None:
+                    converger = self._create(namespace, snapshot_path, snapshot_interval)
+                    with self._lock:
+                        self._convergers[namespace] = converger
+                        self._refcounts[namespace] = int(counted)
+                    return converger
+
+        with self._lock:
+            if self._convergers.get(namespace) is not converger:
+                # 获取期间被释放：重新获取（会创建新的收敛器）
+                return self._acquire(namespace, snapshot_path, snapshot_interval, counted)
+            self._refcounts[namespace] = self._refcounts.get(namespace, 0) + int(counted)
+        if snapshot_path and self._snapshot_paths.get(namespace) != snapshot_path:
+            logger.warning(f"⚠️ 命名空间 {namespace} 的收敛器已存在，忽略快照路径: {snapshot_path}")
+        return converger
+
+    def _create(self, namespace: str, snapshot_path: Optional[str], snapshot_interval: float) -> Any:
+        """创建收敛器，并按需从快照恢复、启动后台快照"""
+        converger = self.factory()
+
+        if snapshot_path:
+            restored = converger.load_snapshot(snapshot_path)
+            if snapshot_interval > 0:
+                converger.start_background_snapshots(snapshot_path, snapshot_interval)
+            with self._lock:
+                self._snapshot_paths[namespace] = snapshot_path
+                if not self._atexit_registered:
+                    atexit.register(self.shutdown)
+                    self._atexit_registered = True
+            logger.info(f"🎰 共享收敛器已创建: {namespace} (从快照恢复 {restored} 个决策臂)")
+        else:
+            logger.info(f"🎰 共享收敛器已创建: {namespace}")
+
+        return converger
+
+    def peek(self, namespace: str = DEFAULT_NAMESPACE) -> Optional[Any]:
+        """获取已存在的收敛器（不创建）"""
+        return self._convergers.get(namespace)
+
+    def namespaces(self) -> List[str]:
+        """已创建的命名空间"""
+        with self._lock:
+            return list(self._convergers.keys())
+
+    def refcount(self, namespace: str = DEFAULT_NAMESPACE) -> int:
+        """命名空间当前的引用数（不存在时为 0）"""
+        with self._lock:
+            return self._refcounts.get(namespace, 0)
+
+    def release(self, namespace: str = DEFAULT_NAMESPACE, final_snapshot: bool = True, force: bool = False) -> bool:
+        """
+        释放一次引用；最后一个引用释放（或 force=True）时停止后台快照、（可选）写入最终快照并移除收敛器
+
+        只由 get() 的调用者调用；此后借用者手中的实例不再共享，之后的 get()/borrow() 会创建新实例
+
+        Returns:
+            命名空间是否存在
+        """
+        with self._lock:
+            if namespace not in self._convergers:
+                return False
+            remaining = self._refcounts.get(namespace, 0) - 1
+            if remaining > 0 and not force:
+                self._refcounts[namespace] = remaining
+                return True
+            converger = self._convergers.pop(namespace)
+            snapshot_path = self._snapshot_paths.pop(namespace, None)
+            self._refcounts.pop(namespace, None)
+
+        if snapshot_path:
+            converger.stop_background_snapshots(final_snapshot=False)
+            if final_snapshot:
+                converger.save_snapshot(snapshot_path)
+        logger.info(f"🎰 共享收敛器已释放: {namespace}")
+        return True
+
+    def shutdown(self, final_snapshot: bool = True):
+        """释放所有命名空间（忽略引用计数，进程退出时自动调用）"""
+        for namespace in self.namespaces():
+            try:
+                self.release(namespace, final_snapshot=final_snapshot, force=True)
+            except Exception as e:
+                logger.error(f"❌ 释放共享收敛器失败: {namespace}: {e}")
+
+
+_registry = MABConvergerRegistry()
+
+
+def get_converger_registry() -> MABConvergerRegistry:
+    """获取进程级注册表"""
+    return _registry
+
+
+def get_shared_mab_converger(namespace: str = DEFAULT_NAMESPACE,
+                             snapshot_path: Optional[str] = None,
+                             snapshot_interval: float = 300.0) -> Any:
+    """
+    获取进程级共享的 MABConverger
+
+    Args:
+        namespace: 命名空间（相同命名空间共享学习状态）
+        snapshot_path: 快照文件路径（可选，启用持久化）
+        snapshot_interval: 后台快照间隔（秒）
+
+    Returns:
+        共享的收敛器实例
+    """
+    return _registry.get(namespace, snapshot_path, snapshot_interval)
+
+
+def borrow_shared_mab_converger(namespace: str = DEFAULT_NAMESPACE,
+                                snapshot_path: Optional[str] = None,
+                                snapshot_interval: float = 300.0) -> Any:
+    """
+    借用进程级共享的 MABConverger（不计引用，无需释放）
+
+    Args:
+        namespace: 命名空间（相同命名空间共享学习状态）
+        snapshot_path: 快照文件路径（可选，启用持久化）
+        snapshot_interval: 后台快照间隔（秒）
+
+    Returns:
+        共享的收敛器实例
+    """
+    return _registry.borrow(namespace, snapshot_path, snapshot_interval)
@@ -7,6 +7,7 @@ Neogenesis System - Tool Coordinators
 """
 
 import asyncio
+import contextvars
 import json
 import logging
 import time
@@ -24,6 +25,12 @@ from ..tools import (
     NeogenesisIdeaVerificationTool
 )
 from ..state.state_management import NeogenesisStateManager, DecisionStage, DecisionState
+from ..converger_registry import DEFAULT_NAMESPACE
+from neogenesis_system.shared.budget import (
+    Budget, DegradationLevel, budget_scope, current_degradation, get_current_budget
+)
+from neogenesis_system.shared.result_cache import ResultCache, stable_digest
+from neogenesis_system.shared.dag_scheduler import DagNode, DependencyScheduler
 
 logger = logging.getLogger(__name__)
 
@@ -47,6 +54,15 @@ class ToolPriority(Enum):
     LOW = "low"              # 低优先级，可选
     OPTIONAL = "optional"    # 完全可选
 
+# 依赖图调度时的启动优先级（数值越大越先启动）
+_PRIORITY_RANK = {
+    ToolPriority.CRITICAL: 4,
+    ToolPriority.HIGH: 3,
+    ToolPriority.MEDIUM: 2,
+    ToolPriority.LOW: 1,
+    ToolPriority.OPTIONAL: 0
+}
+
 @dataclass
 class ExecutionContext:
     """执行上下文"""
@@ -60,6 +76,7 @@ class ExecutionContext:
     max_parallel_tools: int = 3
     fallback_enabled: bool = True
     custom_config: Dict[str, Any] = field(default_factory=dict)
+    budget: Optional[Budget] = None  # 请求预算（token/成本/LLM调用次数/时间），None 表示不限
 
 @dataclass
 class ToolExecutionPlan:
@@ -109,7 +126,11 @@ class NeogenesisToolCoordinator:
                  llm_client=None,
                  web_search_client=None,
                  state_manager: Optional[NeogenesisStateManager] = None,
-                 max_workers: int = 4):
+                 max_workers: int = 4,
+                 mab_namespace: str = DEFAULT_NAMESPACE,
+                 cache_max_size: int = 512,
+                 cache_ttl: Optional[float] = 3600.0,
+                 cache_dir: Optional[str] = None):
         """
         初始化协调器
         
@@ -120,6 +141,10 @@ class NeogenesisToolCoordinator:
             web_search_client: 网络搜索客户端
             state_manager: 状态管理器
             max_workers: 最大工作线程数
+            mab_namespace: MAB收敛器命名空间
+            cache_max_size: 结果缓存的最大条目数
+            cache_ttl: 结果缓存的存活秒数（None 表示不过期）
+            cache_dir: 结果缓存的磁盘层目录（None 表示只用内存）
         """
         self.api_key = api_key
         self.search_engine = search_engine
@@ -127,6 +152,7 @@ class NeogenesisToolCoordinator:
         self.web_search_client = web_search_client
         self.state_manager = state_manager
         self.max_workers = max_workers
+        self.mab_namespace = mab_namespace
         
         # 初始化工具实例
         self._initialize_tools()
@@ -143,7 +169,8 @@ class NeogenesisToolCoordinator:
         }
         
         # 缓存和优化
-        self.result_cache = {}
+        self.result_cache = ResultCache(max_size=cache_max_size, ttl=cache_ttl, cache_dir=cache_dir,
+                                        value_decoder=self._decode_cached_result)
         self.execution_history = []
         self.performance_optimizer = PerformanceOptimizer()
         
@@ -168,7 +195,8 @@ class NeogenesisToolCoordinator:
             ),
             "mab_decision": NeogenesisMABDecisionTool(
                 api_key=self.api_key,
-                llm_client=self.llm_client
+                llm_client=self.llm_client,
+                mab_namespace=self.mab_namespace
             ),
             "idea_verification": NeogenesisIdeaVerificationTool(
                 search_engine=self.search_engine
@@ -336,97 +364,103 @@ class NeogenesisToolCoordinator:
         
         Args:
             plan: 执行计划
-            context: 执行上下文
+            context: 执行上下文（context.budget 在执行期间作为当前请求预算）
             
         Returns:
             执行结果字典
         """
-        results = {}
-        execution_order_groups = {}
-        
-        # 按执行顺序分组
-        for tool_plan in plan:
-            order = tool_plan.execution_order
-            if order not in execution_order_groups:
-                execution_order_groups[order] = []
-            execution_order_groups[order].append(tool_plan)
-        
-        # 按顺序执行每组
-        for order in sorted(execution_order_groups.keys()):
-            group = execution_order_groups[order]
-            
-            if context.execution_mode == ExecutionMode.PARALLEL and len(group) > 1:
-                # 并行执行组内工具
-                group_results = await self._execute_group_parallel(group, context, results)
-            else:
-                # 顺序执行组内工具
-                group_results = await self._execute_group_sequential(group, context, results)
-            
-            results.update(group_results)
-            
-            # 检查关键工具是否成功
-            critical_failed = any(
-                not result.success for tool_plan in group
-                for result in [results.get(tool_plan.tool_name)]
-                if tool_plan.priority == ToolPriority.CRITICAL and result
+        with budget_scope(context.budget):
+            return await self._execute_plan_graph(plan, context)
+    
+    async def _execute_plan_graph(self,
+                                  plan: List[ToolExecutionPlan],
+                                  context: ExecutionContext) -> Dict[str, ExecutionResult]:
+        """
+        按依赖图流式执行计划：每个工具在其依赖完成后立即启动，不在执行顺序组之间设置屏障
+        
+        - 并发上限为 context.max_parallel_tools（顺序模式为 1），排队时按工具优先级放行
+        - 单个工具超过 tool_plan.timeout 记为失败；关键工具失败时先尝试回退
+        - 关键工具失败且回退未能挽回时：未启用回退（context.fallback_enabled 为假）则取消其余在途工具并结束执行；
+          启用回退时继续执行其余工具，依赖它的工具是否执行由 _check_dependencies 决定
+        """
+        results: Dict[str, ExecutionResult] = {}
+        
+        # 依赖按工具名声明；同名工具（如两个验证阶段）都完成后依赖才算满足
+        node_ids: Dict[str, List[str]] = {}
+        for index, tool_plan in enumerate(plan):
+            node_ids.setdefault(tool_plan.tool_name, []).append(str(index))
+        nodes = [
+            DagNode(
+                node_id=str(index),
+                dependencies=[dep_id for dependency in tool_plan.dependencies
+                              for dep_id in node_ids.get(dependency, []) if dep_id != str(index)],
+                priority=_PRIORITY_RANK[tool_plan.priority],
+                order=tool_plan.execution_order,
+                payload=tool_plan
             )
-            
-            if critical_failed and not context.fallback_enabled:
-                logger.error("❌ 关键工具执行失败，终止执行")
-                break
+            for index, tool_plan in enumerate(plan)
+        ]
         
-        return results
-    
-    async def _execute_group_parallel(self,
-                                     group: List[ToolExecutionPlan],
-                                     context: ExecutionContext,
-                                     previous_results: Dict[str, ExecutionResult]) -> Dict[str, ExecutionResult]:
-        """并行执行工具组"""
-        tasks = []
-        
-        for tool_plan in group:
-            if self._check_dependencies(tool_plan, previous_results):
-                task = asyncio.create_task(
-                    self._execute_single_tool_async(tool_plan, context, previous_results)
-                )
-                tasks.append((tool_plan.tool_name, task))
+        def should_run(node: DagNode, outcomes) -> bool:
+            tool_plan = node.payload
+            # 💰 请求预算不足时跳过验证工具（验证均为可选阶段）
+            if tool_plan.tool_name == "idea_verification" and \
+                    current_degradation() >= DegradationLevel.NO_LLM_VERIFICATION:
+                logger.info(f"💰 请求预算不足，跳过验证工具: {tool_plan.stage.value}")
+                return False
+            return self._check_dependencies(tool_plan, results)
         
-        results = {}
-        for tool_name, task in tasks:
+        async def run_tool(node: DagNode) -> ExecutionResult:
+            tool_plan = node.payload
             try:
-                result = await task
-                results[tool_name] = result
-            except Exception as e:
-                logger.error(f"❌ 并行执行工具 {tool_name} 失败: {e}")
-                results[tool_name] = ExecutionResult(
-                    tool_name=tool_name,
-                    stage=DecisionStage.ERROR,
+                result = await asyncio.wait_for(
+                    self._execute_single_tool_async(tool_plan, context, results),
+                    timeout=tool_plan.timeout
+                )
+            except asyncio.TimeoutError:
+                logger.error(f"⏰ 工具执行超时: {tool_plan.tool_name} ({tool_plan.timeout:.1f}s)")
+                self._update_performance_stats(tool_plan.tool_name, tool_plan.timeout, False)
+                result = ExecutionResult(
+                    tool_name=tool_plan.tool_name,
+                    stage=tool_plan.stage,
                     success=False,
-                    error_message=str(e)
+                    execution_time=tool_plan.timeout,
+                    error_message=f"执行超时 ({tool_plan.timeout:.1f}s)"
                 )
+            
+            # 如果关键工具失败，考虑回退
+            if not result.success and tool_plan.priority == ToolPriority.CRITICAL:
+                fallback_result = await self._try_fallback(tool_plan, context, results)
+                if fallback_result:
+                    result = fallback_result
+            return result
         
-        return results
-    
-    async def _execute_group_sequential(self,
-                                       group: List[ToolExecutionPlan],
-                                       context: ExecutionContext,
-                                       previous_results: Dict[str, ExecutionResult]) -> Dict[str, ExecutionResult]:
-        """顺序执行工具组"""
-        results = {}
-        
-        for tool_plan in group:
-            if self._check_dependencies(tool_plan, previous_results):
-                result = await self._execute_single_tool_async(tool_plan, context, previous_results)
-                results[tool_plan.tool_name] = result
-                
-                # 如果关键工具失败，考虑回退
-                if not result.success and tool_plan.priority == ToolPriority.CRITICAL:
-                    fallback_result = await self._try_fallback(tool_plan, context, previous_results)
-                    if fallback_result:
-                        results[tool_plan.tool_name] = fallback_result
+        def should_abort(outcome) -> bool:
+            return not context.fallback_enabled and outcome.node.payload.priority == ToolPriority.CRITICAL and not (
+                outcome.error is None and outcome.result.success)
+        
+        max_concurrency = 1 if context.execution_mode == ExecutionMode.SEQUENTIAL else context.max_parallel_tools
+        scheduler = DependencyScheduler(nodes, max_concurrency=max_concurrency)
+        async for outcome in scheduler.run(run_tool, should_run=should_run, should_abort=should_abort):
+            if outcome.skipped:
+                continue
+            tool_plan = outcome.node.payload
+            results[tool_plan.tool_name] = outcome.result if outcome.error is None else ExecutionResult(
+                tool_name=tool_plan.tool_name,
+                stage=DecisionStage.ERROR,
+                success=False,
+                error_message=str(outcome.error)
+            )
         
+        if scheduler.aborted:
+            logger.error(f"❌ 关键工具执行失败，取消 {len(scheduler.cancelled)} 个在途工具并终止执行")
         return results
     
+    @staticmethod
+    def _decode_cached_result(data: Dict[str, Any]) -> ExecutionResult:
+        """把磁盘缓存中的 JSON 还原为 ExecutionResult"""
+        return ExecutionResult(**{**data, "stage": DecisionStage(data["stage"])})
+    
     async def _execute_single_tool_async(self,
                                         tool_plan: ToolExecutionPlan,
                                         context: ExecutionContext,
@@ -435,21 +469,23 @@ class NeogenesisToolCoordinator:
         start_time = time.time()
         
         try:
-            # 检查缓存
+            # 检查缓存（返回的是副本，标记命中不会修改缓存中的结果）
             cache_key = self._generate_cache_key(tool_plan, context, previous_results)
-            if context.enable_caching and cache_key in self.result_cache:
-                cached_result = self.result_cache[cache_key]
+            cached_result = self.result_cache.get(cache_key) if context.enable_caching else None
+            if cached_result is not None:
                 cached_result.cache_hit = True
+                self.execution_stats["cache_hits"] += 1
                 logger.debug(f"💾 缓存命中: {tool_plan.tool_name}")
                 return cached_result
             
             # 准备工具输入
             tool_input = self._prepare_tool_input(tool_plan, context, previous_results)
             
-            # 执行工具
+            # 执行工具（复制上下文，使请求预算在线程池中同样生效）
             loop = asyncio.get_event_loop()
             result_data = await loop.run_in_executor(
                 self.thread_pool,
+                contextvars.copy_context().run,
                 self._execute_tool_sync,
                 tool_plan.tool_instance,
                 tool_input
@@ -473,7 +509,7 @@ class NeogenesisToolCoordinator:
             
             # 缓存结果
             if context.enable_caching:
-                self.result_cache[cache_key] = result
+                self.result_cache.put(cache_key, result)
             
             # 更新状态管理器
             if self.state_manager:
@@ -539,6 +575,12 @@ class NeogenesisToolCoordinator:
         
         return True
     
+    @staticmethod
+    def _budget_max_paths(max_paths: int) -> int:
+        """按当前请求预算的降级级别限制路径数"""
+        budget = get_current_budget()
+        return budget.limit_paths(max_paths) if budget is not None else max_paths
+    
     def _prepare_tool_input(self,
                           tool_plan: ToolExecutionPlan,
                           context: ExecutionContext,
@@ -573,7 +615,7 @@ class NeogenesisToolCoordinator:
                 tool_input.update({
                     "thinking_seed": thinking_seed,
                     "task": context.user_query,
-                    "max_paths": context.custom_config.get("max_paths", 4)
+                    "max_paths": self._budget_max_paths(context.custom_config.get("max_paths", 4))
                 })
             
         elif tool_plan.tool_name == "mab_decision":
@@ -668,14 +710,23 @@ class NeogenesisToolCoordinator:
                           tool_plan: ToolExecutionPlan,
                           context: ExecutionContext,
                           previous_results: Dict[str, ExecutionResult]) -> str:
-        """生成缓存键"""
-        key_components = [
+        """
+        生成缓存键：规范化输入与声明依赖输出的稳定摘要
+        
+        只有 tool_plan.dependencies 中成功的结果参与摘要，键的计算量不随执行历史增长
+        """
+        dependency_outputs = {
+            name: previous_results[name].data
+            for name in tool_plan.dependencies
+            if name in previous_results and previous_results[name].success
+        }
+        return stable_digest(
             tool_plan.tool_name,
+            tool_plan.stage,
             context.user_query,
-            str(context.custom_config),
-            str([r.data for r in previous_results.values() if r.success])
-        ]
-        return f"cache_{hash('_'.join(key_components))}"
+            context.custom_config,
+            dependency_outputs
+        )
     
     def _update_performance_stats(self, tool_name: str, execution_time: float, success: bool):
         """更新性能统计"""
@@ -714,7 +765,8 @@ class NeogenesisToolCoordinator:
             "summary": self.execution_stats,
             "cache_efficiency": {
                 "cache_size": len(self.result_cache),
-                "cache_hit_rate": self.execution_stats.get("cache_hits", 0) / max(self.execution_stats["total_executions"], 1)
+                "cache_hit_rate": self.execution_stats.get("cache_hits", 0) / max(self.execution_stats["total_executions"], 1),
+                "cache_stats": self.result_cache.get_stats()
             },
             "tool_rankings": sorted(
                 self.execution_stats["tool_performance"].items(),
@@ -17,6 +17,7 @@ from dataclasses import dataclass, field, asdict
 from enum import Enum
 from collections import defaultdict, deque
 import uuid
+import zlib
 
 from .persistent_storage import PersistentStorageEngine, StorageConfig
 from .distributed_state import DistributedStateManager
@@ -34,6 +35,7 @@ class MABAlgorithm(Enum):
     THOMPSON_SAMPLING = "thompson_sampling"
     SOFTMAX = "softmax"
     ADAPTIVE_GREEDY = "adaptive_greedy"
+    LINUCB = "linucb"                # 上下文线性UCB（使用 MABContext.features）
 
 class RewardType(Enum):
     """奖励类型"""
@@ -124,9 +126,206 @@ class MABConfiguration:
     
     # 持久化设置
     auto_save_interval: float = 60.0  # 自动保存间隔（秒）
+    auto_save_max_dirty: int = 500    # 待写入的臂达到此数量时提前保存
     max_history_length: int = 1000    # 最大历史长度
-    enable_contextual: bool = False   # 是否启用上下文感知
+    enable_contextual: bool = False   # 是否启用上下文感知（LINUCB 算法总是启用）
     enable_cold_start: bool = True    # 是否启用冷启动优化
+    
+    # 上下文感知（LinUCB）
+    linucb_alpha: float = 1.0         # 置信上界系数
+    context_dimension: int = 32       # 特征哈希后的维度（含偏置项）
+    ridge_lambda: float = 1.0         # 岭回归正则（A 初始化为 λI）
+
+# =============================================================================
+# 上下文感知模型
+# =============================================================================
+
+class LinUCBModel:
+    """
+    LinUCB 上下文老虎机模型（非线程安全，由引擎的锁保护）
+    
+    每个臂维护 A = λI + Σ x xᵀ 与 b = Σ r x，直接存储 A 的逆：奖励更新用
+    Sherman–Morrison 秩一公式，单次 O(d²)，无需求逆。所有臂的参数堆叠在
+    (n_arms, d, d) / (n_arms, d) 数组中，为全部臂打分是一次批量矩阵运算。
+    底层缓冲区按容量倍增，A_inv / b / theta 是前 n_arms 行的视图，逐个添加臂均摊 O(d²)。
+    """
+    
+    INITIAL_CAPACITY = 8
+    
+    def __init__(self, dimension: int = 32, ridge_lambda: float = 1.0):
+        if dimension < 2:
+            raise ValueError("context_dimension 至少为 2（偏置项 + 特征）")
+        self.dimension = dimension
+        self.ridge_lambda = ridge_lambda
+        
+        self.arm_ids: List[str] = []
+        self.arm_index: Dict[str, int] = {}
+        self.arm_updates: Dict[str, int] = {}  # 每个臂的更新次数（0 表示仍为先验，持久化时省略）
+        self._A_inv = np.empty((0, dimension, dimension))
+        self._b = np.empty((0, dimension))
+        self._theta = np.empty((0, dimension))
+        self.update_count = 0
+    
+    def __len__(self) -> int:
+        return len(self.arm_ids)
+    
+    @property
+    def capacity(self) -> int:
+        return self._A_inv.shape[0]
+    
+    @property
+    def A_inv(self) -> np.ndarray:
+        return self._A_inv[:len(self.arm_ids)]
+    
+    @property
+    def b(self) -> np.ndarray:
+        return self._b[:len(self.arm_ids)]
+    
+    @property
+    def theta(self) -> np.ndarray:
+        return self._theta[:len(self.arm_ids)]
+    
+    def _reserve(self, size: int):
+        """保证缓冲区容量不小于 size（不足时倍增）"""
+        if size <= self.capacity:
+            return
+        capacity = max(self.INITIAL_CAPACITY, self.capacity * 2, size)
+        count = len(self.arm_ids)
+        for name in ("_A_inv", "_b", "_theta"):
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:])
+            new[:count] = old[:count]
+            setattr(self, name, new)
+    
+    def vectorize(self, features: Dict[str, Any]) -> Tuple[np.ndarray, Dict[str, int]]:
+        """
+        特征字典 -> 定长向量（特征哈希）
+        
+        第 0 维为偏置项；数值/布尔特征按值写入 hash(名称) 维，字符串特征按
+        one-hot 写入 hash(名称=取值) 维，字符串列表的每一项同理；其余类型忽略。
+        数值特征应预先缩放到 [0, 1] 左右。
+        
+        Returns:
+            (特征向量, 特征名称 -> 所在维度)
+        """
+        x = np.zeros(self.dimension)
+        x[0] = 1.0
+        positions = {}
+        
+        for name, value in features.items():
+            if isinstance(value, (bool, int, float, np.number)):
+                value = float(value)
+                if not math.isfinite(value):
+                    continue
+                tokens = [(str(name), value)]
+            elif isinstance(value, str):
+                tokens = [(f"{name}={value}", 1.0)]
+            elif isinstance(value, (list, tuple, set)):
+                tokens = [(f"{name}={item}", 1.0) for item in value if isinstance(item, str)]
+            else:
+                continue
+            
+            for token, token_value in tokens:
+                position = 1 + zlib.crc32(token.encode("utf-8")) % (self.dimension - 1)
+                x[position] += token_value
+                positions[token] = position
+        
+        return x, positions
+    
+    def add_arm(self, arm_id: str):
+        """新臂：A⁻¹ = I/λ, b = 0"""
+        if arm_id in self.arm_index:
+            return
+        row = len(self.arm_ids)
+        self._reserve(row + 1)
+        self._A_inv[row] = np.eye(self.dimension) / self.ridge_lambda
+        self._b[row] = 0.0
+        self._theta[row] = 0.0
+        self.arm_index[arm_id] = row
+        self.arm_ids.append(arm_id)
+        self.arm_updates[arm_id] = 0
+    
+    def remove_arm(self, arm_id: str):
+        """移除臂（最后一行移到被删除的位置）"""
+        row = self.arm_index.pop(arm_id, None)
+        if row is None:
+            return
+        self.arm_updates.pop(arm_id, None)
+        last = len(self.arm_ids) - 1
+        if row != last:
+            moved_arm = self.arm_ids[last]
+            self.arm_ids[row] = moved_arm
+            self.arm_index[moved_arm] = row
+            self._A_inv[row], self._b[row], self._theta[row] = self._A_inv[last], self._b[last], self._theta[last]
+        self.arm_ids.pop()
+    
+    def scores(self, x: np.ndarray, alpha: float) -> np.ndarray:
+        """所有臂的置信上界：θᵀx + α·sqrt(xᵀA⁻¹x)"""
+        A_inv_x = self.A_inv @ x                      # (n_arms, d)
+        variance = np.maximum(A_inv_x @ x, 0.0)       # (n_arms,)
+        return self.theta @ x + alpha * np.sqrt(variance)
+    
+    def select(self, x: np.ndarray, alpha: float) -> Optional[str]:
+        """选择置信上界最高的臂（并列时随机）"""
+        if not self.arm_ids:
+            return None
+        scores = self.scores(x, alpha)
+        best_rows = np.flatnonzero(scores >= scores.max() - 1e-12)
+        return self.arm_ids[int(np.random.choice(best_rows))]
+    
+    def update(self, arm_id: str, x: np.ndarray, reward: float):
+        """Sherman–Morrison 秩一更新：(A + xxᵀ)⁻¹ = A⁻¹ - (A⁻¹x)(A⁻¹x)ᵀ / (1 + xᵀA⁻¹x)"""
+        row = self.arm_index.get(arm_id)
+        if row is None:
+            return
+        A_inv = self.A_inv[row]
+        A_inv_x = A_inv @ x
+        A_inv -= np.outer(A_inv_x, A_inv_x) / (1.0 + x @ A_inv_x)
+        self.b[row] += reward * x
+        self.theta[row] = A_inv @ self.b[row]
+        self.update_count += 1
+        self.arm_updates[arm_id] += 1
+    
+    def metadata(self) -> Dict[str, Any]:
+        """模型级参数（与各臂参数分开存储）"""
+        return {
+            "dimension": self.dimension,
+            "ridge_lambda": self.ridge_lambda,
+            "update_count": self.update_count
+        }
+    
+    def arm_state(self, arm_id: str) -> Optional[Dict[str, Any]]:
+        """单个臂的参数；臂不存在或从未更新（仍为先验）时返回 None"""
+        row = self.arm_index.get(arm_id)
+        if row is None or not self.arm_updates.get(arm_id):
+            return None
+        return {
+            "A_inv": self.A_inv[row].tolist(),
+            "b": self.b[row].tolist(),
+            "updates": self.arm_updates[arm_id]
+        }
+    
+    def load_arm_state(self, arm_id: str, data: Dict[str, Any]):
+        """恢复单个臂的参数（臂不存在时先添加）"""
+        self.add_arm(arm_id)
+        row = self.arm_index[arm_id]
+        d = self.dimension
+        self._A_inv[row] = np.array(data["A_inv"], dtype=float).reshape(d, d)
+        self._b[row] = np.array(data["b"], dtype=float).reshape(d)
+        self._theta[row] = self._A_inv[row] @ self._b[row]
+        self.arm_updates[arm_id] = int(data.get("updates", 1))
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'LinUCBModel':
+        """从旧格式（所有臂的参数保存在同一条记录中）恢复"""
+        model = cls(data["dimension"], data.get("ridge_lambda", 1.0))
+        d = model.dimension
+        A_inv = np.array(data["A_inv"], dtype=float).reshape(-1, d, d)
+        b = np.array(data["b"], dtype=float).reshape(-1, d)
+        for row, arm_id in enumerate(data["arm_ids"]):
+            model.load_arm_state(arm_id, {"A_inv": A_inv[row], "b": b[row]})
+        model.update_count = data.get("update_count", 0)
+        return model
 
 # =============================================================================
 # 智能MAB算法实现
@@ -137,16 +336,19 @@ class IntelligentMABEngine:
     
     def __init__(self,
                  config: MABConfiguration = None,
-                 storage_engine: PersistentStorageEngine = None):
+                 storage_engine: PersistentStorageEngine = None,
+                 state_key: str = "mab_state"):
         """
         初始化智能MAB引擎
         
         Args:
             config: MAB配置
             storage_engine: 存储引擎
+            state_key: 默认存储键（自动保存与清理时使用）
         """
         self.config = config or MABConfiguration()
         self.storage_engine = storage_engine
+        self.state_key = state_key
         
         # MAB状态
         self.arms: Dict[str, MABArm] = {}
@@ -154,7 +356,9 @@ class IntelligentMABEngine:
         self.total_rounds: int = 0
         
         # 上下文感知
-        self.contextual_models = {}
+        self.contextual_models: Dict[str, LinUCBModel] = {
+            "linucb": LinUCBModel(self.config.context_dimension, self.config.ridge_lambda)
+        }
         self.feature_importance = defaultdict(float)
         
         # 性能统计
@@ -169,8 +373,18 @@ class IntelligentMABEngine:
         # 线程安全
         self._lock = threading.RLock()
         
+        # 增量保存：自上次保存以来变化的臂（同一臂的多次更新合并为一次写入）
+        self._dirty_arms: set = set()
+        self._removed_arms: set = set()
+        self._header_dirty = True
+        self._last_saved_key: Optional[str] = None
+        self._legacy_model_keys: set = set()  # 已迁移、待全量保存后删除的旧格式模型记录
+        self._save_lock = threading.Lock()  # 同一时刻只有一个写者
+        
         # 自动保存
-        self.auto_save_timer = None
+        self._auto_save_thread: Optional[threading.Thread] = None
+        self._auto_save_stop = threading.Event()
+        self._flush_requested = threading.Event()
         if self.storage_engine and self.config.auto_save_interval > 0:
             self._start_auto_save()
         
@@ -184,6 +398,7 @@ class IntelligentMABEngine:
                 return False
             
             self.arms[arm.arm_id] = arm
+            self.contextual_models["linucb"].add_arm(arm.arm_id)
             logger.info(f"➕ 添加MAB臂: {arm.arm_id} ({arm.name})")
             
             # 如果启用了冷启动，给新臂一些初始探索机会
@@ -191,6 +406,8 @@ class IntelligentMABEngine:
                 arm.total_pulls = 1
                 arm.total_reward = 0.5  # 中性初始奖励
             
+            self._removed_arms.discard(arm.arm_id)
+            self._mark_arm_dirty(arm.arm_id)
             return True
     
     def remove_arm(self, arm_id: str) -> bool:
@@ -201,6 +418,10 @@ class IntelligentMABEngine:
                 return False
             
             del self.arms[arm_id]
+            self.contextual_models["linucb"].remove_arm(arm_id)
+            self._dirty_arms.discard(arm_id)
+            self._removed_arms.add(arm_id)
+            self._header_dirty = True
             logger.info(f"➖ 移除MAB臂: {arm_id}")
             return True
     
@@ -228,6 +449,8 @@ class IntelligentMABEngine:
                 selected_arm = self._thompson_sampling_selection()
             elif self.config.algorithm == MABAlgorithm.SOFTMAX:
                 selected_arm = self._softmax_selection()
+            elif self.config.algorithm == MABAlgorithm.LINUCB:
+                selected_arm = self._linucb_selection(context)
             else:
                 selected_arm = self._adaptive_greedy_selection()
             
@@ -244,6 +467,7 @@ class IntelligentMABEngine:
                 self.performance_stats["total_actions"] += 1
                 if self.arms[selected_arm].total_pulls == 0:
                     self.performance_stats["cold_start_actions"] += 1
+                self._header_dirty = True
             
             logger.debug(f"🎯 选择臂: {selected_arm}")
             return selected_arm
@@ -281,6 +505,15 @@ class IntelligentMABEngine:
             else:
                 arm.failure_count += 1
             
+            # 找到对应的待反馈动作（取最近一次未获得奖励的该臂动作）
+            pending_action = next((action for action in reversed(self.actions_history)
+                                   if action.arm_id == arm_id and action.reward is None), None)
+            
+            # 更新上下文模型
+            if self._contextual_enabled():
+                features_context = context or (pending_action.context if pending_action else None)
+                self._update_contextual_model(arm_id, reward, features_context)
+            
             # 更新Thompson Sampling参数
             arm.thompson_alpha += reward
             arm.thompson_beta += (1.0 - reward)
@@ -297,17 +530,42 @@ class IntelligentMABEngine:
             # 更新全局统计
             self.total_rounds += 1
             self.performance_stats["total_reward"] += reward
+            self._mark_arm_dirty(arm_id)
             
-            # 更新最近动作的奖励
-            if self.actions_history:
-                last_action = self.actions_history[-1]
-                if last_action.arm_id == arm_id and last_action.reward is None:
-                    last_action.reward = reward
-                    last_action.context = context or last_action.context
+            # 更新对应动作的奖励
+            if pending_action:
+                pending_action.reward = reward
+                pending_action.context = context or pending_action.context
             
             logger.debug(f"📊 更新奖励: {arm_id} = {reward:.3f}")
             return True
     
+    def _contextual_enabled(self) -> bool:
+        """是否维护上下文模型"""
+        return self.config.enable_contextual or self.config.algorithm == MABAlgorithm.LINUCB
+    
+    def _update_contextual_model(self, arm_id: str, reward: float, context: Optional[MABContext]):
+        """用一次奖励反馈更新 LinUCB 模型，并刷新相关特征的重要性"""
+        model = self.contextual_models["linucb"]
+        x, positions = model.vectorize(context.features if context else {})
+        model.update(arm_id, x, reward)
+        
+        # 特征重要性：该特征所在维度上各臂权重绝对值的均值
+        for token, position in positions.items():
+            self.feature_importance[token] = float(np.abs(model.theta[:, position]).mean())
+    
+    def get_feature_importance(self, top_k: int = 10) -> List[Tuple[str, float]]:
+        """获取最重要的上下文特征"""
+        with self._lock:
+            ranked = sorted(self.feature_importance.items(), key=lambda item: item[1], reverse=True)
+            return ranked[:top_k]
+    
+    def _linucb_selection(self, context: Optional[MABContext]) -> str:
+        """LinUCB选择：按上下文特征为所有臂批量计算置信上界"""
+        model = self.contextual_models["linucb"]
+        x, _ = model.vectorize(context.features if context else {})
+        return model.select(x, self.config.linucb_alpha)
+    
     def _epsilon_greedy_selection(self) -> str:
         """ε-贪心选择"""
         if np.random.random() < self.config.epsilon:
@@ -441,45 +699,141 @@ class IntelligentMABEngine:
         best_arm_id = rankings[0][0] if rankings else None
         return action.arm_id != best_arm_id
     
-    def save_state(self, key: str = "mab_state") -> bool:
-        """保存MAB状态"""
+    # ==================== 增量持久化 ====================
+    
+    @staticmethod
+    def _arm_key(key: str, arm_id: str) -> str:
+        """每个臂单独存储的键"""
+        return f"{key}:arm:{arm_id}"
+    
+    @staticmethod
+    def _model_key(key: str) -> str:
+        """旧格式中整个上下文模型存储的键（仅用于迁移）"""
+        return f"{key}:linucb"
+    
+    def _arm_record(self, arm_id: str) -> Dict[str, Any]:
+        """臂的存储记录：臂统计 + 该臂的 LinUCB 参数（从未更新的臂省略）"""
+        record = asdict(self.arms[arm_id])
+        linucb_state = self.contextual_models["linucb"].arm_state(arm_id)
+        if linucb_state is not None:
+            record["linucb"] = linucb_state
+        return record
+    
+    def _mark_arm_dirty(self, arm_id: str):
+        """标记臂待写入（需持有 self._lock）；积压过多时唤醒后台写者提前保存"""
+        self._dirty_arms.add(arm_id)
+        self._header_dirty = True
+        if len(self._dirty_arms) >= self.config.auto_save_max_dirty:
+            self._flush_requested.set()
+    
+    def has_pending_changes(self) -> bool:
+        """是否有尚未保存的变化"""
+        with self._lock:
+            return self._header_dirty or bool(self._dirty_arms) or bool(self._removed_arms)
+    
+    def save_state(self, key: str = None, full: bool = False) -> bool:
+        """
+        保存MAB状态（增量）
+        
+        头部记录（配置、统计、臂ID列表、最近100个动作、LinUCB 模型参数）存放在 key 下，
+        每个臂（连同它的 LinUCB A⁻¹ 与 b）存放在 f"{key}:arm:{arm_id}" 下。只写入自上次
+        保存以来变化的臂；首次保存到某个 key 或 full=True 时写入全部臂。没有任何变化时不写入。
+        
+        Args:
+            key: 存储键（默认 self.state_key）
+            full: 是否全量保存
+            
+        Returns:
+            是否保存成功
+        """
         if not self.storage_engine:
             logger.warning("⚠️ 没有存储引擎，无法保存状态")
             return False
         
-        try:
-            with self._lock:
-                state_data = {
-                    "config": asdict(self.config),
-                    "arms": {arm_id: asdict(arm) for arm_id, arm in self.arms.items()},
-                    "total_rounds": self.total_rounds,
-                    "performance_stats": self.performance_stats,
-                    "actions_history": [asdict(action) for action in list(self.actions_history)[-100:]],  # 只保存最近100个
-                    "saved_at": time.time()
-                }
+        key = key or self.state_key
+        with self._save_lock:
+            dirty_arms, removed_arms = set(), set()
+            try:
+                # 在锁内取走待写入集合并复制数据，序列化与写入在锁外进行
+                with self._lock:
+                    full = full or key != self._last_saved_key
+                    dirty_arms = set(self.arms) if full else self._dirty_arms & set(self.arms)
+                    removed_arms = set() if full else set(self._removed_arms)
+                    if not (full or self._header_dirty or dirty_arms or removed_arms):
+                        return True
+                    
+                    arm_items = {self._arm_key(key, arm_id): self._arm_record(arm_id) for arm_id in dirty_arms}
+                    model = self.contextual_models["linucb"]
+                    header = {
+                        "format_version": 3,
+                        "config": asdict(self.config),
+                        "arm_ids": list(self.arms.keys()),
+                        "total_rounds": self.total_rounds,
+                        "performance_stats": dict(self.performance_stats),
+                        "actions_history": [asdict(action) for action in list(self.actions_history)[-100:]],  # 只保存最近100个
+                        "contextual_model": model.metadata() if model.update_count > 0 else None,
+                        "feature_importance": dict(self.feature_importance),
+                        "saved_at": time.time()
+                    }
+                    self._dirty_arms.clear()
+                    self._removed_arms.clear()
+                    self._header_dirty = False
                 
-                success = self.storage_engine.store(key, state_data)
-                if success:
-                    logger.info(f"💾 MAB状态保存成功: {key}")
+                written = self.storage_engine.store_many(arm_items) if arm_items else 0
+                success = written == len(arm_items) and self.storage_engine.store(key, header)
+                if removed_arms:
+                    self.storage_engine.delete_many([self._arm_key(key, arm_id) for arm_id in removed_arms])
                 
+                if success:
+                    self._last_saved_key = key
+                    if full and self._model_key(key) in self._legacy_model_keys:
+                        # 旧格式的整体模型记录已拆分到各臂记录中
+                        self.storage_engine.delete_many([self._model_key(key)])
+                        self._legacy_model_keys.discard(self._model_key(key))
+                    logger.info(f"💾 MAB状态保存成功: {key} ({'全量' if full else '增量'}, {len(dirty_arms)} 个臂)")
+                else:
+                    self._requeue_unsaved(dirty_arms, removed_arms)
                 return success
                 
-        except Exception as e:
-            logger.error(f"❌ MAB状态保存失败: {e}")
-            return False
+            except Exception as e:
+                logger.error(f"❌ MAB状态保存失败: {e}")
+                self._requeue_unsaved(dirty_arms, removed_arms)
+                return False
+    
+    def _requeue_unsaved(self, dirty_arms: set, removed_arms: set):
+        """保存失败时把取走的变化放回待写入集合"""
+        with self._lock:
+            self._dirty_arms.update(arm_id for arm_id in dirty_arms if arm_id in self.arms)
+            self._removed_arms.update(arm_id for arm_id in removed_arms if arm_id not in self.arms)
+            self._header_dirty = True
     
-    def load_state(self, key: str = "mab_state") -> bool:
-        """加载MAB状态"""
+    def load_state(self, key: str = None) -> bool:
+        """加载MAB状态（兼容整体保存的旧格式）"""
         if not self.storage_engine:
             logger.warning("⚠️ 没有存储引擎，无法加载状态")
             return False
         
+        key = key or self.state_key
         try:
             state_data = self.storage_engine.retrieve(key)
             if not state_data:
                 logger.info("ℹ️ 没有找到MAB状态数据")
                 return False
             
+            if "arms" in state_data:
+                arms_data = state_data["arms"]  # 旧格式：所有臂保存在同一条记录中
+            else:
+                arms_data = {}
+                for arm_id in state_data.get("arm_ids", []):
+                    arm_data = self.storage_engine.retrieve(self._arm_key(key, arm_id))
+                    if arm_data:
+                        arms_data[arm_id] = arm_data
+                    else:
+                        logger.warning(f"⚠️ MAB臂数据缺失: {arm_id}")
+            model_meta = state_data.get("contextual_model")
+            # 旧格式：整个模型保存在 f"{key}:linucb" 下，头部只记录 True
+            legacy_model = self.storage_engine.retrieve(self._model_key(key)) if model_meta is True else None
+            
             with self._lock:
                 # 恢复配置
                 if "config" in state_data:
@@ -487,11 +841,31 @@ class IntelligentMABEngine:
                     config_data["algorithm"] = MABAlgorithm(config_data["algorithm"])
                     self.config = MABConfiguration(**config_data)
                 
-                # 恢复臂
-                if "arms" in state_data:
-                    self.arms = {}
-                    for arm_id, arm_data in state_data["arms"].items():
-                        self.arms[arm_id] = MABArm(**arm_data)
+                # 恢复臂（LinUCB 参数从臂记录中取出）
+                arm_models = {arm_id: arm_data.pop("linucb", None) for arm_id, arm_data in arms_data.items()}
+                self.arms = {arm_id: MABArm(**arm_data) for arm_id, arm_data in arms_data.items()}
+                
+                # 恢复上下文模型（维度与当前配置不一致时丢弃）
+                model_data = legacy_model or (model_meta if isinstance(model_meta, dict) else None)
+                model = None
+                if model_data and model_data.get("dimension") == self.config.context_dimension:
+                    if legacy_model:
+                        model = LinUCBModel.from_dict(legacy_model)
+                    else:
+                        model = LinUCBModel(model_data["dimension"], model_data.get("ridge_lambda", 1.0))
+                        model.update_count = model_data.get("update_count", 0)
+                        for arm_id, arm_model in arm_models.items():
+                            if arm_model:
+                                model.load_arm_state(arm_id, arm_model)
+                elif model_data:
+                    logger.warning("⚠️ 上下文模型维度与配置不一致，已重置")
+                model = model or LinUCBModel(self.config.context_dimension, self.config.ridge_lambda)
+                for arm_id in [arm_id for arm_id in model.arm_ids if arm_id not in self.arms]:
+                    model.remove_arm(arm_id)
+                for arm_id in self.arms:
+                    model.add_arm(arm_id)
+                self.contextual_models["linucb"] = model
+                self.feature_importance = defaultdict(float, state_data.get("feature_importance", {}))
                 
                 # 恢复统计信息
                 self.total_rounds = state_data.get("total_rounds", 0)
@@ -505,6 +879,14 @@ class IntelligentMABEngine:
                         action_data["context"] = MABContext(**context_data)
                         self.actions_history.append(MABAction(**action_data))
                 
+                # 旧格式需要在下次保存时全量转换为按臂存储
+                legacy = "arms" in state_data or model_meta is True
+                self._dirty_arms.clear()
+                self._removed_arms.clear()
+                self._header_dirty = False
+                self._legacy_model_keys = {self._model_key(key)} if model_meta is True else set()
+                self._last_saved_key = None if legacy else key
+                
                 saved_at = state_data.get("saved_at", 0)
                 logger.info(f"📥 MAB状态加载成功: {key} (保存于: {time.ctime(saved_at)})")
                 
@@ -515,19 +897,33 @@ class IntelligentMABEngine:
             return False
     
     def _start_auto_save(self):
-        """启动自动保存"""
+        """启动自动保存：按间隔保存，积压的臂过多时提前保存；cleanup() 时停止"""
         def auto_save_loop():
-            while True:
+            while not self._auto_save_stop.is_set():
+                self._flush_requested.wait(self.config.auto_save_interval)
+                self._flush_requested.clear()
+                if self._auto_save_stop.is_set():
+                    break
                 try:
-                    time.sleep(self.config.auto_save_interval)
-                    self.save_state()
+                    if self.has_pending_changes():
+                        self.save_state()
                 except Exception as e:
                     logger.error(f"❌ 自动保存失败: {e}")
         
-        auto_save_thread = threading.Thread(target=auto_save_loop, daemon=True)
-        auto_save_thread.start()
+        self._auto_save_thread = threading.Thread(target=auto_save_loop, name="mab-auto-save", daemon=True)
+        self._auto_save_thread.start()
         logger.info(f"⏰ 自动保存已启动: 间隔 {self.config.auto_save_interval}s")
     
+    def stop_auto_save(self):
+        """停止自动保存线程"""
+        if self._auto_save_thread is None:
+            return
+        self._auto_save_stop.set()
+        self._flush_requested.set()
+        self._auto_save_thread.join()
+        self._auto_save_thread = None
+        logger.info("⏰ 自动保存已停止")
+    
     def reset(self):
         """重置MAB状态"""
         with self._lock:
@@ -541,6 +937,8 @@ class IntelligentMABEngine:
                 arm.thompson_alpha = 1.0
                 arm.thompson_beta = 1.0
             
+            self._dirty_arms.update(self.arms)
+            self._header_dirty = True
             self.actions_history.clear()
             self.total_rounds = 0
             self.performance_stats = {
@@ -555,10 +953,9 @@ class IntelligentMABEngine:
     
     def cleanup(self):
         """清理资源"""
-        if self.auto_save_timer:
-            self.auto_save_timer.cancel()
+        self.stop_auto_save()
         
-        # 最后保存一次
+        # 最后保存一次（只写入未保存的变化）
         if self.storage_engine:
             self.save_state()
         
@@ -622,7 +1019,8 @@ class AdvancedMABManager:
         
         default_engine = IntelligentMABEngine(
             config=default_config,
-            storage_engine=self.storage_engine
+            storage_engine=self.storage_engine,
+            state_key="mab_engine_default"
         )
         
         self.mab_engines["default"] = default_engine
@@ -640,7 +1038,8 @@ class AdvancedMABManager:
             
             engine = IntelligentMABEngine(
                 config=config,
-                storage_engine=self.storage_engine
+                storage_engine=self.storage_engine,
+                state_key=f"mab_engine_{engine_id}"
             )
             
             # 添加臂
@@ -848,8 +1247,8 @@ class AdvancedMABManager:
         success_count = 0
         total_count = len(self.mab_engines)
         
-        for engine_id, engine in self.mab_engines.items():
-            if engine.save_state(f"mab_engine_{engine_id}"):
+        for engine in self.mab_engines.values():
+            if engine.save_state():
                 success_count += 1
         
         # 保存管理器状态
@@ -886,8 +1285,8 @@ class AdvancedMABManager:
         
         # 加载引擎状态
         success_count = 0
-        for engine_id, engine in self.mab_engines.items():
-            if engine.load_state(f"mab_engine_{engine_id}"):
+        for engine in self.mab_engines.values():
+            if engine.load_state():
                 success_count += 1
         
         logger.info(f"📥 加载MAB引擎状态: {success_count}/{len(self.mab_engines)} 成功")
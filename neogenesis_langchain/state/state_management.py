@@ -13,6 +13,7 @@ import logging
 import time
 import pickle
 import os
+import threading
 from typing import Any, Dict, List, Optional, Union, Tuple, Callable
 from dataclasses import dataclass, asdict, field
 from pathlib import Path
@@ -32,6 +33,10 @@ except ImportError:
     AdvancedMABManager = None
     TransactionManager = None
 
+from neogenesis_system.shared.write_coalescer import WriteCoalescer, remove_stale_temp_files
+from neogenesis_system.shared.session_table import LRUSessionTable
+from neogenesis_system.shared.reward_log import RewardLog
+
 logger = logging.getLogger(__name__)
 
 # =============================================================================
@@ -202,30 +207,42 @@ class NeogenesisStateManager:
     - 持久化MAB权重
     - 提供状态查询和更新接口
     - 支持多会话管理
+    
+    自动保存由后台线程合并写入：一个刷新周期内同一会话/权重文件最多写一次，
+    写入为紧凑 JSON 并原子替换；close() 时写入剩余内容。
+    
+    内存中最多保留 max_sessions 个会话，超出时逐个换出最久未访问的会话到磁盘，
+    再次访问时由 _load_session 按需加载。
     """
     
     def __init__(self, 
                  storage_path: str = "./neogenesis_state",
                  max_sessions: int = 1000,
-                 auto_save: bool = True):
+                 auto_save: bool = True,
+                 flush_interval: float = 0.5):
         """
         初始化状态管理器
         
         Args:
             storage_path: 存储路径
-            max_sessions: 最大会话数
+            max_sessions: 内存中保留的最大会话数（更早的会话换出到磁盘）
             auto_save: 是否自动保存
+            flush_interval: 自动保存的刷新间隔（秒），<= 0 时每次更新同步写入
         """
         self.storage_path = Path(storage_path)
         self.max_sessions = max_sessions
         self.auto_save = auto_save
         
         # 内存状态
-        self.active_sessions: Dict[str, DecisionState] = {}
+        self.active_sessions = LRUSessionTable(max_size=max_sessions)
         self.mab_weights = MABWeights()
+        self._lock = threading.RLock()
         
         # 确保存储目录存在
         self.storage_path.mkdir(parents=True, exist_ok=True)
+        remove_stale_temp_files(self.storage_path)
+        self._persistence = WriteCoalescer(flush_interval=flush_interval, lock=self._lock,
+                                           name="neogenesis-state-persistence")
         
         # 加载持久化数据
         self._load_mab_weights()
@@ -249,10 +266,6 @@ class NeogenesisStateManager:
         Returns:
             决策状态对象
         """
-        # 检查会话限制
-        if len(self.active_sessions) >= self.max_sessions:
-            self._cleanup_old_sessions()
-        
         # 创建新状态
         decision_state = DecisionState(
             session_id=session_id,
@@ -262,20 +275,24 @@ class NeogenesisStateManager:
             **kwargs
         )
         
-        self.active_sessions[session_id] = decision_state
+        with self._lock:
+            evicted = self.active_sessions.put(session_id, decision_state)
+        self._page_out(evicted)
         
         if self.auto_save:
-            self._save_session(session_id)
+            self._save_session(session_id, decision_state)
         
         logger.info(f"📝 创建决策会话: {session_id}")
         return decision_state
     
     def get_session(self, session_id: str) -> Optional[DecisionState]:
         """获取决策会话"""
-        if session_id in self.active_sessions:
-            return self.active_sessions[session_id]
+        with self._lock:
+            session = self.active_sessions.get(session_id)
+        if session is not None:
+            return session
         
-        # 尝试从磁盘加载
+        # 尝试从磁盘加载（换出的会话或其他进程创建的会话）
         return self._load_session(session_id)
     
     def update_session_stage(self,
@@ -313,20 +330,24 @@ class NeogenesisStateManager:
             error_message=error_message
         )
         
-        # 更新会话状态
-        session.update_stage(stage, stage_result)
-        
-        # 如果是MAB决策阶段，更新权重
-        if stage == DecisionStage.MAB_DECISION and success:
-            selected_path = data.get("selected_path", {})
-            strategy_id = selected_path.get("strategy_id")
-            if strategy_id:
-                # 简化的奖励计算
-                reward = 1.0 if success else 0.0
-                self.mab_weights.update_strategy(strategy_id, reward)
-        
-        if self.auto_save:
-            self._save_session(session_id)
+        weights_updated = False
+        with self._lock:
+            # 更新会话状态
+            session.update_stage(stage, stage_result)
+            
+            # 如果是MAB决策阶段，更新权重
+            if stage == DecisionStage.MAB_DECISION and success:
+                selected_path = data.get("selected_path", {})
+                strategy_id = selected_path.get("strategy_id")
+                if strategy_id:
+                    # 简化的奖励计算
+                    reward = 1.0 if success else 0.0
+                    self.mab_weights.update_strategy(strategy_id, reward)
+                    weights_updated = True
+        
+        if self.auto_save or self._paged_out(session_id, session):
+            self._save_session(session_id, session)
+        if self.auto_save and weights_updated:
             self._save_mab_weights()
         
         logger.debug(f"📊 更新会话阶段: {session_id} -> {stage.value}")
@@ -338,11 +359,12 @@ class NeogenesisStateManager:
         if not session:
             return False
         
-        session.current_stage = DecisionStage.COMPLETED
-        session.updated_at = time.time()
+        with self._lock:
+            session.current_stage = DecisionStage.COMPLETED
+            session.updated_at = time.time()
         
-        if self.auto_save:
-            self._save_session(session_id)
+        if self.auto_save or self._paged_out(session_id, session):
+            self._save_session(session_id, session)
         
         logger.info(f"✅ 完成决策会话: {session_id}")
         return True
@@ -388,55 +410,64 @@ class NeogenesisStateManager:
             "stage_distribution": stage_distribution,
             "avg_completion_rate": avg_completion_rate,
             "mab_total_rounds": self.mab_weights.total_rounds,
-            "mab_strategies": len(self.mab_weights.strategy_weights)
+            "mab_strategies": len(self.mab_weights.strategy_weights),
+            "session_table": self.active_sessions.get_stats()
         }
     
     def cleanup_session(self, session_id: str) -> bool:
-        """清理会话"""
-        if session_id in self.active_sessions:
-            del self.active_sessions[session_id]
-            
-            # 删除持久化文件
-            session_file = self.storage_path / f"session_{session_id}.json"
-            if session_file.exists():
-                session_file.unlink()
-            
+        """清理会话（包括已换出到磁盘的会话）"""
+        with self._lock:
+            removed = self.active_sessions.pop(session_id, None)
+        # 无论会话是否在内存中都删除持久化文件（同时取消尚未写入的内容）
+        file_removed = self._persistence.remove(self.storage_path / f"session_{session_id}.json")
+        if removed is not None or file_removed:
             logger.info(f"🗑️ 清理会话: {session_id}")
             return True
         return False
     
-    def _cleanup_old_sessions(self):
-        """清理旧会话"""
-        if len(self.active_sessions) < self.max_sessions:
-            return
-        
-        # 按创建时间排序，删除最旧的会话
-        sessions = list(self.active_sessions.items())
-        sessions.sort(key=lambda x: x[1].created_at)
-        
-        cleanup_count = len(sessions) - self.max_sessions + 100  # 清理多一些
-        for i in range(cleanup_count):
-            session_id, _ = sessions[i]
-            self.cleanup_session(session_id)
+    def _page_out(self, evicted: List[Tuple[str, DecisionState]]):
+        """
+        换出被淘汰的会话
         
-        logger.info(f"🧹 清理了 {cleanup_count} 个旧会话")
+        auto_save 时会话文件已是最新（或已登记待写入），无需再写；
+        否则登记写入，保证换出的会话之后仍能加载。
+        """
+        for session_id, session in evicted:
+            if not self.auto_save:
+                session_file = self.storage_path / f"session_{session_id}.json"
+                self._persistence.mark_dirty(session_file, session.to_dict)
+            logger.debug(f"📤 换出会话: {session_id}")
     
-    def _save_session(self, session_id: str):
-        """保存会话到磁盘"""
-        session = self.active_sessions.get(session_id)
-        if not session:
-            return
+    def flush(self) -> int:
+        """立即写入所有待保存的会话和权重，返回写入的文件数"""
+        return self._persistence.flush()
+    
+    def close(self):
+        """停止后台持久化线程并写入剩余内容"""
+        self._persistence.close()
+    
+    def get_persistence_stats(self) -> Dict[str, int]:
+        """获取持久化统计（登记、合并、实际写入次数）"""
+        return self._persistence.get_stats()
+    
+    def _paged_out(self, session_id: str, session: DecisionState) -> bool:
+        """会话对象在读取后是否已被换出（换出后的更新需要重新写入磁盘）"""
+        with self._lock:
+            return self.active_sessions.peek(session_id) is not session
+    
+    def _save_session(self, session_id: str, session: DecisionState):
+        """
+        登记会话待保存（由后台线程合并写入）
         
+        直接登记调用方持有的会话对象：即使会话在读取后、保存前被换出，这次更新也不会丢失。
+        """
         session_file = self.storage_path / f"session_{session_id}.json"
-        try:
-            with open(session_file, 'w', encoding='utf-8') as f:
-                json.dump(session.to_dict(), f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            logger.error(f"❌ 保存会话失败 {session_id}: {e}")
+        self._persistence.mark_dirty(session_file, session.to_dict)
     
     def _load_session(self, session_id: str) -> Optional[DecisionState]:
-        """从磁盘加载会话"""
+        """从磁盘加载会话（换出后尚未落盘的内容先写入）"""
         session_file = self.storage_path / f"session_{session_id}.json"
+        self._persistence.flush([session_file])
         if not session_file.exists():
             return None
         
@@ -445,20 +476,22 @@ class NeogenesisStateManager:
                 data = json.load(f)
             
             session = DecisionState.from_dict(data)
-            self.active_sessions[session_id] = session
+            with self._lock:
+                # 并发加载同一会话时以先放入的为准
+                existing = self.active_sessions.get(session_id)
+                if existing is not None:
+                    return existing
+                evicted = self.active_sessions.put(session_id, session)
+            self._page_out(evicted)
             return session
         except Exception as e:
             logger.error(f"❌ 加载会话失败 {session_id}: {e}")
             return None
     
     def _save_mab_weights(self):
-        """保存MAB权重"""
+        """登记MAB权重待保存（由后台线程合并写入）"""
         weights_file = self.storage_path / "mab_weights.json"
-        try:
-            with open(weights_file, 'w', encoding='utf-8') as f:
-                json.dump(self.mab_weights.to_dict(), f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            logger.error(f"❌ 保存MAB权重失败: {e}")
+        self._persistence.mark_dirty(weights_file, lambda: self.mab_weights.to_dict())
     
     def _load_mab_weights(self):
         """加载MAB权重"""
@@ -480,43 +513,88 @@ class NeogenesisStateManager:
 # =============================================================================
 
 class MABPersistentWeights:
-    """MAB持久化权重管理器（简化版）"""
+    """
+    MAB持久化权重管理器（简化版）
+    
+    每次更新只向奖励日志追加一条带校验和的记录，每 compact_every 条压缩为 JSON 快照；
+    启动时由快照加日志重放得到权重。不再使用 pickle（旧版 .pkl 文件仅在首次启动时以受限方式迁移）。
+    """
+    
+    ALPHA = 0.1            # 移动平均系数
+    DEFAULT_WEIGHT = 0.5   # 未见过的策略的初始权重
     
-    def __init__(self, storage_path: str = "./mab_weights.pkl"):
+    def __init__(self, storage_path: str = "./mab_weights.pkl", compact_every: int = 1000):
+        """
+        初始化权重管理器
+        
+        Args:
+            storage_path: 存储路径（去掉 .pkl 后缀作为 .log/.snapshot.json 的前缀）
+            compact_every: 追加多少条奖励记录后压缩为快照
+        """
         self.storage_path = storage_path
-        self.weights = self._load_weights()
+        prefix = storage_path[:-4] if storage_path.endswith(".pkl") else storage_path
+        self.reward_log = RewardLog(prefix, apply=self._apply_reward, compact_every=compact_every)
+        self._migrate_legacy_pickle()
+    
+    @property
+    def weights(self) -> Dict[str, float]:
+        """当前权重（由快照与日志重放得到）"""
+        return self.reward_log.state
+    
+    @classmethod
+    def _apply_reward(cls, weights: Dict[str, float], record: Dict[str, Any]):
+        """应用一条奖励记录（更新与重放共用，保证结果一致）"""
+        strategy_id = record["strategy_id"]
+        weight = weights.get(strategy_id, cls.DEFAULT_WEIGHT)
+        # 简单的移动平均
+        weights[strategy_id] = (1 - cls.ALPHA) * weight + cls.ALPHA * record["reward"]
     
     def _load_weights(self) -> Dict[str, float]:
-        """加载权重"""
-        if os.path.exists(self.storage_path):
-            try:
-                with open(self.storage_path, 'rb') as f:
-                    return pickle.load(f)
-            except Exception as e:
-                logger.error(f"❌ 加载权重失败: {e}")
-        return {}
+        """从快照与奖励日志重放权重"""
+        return self.reward_log.replay()
+    
+    def _migrate_legacy_pickle(self):
+        """迁移旧版 pickle 权重文件（只接受基础类型，拒绝任何类引用）"""
+        if self.reward_log.seq or not os.path.exists(self.storage_path) or not self.storage_path.endswith(".pkl"):
+            return
+        try:
+            with open(self.storage_path, 'rb') as f:
+                legacy = _BuiltinsOnlyUnpickler(f).load()
+            weights = {str(k): float(v) for k, v in legacy.items()}
+        except Exception as e:
+            logger.error(f"❌ 迁移旧版权重文件失败: {e}")
+            return
+        self.reward_log.state.update(weights)
+        self.reward_log.compact()
+        # 重命名旧文件，避免之后每次启动（seq 仍为 0 时）重复读取并覆盖权重
+        os.replace(self.storage_path, f"{self.storage_path}.migrated")
+        logger.info(f"📦 已迁移旧版权重文件: {len(weights)} 个策略（原文件重命名为 .migrated）")
     
     def save_weights(self):
-        """保存权重"""
+        """保存权重（压缩为快照并清空奖励日志）"""
         try:
-            with open(self.storage_path, 'wb') as f:
-                pickle.dump(self.weights, f)
+            self.reward_log.compact()
         except Exception as e:
             logger.error(f"❌ 保存权重失败: {e}")
     
     def update_weight(self, strategy_id: str, reward: float):
-        """更新权重"""
-        if strategy_id not in self.weights:
-            self.weights[strategy_id] = 0.5
-        
-        # 简单的移动平均
-        alpha = 0.1
-        self.weights[strategy_id] = (1 - alpha) * self.weights[strategy_id] + alpha * reward
-        self.save_weights()
+        """更新权重（追加一条奖励记录）"""
+        self.reward_log.append({"strategy_id": strategy_id, "reward": float(reward)})
     
     def get_weight(self, strategy_id: str) -> float:
         """获取权重"""
-        return self.weights.get(strategy_id, 0.5)
+        return self.weights.get(strategy_id, self.DEFAULT_WEIGHT)
+    
+    def close(self):
+        """压缩并关闭奖励日志"""
+        self.reward_log.close()
+
+
+class _BuiltinsOnlyUnpickler(pickle.Unpickler):
+    """只还原基础类型（dict/str/float 等）的反序列化器，用于迁移旧版权重文件"""
+    
+    def find_class(self, module, name):
+        raise pickle.UnpicklingError(f"旧版权重文件包含不允许的类型: {module}.{name}")
 
 # =============================================================================
 # 测试和演示
@@ -932,8 +1010,8 @@ class EnhancedNeogenesisStateManager:
             if self.storage_engine:
                 self.storage_engine.cleanup()
             
-            # 清理基础状态管理器
-            # basic_state_manager没有cleanup方法，跳过
+            # 清理基础状态管理器（写入尚未落盘的会话和权重）
+            self.basic_state_manager.close()
             
             logger.info("🧹 增强状态管理器清理完成")
             
@@ -137,6 +137,14 @@ class BaseStorageBackend(ABC):
     def cleanup(self):
         """清理资源"""
         pass
+    
+    def store_many(self, items: Dict[str, Any]) -> int:
+        """批量存储数据，返回成功写入的数量（后端可覆盖为单次事务）"""
+        return sum(1 for key, data in items.items() if self.store(key, data))
+    
+    def delete_many(self, keys: List[str]) -> int:
+        """批量删除数据，返回成功删除的数量"""
+        return sum(1 for key in keys if self.delete(key))
 
 # =============================================================================
 # 文件系统存储后端
@@ -513,7 +521,7 @@ class SQLiteBackend(BaseStorageBackend):
                 
                 with sqlite3.connect(self.db_path) as conn:
                     # 检查是否已存在
-                    cursor = conn.execute("SELECT version FROM storage_data WHERE key = ?", (key,))
+                    cursor = conn.execute("SELECT version, created_at FROM storage_data WHERE key = ?", (key,))
                     existing = cursor.fetchone()
                     version = (existing[0] + 1) if existing else 1
                     
@@ -525,7 +533,7 @@ class SQLiteBackend(BaseStorageBackend):
                         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 0, ?)
                     """, (
                         key, serialized_data, len(serialized_data),
-                        current_time if not existing else None,
+                        existing[1] if existing else current_time,
                         current_time, version, checksum,
                         self.config.compression != CompressionType.NONE,
                         self.config.enable_encryption, current_time
@@ -540,6 +548,54 @@ class SQLiteBackend(BaseStorageBackend):
             logger.error(f"❌ SQLite存储失败: {key} - {e}")
             return False
     
+    def store_many(self, items: Dict[str, Any]) -> int:
+        """批量存储数据（单个事务）"""
+        if not items:
+            return 0
+        try:
+            with self._lock:
+                current_time = time.time()
+                rows = []
+                for key, data in items.items():
+                    serialized_data = self._serialize_data(data)
+                    rows.append((key, serialized_data, len(serialized_data), self._calculate_checksum(serialized_data)))
+                
+                with sqlite3.connect(self.db_path) as conn:
+                    versions = {}
+                    keys = list(items.keys())
+                    for start in range(0, len(keys), 500):
+                        chunk = keys[start:start + 500]
+                        cursor = conn.execute(
+                            f"SELECT key, version, created_at FROM storage_data WHERE key IN ({','.join('?' * len(chunk))})",
+                            chunk
+                        )
+                        versions.update({row[0]: (row[1], row[2]) for row in cursor})
+                    
+                    conn.executemany("""
+                        INSERT OR REPLACE INTO storage_data 
+                        (key, data, size, created_at, updated_at, version, checksum, 
+                         compressed, encrypted, access_count, last_accessed)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 0, ?)
+                    """, [
+                        (
+                            key, serialized_data, size,
+                            versions[key][1] if key in versions else current_time,
+                            current_time, versions[key][0] + 1 if key in versions else 1, checksum,
+                            self.config.compression != CompressionType.NONE,
+                            self.config.enable_encryption, current_time
+                        )
+                        for key, serialized_data, size, checksum in rows
+                    ])
+                    
+                    conn.commit()
+                
+                logger.debug(f"✅ SQLite批量存储成功: {len(rows)} 条")
+                return len(rows)
+                
+        except Exception as e:
+            logger.error(f"❌ SQLite批量存储失败: {e}")
+            return 0
+    
     def retrieve(self, key: str) -> Optional[Any]:
         """检索数据"""
         try:
@@ -1047,6 +1103,14 @@ class PersistentStorageEngine:
         """获取元数据"""
         return self.backend.get_metadata(key)
     
+    def store_many(self, items: Dict[str, Any]) -> int:
+        """批量存储数据"""
+        return self.backend.store_many(items)
+    
+    def delete_many(self, keys: List[str]) -> int:
+        """批量删除数据"""
+        return self.backend.delete_many(keys)
+    
     def get_storage_stats(self) -> Dict[str, Any]:
         """获取存储统计信息"""
         keys = self.list_keys()
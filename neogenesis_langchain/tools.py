@@ -44,6 +44,7 @@ from neogenesis_system.meta_mab.reasoner import PriorReasoner
 from neogenesis_system.meta_mab.rag_seed_generator import RAGSeedGenerator
 from neogenesis_system.meta_mab.path_generator import PathGenerator
 from neogenesis_system.meta_mab.mab_converger import MABConverger
+from .converger_registry import borrow_shared_mab_converger, DEFAULT_NAMESPACE
 from neogenesis_system.meta_mab.utils.search_tools import IdeaVerificationTool as OriginalIdeaVerificationTool
 from neogenesis_system.meta_mab.utils.search_client import WebSearchClient
 
@@ -413,13 +414,15 @@ class NeogenesisMABDecisionTool(BaseTool):
     """
     args_schema: Type[BaseModel] = MABDecisionInput
     
-    def __init__(self, api_key: str = "", llm_client=None, **kwargs):
+    def __init__(self, api_key: str = "", llm_client=None,
+                 mab_namespace: str = DEFAULT_NAMESPACE, mab_converger: MABConverger = None, **kwargs):
         super().__init__(**kwargs)
-        # 初始化真正的MABConverger，使用object.__setattr__绕过Pydantic验证
+        # 借用进程级共享的MABConverger（同一命名空间的工具共享学习状态；工具没有明确的生命周期，借用不计引用），
+        # 使用object.__setattr__绕过Pydantic验证
         try:
-            object.__setattr__(self, 'mab_converger', MABConverger())
+            object.__setattr__(self, 'mab_converger', mab_converger or borrow_shared_mab_converger(mab_namespace))
             object.__setattr__(self, '_initialized', True)
-            logger.info("🎰 MABConverger初始化成功")
+            logger.info(f"🎰 MABConverger就绪: {mab_namespace}")
         except Exception as e:
             logger.warning(f"⚠️ MABConverger初始化失败，使用回退逻辑: {e}")
             object.__setattr__(self, 'mab_converger', None)
@@ -725,6 +728,7 @@ class NeogenesisFiveStageDecisionTool(BaseTool):
                  search_engine: str = "duckduckgo",
                  llm_client=None,
                  web_search_client=None,
+                 mab_namespace: str = DEFAULT_NAMESPACE,
                  **kwargs):
         super().__init__(**kwargs)
         
@@ -743,7 +747,8 @@ class NeogenesisFiveStageDecisionTool(BaseTool):
         ))
         object.__setattr__(self, 'mab_decision_tool', NeogenesisMABDecisionTool(
             api_key=api_key,
-            llm_client=llm_client
+            llm_client=llm_client,
+            mab_namespace=mab_namespace
         ))
         
         logger.info("🔗 NeogenesisFiveStageDecisionTool 初始化完成")
@@ -913,7 +918,8 @@ def get_all_neogenesis_tools(
     api_key: str = "",
     search_engine: str = "duckduckgo",
     llm_client=None,
-    web_search_client=None
+    web_search_client=None,
+    mab_namespace: str = DEFAULT_NAMESPACE
 ) -> List[BaseTool]:
     """
     获取所有Neogenesis工具的列表
@@ -923,6 +929,7 @@ def get_all_neogenesis_tools(
         search_engine: 搜索引擎类型
         llm_client: LLM客户端
         web_search_client: 网络搜索客户端
+        mab_namespace: MAB收敛器命名空间（同一命名空间的工具共享学习状态）
         
     Returns:
         工具列表
@@ -941,7 +948,8 @@ def get_all_neogenesis_tools(
         ),
         NeogenesisMABDecisionTool(
             api_key=api_key,
-            llm_client=llm_client
+            llm_client=llm_client,
+            mab_namespace=mab_namespace
         ),
         NeogenesisIdeaVerificationTool(
             search_engine=search_engine
@@ -950,7 +958,8 @@ def get_all_neogenesis_tools(
             api_key=api_key,
             search_engine=search_engine,
             llm_client=llm_client,
-            web_search_client=web_search_client
+            web_search_client=web_search_client,
+            mab_namespace=mab_namespace
         )
     ]
     
@@ -46,6 +46,7 @@ from .abstractions import (
 
 # 导入具体实现
 from .core.neogenesis_planner import NeogenesisPlanner
+from .core.tool_executor import ParallelToolExecutor
 
 # 导入领域特定数据结构
 from .cognitive_engine.data_structures import (
@@ -102,6 +103,7 @@ __all__ = [
     
     # 具体实现
     "NeogenesisPlanner",
+    "ParallelToolExecutor",
     
     # 领域特定数据结构
     "ReasoningPath",
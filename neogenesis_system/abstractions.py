@@ -158,7 +158,8 @@ class BaseToolExecutor(ABC):
             List[Observation]: 所有行动的执行结果
             
         Note:
-            - 必须按顺序执行计划中的行动
+            - 没有依赖关系（metadata['depends_on'] 或 {{obs:<action_id>}} 占位符）的行动可以并行执行，
+              有依赖的行动必须在其依赖完成后执行；顺序实现按计划中的顺序逐个执行即可
             - 每个行动的结果都要包装成Observation对象
             - 如果某个行动失败，需要记录错误信息
         """
@@ -5,6 +5,8 @@ Neogenesis System FastAPI 主应用程序
 提供完整的 Web API 接口来访问 Neogenesis System 的核心功能。
 """
 
+import asyncio
+import json
 import logging
 import os
 import time
@@ -15,7 +17,7 @@ from typing import Dict, List, Optional, Any
 
 from fastapi import FastAPI, HTTPException, Depends, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import ValidationError
 
 # 导入数据模型
@@ -42,6 +44,8 @@ try:
     from ..core.cognitive_scheduler import CognitiveScheduler
     from ..core.retrospection_engine import TaskRetrospectionEngine
     from ..providers.knowledge_explorer import KnowledgeExplorer
+    from ..providers.knowledge_store import KnowledgeStore
+    from ..cognitive_engine.shared_arm_table import SharedArmTable
     from ..shared.state_manager import StateManager
     from ..config import get_default_config
     from .. import create_system
@@ -67,6 +71,8 @@ neogenesis_agent: Optional[NeogenesisAgent] = None
 neogenesis_system = None
 cognitive_scheduler: Optional[CognitiveScheduler] = None
 knowledge_explorer: Optional[KnowledgeExplorer] = None
+knowledge_store: Optional[KnowledgeStore] = None
+shared_arm_table: Optional[SharedArmTable] = None
 state_manager: Optional[StateManager] = None
 
 # 系统统计信息
@@ -130,6 +136,9 @@ async def initialize_neogenesis_agent():
         except Exception as e:
             logger.warning(f"⚠️ NeogenesisSystem 创建失败: {e}")
         
+        _restore_mab_snapshot()
+        _attach_shared_arm_table()
+        
         system_stats["agent_initialized"] = True
         logger.info("✅ NeogenesisAgent 初始化成功")
         
@@ -139,13 +148,59 @@ async def initialize_neogenesis_agent():
         system_stats["agent_initialized"] = False
 
 
+def _planner_mab_converger():
+    planner = getattr(neogenesis_agent, 'planner', None)
+    return getattr(planner, 'mab_converger', None)
+
+
+def _restore_mab_snapshot():
+    """按 NEOGENESIS_MAB_SNAPSHOT 从快照热启动MAB收敛器，并启动后台定时快照"""
+    snapshot_path = os.getenv("NEOGENESIS_MAB_SNAPSHOT")
+    mab_converger = _planner_mab_converger()
+    if not snapshot_path or not hasattr(mab_converger, 'load_snapshot'):
+        return
+    
+    try:
+        mab_converger.load_snapshot(snapshot_path)
+        interval = float(os.getenv("NEOGENESIS_MAB_SNAPSHOT_INTERVAL", "300"))
+        mab_converger.start_background_snapshots(snapshot_path, interval)
+    except Exception as e:
+        logger.warning(f"⚠️ MAB快照热启动失败: {e}")
+
+
+def _attach_shared_arm_table():
+    """多 worker 部署时接入监督进程创建的共享决策臂表，让所有 worker 共同学习"""
+    global shared_arm_table
+    
+    try:
+        shared_arm_table = SharedArmTable.from_environment()
+    except Exception as e:
+        logger.warning(f"⚠️ 共享决策臂表接入失败，本 worker 将独立学习: {e}")
+        return
+    if shared_arm_table is None:
+        return
+    
+    for mab_converger in (_planner_mab_converger(), getattr(neogenesis_system, 'mab_converger', None)):
+        if mab_converger is not None and hasattr(mab_converger, 'attach_shared_arm_table'):
+            mab_converger.attach_shared_arm_table(shared_arm_table)
+
+
 async def initialize_additional_components():
     """初始化额外的系统组件"""
-    global cognitive_scheduler, knowledge_explorer, state_manager
+    global cognitive_scheduler, knowledge_explorer, knowledge_store, state_manager
     
     try:
         logger.info("🧠 初始化额外组件...")
         
+        # 初始化本地知识库（探索结果增量写入，/knowledge/search 从中检索）
+        if 'KnowledgeStore' in globals():
+            try:
+                db_path = os.getenv("NEOGENESIS_KNOWLEDGE_DB", os.path.join("data", "knowledge_store.db"))
+                knowledge_store = KnowledgeStore(db_path)
+                logger.info("✅ KnowledgeStore 初始化成功")
+            except Exception as e:
+                logger.warning(f"⚠️ KnowledgeStore 初始化失败: {e}")
+        
         # 初始化状态管理器
         if 'StateManager' in globals():
             state_manager = StateManager()
@@ -168,6 +223,8 @@ async def initialize_additional_components():
                         logger.warning(f"⚠️ LLM客户端创建失败: {e}")
                 
                 cognitive_scheduler = CognitiveScheduler(state_manager, llm_client, config)
+                if knowledge_store and getattr(cognitive_scheduler, 'knowledge_explorer', None):
+                    cognitive_scheduler.knowledge_explorer.knowledge_store = knowledge_store
                 logger.info("✅ CognitiveScheduler 初始化成功")
                 
                 # 🔧 修复：双向依赖注入 - 确保认知调度器与主系统正确链接
@@ -179,8 +236,7 @@ async def initialize_additional_components():
         # 初始化知识探索器（如果可用）
         if 'KnowledgeExplorer' in globals():
             try:
-                config = get_default_config() if 'get_default_config' in globals() else {}
-                knowledge_explorer = KnowledgeExplorer(config)
+                knowledge_explorer = KnowledgeExplorer(knowledge_store=knowledge_store)
                 logger.info("✅ KnowledgeExplorer 初始化成功")
             except Exception as e:
                 logger.warning(f"⚠️ KnowledgeExplorer 初始化失败: {e}")
@@ -242,10 +298,20 @@ def _inject_bidirectional_dependencies(scheduler):
 
 async def cleanup_resources():
     """清理系统资源"""
-    global neogenesis_agent, neogenesis_system, cognitive_scheduler, knowledge_explorer, state_manager
+    global neogenesis_agent, neogenesis_system, cognitive_scheduler, knowledge_explorer, knowledge_store, state_manager
+    global shared_arm_table
     
     try:
         # 清理各个组件
+        mab_converger = _planner_mab_converger()
+        if hasattr(mab_converger, 'stop_background_snapshots'):
+            mab_converger.stop_background_snapshots()
+        if knowledge_store:
+            knowledge_store.close()
+        knowledge_store = None
+        if shared_arm_table:
+            shared_arm_table.close()
+        shared_arm_table = None
         neogenesis_agent = None
         neogenesis_system = None
         cognitive_scheduler = None
@@ -529,6 +595,50 @@ async def create_plan(
         )
 
 
+def _sse_event(event: str, data: Any) -> str:
+    """格式化一条 Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+@app.post("/planning/stream")
+async def stream_plan(
+    request: PlanningRequest,
+    agent: NeogenesisAgent = Depends(get_neogenesis_agent)
+):
+    """
+    流式战略决策（Server-Sent Events）
+    
+    阶段完成即推送事件（analysis / paths / selection），随后逐段推送回答（token），最后为 done 或 error。
+    背压：上一条事件写入连接后才拉取下一条，慢客户端不会让回答在服务端堆积；
+    客户端断开时响应任务被取消，规划器停止后续阶段并关闭上游 LLM 流。
+    """
+    planner = getattr(agent, 'planner', None)
+    if not hasattr(planner, 'astream_decision'):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Agent 规划器不支持流式决策"
+        )
+    
+    logger.info(f"🌊 收到流式规划请求: {request.query}")
+    
+    async def event_source():
+        events = planner.astream_decision(request.query, request.context or {})
+        try:
+            async for event in events:
+                yield _sse_event(event['event'], event['data'])
+        except Exception as e:
+            logger.error(f"❌ 流式决策失败: {e}")
+            yield _sse_event('error', {'message': str(e)})
+        finally:
+            await events.aclose()
+    
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @app.post("/cognitive/process", response_model=CognitiveResponse)
 async def cognitive_process(
     request: CognitiveRequest,
@@ -578,32 +688,45 @@ async def cognitive_process(
 async def knowledge_search(
     request: KnowledgeSearchRequest
 ):
-    """知识搜索功能（简化版本）"""
+    """知识搜索功能（本地知识库 BM25 检索，支持分页）"""
+    if not knowledge_store:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="KnowledgeStore 未初始化或不可用"
+        )
+    
     try:
         logger.info(f"🔍 收到知识搜索请求: {request.query}")
         
-        # 这里提供一个基础的搜索实现
-        # 在实际应用中，这应该连接到真实的知识库
-        mock_results = [
-            {
-                "id": f"knowledge_{i}",
-                "title": f"关于 '{request.query}' 的知识项 {i+1}",
-                "content": f"这是关于 {request.query} 的相关知识内容...",
-                "source": "Neogenesis Knowledge Base",
-                "confidence": max(0.5, 1.0 - i * 0.1),
-                "metadata": {"type": "generated", "index": i},
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow()
-            }
-            for i in range(min(request.limit or 5, 10))
-        ]
+        start_time = time.time()
+        hits, total_results = await asyncio.to_thread(
+            knowledge_store.search, request.query, request.limit or 10, request.offset
+        )
+        query_time = time.time() - start_time
+        
+        results = []
+        for hit in hits:
+            metadata = None
+            if request.include_metadata:
+                metadata = dict(hit["metadata"], bm25_score=hit["score"], source_confidence=hit["confidence"])
+            created_at = datetime.utcfromtimestamp(hit["created_at"]) if hit["created_at"] else None
+            results.append({
+                "id": hit["id"],
+                "title": hit["title"],
+                "content": hit["content"],
+                "source": hit["source"],
+                "confidence": round(hit["relevance"], 4),
+                "metadata": metadata,
+                "created_at": created_at,
+                "updated_at": created_at
+            })
         
         return KnowledgeSearchResponse(
             success=True,
             timestamp=datetime.utcnow(),
-            results=mock_results,
-            total_results=len(mock_results),
-            query_time=0.1,
+            results=results,
+            total_results=total_results,
+            query_time=query_time,
             message="知识搜索完成"
         )
         
@@ -123,6 +123,7 @@ class KnowledgeSearchRequest(BaseModel):
     """知识搜索请求模型"""
     query: str = Field(..., min_length=1, max_length=500, description="搜索查询")
     limit: Optional[int] = Field(10, ge=1, le=100, description="结果数量限制")
+    offset: int = Field(0, ge=0, description="分页偏移")
     filters: Optional[Dict[str, Any]] = Field(None, description="搜索过滤器")
     include_metadata: bool = Field(True, description="是否包含元数据")
     
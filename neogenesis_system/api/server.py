@@ -136,6 +136,24 @@ def print_startup_info(host: str, port: int, ssl_enabled: bool = False):
     print()
 
 
+def create_shared_arm_table(logger):
+    """
+    为多个 worker 创建共享的决策臂表，并通过环境变量把名称传给 worker 进程
+    
+    worker 启动时按 NEOGENESIS_SHARED_MAB_TABLE 接入，所有 worker 共同累积老虎机统计。
+    """
+    try:
+        from neogenesis_system.cognitive_engine.shared_arm_table import SharedArmTable, SHARED_ARM_TABLE_ENV
+        table = SharedArmTable.create(capacity=int(os.getenv("NEOGENESIS_SHARED_MAB_CAPACITY", "4096")))
+    except Exception as e:
+        logger.warning(f"⚠️ 共享决策臂表创建失败，各 worker 将独立学习: {e}")
+        return None
+    
+    os.environ[SHARED_ARM_TABLE_ENV] = table.name
+    logger.info(f"🧮 worker 将共享决策臂表: {table.name}")
+    return table
+
+
 def main():
     """主函数"""
     args = parse_arguments()
@@ -172,6 +190,7 @@ def main():
         })
     
     # 开发/生产模式配置
+    shared_arm_table = None
     if args.production:
         # 生产模式
         logger.info("🏭 以生产模式启动")
@@ -179,6 +198,10 @@ def main():
             "workers": args.workers if args.workers > 1 else 1,
             "reload": False,
         })
+        if args.workers > 1:
+            # 多进程模式需要以导入字符串传入应用
+            uvicorn_config["app"] = "neogenesis_system.api.main:app"
+            shared_arm_table = create_shared_arm_table(logger)
     else:
         # 开发模式
         logger.info("🔧 以开发模式启动")
@@ -195,6 +218,10 @@ def main():
     except Exception as e:
         logger.error(f"❌ 服务器启动失败: {e}")
         sys.exit(1)
+    finally:
+        if shared_arm_table is not None:
+            shared_arm_table.close()
+            shared_arm_table.unlink()
 
 
 if __name__ == "__main__":
@@ -10,12 +10,18 @@ Responsible for selecting optimal reasoning path from multiple paths using MAB a
 
 import time
 import logging
+import threading
+import functools
 import numpy as np
-from typing import Dict, List, Optional, Any, Tuple
+from contextlib import ExitStack, contextmanager
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Tuple, Set, FrozenSet, Iterator
 from collections import defaultdict
 from dataclasses import dataclass
 
 from .data_structures import EnhancedDecisionArm, ReasoningPath
+from .shared_arm_table import SharedArmTable, SharedArmTableFullError
+from .mab_snapshot import ARM_KIND_PATH, ARM_KIND_TOOL, arm_row, read_snapshot, write_snapshot
 try:
     from neogenesis_system.config import MAB_CONFIG
 except ImportError:
@@ -30,11 +36,161 @@ except ImportError:
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=4096)
+def _description_tokens(description: str) -> FrozenSet[str]:
+    """描述文本 -> 小写词集合（候选路径描述反复出现，结果缓存）"""
+    return frozenset(description.lower().split()) if description else frozenset()
+
+
+def _token_jaccard(tokens1: FrozenSet[str], tokens2: FrozenSet[str]) -> float:
+    """两个词集合的 Jaccard 相似度"""
+    if not tokens1 or not tokens2:
+        return 0.0
+    return len(tokens1 & tokens2) / len(tokens1 | tokens2)
+
+
+class GoldenTemplateIndex(dict):
+    """
+    带索引的黄金模板字典：模板ID -> 模板数据
+    
+    写入、删除模板时同步维护 strategy_id / path_type 索引和描述词集合缓存，
+    匹配时每条候选路径只需两次哈希查找，与模板总数无关。
+    模板数据被原地修改后需调用 reindex()。
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self._by_strategy: Dict[str, Set[str]] = defaultdict(set)
+        self._by_type: Dict[str, Set[str]] = defaultdict(set)
+        self._tokens: Dict[str, FrozenSet[str]] = {}
+        self._index_keys: Dict[str, Tuple[Set[str], Optional[str]]] = {}
+        self.update(*args, **kwargs)
+    
+    # ---------- 索引维护 ----------
+    
+    def _index(self, template_id: str, template_data: Dict[str, Any]):
+        self._unindex(template_id)
+        strategy_keys = {template_id, template_data.get('strategy_id', template_data.get('path_id', template_id))}
+        path_type = template_data.get('path_type')
+        for strategy_key in strategy_keys:
+            self._by_strategy[strategy_key].add(template_id)
+        if path_type is not None:
+            self._by_type[path_type].add(template_id)
+        self._index_keys[template_id] = (strategy_keys, path_type)
+        self._tokens[template_id] = _description_tokens(template_data.get('description', ''))
+    
+    def _unindex(self, template_id: str):
+        self._tokens.pop(template_id, None)
+        index_keys = self._index_keys.pop(template_id, None)
+        if index_keys is None:
+            return
+        strategy_keys, path_type = index_keys
+        for index, keys in ((self._by_strategy, strategy_keys), (self._by_type, (path_type,))):
+            for key in keys:
+                template_ids = index.get(key)
+                if template_ids is not None:
+                    template_ids.discard(template_id)
+                    if not template_ids:
+                        del index[key]
+    
+    def reindex(self, template_id: str):
+        """模板数据原地更新后刷新索引"""
+        if template_id in self:
+            self._index(template_id, self[template_id])
+    
+    # ---------- 查询 ----------
+    
+    def candidates(self, strategy_id: str, path_type: str, include_type_matches: bool = True) -> Set[str]:
+        """与路径策略ID或路径类型相关的模板ID"""
+        template_ids = set(self._by_strategy.get(strategy_id, ()))
+        if include_type_matches:
+            template_ids.update(self._by_type.get(path_type, ()))
+        return template_ids
+    
+    def tokens(self, template_id: str) -> FrozenSet[str]:
+        """模板描述的词集合（已缓存）"""
+        return self._tokens.get(template_id, frozenset())
+    
+    # ---------- dict 写操作 ----------
+    
+    def __setitem__(self, template_id: str, template_data: Dict[str, Any]):
+        super().__setitem__(template_id, template_data)
+        self._index(template_id, template_data)
+    
+    def __delitem__(self, template_id: str):
+        super().__delitem__(template_id)
+        self._unindex(template_id)
+    
+    def pop(self, template_id: str, *default):
+        if template_id in self:
+            self._unindex(template_id)
+        return super().pop(template_id, *default)
+    
+    def popitem(self):
+        template_id, template_data = super().popitem()
+        self._unindex(template_id)
+        return template_id, template_data
+    
+    def setdefault(self, template_id: str, default=None):
+        if template_id not in self:
+            self[template_id] = default
+        return self[template_id]
+    
+    def update(self, *args, **kwargs):
+        for template_id, template_data in dict(*args, **kwargs).items():
+            self[template_id] = template_data
+    
+    def clear(self):
+        super().clear()
+        self._by_strategy.clear()
+        self._by_type.clear()
+        self._tokens.clear()
+        self._index_keys.clear()
+    
+    def copy(self) -> Dict[str, Dict[str, Any]]:
+        return dict(self)
+
+
+def _synchronized(method):
+    """在结构锁内执行：决策臂注册表、试炼场和黄金模板的结构性修改"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._structure_lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _atomic_view(method):
+    """持有全部锁执行：分析方法看到一致的聚合状态，重置类方法独占修改"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._all_locks():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 @dataclass
 class MABConverger:
     """MAB收敛器 - 阶段三：思维路径选择器"""
     
+    # 仅路径类型匹配（策略ID不同）时模板匹配分数的上限：0.4 + 0.2 + 0.2
+    TYPE_ONLY_MATCH_MAX_SCORE = 0.8
+    
     def __init__(self):
+        # 🔒 并发控制（FastAPI 等多线程服务中并发选择/更新）
+        # 加锁顺序固定为：结构锁 -> 决策臂分段锁（按下标升序）-> 统计锁
+        self._structure_lock = threading.RLock()   # 决策臂注册表、试炼场、黄金模板
+        self._arm_locks = [threading.RLock() for _ in range(MAB_CONFIG.get("lock_stripes", 16))]
+        self._stats_lock = threading.RLock()       # 选择计数、选择历史、算法与来源统计
+        
+        # 🧮 跨进程共享的决策臂统计（多 worker 部署时由 attach_shared_arm_table 接入）
+        self.shared_arm_table: Optional[SharedArmTable] = None
+        
+        # 💾 后台快照线程
+        self._snapshot_thread: Optional[threading.Thread] = None
+        self._snapshot_path: Optional[str] = None
+        self._snapshot_stop = threading.Event()
+        
         # 改为存储路径级别的决策臂：path_id -> EnhancedDecisionArm
         self.path_arms: Dict[str, EnhancedDecisionArm] = {}
         self.convergence_threshold = MAB_CONFIG["convergence_threshold"]  # 收敛阈值
@@ -61,7 +217,7 @@ class MABConverger:
         self.tool_algorithm_performance = defaultdict(lambda: {'successes': 0, 'total': 0})
         
         # 🏆 黄金决策模板系统
-        self.golden_templates: Dict[str, Dict[str, any]] = {}  # 存储黄金模板
+        self.golden_templates: GoldenTemplateIndex = GoldenTemplateIndex()  # 存储黄金模板（带策略ID/路径类型索引）
         self.golden_template_config = {
             'success_rate_threshold': 0.90,  # 成功率阈值90%
             'min_samples_required': 20,      # 最小样本数20次
@@ -75,12 +231,7 @@ class MABConverger:
         # 🔧 改进方案：采用动态创建策略，在需要时自动创建决策臂
         
         # 🔍 新增：知识来源追踪系统
-        self.feedback_source_tracking = {
-            "retrospection": {"count": 0, "success_rate": 0.0, "avg_reward": 0.0},
-            "user_feedback": {"count": 0, "success_rate": 0.0, "avg_reward": 0.0},
-            "auto_evaluation": {"count": 0, "success_rate": 0.0, "avg_reward": 0.0},
-            "tool_verification": {"count": 0, "success_rate": 0.0, "avg_reward": 0.0}
-        }
+        self.feedback_source_tracking = self._empty_feedback_source_tracking()
         self.source_weight_config = {
             "retrospection": 0.8,      # 回溯分析权重（初始探索奖励）
             "user_feedback": 1.0,      # 用户反馈权重（标准权重）
@@ -118,6 +269,123 @@ class MABConverger:
         logger.info("🔍 知识来源追踪系统已激活")
         logger.info("🎭 试炼场系统已就绪 - 新思想的成长摇篮")
     
+    # ==================== 🔒 并发控制 ====================
+    
+    def _arm_stripe(self, arm_id: str) -> int:
+        return hash(arm_id) % len(self._arm_locks)
+    
+    def _arm_lock(self, arm_id: str) -> threading.RLock:
+        """决策臂所在分段的锁：不同决策臂的更新大多落在不同分段，互不阻塞"""
+        return self._arm_locks[self._arm_stripe(arm_id)]
+    
+    @contextmanager
+    def _all_locks(self) -> Iterator[None]:
+        """按固定顺序获取全部锁"""
+        with ExitStack() as stack:
+            stack.enter_context(self._structure_lock)
+            for lock in self._arm_locks:
+                stack.enter_context(lock)
+            stack.enter_context(self._stats_lock)
+            yield
+    
+    # ==================== 🧮 跨进程共享统计 ====================
+    
+    @_atomic_view
+    def attach_shared_arm_table(self, table: SharedArmTable):
+        """
+        接入跨进程共享的决策臂表：成功/失败/奖励/激活次数由同一主机上的所有 worker 共同累积
+        
+        本地已有的决策臂统计在共享表中没有记录时作为初始值写入；
+        奖励与结果历史仍保留在各进程本地。
+        """
+        self.shared_arm_table = table
+        for arm_kind, arms in (('path', self.path_arms), ('tool', self.tool_arms)):
+            for arm_id, arm in arms.items():
+                try:
+                    record = table.ensure(f"{arm_kind}:{arm_id}", {
+                        'success': arm.success_count,
+                        'failure': arm.failure_count,
+                        'activation': arm.activation_count,
+                        'total_reward': arm.total_reward,
+                        'last_used': arm.last_used
+                    })
+                except SharedArmTableFullError as e:
+                    logger.warning(f"⚠️ {e}，决策臂 {arm_id} 仅在本进程统计")
+                    continue
+                self._apply_shared_record(arm, record)
+        logger.info(f"🧮 已接入共享决策臂表 {table.name}")
+    
+    @staticmethod
+    def _apply_shared_record(arm: EnhancedDecisionArm, record: Dict[str, float]):
+        arm.success_count = record['success']
+        arm.failure_count = record['failure']
+        arm.activation_count = record['activation']
+        arm.total_reward = record['total_reward']
+        arm.last_used = max(arm.last_used, record['last_used'])
+    
+    def _sync_arms_from_shared(self, arms: List[EnhancedDecisionArm], arm_kind: str):
+        """选择前从共享表刷新候选决策臂的计数（seqlock 读，无需加锁）"""
+        table = self.shared_arm_table
+        if table is None:
+            return
+        for arm in arms:
+            record = table.get(f"{arm_kind}:{arm.path_id}")
+            if record is not None:
+                with self._arm_lock(arm.path_id):
+                    self._apply_shared_record(arm, record)
+    
+    def _publish_to_shared(self, arm: EnhancedDecisionArm, arm_kind: str, success: int = 0, failure: int = 0,
+                           activation: int = 0, reward: float = 0.0):
+        """把本次增量写入共享表，并用合并后的计数覆盖本地决策臂（需持有决策臂分段锁）"""
+        table = self.shared_arm_table
+        if table is None:
+            return
+        try:
+            record = table.add(f"{arm_kind}:{arm.path_id}", success=success, failure=failure,
+                               activation=activation, reward=reward, last_used=arm.last_used)
+        except SharedArmTableFullError as e:
+            logger.warning(f"⚠️ {e}，决策臂 {arm.path_id} 仅在本进程统计")
+            return
+        self._apply_shared_record(arm, record)
+    
+    @_atomic_view
+    def get_analytics_snapshot(self) -> Dict[str, Any]:
+        """
+        原子地获取聚合状态快照（持有全部锁时复制）
+        
+        Returns:
+            决策臂统计、选择计数、算法/来源统计、黄金模板和试炼场状态的副本
+        """
+        def arm_stats(arm: EnhancedDecisionArm) -> Dict[str, Any]:
+            return {
+                'option': arm.option,
+                'success_count': arm.success_count,
+                'failure_count': arm.failure_count,
+                'activation_count': arm.activation_count,
+                'total_reward': arm.total_reward,
+                'success_rate': arm.success_rate,
+                'last_used': arm.last_used,
+                'rl_reward_history': list(arm.rl_reward_history),
+                'recent_results': list(arm.recent_results)
+            }
+        
+        return {
+            'timestamp': time.time(),
+            'path_arms': {arm_id: arm_stats(arm) for arm_id, arm in self.path_arms.items()},
+            'tool_arms': {arm_id: arm_stats(arm) for arm_id, arm in self.tool_arms.items()},
+            'total_path_selections': self.total_path_selections,
+            'total_tool_selections': self.total_tool_selections,
+            'algorithm_performance': {k: dict(v) for k, v in self.algorithm_performance.items()},
+            'tool_algorithm_performance': {k: dict(v) for k, v in self.tool_algorithm_performance.items()},
+            'feedback_source_tracking': {k: dict(v) for k, v in self.feedback_source_tracking.items()},
+            'golden_templates': {k: dict(v) for k, v in self.golden_templates.items()},
+            'template_usage_stats': dict(self.template_usage_stats),
+            'learned_paths': list(self.trial_ground["learned_paths"]),
+            'exploration_boost_active': dict(self.trial_ground["exploration_boost_active"]),
+            'culling_candidates': list(self.trial_ground["culling_candidates"])
+        }
+    
+    @_synchronized
     def _create_strategy_arm_if_missing(self, strategy_id: str, path_type: str = None, 
                                        path_source: str = "unknown", reasoning_path: 'ReasoningPath' = None) -> EnhancedDecisionArm:
         """
@@ -184,6 +452,7 @@ class MABConverger:
         
         return self.path_arms[strategy_id]
     
+    @_synchronized
     def _create_tool_arm_if_missing(self, tool_id: str, tool_name: str = None) -> EnhancedDecisionArm:
         """
         动态创建工具决策臂（如果不存在）
@@ -347,6 +616,7 @@ class MABConverger:
         
         return boost_factor
     
+    @_synchronized
     def _update_exploration_boost(self, strategy_id: str):
         """
         更新探索增强状态（每次选择后调用）
@@ -437,6 +707,7 @@ class MABConverger:
         
         return consecutive_count
     
+    @_atomic_view
     def execute_automatic_culling(self) -> Dict[str, Any]:
         """
         🗡️ 执行自动淘汰机制
@@ -592,6 +863,7 @@ class MABConverger:
             logger.info(f"🗡️ 路径 {strategy_id} 已被淘汰: {reason}")
             logger.info(f"   最终统计: 成功率 {culled_arm.success_rate:.3f}, 激活 {culled_arm.activation_count} 次")
     
+    @_atomic_view
     def get_trial_ground_analytics(self) -> Dict[str, Any]:
         """
         📊 获取试炼场全面分析数据
@@ -917,6 +1189,7 @@ class MABConverger:
     
     # 🎭 试炼场管理和维护方法
     
+    @_atomic_view
     def trigger_trial_ground_maintenance(self) -> Dict[str, Any]:
         """
         🔧 触发试炼场维护任务
@@ -1015,6 +1288,7 @@ class MABConverger:
         
         return history_result
     
+    @_synchronized
     def reset_path_trial_status(self, strategy_id: str) -> Dict[str, Any]:
         """
         🔄 重置指定路径的试炼状态
@@ -1071,6 +1345,7 @@ class MABConverger:
         
         return reset_result
     
+    @_synchronized
     def force_promote_to_golden(self, strategy_id: str, reason: str = "manual_promotion") -> Dict[str, Any]:
         """
         🏆 强制提升路径为黄金模板
@@ -1104,7 +1379,8 @@ class MABConverger:
             
             # 执行提升
             if strategy_id not in self.golden_templates:
-                self.golden_templates.add(strategy_id)
+                self._promote_to_golden_template(strategy_id, arm)
+                self.golden_templates[strategy_id]['promotion_reason'] = reason
                 logger.info(f"🏆 路径 {strategy_id} 已被强制提升为黄金模板: {reason}")
                 
                 # 从候选名单中移除
@@ -1137,6 +1413,7 @@ class MABConverger:
         
         return promotion_result
     
+    @_synchronized
     def revoke_golden_status(self, strategy_id: str, reason: str = "manual_revocation") -> Dict[str, Any]:
         """
         🔻 撤销黄金模板状态
@@ -1156,7 +1433,7 @@ class MABConverger:
         
         try:
             if strategy_id in self.golden_templates:
-                self.golden_templates.remove(strategy_id)
+                self.golden_templates.pop(strategy_id)
                 logger.info(f"🔻 路径 {strategy_id} 的黄金模板状态已撤销: {reason}")
                 
                 # 记录撤销历史
@@ -1203,29 +1480,33 @@ class MABConverger:
             logger.info(f"🎯 只有一个路径，直接选择: {paths[0].path_type}")
             return paths[0]
         
-        self.total_path_selections += 1
-        logger.info(f"🛤️ 开始第 {self.total_path_selections} 次路径选择，候选路径: {len(paths)}个")
+        with self._stats_lock:
+            self.total_path_selections += 1
+            selection_round = self.total_path_selections
+        logger.info(f"🛤️ 开始第 {selection_round} 次路径选择，候选路径: {len(paths)}个")
         
         # 🏆 黄金模板优先检查：在MAB算法前先检查是否有匹配的黄金模板
-        golden_match = self._check_golden_template_match(paths)
+        with self._structure_lock:
+            golden_match = self._check_golden_template_match(paths)
+            if golden_match:
+                # 更新黄金模板使用统计
+                self.template_usage_stats[golden_match['template_id']] += 1
+                
+                # 记录模板匹配历史
+                self.template_match_history.append({
+                    'template_id': golden_match['template_id'],
+                    'path_id': golden_match['path'].path_id,
+                    'path_type': golden_match['path'].path_type,
+                    'match_score': golden_match['match_score'],
+                    'timestamp': time.time(),
+                    'selection_round': selection_round
+                })
+        
         if golden_match:
             selected_path = golden_match['path']
             template_id = golden_match['template_id']
             match_score = golden_match['match_score']
             
-            # 更新黄金模板使用统计
-            self.template_usage_stats[template_id] += 1
-            
-            # 记录模板匹配历史
-            self.template_match_history.append({
-                'template_id': template_id,
-                'path_id': selected_path.path_id,
-                'path_type': selected_path.path_type,
-                'match_score': match_score,
-                'timestamp': time.time(),
-                'selection_round': self.total_path_selections
-            })
-            
             logger.info(f"🏆 黄金模板匹配成功！")
             logger.info(f"   模板ID: {template_id}")
             logger.info(f"   匹配路径: {selected_path.path_type}")
@@ -1242,13 +1523,15 @@ class MABConverger:
             strategy_id = path.strategy_id
             strategy_to_path_mapping[strategy_id] = path  # 记录映射关系
             
-            # 🔧 动态创建：确保策略决策臂存在
-            arm = self._create_strategy_arm_if_missing(strategy_id, path.path_type)
+            # 🔧 动态创建：确保策略决策臂存在（已存在时无需加锁）
+            arm = self.path_arms.get(strategy_id) or self._create_strategy_arm_if_missing(strategy_id, path.path_type)
             available_arms.append(arm)
             
             logger.debug(f"✅ 策略决策臂就绪: {strategy_id} ({path.path_type})")
             logger.debug(f"   对应实例: {path.instance_id}")
         
+        self._sync_arms_from_shared(available_arms, 'path')
+        
         # 自动选择算法
         if algorithm == 'auto':
             algorithm = self._select_best_algorithm_for_paths()
@@ -1266,8 +1549,10 @@ class MABConverger:
                 best_arm = self._thompson_sampling_for_paths(available_arms)
             
             # 更新使用时间和激活次数
-            best_arm.last_used = time.time()
-            best_arm.activation_count += 1
+            with self._arm_lock(best_arm.path_id):
+                best_arm.last_used = time.time()
+                best_arm.activation_count += 1
+                self._publish_to_shared(best_arm, 'path', activation=1)
             
             # 🎭 试炼场更新：更新探索增强状态
             self._update_exploration_boost(best_arm.path_id)
@@ -1289,13 +1574,14 @@ class MABConverger:
                     selected_path = paths[0]  # 回退到第一个路径
             
             # 记录选择历史
-            self.path_selection_history.append({
-                'path_id': best_arm.path_id,
-                'path_type': selected_path.path_type,
-                'algorithm': algorithm,
-                'timestamp': time.time(),
-                'selection_round': self.total_path_selections
-            })
+            with self._stats_lock:
+                self.path_selection_history.append({
+                    'path_id': best_arm.path_id,
+                    'path_type': selected_path.path_type,
+                    'algorithm': algorithm,
+                    'timestamp': time.time(),
+                    'selection_round': selection_round
+                })
             
             logger.info(f"🎯 使用 {algorithm} 选择路径: {selected_path.path_type} (ID: {best_arm.path_id})")
             return selected_path
@@ -1325,8 +1611,10 @@ class MABConverger:
             logger.info(f"🔧 只有一个工具，直接选择: {available_tools[0]}")
             return available_tools[0]
         
-        self.total_tool_selections += 1
-        logger.info(f"🔧 开始第 {self.total_tool_selections} 次工具选择，候选工具: {len(available_tools)}个")
+        with self._stats_lock:
+            self.total_tool_selections += 1
+            selection_round = self.total_tool_selections
+        logger.info(f"🔧 开始第 {selection_round} 次工具选择，候选工具: {len(available_tools)}个")
         
         # 🔧 动态创建：确保所有工具的决策臂都存在
         available_arms = []
@@ -1336,12 +1624,14 @@ class MABConverger:
             tool_id = tool_name  # 使用工具名称作为ID
             tool_to_arm_mapping[tool_name] = tool_id
             
-            # 🔧 动态创建：确保工具决策臂存在
-            arm = self._create_tool_arm_if_missing(tool_id, tool_name)
+            # 🔧 动态创建：确保工具决策臂存在（已存在时无需加锁）
+            arm = self.tool_arms.get(tool_id) or self._create_tool_arm_if_missing(tool_id, tool_name)
             available_arms.append(arm)
             
             logger.debug(f"✅ 工具决策臂就绪: {tool_id} ({tool_name})")
         
+        self._sync_arms_from_shared(available_arms, 'tool')
+        
         # 自动选择算法
         if algorithm == 'auto':
             algorithm = self._select_best_algorithm_for_tools()
@@ -1359,20 +1649,23 @@ class MABConverger:
                 best_arm = self._thompson_sampling_for_tools(available_arms)
             
             # 更新使用时间和激活次数
-            best_arm.last_used = time.time()
-            best_arm.activation_count += 1
+            with self._arm_lock(best_arm.path_id):
+                best_arm.last_used = time.time()
+                best_arm.activation_count += 1
+                self._publish_to_shared(best_arm, 'tool', activation=1)
             
             # 🎯 找到对应的工具名称
             selected_tool = best_arm.option  # 工具名称存储在option字段中
             
             # 记录选择历史
-            self.tool_selection_history.append({
-                'tool_id': best_arm.path_id,
-                'tool_name': selected_tool,
-                'algorithm': algorithm,
-                'timestamp': time.time(),
-                'selection_round': self.total_tool_selections
-            })
+            with self._stats_lock:
+                self.tool_selection_history.append({
+                    'tool_id': best_arm.path_id,
+                    'tool_name': selected_tool,
+                    'algorithm': algorithm,
+                    'timestamp': time.time(),
+                    'selection_round': selection_round
+                })
             
             logger.info(f"🔧 使用 {algorithm} 选择工具: {selected_tool} (ID: {best_arm.path_id})")
             return selected_tool
@@ -2014,31 +2307,31 @@ class MABConverger:
             source: 反馈来源 ("user_feedback", "retrospection", "auto_evaluation", "tool_verification")
         """
         # 🎯 智能识别：检查是路径反馈还是工具反馈
-        if path_id in self.path_arms:
-            # 路径反馈处理
-            target_arm = self.path_arms[path_id]
-            
+        target_arm = self.path_arms.get(path_id)
+        if target_arm is not None:
             # 更新路径算法性能统计
-            if self.path_selection_history:
-                last_selection = self.path_selection_history[-1]
-                if last_selection['path_id'] == path_id:
-                    algorithm = last_selection['algorithm']
-                    self.algorithm_performance[algorithm]['total'] += 1
-                    if success:
-                        self.algorithm_performance[algorithm]['successes'] += 1
+            with self._stats_lock:
+                if self.path_selection_history:
+                    last_selection = self.path_selection_history[-1]
+                    if last_selection['path_id'] == path_id:
+                        algorithm = last_selection['algorithm']
+                        self.algorithm_performance[algorithm]['total'] += 1
+                        if success:
+                            self.algorithm_performance[algorithm]['successes'] += 1
                         
         elif path_id in self.tool_arms:
             # 工具反馈处理
             target_arm = self.tool_arms[path_id]
             
             # 更新工具算法性能统计
-            if self.tool_selection_history:
-                last_selection = self.tool_selection_history[-1]
-                if last_selection['tool_id'] == path_id:
-                    algorithm = last_selection['algorithm']
-                    self.tool_algorithm_performance[algorithm]['total'] += 1
-                    if success:
-                        self.tool_algorithm_performance[algorithm]['successes'] += 1
+            with self._stats_lock:
+                if self.tool_selection_history:
+                    last_selection = self.tool_selection_history[-1]
+                    if last_selection['tool_id'] == path_id:
+                        algorithm = last_selection['algorithm']
+                        self.tool_algorithm_performance[algorithm]['total'] += 1
+                        if success:
+                            self.tool_algorithm_performance[algorithm]['successes'] += 1
                         
         else:
             # 动态创建决策臂（默认作为路径处理，保持向后兼容）
@@ -2047,10 +2340,15 @@ class MABConverger:
         
         # ✅ 增强版性能更新：根据来源调整处理策略
         adjusted_reward = self._adjust_reward_by_source(reward, source, success)
-        target_arm.update_performance(success, adjusted_reward)
+        with self._arm_lock(path_id):
+            target_arm.update_performance(success, adjusted_reward)
+            self._publish_to_shared(target_arm, 'tool' if path_id in self.tool_arms else 'path',
+                                    success=int(success), failure=int(not success),
+                                    activation=1, reward=adjusted_reward)
         
         # 📊 记录来源追踪信息
-        self._record_feedback_source(path_id, source, success, reward)
+        with self._stats_lock:
+            self._record_feedback_source(path_id, source, success, reward)
         
         # 记录更新日志
         arm_type = "工具" if path_id in self.tool_arms else "路径"
@@ -2059,10 +2357,11 @@ class MABConverger:
         
         # 🏆 黄金模板识别逻辑：检查是否符合黄金模板条件（仅对路径应用）
         if path_id in self.path_arms:
-            self._check_and_promote_to_golden_template(path_id, target_arm)
-            
-            # 🎭 试炼场管理：检查淘汰候选
-            self._check_culling_candidates(path_id, target_arm, success)
+            with self._structure_lock, self._arm_lock(path_id):
+                self._check_and_promote_to_golden_template(path_id, target_arm)
+                
+                # 🎭 试炼场管理：检查淘汰候选
+                self._check_culling_candidates(path_id, target_arm, success)
     
     def _adjust_reward_by_source(self, reward: float, source: str, success: bool) -> float:
         """
@@ -2127,6 +2426,7 @@ class MABConverger:
             
             logger.debug(f"📊 来源追踪更新: {source} -> 次数:{new_count}, 成功率:{new_success_rate:.3f}, 平均奖励:{new_avg_reward:.3f}")
     
+    @_atomic_view
     def get_feedback_source_stats(self) -> Dict[str, Any]:
         """
         获取反馈来源统计信息
@@ -2164,6 +2464,7 @@ class MABConverger:
         path_id = f"{dimension_name}_{option}"  # 临时转换
         self.update_path_performance(path_id, success, reward)
     
+    @_atomic_view
     def check_path_convergence(self) -> bool:
         """
         检查路径选择是否收敛
@@ -2207,6 +2508,7 @@ class MABConverger:
         logger.warning("⚠️ check_convergence 已过时，请使用 check_path_convergence")
         return self.check_path_convergence()
     
+    @_atomic_view
     def get_path_statistics(self) -> Dict[str, Dict[str, any]]:
         """
         获取所有路径的统计信息（包含黄金模板状态）
@@ -2269,6 +2571,7 @@ class MABConverger:
         return (arm.success_rate >= config['success_rate_threshold'] and 
                 arm.activation_count >= config['min_samples_required'])
     
+    @_atomic_view
     def get_system_path_summary(self) -> Dict[str, any]:
         """
         获取路径选择系统的整体摘要
@@ -2328,6 +2631,7 @@ class MABConverger:
         logger.warning("⚠️ get_dimension_statistics 已过时，请使用 get_path_statistics")
         return self.get_path_statistics()
     
+    @_atomic_view
     def get_path_details(self, path_id: str = None) -> Dict[str, any]:
         """
         获取指定路径的详细信息
@@ -2371,6 +2675,7 @@ class MABConverger:
                                 reverse=True)
             return dict(sorted_paths)
     
+    @_atomic_view
     def get_selection_history(self, limit: int = 10) -> List[Dict[str, any]]:
         """
         获取路径选择历史
@@ -2391,6 +2696,7 @@ class MABConverger:
         logger.warning("⚠️ get_arm_details 已过时，请使用 get_path_details")
         return list(self.get_path_details().values())
     
+    @_atomic_view
     def reset_path(self, path_id: str):
         """
         重置指定路径的所有数据
@@ -2400,6 +2706,8 @@ class MABConverger:
         """
         if path_id in self.path_arms:
             del self.path_arms[path_id]
+            if self.shared_arm_table is not None:
+                self.shared_arm_table.reset(f"path:{path_id}")
             logger.info(f"🔄 路径 {path_id} 已重置")
         
         # 清理选择历史中的相关记录
@@ -2408,16 +2716,21 @@ class MABConverger:
             if record['path_id'] != path_id
         ]
     
+    @_atomic_view
     def reset_all_paths(self):
         """
         重置所有路径数据，完全清空学习历史
         """
+        if self.shared_arm_table is not None:
+            for path_id in self.path_arms:
+                self.shared_arm_table.reset(f"path:{path_id}")
         self.path_arms.clear()
         self.path_selection_history.clear()
         self.total_path_selections = 0
         self.algorithm_performance.clear()
         logger.info("🔄 所有路径数据已重置")
     
+    @_atomic_view
     def get_system_status(self) -> Dict[str, any]:
         """
         获取MAB路径选择系统的整体状态
@@ -2498,23 +2811,29 @@ class MABConverger:
         best_score = 0.0
         match_threshold = 0.85  # 匹配阈值
         
+        # 仅路径类型匹配的分数达不到阈值时，只需查找策略ID索引
+        include_type_matches = match_threshold < self.TYPE_ONLY_MATCH_MAX_SCORE
+        
         logger.debug(f"🏆 检查 {len(self.golden_templates)} 个黄金模板")
         
-        for template_id, template_data in self.golden_templates.items():
-            template_path_type = template_data['path_type']
+        # 🎯 按路径查索引：每条路径只做策略ID/路径类型哈希查找，与模板总数无关
+        for path in paths:
+            # 直接使用路径的策略ID
+            path_strategy_id = path.strategy_id
             
-            # 🎯 根源修复：直接使用路径的策略ID，无需推导
-            for path in paths:
-                # 直接使用路径的策略ID
-                path_strategy_id = path.strategy_id
+            for template_id in self.golden_templates.candidates(path_strategy_id, path.path_type,
+                                                                include_type_matches):
+                template_data = self.golden_templates[template_id]
                 
                 # 检查是否匹配：策略ID匹配或路径类型匹配
                 is_strategy_match = (template_id == path_strategy_id)
-                is_type_match = (template_path_type == path.path_type)
+                is_type_match = (template_data.get('path_type') == path.path_type)
                 
                 if is_strategy_match or is_type_match:
                     # 计算匹配分数
-                    match_score = self._calculate_template_match_score(template_data, path)
+                    match_score = self._calculate_template_match_score(
+                        template_data, path, self.golden_templates.tokens(template_id)
+                    )
                     
                     # 策略ID匹配给额外分数
                     if is_strategy_match:
@@ -2541,13 +2860,15 @@ class MABConverger:
         
         return best_match
     
-    def _calculate_template_match_score(self, template_data: Dict[str, any], path: ReasoningPath) -> float:
+    def _calculate_template_match_score(self, template_data: Dict[str, any], path: ReasoningPath,
+                                        template_tokens: Optional[FrozenSet[str]] = None) -> float:
         """
         计算模板与路径的匹配分数 - 🎯 修复版：基于策略ID匹配
         
         Args:
             template_data: 黄金模板数据
             path: 候选路径
+            template_tokens: 已缓存的模板描述词集合
             
         Returns:
             匹配分数 (0.0-1.0)
@@ -2566,9 +2887,9 @@ class MABConverger:
             score += 0.4
         
         # 2. 描述相似性 (额外20%)
-        desc_similarity = self._calculate_description_similarity(
-            template_data.get('description', ''), path.description
-        )
+        if template_tokens is None:
+            template_tokens = _description_tokens(template_data.get('description', ''))
+        desc_similarity = _token_jaccard(template_tokens, _description_tokens(path.description or ''))
         score += desc_similarity * 0.2
         
         # 3. 历史性能奖励 (额外20%)
@@ -2599,17 +2920,8 @@ class MABConverger:
         if not desc1 or not desc2:
             return 0.0
         
-        # 简单的关键词匹配算法
-        words1 = set(desc1.lower().split())
-        words2 = set(desc2.lower().split())
-        
-        if not words1 or not words2:
-            return 0.0
-        
-        intersection = words1.intersection(words2)
-        union = words1.union(words2)
-        
-        return len(intersection) / len(union) if union else 0.0
+        # 简单的关键词匹配算法（词集合有缓存）
+        return _token_jaccard(_description_tokens(desc1), _description_tokens(desc2))
     
     def _check_and_promote_to_golden_template(self, path_id: str, arm: EnhancedDecisionArm):
         """
@@ -2719,6 +3031,7 @@ class MABConverger:
                 'last_updated': time.time(),
                 'stability_score': self._calculate_stability_score(arm)
             })
+            self.golden_templates.reindex(strategy_id)
             
             logger.debug(f"🏆 更新黄金模板: {strategy_id} -> 成功率:{arm.success_rate:.1%}")
     
@@ -2820,6 +3133,7 @@ class MABConverger:
     
     # ==================== 🏆 黄金模板管理接口 ====================
     
+    @_synchronized
     def get_golden_templates(self) -> Dict[str, Dict[str, any]]:
         """
         获取所有黄金模板
@@ -2829,6 +3143,7 @@ class MABConverger:
         """
         return self.golden_templates.copy()
     
+    @_atomic_view
     def get_golden_template_stats(self) -> Dict[str, any]:
         """
         获取黄金模板系统统计信息
@@ -2865,6 +3180,7 @@ class MABConverger:
             'match_history_count': len(self.template_match_history)
         }
     
+    @_synchronized
     def remove_golden_template(self, template_id: str) -> bool:
         """
         手动移除指定的黄金模板
@@ -2884,6 +3200,7 @@ class MABConverger:
             logger.warning(f"⚠️ 黄金模板 {template_id} 不存在")
             return False
     
+    @_atomic_view
     def clear_golden_templates(self):
         """
         清空所有黄金模板
@@ -2895,6 +3212,7 @@ class MABConverger:
         
         logger.info(f"🗑️ 已清空所有黄金模板 (共 {count} 个)")
     
+    @_atomic_view
     def export_golden_templates(self) -> str:
         """
         导出黄金模板数据（JSON格式）
@@ -2913,6 +3231,7 @@ class MABConverger:
         
         return json.dumps(export_data, indent=2, ensure_ascii=False)
     
+    @_synchronized
     def import_golden_templates(self, json_data: str) -> bool:
         """
         导入黄金模板数据
@@ -2954,6 +3273,174 @@ class MABConverger:
             logger.error(f"❌ 导入黄金模板失败: {e}")
             return False
     
+    # ==================== 💾 快照与热启动 ====================
+    
+    def _capture_snapshot(self) -> Dict[str, Any]:
+        """
+        复制快照所需的状态
+        
+        结构状态、统计状态和各决策臂分段依次在各自的锁内复制，任何时刻只持有一把锁，
+        选择与更新最多等待一个分段的复制；各部分分别一致，整体为近似时间点快照。
+        """
+        with self._structure_lock:
+            arms_by_stripe = defaultdict(list)
+            for kind, arms in ((ARM_KIND_PATH, self.path_arms), (ARM_KIND_TOOL, self.tool_arms)):
+                for arm_id, arm in arms.items():
+                    arms_by_stripe[self._arm_stripe(arm_id)].append((kind, arm))
+            trial_ground = self.trial_ground
+            capture = {
+                'exploration_boost_active': dict(trial_ground["exploration_boost_active"]),
+                'culling_candidates': list(trial_ground["culling_candidates"]),
+                'promotion_candidates': list(trial_ground["promotion_candidates"]),
+                'state': {
+                    'golden_templates': {k: dict(v) for k, v in self.golden_templates.items()},
+                    'template_usage_stats': dict(self.template_usage_stats),
+                    'learned_paths': {k: dict(v) for k, v in trial_ground["learned_paths"].items()},
+                    'performance_watch_list': {k: dict(v) for k, v in trial_ground["performance_watch_list"].items()},
+                    'trial_history': list(trial_ground["trial_history"]),
+                    'culled_paths': list(trial_ground["culled_paths"])
+                }
+            }
+        
+        with self._stats_lock:
+            capture['state'].update({
+                'total_path_selections': self.total_path_selections,
+                'total_tool_selections': self.total_tool_selections,
+                'algorithm_performance': {k: dict(v) for k, v in self.algorithm_performance.items()},
+                'tool_algorithm_performance': {k: dict(v) for k, v in self.tool_algorithm_performance.items()},
+                'feedback_source_tracking': {k: dict(v) for k, v in self.feedback_source_tracking.items()}
+            })
+        
+        rows = []
+        for stripe, arms in arms_by_stripe.items():
+            with self._arm_locks[stripe]:
+                rows.extend(arm_row(kind, arm) for kind, arm in arms)
+        capture['rows'] = rows
+        return capture
+    
+    def save_snapshot(self, path: str) -> int:
+        """
+        保存决策臂、试炼场与黄金模板的二进制快照（格式见 mab_snapshot）
+        
+        选择历史属于运行日志，不写入快照。
+        
+        Args:
+            path: 快照文件路径
+            
+        Returns:
+            写入的决策臂数量
+        """
+        start_time = time.time()
+        capture = self._capture_snapshot()
+        write_snapshot(path, capture['rows'], capture['exploration_boost_active'],
+                       capture['culling_candidates'], capture['promotion_candidates'],
+                       capture['state'], start_time)
+        logger.info(f"💾 MAB快照已保存: {path} ({len(capture['rows'])} 个决策臂, "
+                    f"{(time.time() - start_time) * 1000:.1f}ms)")
+        return len(capture['rows'])
+    
+    def load_snapshot(self, path: str) -> int:
+        """
+        从快照恢复状态（替换当前的决策臂、试炼场与黄金模板）
+        
+        Args:
+            path: 快照文件路径
+            
+        Returns:
+            恢复的决策臂数量；文件不存在或版本不兼容时为 0
+        """
+        start_time = time.time()
+        try:
+            snapshot = read_snapshot(path)
+        except Exception as e:
+            logger.error(f"❌ 读取MAB快照失败: {path}: {e}")
+            return 0
+        if snapshot is None:
+            return 0
+        
+        state = snapshot.state
+        with self._all_locks():
+            self.path_arms = snapshot.path_arms
+            self.tool_arms = snapshot.tool_arms
+            
+            self.trial_ground.update({
+                "learned_paths": state.get('learned_paths', {}),
+                "trial_history": state.get('trial_history', []),
+                "promotion_candidates": snapshot.promotion_candidates,
+                "culling_candidates": snapshot.culling_candidates,
+                "exploration_boost_active": snapshot.exploration_boost_active,
+                "performance_watch_list": state.get('performance_watch_list', {}),
+                "culled_paths": state.get('culled_paths', [])
+            })
+            self.golden_templates = GoldenTemplateIndex(state.get('golden_templates', {}))
+            self.template_usage_stats = defaultdict(int, state.get('template_usage_stats', {}))
+            
+            self.total_path_selections = state.get('total_path_selections', 0)
+            self.total_tool_selections = state.get('total_tool_selections', 0)
+            self.algorithm_performance.clear()
+            self.algorithm_performance.update(state.get('algorithm_performance', {}))
+            self.tool_algorithm_performance.clear()
+            self.tool_algorithm_performance.update(state.get('tool_algorithm_performance', {}))
+            self.feedback_source_tracking.clear()
+            self.feedback_source_tracking.update(self._empty_feedback_source_tracking())
+            self.feedback_source_tracking.update(state.get('feedback_source_tracking', {}))
+        
+        if self.shared_arm_table is not None:
+            self.attach_shared_arm_table(self.shared_arm_table)
+        
+        restored = len(snapshot.path_arms) + len(snapshot.tool_arms)
+        logger.info(f"📂 MAB快照已加载: {path} ({restored} 个决策臂, "
+                    f"{(time.time() - start_time) * 1000:.1f}ms)")
+        return restored
+    
+    @staticmethod
+    def _empty_feedback_source_tracking() -> Dict[str, Dict[str, float]]:
+        """各反馈来源的初始统计"""
+        return {
+            source: {"count": 0, "success_rate": 0.0, "avg_reward": 0.0}
+            for source in ("retrospection", "user_feedback", "auto_evaluation", "tool_verification")
+        }
+    
+    def start_background_snapshots(self, path: str, interval: float = 300.0):
+        """
+        启动后台定时快照线程（已在运行时先停止旧线程）
+        
+        Args:
+            path: 快照文件路径
+            interval: 快照间隔（秒）
+        """
+        self.stop_background_snapshots(final_snapshot=False)
+        self._snapshot_stop.clear()
+        
+        def snapshot_loop():
+            while not self._snapshot_stop.wait(interval):
+                try:
+                    self.save_snapshot(path)
+                except Exception as e:
+                    logger.error(f"❌ 后台MAB快照失败: {e}")
+        
+        self._snapshot_path = path
+        self._snapshot_thread = threading.Thread(target=snapshot_loop, name="mab-snapshot", daemon=True)
+        self._snapshot_thread.start()
+        logger.info(f"💾 后台MAB快照已启动: 每 {interval:.0f}s 写入 {path}")
+    
+    def stop_background_snapshots(self, final_snapshot: bool = True):
+        """
+        停止后台快照线程
+        
+        Args:
+            final_snapshot: 停止后是否再保存一次
+        """
+        thread = self._snapshot_thread
+        if thread is None:
+            return
+        self._snapshot_stop.set()
+        thread.join()
+        self._snapshot_thread = None
+        if final_snapshot:
+            self.save_snapshot(self._snapshot_path)
+        logger.info("💾 后台MAB快照已停止")
+    
     # ==================== 🏆 黄金模板使用示例 ====================
     
     def demo_golden_template_workflow(self):
@@ -3067,6 +3554,7 @@ class MABConverger:
         
         return recent_success_rate
     
+    @_atomic_view
     def get_all_paths_confidence(self) -> Dict[str, float]:
         """
         获取所有路径的置信度
@@ -3080,6 +3568,7 @@ class MABConverger:
         
         return confidence_map
     
+    @_atomic_view
     def check_low_confidence_scenario(self, threshold: float = 0.3) -> bool:
         """
         检查是否处于低置信度场景（所有路径表现都很差）
@@ -3107,6 +3596,7 @@ class MABConverger:
         # 如果最高置信度都低于阈值，则认为需要绕道思考
         return max_confidence < threshold
     
+    @_atomic_view
     def get_confidence_analysis(self) -> Dict[str, any]:
         """
         获取置信度分析报告
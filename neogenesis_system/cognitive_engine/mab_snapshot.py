@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+MAB收敛器快照 - MAB Snapshot
+决策臂与试炼场状态的紧凑二进制快照，用于重启后快速热启动
+
+格式（numpy .npz，不使用 pickle）：
+- format_version: 格式版本号
+- strings_utf8 / strings_offsets: 字符串驻留表（策略ID、工具ID、选项名只存一次，其余字段存下标）
+- arm_kind / arm_id / arm_option: 决策臂类型（0 路径 / 1 工具）与字符串下标
+- arm_counters (n, 3): 成功、失败、激活次数；arm_floats (n, 2): 累计奖励、最近使用时间
+- 奖励/结果历史：values + offsets 的压缩行格式
+- boost_ids / boost_remaining、culling_ids、promotion_ids: 试炼场集合
+- state_json: 其余不规则的小状态（黄金模板、试炼场元数据、统计计数）
+"""
+
+import os
+import json
+import logging
+import threading
+from itertools import chain
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, Any, Iterable, Set
+
+import numpy as np
+
+from .data_structures import EnhancedDecisionArm
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+ARM_KIND_PATH = 0
+ARM_KIND_TOOL = 1
+
+# 决策臂行：(类型, ID, 选项, 成功, 失败, 激活, 累计奖励, 最近使用, 最近奖励, RL奖励历史, 最近结果)
+ArmRow = Tuple[int, str, str, int, int, int, float, float, List[float], List[float], List[bool]]
+
+_HISTORY_FIELDS = (
+    ('recent_rewards', np.float64),
+    ('rl_reward_history', np.float64),
+    ('recent_results', np.bool_)
+)
+_HISTORY_COLUMNS = {'recent_rewards': 8, 'rl_reward_history': 9, 'recent_results': 10}
+
+
+def arm_row(kind: int, arm: EnhancedDecisionArm) -> ArmRow:
+    """复制决策臂为快照行（历史列表复制一份，之后可在锁外序列化）"""
+    return (kind, arm.path_id, arm.option, arm.success_count, arm.failure_count, arm.activation_count,
+            arm.total_reward, arm.last_used,
+            list(arm.recent_rewards), list(arm.rl_reward_history), list(arm.recent_results))
+
+
+class _StringTable:
+    """字符串驻留表：字符串 -> 下标"""
+
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.strings: List[str] = []
+
+    def intern(self, value: str) -> int:
+        position = self.index.get(value)
+        if position is None:
+            position = self.index[value] = len(self.strings)
+            self.strings.append(value)
+        return position
+
+    def intern_all(self, values: Iterable[str]) -> np.ndarray:
+        return np.array([self.intern(value) for value in values], dtype=np.int32)
+
+    def encode(self) -> Tuple[np.ndarray, np.ndarray]:
+        """UTF-8 字节串 + 字符偏移（比定宽 unicode 数组紧凑）"""
+        offsets = np.zeros(len(self.strings) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in self.strings], out=offsets[1:])
+        return np.frombuffer("".join(self.strings).encode("utf-8"), dtype=np.uint8), offsets
+
+    @staticmethod
+    def decode(blob: np.ndarray, offsets: np.ndarray) -> List[str]:
+        text = blob.tobytes().decode("utf-8")
+        bounds = offsets.tolist()
+        return [text[bounds[i]:bounds[i + 1]] for i in range(len(bounds) - 1)]
+
+
+@dataclass
+class MABSnapshot:
+    """读取后的快照内容"""
+    path_arms: Dict[str, EnhancedDecisionArm] = field(default_factory=dict)
+    tool_arms: Dict[str, EnhancedDecisionArm] = field(default_factory=dict)
+    exploration_boost_active: Dict[str, int] = field(default_factory=dict)
+    culling_candidates: Set[str] = field(default_factory=set)
+    promotion_candidates: Set[str] = field(default_factory=set)
+    state: Dict[str, Any] = field(default_factory=dict)
+    created_at: float = 0.0
+
+
+def write_snapshot(path: str,
+                   rows: List[ArmRow],
+                   exploration_boost_active: Dict[str, int],
+                   culling_candidates: Iterable[str],
+                   promotion_candidates: Iterable[str],
+                   state: Dict[str, Any],
+                   created_at: float):
+    """
+    写入快照（先写临时文件再原子替换）
+
+    Args:
+        path: 快照文件路径
+        rows: 决策臂行（见 arm_row）
+        exploration_boost_active: 策略ID -> 剩余探索增强轮数
+        culling_candidates: 淘汰候选策略ID
+        promotion_candidates: 黄金模板候选策略ID
+        state: 其余可 JSON 序列化的状态
+        created_at: 快照时间
+    """
+    strings = _StringTable()
+    count = len(rows)
+
+    arm_kind = np.fromiter((row[0] for row in rows), dtype=np.uint8, count=count)
+    arm_id = strings.intern_all(row[1] for row in rows)
+    arm_option = strings.intern_all(row[2] for row in rows)
+    arm_counters = np.array([row[3:6] for row in rows], dtype=np.int64).reshape(count, 3)
+    arm_floats = np.array([row[6:8] for row in rows], dtype=np.float64).reshape(count, 2)
+
+    histories = {}
+    for name, dtype in _HISTORY_FIELDS:
+        column = _HISTORY_COLUMNS[name]
+        lengths = np.fromiter((len(row[column]) for row in rows), dtype=np.int64, count=count)
+        offsets = np.zeros(count + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        values = np.fromiter(chain.from_iterable(row[column] for row in rows),
+                             dtype=dtype, count=int(offsets[-1]))
+        histories[f"{name}_values"] = values
+        histories[f"{name}_offsets"] = offsets
+
+    boost_items = list(exploration_boost_active.items())
+    boost_ids = strings.intern_all(strategy_id for strategy_id, _ in boost_items)
+    culling_ids = strings.intern_all(culling_candidates)
+    promotion_ids = strings.intern_all(promotion_candidates)
+    strings_utf8, strings_offsets = strings.encode()
+    state_json = json.dumps(state, ensure_ascii=False, default=str).encode("utf-8")
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"  # 多个 worker 可能写同一路径
+    with open(tmp_path, "wb") as f:
+        np.savez(
+            f,
+            format_version=np.array([SNAPSHOT_FORMAT_VERSION], dtype=np.int64),
+            created_at=np.array([created_at], dtype=np.float64),
+            arm_kind=arm_kind,
+            arm_id=arm_id,
+            arm_option=arm_option,
+            arm_counters=arm_counters,
+            arm_floats=arm_floats,
+            boost_ids=boost_ids,
+            boost_remaining=np.array([remaining for _, remaining in boost_items], dtype=np.int64),
+            culling_ids=culling_ids,
+            promotion_ids=promotion_ids,
+            strings_utf8=strings_utf8,
+            strings_offsets=strings_offsets,
+            state_json=np.frombuffer(state_json, dtype=np.uint8),
+            **histories
+        )
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path: str) -> Optional[MABSnapshot]:
+    """
+    读取快照
+
+    Returns:
+        快照内容；文件不存在或版本不兼容时返回 None
+    """
+    if not os.path.exists(path):
+        return None
+
+    with np.load(path, allow_pickle=False) as data:
+        version = int(data["format_version"][0])
+        if version != SNAPSHOT_FORMAT_VERSION:
+            logger.warning(f"⚠️ 不支持的MAB快照版本 {version}（当前 {SNAPSHOT_FORMAT_VERSION}），忽略: {path}")
+            return None
+
+        strings = _StringTable.decode(data["strings_utf8"], data["strings_offsets"])
+        arm_kind = data["arm_kind"].tolist()
+        arm_ids = [strings[i] for i in data["arm_id"].tolist()]
+        arm_options = [strings[i] for i in data["arm_option"].tolist()]
+        counters = data["arm_counters"].tolist()
+        floats = data["arm_floats"].tolist()
+        histories = {
+            name: (data[f"{name}_values"].tolist(), data[f"{name}_offsets"].tolist())
+            for name, _ in _HISTORY_FIELDS
+        }
+        snapshot = MABSnapshot(
+            exploration_boost_active=dict(zip((strings[i] for i in data["boost_ids"].tolist()),
+                                              data["boost_remaining"].tolist())),
+            culling_candidates={strings[i] for i in data["culling_ids"].tolist()},
+            promotion_candidates={strings[i] for i in data["promotion_ids"].tolist()},
+            state=json.loads(data["state_json"].tobytes().decode("utf-8")),
+            created_at=float(data["created_at"][0])
+        )
+
+        rewards, reward_offsets = histories['recent_rewards']
+        rl_rewards, rl_offsets = histories['rl_reward_history']
+        results, result_offsets = histories['recent_results']
+        targets = (snapshot.path_arms, snapshot.tool_arms)
+        for i, arm_id in enumerate(arm_ids):
+            success, failure, activation = counters[i]
+            total_reward, last_used = floats[i]
+            targets[arm_kind[i]][arm_id] = EnhancedDecisionArm(
+                path_id=arm_id,
+                option=arm_options[i],
+                success_count=success,
+                failure_count=failure,
+                total_reward=total_reward,
+                recent_rewards=rewards[reward_offsets[i]:reward_offsets[i + 1]],
+                rl_reward_history=rl_rewards[rl_offsets[i]:rl_offsets[i + 1]],
+                recent_results=results[result_offsets[i]:result_offsets[i + 1]],
+                activation_count=activation,
+                last_used=last_used
+            )
+    return snapshot
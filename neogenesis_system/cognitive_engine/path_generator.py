@@ -22,6 +22,7 @@ from dataclasses import dataclass
 from .data_structures import ReasoningPath, TaskComplexity
 # from .utils.client_adapter import DeepSeekClientAdapter  # 不再需要，使用依赖注入
 from ..shared.common_utils import parse_json_response, extract_context_factors
+from ..shared.budget import DegradationLevel, current_degradation, get_current_budget
 try:
     from neogenesis_system.config import PROMPT_TEMPLATES
 except ImportError:
@@ -1337,6 +1338,11 @@ class PathGenerator:
         # 💡 Aha-Moment决策：creative_bypass模式跳过缓存，确保创造性
         use_cache = (mode != 'creative_bypass')
         
+        # 💰 请求预算不足时减少路径数
+        budget = get_current_budget()
+        if budget is not None:
+            max_paths = budget.limit_paths(max_paths)
+        
         # 检查缓存
         cache_key = f"paths_{hash(thinking_seed)}_{hash(task)}_{max_paths}_{mode}"
         if use_cache and cache_key in self.path_generation_cache:
@@ -1397,8 +1403,8 @@ class PathGenerator:
         """
         logger.debug(f" 开始LLM分析思维种子: {thinking_seed[:50]}...")
         
-        # 如果LLM分析器可用，使用智能分析
-        if self.llm_analyzer:
+        # 如果LLM分析器可用（且请求预算允许LLM调用），使用智能分析
+        if self.llm_analyzer and current_degradation() < DegradationLevel.HEURISTIC_ONLY:
             try:
                 return self._llm_analyze_thinking_seed(thinking_seed)
             except Exception as e:
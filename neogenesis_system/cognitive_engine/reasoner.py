@@ -21,6 +21,11 @@ from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
 from enum import Enum
 
+try:
+    from neogenesis_system.shared.budget import DegradationLevel, current_degradation
+except ImportError:
+    from ..shared.budget import DegradationLevel, current_degradation
+
 logger = logging.getLogger(__name__)
 # LLM 相关导入
 try:
@@ -217,16 +222,29 @@ class PriorReasoner:
         """
         if not self.enable_llm:
             return None
+        
+        # 请求预算已降级为只用启发式：不再发起LLM调用
+        if current_degradation() >= DegradationLevel.HEURISTIC_ONLY:
+            logger.debug("💰 请求预算不足，跳过LLM调用")
+            return None
             
         try:
             # 方式1：优先使用Ollama客户端（更快速）
             if self.ollama_client:
                 messages = [LLMMessage(role="user", content=prompt)]
-                response = self.ollama_client.chat_completion(
-                    messages=messages,
-                    temperature=temperature,
-                    max_tokens=max_tokens
-                )
+                reservation, call_kwargs = self.ollama_client.reserve_budget(messages, {'max_tokens': max_tokens})
+                try:
+                    response = self.ollama_client.chat_completion(
+                        messages=messages,
+                        temperature=temperature,
+                        **call_kwargs
+                    )
+                except BaseException:
+                    if reservation:
+                        reservation.commit()
+                    raise
+                if reservation:
+                    reservation.commit(response.usage, failed=not response.success)
                 
                 if response.success:
                     logger.debug(f"✅ Ollama调用成功: {response.content[:50]}...")
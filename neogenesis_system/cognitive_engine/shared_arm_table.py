@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+跨进程共享的决策臂表 - Shared Arm Table
+让同一主机上的多个 uvicorn worker 读写同一份老虎机统计，而不是各自学习
+
+- 表放在 multiprocessing.shared_memory 中：定长记录（成功/失败/奖励/激活次数/最近使用时间）
+- 读取采用 seqlock：写入前后递增序号，读到奇数序号或前后序号不一致时重读，读者不加锁
+- 写入经过分段锁：进程内 threading.Lock + 锁文件上按字节加的 fcntl 记录锁
+- 开放寻址（线性探测）定位记录，记录只增不删，查找无需加锁
+
+用法：监督进程 create() 后把 name 传给 worker（环境变量），worker 用 attach(name) 接入；
+监督进程退出时 unlink()。同一进程内同一张表只应打开一次（关闭锁文件会释放该进程的全部记录锁）。
+"""
+
+import os
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# 环境变量：监督进程创建的共享表名称
+SHARED_ARM_TABLE_ENV = "NEOGENESIS_SHARED_MAB_TABLE"
+
+_MAGIC = 0x4E454F4D41423031  # "NEOMAB01"
+_HEADER_DTYPE = np.dtype([
+    ('magic', '<u8'),
+    ('capacity', '<u8'),
+    ('lock_count', '<u8'),
+    ('count', '<u8'),
+    ('reserved', '<u8', (4,))
+])
+_KEY_BYTES = 96
+_RECORD_DTYPE = np.dtype([
+    ('seq', '<u8'),            # seqlock 序号：奇数表示正在写入
+    ('state', '<u8'),          # 0 = 空槽, 1 = 已占用
+    ('key_hash', '<u8'),
+    ('success', '<i8'),
+    ('failure', '<i8'),
+    ('activation', '<i8'),
+    ('total_reward', '<f8'),
+    ('last_used', '<f8'),
+    ('key', f'S{_KEY_BYTES}')
+])
+
+_EMPTY, _OCCUPIED = 0, 1
+_FIELDS = ('success', 'failure', 'activation', 'total_reward', 'last_used')
+
+
+def _encode_key(key: str) -> bytes:
+    """键 -> 定长字节（超长的键用摘要代替）"""
+    encoded = key.encode("utf-8")
+    if len(encoded) > _KEY_BYTES or b"\0" in encoded:
+        encoded = b"#" + hashlib.blake2b(encoded, digest_size=32).hexdigest().encode("ascii")
+    return encoded
+
+
+def _stable_hash(encoded_key: bytes) -> int:
+    """跨进程稳定的哈希（内置 hash() 在每个进程中带随机盐）"""
+    return int.from_bytes(hashlib.blake2b(encoded_key, digest_size=8).digest(), "little")
+
+
+class SharedArmTableFullError(RuntimeError):
+    """共享表已满"""
+
+
+class SharedArmTable:
+    """
+    共享内存中的决策臂统计表
+
+    记录字段：success / failure / activation / total_reward / last_used。
+    增量写入（add）在分段锁内完成并返回写入后的记录；读取（get）不加锁。
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool = False):
+        """
+        请使用 create() / attach() 构造
+
+        Args:
+            shm: 已打开的共享内存段
+            owner: 是否为创建者（负责 unlink）
+        """
+        self._shm = shm
+        self.owner = owner
+        self.name = shm.name
+
+        self._header = np.ndarray((1,), dtype=_HEADER_DTYPE, buffer=shm.buf)[0]
+        if int(self._header['magic']) != _MAGIC:
+            raise ValueError(f"共享内存段 {shm.name} 不是决策臂表")
+        self.capacity = int(self._header['capacity'])
+        self.lock_count = int(self._header['lock_count'])
+
+        records = np.ndarray((self.capacity,), dtype=_RECORD_DTYPE,
+                             buffer=shm.buf, offset=_HEADER_DTYPE.itemsize)
+        self._records = records
+        self._seq = records['seq']
+        self._state = records['state']
+        self._key_hash = records['key_hash']
+        self._keys = records['key']
+        self._columns = {field: records[field] for field in _FIELDS}
+
+        # 写锁：第 0 个字节用于分配新记录，其余按槽位分段
+        self._thread_locks = [threading.Lock() for _ in range(self.lock_count + 1)]
+        self._lock_path = os.path.join(tempfile.gettempdir(), f"{self.name.lstrip('/')}.lock")
+        self._lock_fd = os.open(self._lock_path, os.O_RDWR | os.O_CREAT, 0o600) if fcntl else None
+        if fcntl is None:
+            logger.warning("⚠️ 当前平台不支持 fcntl 记录锁，共享决策臂表仅在进程内串行化写入")
+
+        self._slot_cache: Dict[str, int] = {}
+
+    # ==================== 创建与接入 ====================
+
+    @classmethod
+    def create(cls, name: Optional[str] = None, capacity: int = 4096, lock_count: int = 64) -> 'SharedArmTable':
+        """创建新的共享表"""
+        size = _HEADER_DTYPE.itemsize + capacity * _RECORD_DTYPE.itemsize
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        shm.buf[:size] = bytes(size)
+        header = np.ndarray((1,), dtype=_HEADER_DTYPE, buffer=shm.buf)[0]
+        header['capacity'] = capacity
+        header['lock_count'] = lock_count
+        header['magic'] = _MAGIC
+        del header
+
+        table = cls(shm, owner=True)
+        logger.info(f"🧮 共享决策臂表已创建: {table.name} (容量 {capacity}, {lock_count} 个分段锁)")
+        return table
+
+    @classmethod
+    def attach(cls, name: str) -> 'SharedArmTable':
+        """接入已存在的共享表"""
+        table = cls(shared_memory.SharedMemory(name=name), owner=False)
+        logger.info(f"🧮 已接入共享决策臂表: {name} ({len(table)} 条记录)")
+        return table
+
+    @classmethod
+    def from_environment(cls) -> Optional['SharedArmTable']:
+        """按环境变量 NEOGENESIS_SHARED_MAB_TABLE 接入共享表（未设置时返回 None）"""
+        name = os.getenv(SHARED_ARM_TABLE_ENV)
+        return cls.attach(name) if name else None
+
+    def close(self):
+        """断开与共享表的连接"""
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+        self._records = self._seq = self._state = self._key_hash = self._keys = self._header = None
+        self._columns = {}
+        self._shm.close()
+
+    def unlink(self):
+        """销毁共享表（仅创建者调用）"""
+        self._shm.unlink()
+        try:
+            os.remove(self._lock_path)
+        except OSError:
+            pass
+
+    def __len__(self) -> int:
+        return int(self._header['count'])
+
+    # ==================== 锁 ====================
+
+    @contextmanager
+    def _locked(self, index: int) -> Iterator[None]:
+        """第 index 把写锁（0 为分配锁）：先进程内、再跨进程"""
+        with self._thread_locks[index]:
+            if self._lock_fd is None:
+                yield
+                return
+            fcntl.lockf(self._lock_fd, fcntl.LOCK_EX, 1, index)
+            try:
+                yield
+            finally:
+                fcntl.lockf(self._lock_fd, fcntl.LOCK_UN, 1, index)
+
+    def _stripe(self, slot: int) -> int:
+        return 1 + slot % self.lock_count
+
+    # ==================== 槽位查找 ====================
+
+    def _probe(self, encoded_key: bytes, key_hash: int) -> Optional[int]:
+        """线性探测：返回键所在槽位；遇到空槽或探测一圈仍未找到返回 None"""
+        start = key_hash % self.capacity
+        for step in range(self.capacity):
+            slot = (start + step) % self.capacity
+            if self._state[slot] == _EMPTY:
+                return None
+            if self._key_hash[slot] == key_hash and self._keys[slot] == encoded_key:
+                return slot
+        return None
+
+    def _find_slot(self, key: str) -> Optional[int]:
+        slot = self._slot_cache.get(key)
+        if slot is None:
+            encoded_key = _encode_key(key)
+            slot = self._probe(encoded_key, _stable_hash(encoded_key))
+            if slot is not None:
+                self._slot_cache[key] = slot
+        return slot
+
+    def _find_or_insert_slot(self, key: str, initial: Optional[Dict[str, float]] = None) -> int:
+        slot = self._find_slot(key)
+        if slot is not None:
+            return slot
+
+        encoded_key = _encode_key(key)
+        key_hash = _stable_hash(encoded_key)
+        with self._locked(0):
+            start = key_hash % self.capacity
+            for step in range(self.capacity):
+                slot = (start + step) % self.capacity
+                if self._state[slot] == _EMPTY:
+                    break
+                if self._key_hash[slot] == key_hash and self._keys[slot] == encoded_key:
+                    self._slot_cache[key] = slot
+                    return slot  # 其他进程刚刚插入
+            else:
+                raise SharedArmTableFullError(f"共享决策臂表已满（容量 {self.capacity}）")
+
+            # 先写键和初始值，最后标记占用：无锁读者看到占用时记录已完整
+            self._keys[slot] = encoded_key
+            self._key_hash[slot] = key_hash
+            for field in _FIELDS:
+                self._columns[field][slot] = (initial or {}).get(field, 0)
+            self._state[slot] = _OCCUPIED
+            self._header['count'] += 1
+
+        self._slot_cache[key] = slot
+        return slot
+
+    # ==================== 读写 ====================
+
+    def _read_slot(self, slot: int) -> Dict[str, float]:
+        """seqlock 读：序号为奇数或读取前后不一致时重读"""
+        columns = self._columns
+        attempts = 0
+        while True:
+            seq_before = int(self._seq[slot])
+            if not seq_before & 1:
+                record = {
+                    'success': int(columns['success'][slot]),
+                    'failure': int(columns['failure'][slot]),
+                    'activation': int(columns['activation'][slot]),
+                    'total_reward': float(columns['total_reward'][slot]),
+                    'last_used': float(columns['last_used'][slot])
+                }
+                if int(self._seq[slot]) == seq_before:
+                    return record
+            attempts += 1
+            if attempts % 100 == 0:
+                time.sleep(0)  # 写者可能被挂起，让出时间片
+
+    def get(self, key: str) -> Optional[Dict[str, float]]:
+        """读取记录（无锁）；不存在时返回 None"""
+        slot = self._find_slot(key)
+        return self._read_slot(slot) if slot is not None else None
+
+    def ensure(self, key: str, initial: Dict[str, float]) -> Dict[str, float]:
+        """记录不存在时用 initial 创建；返回当前记录"""
+        return self._read_slot(self._find_or_insert_slot(key, initial))
+
+    def add(self, key: str, success: int = 0, failure: int = 0, activation: int = 0,
+            reward: float = 0.0, last_used: Optional[float] = None) -> Dict[str, float]:
+        """
+        增量更新记录（不存在时创建）
+
+        Returns:
+            更新后的记录
+        """
+        slot = self._find_or_insert_slot(key)
+        columns = self._columns
+        with self._locked(self._stripe(slot)):
+            self._seq[slot] += 1
+            columns['success'][slot] += success
+            columns['failure'][slot] += failure
+            columns['activation'][slot] += activation
+            columns['total_reward'][slot] += reward
+            if last_used is not None:
+                columns['last_used'][slot] = max(float(columns['last_used'][slot]), last_used)
+            record = {field: columns[field][slot].item() for field in _FIELDS}
+            self._seq[slot] += 1
+        return record
+
+    def reset(self, key: str):
+        """清零记录（记录本身保留）"""
+        slot = self._find_slot(key)
+        if slot is None:
+            return
+        with self._locked(self._stripe(slot)):
+            self._seq[slot] += 1
+            for field in _FIELDS:
+                self._columns[field][slot] = 0
+            self._seq[slot] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """所有记录的副本：键 -> 记录"""
+        occupied = np.flatnonzero(self._state == _OCCUPIED)
+        return {
+            self._keys[slot].decode("utf-8"): self._read_slot(int(slot))
+            for slot in occupied
+        }
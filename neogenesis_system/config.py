@@ -215,6 +215,9 @@ RAG_CONFIG = {
     "enable_real_web_search": False,            # 🚨 暂时禁用真实搜索 - 避免网络连接问题
     # 🛡️ 搜索稳定性优化配置
     "search_rate_limit_interval": 3.0,          # 🚨 增加搜索请求间隔（秒） - 降低触发速率限制风险
+    "search_rate_limit_burst": 3,               # 令牌桶容量：可立即并发放行的搜索请求数
+    "search_query_cache_size": 256,             # 想法验证搜索结果共享缓存的最大条目数
+    "search_query_cache_ttl": 1800,             # 想法验证搜索结果缓存时间（秒）
     "search_max_retries": 2,                     # 🚨 减少重试次数 - 避免过度请求
     "search_retry_base_delay": 2.0,              # 🚨 增加重试基础延迟（秒）
     "search_use_fallback_on_ratelimit": True     # 遇到速率限制时自动降级到模拟搜索
@@ -374,7 +377,7 @@ DEFAULT_LLM_CONFIG = {
     "fallback_on_error": True,          # 错误时是否回退
     "fallback_on_rate_limit": True,     # 速率限制时是否回退
     "load_balancing": False,             # 是否启用负载均衡
-    "provider_selection_strategy": "priority",  # 选择策略: priority, round_robin, random
+    "provider_selection_strategy": "latency",   # 选择策略: latency（按期望延迟）, priority（按顺序）
     "health_check_interval": 300,       # 健康检查间隔（秒）
     "performance_tracking": True,       # 是否跟踪性能
     "cost_tracking": True,              # 是否跟踪成本
@@ -392,7 +395,18 @@ LLM_MANAGER_CONFIG = {
     "cache_ttl_seconds": 300,           # 缓存过期时间（秒）
     "enable_response_validation": True, # 启用响应验证
     "log_all_interactions": False,      # 是否记录所有交互（调试用）
-    "enable_provider_metrics": True     # 启用提供商指标
+    "enable_provider_metrics": True,    # 启用提供商指标
+    "routing": {                        # 路由：熔断与对冲请求（其余参数见 providers/provider_router.py）
+        "breaker": {
+            "consecutive_failures": 3,  # 连续失败达到此数时熔断
+            "error_rate_threshold": 0.5,# 窗口错误率达到此值时熔断
+            "open_timeout": 30.0        # 熔断冷却时间（秒），之后放行探测请求
+        },
+        "hedging": {
+            "enabled": True,            # 主提供商超过其 p95 延迟时向次优提供商发送对冲请求
+            "max_hedges": 1             # 每个请求最多的对冲次数
+        }
+    }
 }
 
 # 成本控制配置
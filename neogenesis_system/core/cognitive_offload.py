@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+认知任务进程池卸载 - Cognitive Task Process Offload
+将 CPU 密集型的纯函数计算（知识探索中的趋势分析、CPU 型工具）放到独立进程执行
+
+纯 Python 文本处理在认知工作线程中运行时会与 API 请求处理争用 GIL。
+本模块提供：
+- CognitiveProcessPool: 惰性创建、可重建的进程池封装
+- is_picklable(): 判断载荷能否跨进程传递
+
+注意：模块顶层只依赖标准库，子进程导入开销尽量小。
+"""
+
+import pickle
+import logging
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# ==================== 进程池 ====================
+
+def is_picklable(payload: Any) -> bool:
+    """检查载荷能否跨进程传递"""
+    try:
+        pickle.dumps(payload)
+        return True
+    except Exception:
+        return False
+
+
+class CognitiveProcessPool:
+    """
+    认知任务进程池
+
+    - 首次提交时才创建进程，未启用卸载时没有任何开销
+    - 默认使用 spawn 启动方式，避免在多线程的服务进程中 fork
+    - 进程池损坏（子进程崩溃）后自动重建
+    """
+
+    def __init__(self, max_workers: int = 2, start_method: str = "spawn"):
+        self.max_workers = max_workers
+        self.start_method = start_method
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        """底层执行器（惰性创建）"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context(self.start_method)
+            )
+            logger.info(f"🧮 认知进程池已创建: {self.max_workers} 个进程 ({self.start_method})")
+        return self._executor
+
+    def submit(self, fn: Callable, *args) -> Future:
+        """提交任务，进程池损坏时重建后重试一次"""
+        try:
+            return self.executor.submit(fn, *args)
+        except BrokenProcessPool:
+            logger.warning("⚠️ 认知进程池已损坏，正在重建")
+            self._executor = None
+            return self.executor.submit(fn, *args)
+
+    def shutdown(self, wait: bool = False):
+        """关闭进程池，取消尚未开始的任务"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
@@ -15,17 +15,21 @@
 """
 
 import time
+import heapq
+import itertools
 import threading
 import logging
 import asyncio
-from typing import Dict, List, Optional, Any, Callable
+from typing import Dict, List, Optional, Any, Callable, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
-from queue import Queue, Empty
+from queue import Empty
 import json
 
 from ..shared.state_manager import StateManager, TaskPhase, GoalStatus
+from ..shared.deadline import Deadline, deadline_scope
 from .retrospection_engine import TaskRetrospectionEngine, RetrospectionStrategy
+from .cognitive_offload import CognitiveProcessPool
 from ..providers.knowledge_explorer import KnowledgeExplorer, ExplorationStrategy
 
 logger = logging.getLogger(__name__)
@@ -49,10 +53,215 @@ class CognitiveTask:
     context: Dict[str, Any] = field(default_factory=dict)
     created_at: float = field(default_factory=time.time)
     estimated_duration: float = 30.0  # 预估执行时间(秒)
+    cancel_event: threading.Event = field(default_factory=threading.Event, repr=False, compare=False)
+    cancel_reason: str = ""
+    started_at: Optional[float] = None     # 开始执行时间（超时以此为基准）
+    worker_name: Optional[str] = None      # 执行该任务的工作线程
+    deadline: Optional[Deadline] = field(default=None, repr=False, compare=False)
     
     def __post_init__(self):
         if not self.task_id:
             self.task_id = f"{self.task_type}_{int(time.time() * 1000)}"
+    
+    @property
+    def is_user_directed(self) -> bool:
+        """是否为用户指令驱动的任务"""
+        return self.context.get("exploration_mode") == "user_directed"
+    
+    @property
+    def is_cancelled(self) -> bool:
+        """任务是否已被取消"""
+        return self.cancel_event.is_set()
+    
+    def cancel(self, reason: str = ""):
+        """协作式取消：设置取消标志，由执行方在检查点处退出"""
+        self.cancel_reason = reason
+        self.cancel_event.set()
+
+
+class CognitiveTaskQueue:
+    """
+    线程安全的双轨优先级认知任务队列
+    
+    - 用户指令任务与自主任务分别进入独立的优先级堆
+    - 按等待时间老化优先级，避免低优先级任务饿死
+    - 按通道限制并发执行数（max_concurrent_user_tasks / max_concurrent_autonomous）
+    
+    老化后的有效优先级为 priority + aging_rate * (now - enqueued_at)，
+    同一通道内的相对顺序不随时间变化，因此堆键可在入队时一次算好。
+    """
+    
+    USER_DIRECTED = "user_directed"
+    AUTONOMOUS = "autonomous"
+    
+    def __init__(self, max_concurrent: Optional[Dict[str, int]] = None, aging_rate: float = 0.05):
+        """
+        初始化任务队列
+        
+        Args:
+            max_concurrent: 各通道最大并发数，None 或缺省表示不限制
+            aging_rate: 每等待1秒提升的优先级
+        """
+        self._condition = threading.Condition()
+        self._lanes: Dict[str, List[Tuple[float, int, CognitiveTask]]] = {
+            self.USER_DIRECTED: [],
+            self.AUTONOMOUS: []
+        }
+        self._running: Dict[str, Dict[str, CognitiveTask]] = {
+            self.USER_DIRECTED: {},
+            self.AUTONOMOUS: {}
+        }
+        self._max_concurrent = dict(max_concurrent or {})
+        self._aging_rate = aging_rate
+        self._sequence = itertools.count()
+        self._closed = False
+        self.stats = {
+            "enqueued": 0,
+            "dequeued": 0,
+            "dropped_cancelled": 0,
+            "preempted": 0
+        }
+    
+    @classmethod
+    def lane_of(cls, task: CognitiveTask) -> str:
+        """任务所属通道"""
+        return cls.USER_DIRECTED if task.is_user_directed else cls.AUTONOMOUS
+    
+    def put(self, task: CognitiveTask):
+        """任务入队"""
+        with self._condition:
+            enqueued_at = time.time()
+            sort_key = -(task.priority - self._aging_rate * enqueued_at)
+            heapq.heappush(self._lanes[self.lane_of(task)], (sort_key, next(self._sequence), task))
+            self.stats["enqueued"] += 1
+            self._condition.notify()
+    
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> Optional[CognitiveTask]:
+        """
+        取出当前可执行的最高有效优先级任务，并计入对应通道的运行数
+        
+        Returns:
+            认知任务；队列关闭时返回 None
+            
+        Raises:
+            Empty: 非阻塞或超时时没有可执行任务
+        """
+        deadline = time.time() + timeout if timeout is not None else None
+        
+        with self._condition:
+            while True:
+                if self._closed:
+                    return None
+                
+                lane = self._select_lane_locked()
+                if lane is not None:
+                    _, _, task = heapq.heappop(self._lanes[lane])
+                    self._running[lane][task.task_id] = task
+                    self.stats["dequeued"] += 1
+                    return task
+                
+                if not block:
+                    raise Empty
+                
+                if deadline is None:
+                    self._condition.wait()
+                else:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        raise Empty
+                    self._condition.wait(remaining)
+    
+    def get_nowait(self) -> Optional[CognitiveTask]:
+        """非阻塞取出任务"""
+        return self.get(block=False)
+    
+    def task_done(self, task: CognitiveTask):
+        """任务执行结束，释放通道并发名额"""
+        with self._condition:
+            self._running[self.lane_of(task)].pop(task.task_id, None)
+            self._condition.notify_all()
+    
+    def _select_lane_locked(self) -> Optional[str]:
+        """选择队首有效优先级最高且未达并发上限的通道（调用方需持有锁）"""
+        now = time.time()
+        best_lane = None
+        best_priority = None
+        
+        for lane, heap in self._lanes.items():
+            # 惰性丢弃排队期间已被取消的任务
+            while heap and heap[0][2].is_cancelled:
+                heapq.heappop(heap)
+                self.stats["dropped_cancelled"] += 1
+            if not heap:
+                continue
+            
+            limit = self._max_concurrent.get(lane)
+            if limit is not None and len(self._running[lane]) >= limit:
+                continue
+            
+            effective_priority = -heap[0][0] + self._aging_rate * now
+            if best_priority is None or effective_priority > best_priority:
+                best_lane = lane
+                best_priority = effective_priority
+        
+        return best_lane
+    
+    def preempt_autonomous(self, reason: str = "user_task_preemption") -> Optional[CognitiveTask]:
+        """
+        协作式取消一个正在执行的最低优先级自主任务
+        
+        Returns:
+            被取消的任务；没有可抢占的任务时返回 None
+        """
+        with self._condition:
+            candidates = [task for task in self._running[self.AUTONOMOUS].values()
+                          if not task.is_cancelled]
+            if not candidates:
+                return None
+            
+            victim = min(candidates, key=lambda t: (t.priority, -t.created_at))
+            victim.cancel(reason)
+            self.stats["preempted"] += 1
+            return victim
+    
+    def running_count(self, lane: Optional[str] = None) -> int:
+        """正在执行的任务数"""
+        with self._condition:
+            if lane is not None:
+                return len(self._running[lane])
+            return sum(len(tasks) for tasks in self._running.values())
+    
+    def qsize(self) -> int:
+        """排队中的任务数"""
+        with self._condition:
+            return sum(len(heap) for heap in self._lanes.values())
+    
+    def empty(self) -> bool:
+        """队列是否为空"""
+        return self.qsize() == 0
+    
+    def close(self):
+        """关闭队列，唤醒所有等待中的工作线程"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+    
+    def reopen(self):
+        """重新开放队列"""
+        with self._condition:
+            self._closed = False
+    
+    def get_lane_status(self) -> Dict[str, Dict[str, int]]:
+        """各通道的排队与执行情况"""
+        with self._condition:
+            return {
+                lane: {
+                    "queued": len(self._lanes[lane]),
+                    "running": len(self._running[lane]),
+                    "max_concurrent": self._max_concurrent.get(lane, -1)
+                }
+                for lane in self._lanes
+            }
 
 
 class CognitiveScheduler:
@@ -93,7 +302,7 @@ class CognitiveScheduler:
                 "min_idle_duration": 10.0,      # 最小空闲时间(秒)
                 "max_idle_duration": 300.0,     # 最大空闲时间(秒)  
                 "task_completion_buffer": 5.0,   # 任务完成后缓冲时间
-                "check_interval": 2.0            # 状态检查间隔
+                "max_sleep_interval": 300.0      # 无事件时的最长休眠时间（兜底唤醒）
             },
             
             # 认知任务配置
@@ -102,7 +311,16 @@ class CognitiveScheduler:
                 "ideation_interval": 120.0,          # 创想任务间隔
                 "exploration_interval": 180.0,       # 知识探索任务间隔
                 "max_concurrent_tasks": 2,           # 最大并发认知任务数
-                "task_timeout": 180.0                # 认知任务超时时间
+                "task_timeout": 180.0,               # 认知任务超时时间
+                "hung_worker_grace": 30.0,           # 超时后仍未退出的宽限期，过后替换工作线程
+                "priority_aging_rate": 0.05,         # 排队每秒提升的优先级（防止饿死）
+                
+                # 🧮 知识探索中的趋势分析在进程池执行（避免与请求处理争用GIL）
+                "process_pool": {
+                    "enabled": False,
+                    "max_workers": 2,
+                    "start_method": "spawn"          # 避免在多线程服务进程中fork
+                }
             },
             
             # 🌐 知识探索配置 - 双轨探索系统
@@ -160,9 +378,17 @@ class CognitiveScheduler:
         self.is_idle = False
         self.last_activity_time = time.time()
         self.last_task_completion_time = None
-        
-        # 认知任务管理
-        self.cognitive_task_queue = Queue()
+        self.last_ideation_time = 0.0
+        
+        # 认知任务管理 - 双轨优先级队列
+        dual_track_config = self.config["knowledge_exploration"]["dual_track_config"]
+        self.cognitive_task_queue = CognitiveTaskQueue(
+            max_concurrent={
+                CognitiveTaskQueue.USER_DIRECTED: dual_track_config["max_concurrent_user_tasks"],
+                CognitiveTaskQueue.AUTONOMOUS: dual_track_config["max_concurrent_autonomous"]
+            },
+            aging_rate=self.config["cognitive_tasks"]["priority_aging_rate"]
+        )
         self.active_cognitive_tasks: Dict[str, CognitiveTask] = {}
         self.cognitive_history: List[Dict[str, Any]] = []
         
@@ -200,6 +426,25 @@ class CognitiveScheduler:
         self.scheduler_thread: Optional[threading.Thread] = None
         self.cognitive_workers: List[threading.Thread] = []
         self.stop_event = threading.Event()
+        self._worker_sequence = itertools.count(1)
+        self._abandoned_workers: set = set()  # 被判定为挂起、已由新线程替换的工作线程名
+        
+        # 🧮 趋势分析进程池（未启用时为 None）
+        process_pool_config = self.config["cognitive_tasks"]["process_pool"]
+        self._process_pool: Optional[CognitiveProcessPool] = None
+        if process_pool_config["enabled"]:
+            self._process_pool = CognitiveProcessPool(
+                max_workers=process_pool_config["max_workers"],
+                start_method=process_pool_config["start_method"]
+            )
+        
+        # ⏰ 事件驱动调度：状态变化或定时器到期时唤醒主循环
+        self._wakeup_event = threading.Event()
+        self._timer_lock = threading.Lock()
+        self._timer_heap: List[Tuple[float, str]] = []     # (到期时间, 定时器名) 最小堆
+        self._timer_deadlines: Dict[str, float] = {}        # 定时器名 -> 当前有效到期时间
+        self._task_finished = self.state_manager.is_current_task_finished()
+        self._last_synthesis_history_len = 0
         
         # 性能统计
         self.stats = {
@@ -209,7 +454,12 @@ class CognitiveScheduler:
             "retrospection_sessions": 0,
             "ideation_sessions": 0,
             "knowledge_synthesis_sessions": 0,
-            "knowledge_exploration_sessions": 0  # 新增：知识探索会话数
+            "knowledge_exploration_sessions": 0,  # 新增：知识探索会话数
+            "scheduler_wakeups": 0,               # 主循环唤醒次数
+            "cancelled_cognitive_tasks": 0,       # 被取消（抢占）的认知任务数
+            "timed_out_cognitive_tasks": 0,       # 超过截止时间的认知任务数
+            "replaced_workers": 0,                # 因挂起被替换的工作线程数
+            "merged_offloaded_results": 0         # 通过 StateManager 事件合并的进程池计算结果数
         }
         
         # 🌐 知识探索相关状态 - 新增
@@ -222,7 +472,7 @@ class CognitiveScheduler:
         self.state_manager.add_state_change_listener(self._on_state_change)
         
         logger.info("🧠 CognitiveScheduler 初始化完成")
-        logger.info(f"   空闲检测间隔: {self.config['idle_detection']['check_interval']}s")
+        logger.info("   调度模式: 事件驱动 + 定时器堆")
         logger.info(f"   最小空闲触发时间: {self.config['idle_detection']['min_idle_duration']}s")
         logger.info(f"   回溯引擎: {'已集成' if self.retrospection_engine else '未集成'}")
         logger.info(f"   知识探勘器: {'已集成' if self.knowledge_explorer else '未集成'}")
@@ -236,6 +486,9 @@ class CognitiveScheduler:
         
         self.is_running = True
         self.stop_event.clear()
+        self._wakeup_event.clear()
+        self.cognitive_task_queue.reopen()
+        self._task_finished = self.state_manager.is_current_task_finished()
         
         # 启动主调度线程
         self.scheduler_thread = threading.Thread(
@@ -247,19 +500,29 @@ class CognitiveScheduler:
         
         # 启动认知工作线程
         max_workers = self.config["cognitive_tasks"]["max_concurrent_tasks"]
-        for i in range(max_workers):
-            worker = threading.Thread(
-                target=self._cognitive_worker_loop,
-                name=f"CognitiveWorker-{i+1}",
-                daemon=True
-            )
-            worker.start()
-            self.cognitive_workers.append(worker)
+        for _ in range(max_workers):
+            self._spawn_cognitive_worker()
+        
+        # 知识探索的趋势分析交给进程池，结果通过 StateManager 事件合并到认知历史
+        if self._process_pool and self.knowledge_explorer:
+            self.knowledge_explorer.cpu_executor = self._process_pool
+            self.knowledge_explorer.cpu_result_publisher = self.state_manager.publish_cognitive_result
         
         logger.info("🚀 认知调度器已启动")
         logger.info(f"   主调度线程: {self.scheduler_thread.name}")
         logger.info(f"   认知工作线程数: {len(self.cognitive_workers)}")
     
+    def _spawn_cognitive_worker(self) -> threading.Thread:
+        """启动一个认知工作线程"""
+        worker = threading.Thread(
+            target=self._cognitive_worker_loop,
+            name=f"CognitiveWorker-{next(self._worker_sequence)}",
+            daemon=True
+        )
+        worker.start()
+        self.cognitive_workers.append(worker)
+        return worker
+    
     def stop(self):
         """停止认知调度器"""
         if not self.is_running:
@@ -270,6 +533,10 @@ class CognitiveScheduler:
         
         self.is_running = False
         self.stop_event.set()
+        self._wakeup_event.set()
+        
+        # 关闭队列，唤醒阻塞在队列上的工作线程
+        self.cognitive_task_queue.close()
         
         # 等待主调度线程结束
         if self.scheduler_thread and self.scheduler_thread.is_alive():
@@ -279,16 +546,31 @@ class CognitiveScheduler:
         for worker in self.cognitive_workers:
             if worker.is_alive():
                 worker.join(timeout=5.0)
+        self.cognitive_workers = []
+        
+        # 关闭知识探勘器的共享搜索线程池
+        if self.knowledge_explorer:
+            self.knowledge_explorer.shutdown()
+        
+        # 关闭进程池
+        if self._process_pool:
+            if self.knowledge_explorer:
+                self.knowledge_explorer.cpu_executor = None
+                self.knowledge_explorer.cpu_result_publisher = None
+            self._process_pool.shutdown()
         
         logger.info("✅ 认知调度器已停止")
         self._log_final_stats()
     
     def _scheduler_main_loop(self):
-        """主调度循环 - 监控空闲状态并触发认知任务"""
+        """主调度循环 - 由状态变化事件和定时器到期驱动，无事可做时休眠"""
         logger.info("🔄 认知调度主循环已启动")
         
         while self.is_running and not self.stop_event.is_set():
             try:
+                self._wakeup_event.clear()
+                self.stats["scheduler_wakeups"] += 1
+                
                 # 检测当前状态
                 self._detect_idle_state()
                 
@@ -304,31 +586,99 @@ class CognitiveScheduler:
                 # 清理过期任务
                 self._cleanup_expired_tasks()
                 
-                # 等待下一个检查周期
-                check_interval = self.config["idle_detection"]["check_interval"]
-                self.stop_event.wait(check_interval)
+                # 重新布置定时器，休眠到下一个事件或最近的定时器到期
+                self._rearm_timers()
+                self._wakeup_event.wait(self._next_wakeup_delay())
                 
             except Exception as e:
                 logger.error(f"❌ 认知调度循环出错: {e}")
-                time.sleep(5.0)  # 错误恢复延迟
+                self.stop_event.wait(5.0)  # 错误恢复延迟
         
         logger.info("🔚 认知调度主循环已结束")
     
-    def _detect_idle_state(self):
-        """检测系统空闲状态"""
-        current_time = time.time()
-        current_state = self.state_manager.get_current_state()
+    def _wake_scheduler(self):
+        """唤醒主调度循环"""
+        self._wakeup_event.set()
+    
+    def _arm_timer(self, name: str, due_time: float):
+        """
+        布置（或重置）一个命名定时器
         
-        # 获取状态信息
-        current_phase = current_state.get("current_phase", "initialization")
-        current_goal = current_state.get("current_goal", {})
-        goal_status = current_goal.get("status", "pending")
+        同名定时器只保留最新的到期时间，堆中的旧条目在出堆时惰性丢弃。
+        """
+        with self._timer_lock:
+            if self._timer_deadlines.get(name) == due_time:
+                return
+            self._timer_deadlines[name] = due_time
+            heapq.heappush(self._timer_heap, (due_time, name))
+    
+    def _disarm_timer(self, name: str):
+        """取消命名定时器"""
+        with self._timer_lock:
+            self._timer_deadlines.pop(name, None)
+    
+    def _rearm_timers(self):
+        """根据当前调度状态布置下一批到期时间"""
+        idle_config = self.config["idle_detection"]
+        task_config = self.config["cognitive_tasks"]
+        
+        # 任务已完成但尚未进入空闲：等待最小空闲时长到期
+        if self._task_finished and not self.is_idle and self.last_task_completion_time:
+            self._arm_timer("idle_threshold",
+                            self.last_task_completion_time + idle_config["min_idle_duration"])
+        else:
+            self._disarm_timer("idle_threshold")
         
-        # 判断是否处于空闲状态
-        is_task_completed = (
-            current_phase == "completion" or 
-            goal_status in ["achieved", "failed"]
-        )
+        # 空闲期间：周期性的创想与知识探索（同类任务执行中时由任务完成事件唤醒）
+        if self.is_idle and not self._has_active_task_type("ideation"):
+            self._arm_timer("ideation",
+                            self._ideation_reference_time() + task_config["ideation_interval"])
+        else:
+            self._disarm_timer("ideation")
+        
+        if self.is_idle and not self._has_active_task_type("knowledge_exploration"):
+            self._arm_timer("knowledge_exploration",
+                            self.last_exploration_time + task_config["exploration_interval"])
+        else:
+            self._disarm_timer("knowledge_exploration")
+        
+        # 活跃认知任务：最早的超时时间（已超时的任务则是挂起判定时间）
+        active_tasks = list(self.active_cognitive_tasks.values())
+        if active_tasks:
+            self._arm_timer("task_timeout",
+                            min(self._task_watchdog_due_time(task) for task in active_tasks))
+        else:
+            self._disarm_timer("task_timeout")
+    
+    def _next_wakeup_delay(self) -> Optional[float]:
+        """
+        计算距离下一个有效定时器到期的秒数
+        
+        Returns:
+            休眠秒数；没有定时器时返回兜底的最长休眠时间（None 表示无限期等待事件）
+        """
+        now = time.time()
+        max_sleep = self.config["idle_detection"].get("max_sleep_interval")
+        
+        with self._timer_lock:
+            while self._timer_heap:
+                due_time, name = self._timer_heap[0]
+                if self._timer_deadlines.get(name) != due_time:
+                    heapq.heappop(self._timer_heap)  # 已被重置或取消的旧条目
+                    continue
+                if due_time <= now:
+                    heapq.heappop(self._timer_heap)
+                    self._timer_deadlines.pop(name, None)
+                    return 0.0
+                delay = due_time - now
+                return min(delay, max_sleep) if max_sleep else delay
+        
+        return max_sleep
+    
+    def _detect_idle_state(self):
+        """检测系统空闲状态（基于状态事件缓存的任务完成标志，不构建完整状态）"""
+        current_time = time.time()
+        is_task_completed = self._task_finished
         
         # 计算空闲时间
         if is_task_completed and self.last_task_completion_time is None:
@@ -352,6 +702,9 @@ class CognitiveScheduler:
             self._enter_idle_state(idle_duration)
         elif not self.is_idle and was_idle:
             self._exit_idle_state()
+        elif not is_task_completed:
+            # 任务在空闲阈值到达前重新开始，重置完成时间
+            self.last_task_completion_time = None
     
     def _enter_idle_state(self, idle_duration: float):
         """进入空闲状态"""
@@ -387,7 +740,7 @@ class CognitiveScheduler:
         
         # 检查是否需要安排创想任务
         ideation_interval = self.config["cognitive_tasks"]["ideation_interval"]
-        if (current_time - self.last_activity_time) >= ideation_interval:
+        if (current_time - self._ideation_reference_time()) >= ideation_interval:
             if not self._has_active_task_type("ideation"):
                 self._schedule_ideation_task()
         
@@ -399,6 +752,7 @@ class CognitiveScheduler:
         
         # 检查是否需要知识综合
         if self._should_trigger_knowledge_synthesis():
+            self._last_synthesis_history_len = len(self.cognitive_history)
             self._schedule_knowledge_synthesis_task()
     
     def _handle_active_state(self):
@@ -441,6 +795,7 @@ class CognitiveScheduler:
         )
         
         self.cognitive_task_queue.put(task)
+        self.last_ideation_time = time.time()
         logger.info("💡 已安排主动创想任务")
     
     def _schedule_knowledge_synthesis_task(self):
@@ -608,33 +963,23 @@ class CognitiveScheduler:
         return strategies[:3]
     
     def _insert_high_priority_task(self, task: CognitiveTask):
-        """🚀 插入高优先级任务到队列前端"""
-        try:
-            # 由于Queue不支持优先级插入，我们使用一个临时列表来重组队列
-            temp_tasks = []
-            
-            # 先取出所有现有任务
-            while not self.cognitive_task_queue.empty():
-                try:
-                    existing_task = self.cognitive_task_queue.get_nowait()
-                    temp_tasks.append(existing_task)
-                except Empty:
-                    break
-            
-            # 首先插入高优先级任务
-            self.cognitive_task_queue.put(task)
-            
-            # 然后按优先级重新插入其他任务
-            temp_tasks.sort(key=lambda t: t.priority, reverse=True)
-            for existing_task in temp_tasks:
-                self.cognitive_task_queue.put(existing_task)
-            
-            logger.debug(f"🚀 高优先级任务已插入队列前端: {task.task_id}")
-            
-        except Exception as e:
-            logger.error(f"❌ 插入高优先级任务失败: {e}")
-            # 回退到普通插入
-            self.cognitive_task_queue.put(task)
+        """🚀 提交高优先级（用户指令）任务，必要时抢占正在执行的自主任务"""
+        self.cognitive_task_queue.put(task)
+        
+        dual_track_config = self.config["knowledge_exploration"]["dual_track_config"]
+        if not dual_track_config.get("user_task_preemption", True):
+            return
+        
+        # 所有工作线程都忙时，协作式取消一个自主任务为用户任务腾出线程
+        max_workers = self.config["cognitive_tasks"]["max_concurrent_tasks"]
+        if self.cognitive_task_queue.running_count() >= max_workers:
+            victim = self.cognitive_task_queue.preempt_autonomous(
+                reason=f"preempted_by:{task.task_id}"
+            )
+            if victim:
+                logger.info(f"⏸️ 用户任务抢占自主任务: {victim.task_id}")
+        
+        logger.debug(f"🚀 高优先级任务已入队: {task.task_id}")
     
     def _extract_query_keywords(self, user_query: str) -> List[str]:
         """提取用户查询中的关键词"""
@@ -718,12 +1063,22 @@ class CognitiveScheduler:
             try:
                 # 获取认知任务（阻塞等待，超时5秒）
                 task = self.cognitive_task_queue.get(timeout=5.0)
+                if task is None:
+                    # 队列已关闭
+                    break
                 
-                # 执行认知任务
-                self._execute_cognitive_task(task, worker_name)
+                try:
+                    # 执行认知任务
+                    self._execute_cognitive_task(task, worker_name)
+                finally:
+                    # 标记任务完成，释放通道并发名额
+                    self.cognitive_task_queue.task_done(task)
                 
-                # 标记任务完成
-                self.cognitive_task_queue.task_done()
+                # 挂起期间已被替换的线程，返回后直接退出
+                if worker_name in self._abandoned_workers:
+                    self._abandoned_workers.discard(worker_name)
+                    logger.info(f"🔚 {worker_name} 已被替换，退出")
+                    return
                 
             except Empty:
                 # 队列为空，继续等待
@@ -738,25 +1093,47 @@ class CognitiveScheduler:
         start_time = time.time()
         
         try:
+            if task.is_cancelled:
+                self.stats["cancelled_cognitive_tasks"] += 1
+                logger.info(f"⏹️ {worker_name} 跳过已取消的认知任务: {task.task_id} ({task.cancel_reason})")
+                return
+            
             logger.info(f"🧠 {worker_name} 开始执行认知任务: {task.task_type}")
             
-            # 记录活跃任务
+            # 创建截止时间（与取消事件绑定），记录活跃任务，并唤醒主循环布置超时定时器
+            task.started_at = start_time
+            task.worker_name = worker_name
+            task.deadline = Deadline(self._get_task_timeout(task), cancel_event=task.cancel_event)
             self.active_cognitive_tasks[task.task_id] = task
+            self._wake_scheduler()
             
-            # 根据任务类型执行不同逻辑
+            # 根据任务类型执行不同逻辑（截止时间传递到 HTTP 调用）
             result = {}
-            if task.task_type == "retrospection":
-                result = self._execute_retrospection_task(task)
-            elif task.task_type == "ideation":  
-                result = self._execute_ideation_task(task)
-            elif task.task_type == "knowledge_synthesis":
-                result = self._execute_knowledge_synthesis_task(task)
-            elif task.task_type == "knowledge_exploration":  # 🌐 新增
-                result = self._execute_knowledge_exploration_task(task)
-            else:
-                logger.warning(f"⚠️ 未知认知任务类型: {task.task_type}")
+            with deadline_scope(task.deadline):
+                if task.task_type == "retrospection":
+                    result = self._execute_retrospection_task(task)
+                elif task.task_type == "ideation":  
+                    result = self._execute_ideation_task(task)
+                elif task.task_type == "knowledge_synthesis":
+                    result = self._execute_knowledge_synthesis_task(task)
+                elif task.task_type == "knowledge_exploration":  # 🌐 新增
+                    result = self._execute_knowledge_exploration_task(task)
+                else:
+                    logger.warning(f"⚠️ 未知认知任务类型: {task.task_type}")
+                    return
+            
+            # 执行期间被抢占的任务，其部分结果不进入认知历史
+            if task.is_cancelled:
+                self.stats["cancelled_cognitive_tasks"] += 1
+                logger.info(f"⏹️ {worker_name} 认知任务已取消: {task.task_id} ({task.cancel_reason})")
                 return
             
+            # 超时任务保留已完成阶段的部分结果
+            timed_out = task.deadline.expired
+            if timed_out:
+                self.stats["timed_out_cognitive_tasks"] += 1
+                logger.warning(f"⏰ {worker_name} 认知任务超时，保留部分结果: {task.task_id}")
+            
             # 记录认知结果
             execution_time = time.time() - start_time
             cognitive_result = {
@@ -765,6 +1142,7 @@ class CognitiveScheduler:
                 "result": result,
                 "execution_time": execution_time,
                 "worker_name": worker_name,
+                "timed_out": timed_out,
                 "timestamp": time.time()
             }
             
@@ -776,8 +1154,9 @@ class CognitiveScheduler:
         except Exception as e:
             logger.error(f"❌ {worker_name} 认知任务执行失败: {e}")
         finally:
-            # 清理活跃任务记录
+            # 清理活跃任务记录，唤醒主循环重新评估（如知识综合触发）
             self.active_cognitive_tasks.pop(task.task_id, None)
+            self._wake_scheduler()
     
     def _execute_retrospection_task(self, task: CognitiveTask) -> Dict[str, Any]:
         """执行回溯任务 - 分析过往决策模式和经验教训"""
@@ -795,7 +1174,8 @@ class CognitiveScheduler:
                 # 执行完整的三阶段回溯流程
                 retrospection_result = self.retrospection_engine.perform_retrospection(
                     state_manager=self.state_manager,
-                    strategy=strategy
+                    strategy=strategy,
+                    deadline=task.deadline
                 )
                 
                 # 转换为认知调度器的分析格式
@@ -903,11 +1283,17 @@ class CognitiveScheduler:
                 # 创建探索目标
                 targets = self.knowledge_explorer.create_exploration_targets_from_context(task.context)
                 
+                # 取消检查点：探索前被抢占则直接放弃
+                if task.is_cancelled:
+                    return {"cancelled": True, "cancel_reason": task.cancel_reason}
+                
                 # 选择探索策略
                 strategy = self._map_to_exploration_strategy(exploration_strategies)
                 
                 # 执行专业探索
-                explorer_result = self.knowledge_explorer.explore_knowledge(targets, strategy)
+                explorer_result = self.knowledge_explorer.explore_knowledge(
+                    targets, strategy, deadline=task.deadline
+                )
                 
                 # 转换为认知调度器格式
                 exploration_results = self._convert_explorer_result_to_scheduler_format(
@@ -1105,13 +1491,25 @@ class CognitiveScheduler:
     # ==================== 辅助方法 ====================
     
     def _on_state_change(self, event_type: str, event_data: Dict[str, Any], state_manager):
-        """状态变化监听器回调"""
+        """状态变化监听器回调 - 刷新任务完成标志并立即唤醒主循环"""
         if event_type == "goal_progress":
             self.last_activity_time = time.time()
         elif event_type == "turn_completed":
             success = event_data.get("success", False)
             if success:
                 self.last_activity_time = time.time()
+        elif event_type == "cognitive_result":
+            # 进程池中完成的认知计算结果（如趋势分析）
+            self.cognitive_history.append({**event_data, "timestamp": time.time()})
+            self.stats["merged_offloaded_results"] += 1
+            logger.info(f"✅ 合并进程池认知结果 {event_data.get('task_type')} "
+                        f"(耗时: {event_data.get('execution_time', 0.0):.1f}s)")
+        
+        if event_type in ("goal_added", "goal_progress", "turn_started",
+                          "turn_completed", "phase_changed"):
+            self._task_finished = state_manager.is_current_task_finished()
+        
+        self._wake_scheduler()
     
     def _merge_config(self, base_config: Dict, user_config: Dict):
         """递归合并配置"""
@@ -1121,14 +1519,20 @@ class CognitiveScheduler:
             else:
                 base_config[key] = value
     
+    def _ideation_reference_time(self) -> float:
+        """创想间隔的计时起点：最近一次活动或最近一次安排创想任务"""
+        return max(self.last_activity_time, self.last_ideation_time)
+    
     def _has_active_task_type(self, task_type: str) -> bool:
         """检查是否有指定类型的活跃认知任务"""
-        return any(task.task_type == task_type for task in self.active_cognitive_tasks.values())
+        return any(task.task_type == task_type for task in list(self.active_cognitive_tasks.values()))
     
     def _should_trigger_knowledge_synthesis(self) -> bool:
         """判断是否应该触发知识综合"""
-        # 简单实现：当认知历史达到一定数量时触发
-        return len(self.cognitive_history) > 0 and len(self.cognitive_history) % 5 == 0
+        # 简单实现：当认知历史达到一定数量时触发（同一历史长度只触发一次）
+        history_len = len(self.cognitive_history)
+        return (history_len > 0 and history_len % 5 == 0 and
+                history_len != self._last_synthesis_history_len)
     
     def _extract_session_insights(self) -> Dict[str, Any]:
         """从当前会话中提取见解"""
@@ -1577,19 +1981,56 @@ class CognitiveScheduler:
         # 简化实现，后续可以添加任务优先级管理
         pass
     
-    def _cleanup_expired_tasks(self):
-        """清理过期任务"""
-        current_time = time.time()
+    def _get_task_timeout(self, task: CognitiveTask) -> float:
+        """认知任务的执行超时（知识探索使用探索配置中更短的超时）"""
         timeout = self.config["cognitive_tasks"]["task_timeout"]
+        if task.task_type == "knowledge_exploration":
+            exploration_config = self.config["knowledge_exploration"]
+            key = "user_directed_timeout" if task.is_user_directed else "exploration_timeout"
+            timeout = min(timeout, exploration_config.get(key, timeout))
+        return timeout
+    
+    def _task_watchdog_due_time(self, task: CognitiveTask) -> float:
+        """看门狗下一次检查该任务的时间：先是截止时间，超时后是挂起判定时间"""
+        started_at = task.started_at or task.created_at
+        due_time = started_at + self._get_task_timeout(task)
+        if task.deadline is not None and task.deadline.expired:
+            due_time += self.config["cognitive_tasks"]["hung_worker_grace"]
+        return due_time
+    
+    def _cleanup_expired_tasks(self):
+        """
+        清理过期任务
         
-        expired_tasks = []
-        for task_id, task in self.active_cognitive_tasks.items():
-            if (current_time - task.created_at) > timeout:
-                expired_tasks.append(task_id)
+        超时的任务由截止时间在下一个检查点中止；超过宽限期仍未返回的，
+        视为工作线程挂起：取消任务、释放并发名额，并启动新线程替换它。
+        """
+        current_time = time.time()
+        grace = self.config["cognitive_tasks"]["hung_worker_grace"]
         
-        for task_id in expired_tasks:
-            self.active_cognitive_tasks.pop(task_id, None)
-            logger.warning(f"⏰ 认知任务超时被清理: {task_id}")
+        for task in list(self.active_cognitive_tasks.values()):
+            started_at = task.started_at or task.created_at
+            if current_time - started_at <= self._get_task_timeout(task) + grace:
+                continue
+            self._replace_hung_worker(task)
+    
+    def _replace_hung_worker(self, task: CognitiveTask):
+        """放弃执行挂起任务的工作线程，并启动替换线程"""
+        task.cancel("hung_worker")
+        self.active_cognitive_tasks.pop(task.task_id, None)
+        self.cognitive_task_queue.task_done(task)
+        
+        worker_name = task.worker_name
+        logger.warning(f"⏰ 认知任务超时未退出: {task.task_id}，替换工作线程 {worker_name}")
+        
+        if worker_name:
+            self._abandoned_workers.add(worker_name)
+            self.cognitive_workers = [worker for worker in self.cognitive_workers
+                                      if worker.name != worker_name]
+        self.stats["replaced_workers"] += 1
+        
+        if self.is_running and not self.stop_event.is_set():
+            self._spawn_cognitive_worker()
     
     def _log_final_stats(self):
         """记录最终统计信息"""
@@ -1618,5 +2059,6 @@ class CognitiveScheduler:
             "is_idle": self.is_idle,
             "active_cognitive_tasks": len(self.active_cognitive_tasks),
             "queued_cognitive_tasks": self.cognitive_task_queue.qsize(),
+            "task_lanes": self.cognitive_task_queue.get_lane_status(),
             "stats": self.stats.copy()
         }
@@ -11,8 +11,10 @@ Neogenesis智能规划器 - 基于Meta MAB的高级规划系统
 """
 
 import time
+import asyncio
 import logging
-from typing import Dict, List, Optional, Any
+import contextvars
+from typing import Dict, List, Optional, Any, Tuple, AsyncIterator, Callable
 
 # 导入框架核心
 try:
@@ -35,6 +37,9 @@ except ImportError:
     SEMANTIC_ANALYZER_AVAILABLE = False
 from ..cognitive_engine.data_structures import DecisionResult, ReasoningPath
 from ..shared.state_manager import StateManager
+from ..shared.deadline import Deadline, deadline_scope, check_current_deadline
+from ..shared.budget import Budget, DegradationLevel, budget_scope, get_current_budget
+from ..providers.llm_base import LLMMessage
 
 # 导入工具系统
 from ..tools.tool_abstraction import (
@@ -46,6 +51,20 @@ from ..tools.tool_abstraction import (
 
 logger = logging.getLogger(__name__)
 
+# 当前决策的阶段事件监听者（由 astream_decision 在工作线程的上下文中设置）
+_stage_listener: contextvars.ContextVar = contextvars.ContextVar("neogenesis_stage_listener", default=None)
+
+
+def _emit_stage(stage: str, data: Dict[str, Any]):
+    """阶段边界：通知当前监听者，同时作为协作式取消的检查点"""
+    listener: Optional[Callable[[str, Dict[str, Any]], None]] = _stage_listener.get()
+    if listener is not None:
+        try:
+            listener(stage, data)
+        except Exception as e:
+            logger.debug(f"❌ 阶段事件回调失败: {e}")
+    check_current_deadline(stage)
+
 
 class NeogenesisPlanner(BasePlanner):
     """
@@ -279,6 +298,12 @@ class NeogenesisPlanner(BasePlanner):
         阶段四：路径验证与选择
         阶段五：MAB学习与优化
         """
+        # 💰 调用方未设置请求预算时，按配置为本次决策创建一个
+        budget_config = self.config.get('request_budget')
+        if budget_config and get_current_budget() is None:
+            with budget_scope(Budget(**budget_config)):
+                return self._make_decision_logic(user_query, deepseek_confidence, execution_context)
+        
         start_time = time.time()
         self.total_rounds += 1
         
@@ -397,6 +422,7 @@ class NeogenesisPlanner(BasePlanner):
         
         # 生成简化的思维种子
         thinking_seed = self.prior_reasoner.get_thinking_seed(user_query, execution_context)
+        _emit_stage('analysis', self._describe_analysis(route_classification, thinking_seed, fast_path=True))
         
         # 创建单一的快速响应路径
         from ..cognitive_engine.data_structures import ReasoningPath
@@ -409,6 +435,8 @@ class NeogenesisPlanner(BasePlanner):
                            f"领域为{route_classification.domain.value}，建议直接回答。",
             confidence_score=route_classification.confidence
         )
+        _emit_stage('paths', {'paths': [self._describe_path(fast_path)]})
+        _emit_stage('selection', {'path': self._describe_path(fast_path), 'selection_algorithm': 'llm_route_fast_path'})
         
         execution_time = time.time() - start_time
         
@@ -436,6 +464,9 @@ class NeogenesisPlanner(BasePlanner):
             },
             'route_classification': route_classification
         }
+        budget = get_current_budget()
+        if budget is not None:
+            decision_result['budget'] = budget.snapshot()
         
         logger.info(f"⚡ 快速路径决策完成，耗时: {execution_time:.3f}s")
         return decision_result
@@ -491,30 +522,9 @@ class NeogenesisPlanner(BasePlanner):
             self._update_component_performance('prior_reasoner', reasoner_time)
             
             logger.info(f"🧠 阶段一完成: LLM增强思维种子生成 (长度: {len(thinking_seed)} 字符)")
+            _emit_stage('analysis', self._describe_analysis(route_classification, thinking_seed, fast_path=False))
             
-            # 🔍 阶段二：LLM增强思维种子验证
-            seed_verification_start = time.time()
-            seed_verification_result = self._verify_idea_feasibility(
-                idea_text=thinking_seed,
-                context={
-                    'stage': 'thinking_seed',
-                    'domain': route_classification.domain.value,  # 使用LLM路由分析的领域
-                    'complexity': route_classification.complexity.value,  # 使用LLM路由分析的复杂度
-                    'route_strategy': route_classification.route_strategy.value,  # 使用LLM路由策略
-                    'query': user_query,
-                    'llm_routing_enabled': True,  # 标记启用了LLM路由
-                    **(execution_context if execution_context else {})
-                }
-            )
-            seed_verification_time = time.time() - seed_verification_start
-            
-            # 分析种子验证结果
-            seed_feasibility = seed_verification_result.get('feasibility_analysis', {}).get('feasibility_score', 0.5)
-            seed_reward = seed_verification_result.get('reward_score', 0.0)
-            
-            logger.info(f"🔍 阶段二完成: LLM增强思维种子验证 (可行性: {seed_feasibility:.2f}, 奖励: {seed_reward:+.3f})")
-            
-            # 🛤️ 阶段三：LLM优化路径生成
+            # 🛤️ 阶段三：LLM优化路径生成（先于种子验证执行，以便种子与路径一起批量验证）
             generator_start = time.time()
             
             # 根据LLM路由分析优化路径生成参数
@@ -526,41 +536,73 @@ class NeogenesisPlanner(BasePlanner):
                 max_paths=max_paths
                 # 注释：路由提示信息已通过enhanced_context传递给思维种子生成
             )
+            
+            # 💰 请求预算降级：减少验证路径 → 不做LLM验证（只升不降，顺序确定）
+            budget = get_current_budget()
+            if budget is not None:
+                all_reasoning_paths = all_reasoning_paths[:budget.limit_paths(len(all_reasoning_paths))]
+            skip_verification = budget is not None and budget.degradation_level() >= DegradationLevel.NO_LLM_VERIFICATION
             generator_time = time.time() - generator_start
             self._update_component_performance('path_generator', generator_time)
             
             logger.info(f"🛤️ 阶段三完成: LLM优化生成 {len(all_reasoning_paths)} 条思维路径 (策略: {route_classification.route_strategy.value})")
+            _emit_stage('paths', {'paths': [self._describe_path(path) for path in all_reasoning_paths]})
+            
+            # 🔍 阶段二：思维种子与路径批量验证（共享关键概念的搜索只执行一次）
+            seed_verification_start = time.time()
+            verification_requests = [(thinking_seed, {
+                'stage': 'thinking_seed',
+                'domain': route_classification.domain.value,  # 使用LLM路由分析的领域
+                'complexity': route_classification.complexity.value,  # 使用LLM路由分析的复杂度
+                'route_strategy': route_classification.route_strategy.value,  # 使用LLM路由策略
+                'query': user_query,
+                'llm_routing_enabled': True,  # 标记启用了LLM路由
+                **(execution_context if execution_context else {})
+            })]
+            verification_requests.extend(
+                (f"{path.path_type}: {path.description}", {
+                    'stage': 'reasoning_path',
+                    'path_id': path.path_id,
+                    'path_type': path.path_type,
+                    'query': user_query,
+                    **(execution_context if execution_context else {})
+                })
+                for path in all_reasoning_paths
+            )
+            if skip_verification:
+                logger.info("💰 请求预算不足，跳过种子与路径验证")
+                verification_results = [self._create_skipped_verification_result() for _ in verification_requests]
+            else:
+                verification_results = self._verify_ideas_batch(verification_requests)
+            seed_verification_result = verification_results[0]
+            path_verification_results = verification_results[1:]
+            seed_verification_time = time.time() - seed_verification_start
+            
+            # 分析种子验证结果
+            seed_feasibility = seed_verification_result.get('feasibility_analysis', {}).get('feasibility_score', 0.5)
+            seed_reward = seed_verification_result.get('reward_score', 0.0)
+            
+            logger.info(f"🔍 阶段二完成: 批量验证种子与 {len(all_reasoning_paths)} 条路径 (种子可行性: {seed_feasibility:.2f}, 奖励: {seed_reward:+.3f})")
             
             # 🚀 阶段四：路径验证学习
             path_verification_start = time.time()
             verified_paths = []
             all_infeasible = True
             
-            logger.info(f"🔬 阶段四开始: 验证思维路径")
+            logger.info(f"🔬 阶段四开始: 根据验证结果学习")
             
-            # 简化版路径验证（避免复杂的并行处理）
-            for i, path in enumerate(all_reasoning_paths, 1):
-                logger.debug(f"🔬 验证路径 {i}/{len(all_reasoning_paths)}: {path.path_type}")
-                
-                # 验证单个路径
-                path_verification_result = self._verify_idea_feasibility(
-                    idea_text=f"{path.path_type}: {path.description}",
-                    context={
-                        'stage': 'reasoning_path',
-                        'path_id': path.path_id,
-                        'path_type': path.path_type,
-                        'query': user_query,
-                        **(execution_context if execution_context else {})
-                    }
-                )
+            for i, (path, path_verification_result) in enumerate(zip(all_reasoning_paths, path_verification_results), 1):
+                logger.debug(f"🔬 处理路径验证结果 {i}/{len(all_reasoning_paths)}: {path.path_type}")
                 
                 # 提取验证结果
                 path_feasibility = path_verification_result.get('feasibility_analysis', {}).get('feasibility_score', 0.5)
                 path_reward = path_verification_result.get('reward_score', 0.0)
                 verification_success = not path_verification_result.get('fallback', False)
                 
-                # 💡 即时学习：立即将验证结果反馈给MAB系统
-                if verification_success and path_feasibility > 0.3:
+                # 💡 即时学习：立即将验证结果反馈给MAB系统（未经验证的路径不产生学习信号）
+                if skip_verification:
+                    all_infeasible = False
+                elif verification_success and path_feasibility > 0.3:
                     # 可行的路径 - 正面学习信号
                     self.mab_converger.update_path_performance(
                         path_id=path.strategy_id,
@@ -606,10 +648,15 @@ class NeogenesisPlanner(BasePlanner):
                 # ✅ 至少有可行路径 - 使用增强的MAB选择
                 logger.info("✅ 发现可行路径，使用验证增强的MAB决策")
                 chosen_path = self.mab_converger.select_best_path(all_reasoning_paths)
-                selection_algorithm = 'verification_enhanced_mab'
+                selection_algorithm = 'mab_without_verification' if skip_verification else 'verification_enhanced_mab'
             
             final_decision_time = time.time() - final_decision_start
             total_mab_time = path_verification_time + final_decision_time
+            _emit_stage('selection', {
+                'path': self._describe_path(chosen_path),
+                'selection_algorithm': selection_algorithm,
+                'feasible_path_count': feasible_count
+            })
             self._update_component_performance('mab_converger', total_mab_time)
             
             # 计算总体决策时间
@@ -637,8 +684,9 @@ class NeogenesisPlanner(BasePlanner):
                 'feasible_path_count': feasible_count,
                 'selection_algorithm': selection_algorithm,
                 'architecture_version': '5-stage-verification',
-                'verification_enabled': True,
-                'instant_learning_enabled': True,
+                'verification_enabled': not skip_verification,
+                'instant_learning_enabled': not skip_verification,
+                'budget': budget.snapshot() if budget is not None else None,
                 
                 # 验证统计
                 'verification_stats': {
@@ -697,13 +745,20 @@ class NeogenesisPlanner(BasePlanner):
         Returns:
             StrategyDecision: 战略决策结果
         """
-        from ..shared.data_structures import StrategyDecision
-        
         # 调用原有的决策逻辑
         decision_result = self._make_decision_logic(user_query, confidence, execution_context)
         
-        # 转换为StrategyDecision格式
-        strategy_decision = StrategyDecision(
+        strategy_decision = self._to_strategy_decision(decision_result, user_query, confidence, execution_context)
+        
+        logger.info(f"🎯 战略决策完成: {strategy_decision.chosen_path.path_type}")
+        return strategy_decision
+    
+    def _to_strategy_decision(self, decision_result: Dict[str, Any], user_query: str, confidence: float,
+                              execution_context: Optional[Dict]) -> 'StrategyDecision':
+        """决策结果字典 -> StrategyDecision"""
+        from ..shared.data_structures import StrategyDecision
+        
+        return StrategyDecision(
             chosen_path=decision_result.get('chosen_path'),
             thinking_seed=decision_result.get('thinking_seed', ''),
             reasoning=decision_result.get('reasoning', ''),
@@ -718,9 +773,105 @@ class NeogenesisPlanner(BasePlanner):
             execution_context=execution_context,
             confidence_score=confidence
         )
+    
+    async def astream_decision(self, user_query: str, execution_context: Optional[Dict] = None,
+                               llm_client: Any = None, confidence: float = 0.5) -> AsyncIterator[Dict[str, Any]]:
+        """
+        🌊 流式战略决策 - 阶段完成即产出事件，随后逐段产出回答
         
-        logger.info(f"🎯 战略决策完成: {strategy_decision.chosen_path.path_type}")
-        return strategy_decision
+        决策各阶段（同步组件）在工作线程中执行，阶段边界的事件经事件循环转发：
+        analysis（路由分析与思维种子）→ paths（候选路径）→ selection（选定路径）→
+        token（回答片段，逐段）→ done；决策失败时产出 error 并结束。
+        
+        调用方关闭生成器或取消任务时：取消工作线程中的决策（下一个阶段边界处停止），
+        并关闭 LLM 流，上游随即停止生成。
+        
+        Args:
+            user_query: 用户查询
+            execution_context: 执行上下文
+            llm_client: 生成回答的客户端（BaseLLMClient 或 LLMManager），默认使用先验推理器的 LLM 管理器；
+                        都不可用时以回退计划的回答作为单个 token
+            confidence: 置信度
+            
+        Yields:
+            Dict: {'event': 事件名, 'data': 事件数据}
+        """
+        loop = asyncio.get_running_loop()
+        events: asyncio.Queue = asyncio.Queue()
+        deadline = Deadline()
+        start_time = time.time()
+        
+        def listener(stage: str, data: Dict[str, Any]):
+            loop.call_soon_threadsafe(events.put_nowait, {'event': stage, 'data': data})
+        
+        def decide() -> Dict[str, Any]:
+            _stage_listener.set(listener)
+            try:
+                with deadline_scope(deadline):
+                    return self._make_decision_logic(user_query, confidence, execution_context)
+            finally:
+                loop.call_soon_threadsafe(events.put_nowait, None)
+        
+        decision_future = loop.run_in_executor(None, contextvars.copy_context().run, decide)
+        answer_stream = None
+        try:
+            while True:
+                event = await events.get()
+                if event is None:
+                    break
+                yield event
+            
+            decision_result = await decision_future
+            if decision_result.get('error') or decision_result.get('chosen_path') is None:
+                yield {'event': 'error', 'data': {'message': decision_result.get('reasoning', '决策失败')}}
+                return
+            
+            llm_client = llm_client or getattr(self.prior_reasoner, 'llm_manager', None)
+            if llm_client is not None and hasattr(llm_client, 'astream_chat_completion'):
+                answer_stream = llm_client.astream_chat_completion(self._answer_messages(user_query, decision_result))
+                async for text in answer_stream:
+                    yield {'event': 'token', 'data': {'text': text}}
+            else:
+                strategy_decision = self._to_strategy_decision(decision_result, user_query, confidence, execution_context)
+                yield {'event': 'token', 'data': {'text': self._create_fallback_plan(user_query, strategy_decision).final_answer}}
+            
+            execution_time = time.time() - start_time
+            self._update_planner_stats(True, execution_time)
+            yield {'event': 'done', 'data': {
+                'selection_algorithm': decision_result.get('selection_algorithm'),
+                'round_number': decision_result.get('round_number'),
+                'total_time': execution_time
+            }}
+        finally:
+            deadline.cancel()
+            if answer_stream is not None and hasattr(answer_stream, 'aclose'):
+                await answer_stream.aclose()
+    
+    def _answer_messages(self, user_query: str, decision_result: Dict[str, Any]) -> List[LLMMessage]:
+        """按选定的思维路径构建回答提示"""
+        chosen_path = decision_result['chosen_path']
+        system_prompt = (f"请按照选定的思维路径回答用户的问题。\n"
+                         f"思维路径: {chosen_path.path_type} - {chosen_path.description}\n"
+                         f"{chosen_path.prompt_template}\n"
+                         f"思维种子: {decision_result.get('thinking_seed', '')}")
+        return [LLMMessage(role="system", content=system_prompt), LLMMessage(role="user", content=user_query)]
+    
+    @staticmethod
+    def _describe_analysis(route_classification, thinking_seed: str, fast_path: bool) -> Dict[str, Any]:
+        """analysis 事件数据"""
+        return {
+            'complexity': route_classification.complexity.value,
+            'domain': route_classification.domain.value,
+            'strategy': route_classification.route_strategy.value,
+            'confidence': route_classification.confidence,
+            'fast_path': fast_path,
+            'thinking_seed': thinking_seed
+        }
+    
+    @staticmethod
+    def _describe_path(path) -> Dict[str, Any]:
+        """路径的可序列化摘要（paths / selection 事件数据）"""
+        return {'path_id': path.path_id, 'path_type': path.path_type, 'description': path.description}
     
     
     def _get_optimal_path_count_for_route(self, route_classification) -> int:
@@ -884,6 +1035,42 @@ class NeogenesisPlanner(BasePlanner):
                 'fallback': True
             }
     
+    def _verify_ideas_batch(self, verification_requests: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        批量验证想法可行性
+        
+        优先调用idea_verification_batch工具（一轮共享搜索）；
+        工具不可用或调用失败时逐个回退到 _verify_idea_feasibility。
+        
+        Args:
+            verification_requests: [(想法文本, 上下文)] 列表
+            
+        Returns:
+            与输入顺序一致的验证结果列表
+        """
+        try:
+            if self.tool_registry and self.tool_registry.has_tool("idea_verification_batch"):
+                result = execute_tool(
+                    "idea_verification_batch",
+                    ideas=[idea_text for idea_text, _ in verification_requests],
+                    domain=verification_requests[0][1].get('domain'),
+                    contexts=[context for _, context in verification_requests]
+                )
+                if result.success:
+                    return [
+                        item if item.get('success', True) else {
+                            'feasibility_analysis': {'feasibility_score': 0.5},
+                            'reward_score': 0.0,
+                            'fallback': True
+                        }
+                        for item in result.data['results']
+                    ]
+        except Exception as e:
+            logger.warning(f"⚠️ 批量想法验证失败，逐个验证: {e}")
+        
+        return [self._verify_idea_feasibility(idea_text, context)
+                for idea_text, context in verification_requests]
+    
     def _execute_intelligent_detour_thinking(self, user_query: str, thinking_seed: str, 
                                            all_paths: List[ReasoningPath]) -> ReasoningPath:
         """
@@ -931,6 +1118,15 @@ class NeogenesisPlanner(BasePlanner):
                 current_avg * (total_decisions - 1) + execution_time
             ) / total_decisions
     
+    def _create_skipped_verification_result(self) -> Dict[str, Any]:
+        """请求预算不足时跳过验证的中性结果"""
+        return {
+            'feasibility_analysis': {'feasibility_score': 0.5},
+            'reward_score': 0.0,
+            'fallback': True,
+            'skipped_reason': 'budget'
+        }
+    
     def _create_error_decision_result(self, user_query: str, error_msg: str, execution_time: float) -> Dict[str, Any]:
         """创建错误决策结果"""
         return {
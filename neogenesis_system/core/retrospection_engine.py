@@ -22,6 +22,7 @@ from enum import Enum
 import json
 
 from ..shared.state_manager import StateManager, ConversationTurn, TaskPhase, GoalStatus
+from ..shared.deadline import Deadline, DeadlineExceeded, deadline_scope, check_current_deadline
 from ..cognitive_engine.data_structures import ReasoningPath, TaskComplexity
 from ..cognitive_engine.path_generator import PathGenerator, LLMDrivenDimensionCreator
 from ..cognitive_engine.mab_converger import MABConverger
@@ -187,7 +188,8 @@ class TaskRetrospectionEngine:
     def perform_retrospection(self, 
                             state_manager: StateManager,
                             strategy: Optional[RetrospectionStrategy] = None,
-                            target_task_id: Optional[str] = None) -> RetrospectionResult:
+                            target_task_id: Optional[str] = None,
+                            deadline: Optional[Deadline] = None) -> RetrospectionResult:
         """
         执行完整的任务回溯流程
         
@@ -201,6 +203,7 @@ class TaskRetrospectionEngine:
             state_manager: 状态管理器实例
             strategy: 回溯策略（可选，默认使用配置策略）
             target_task_id: 目标任务ID（可选，指定特定任务）
+            deadline: 截止时间（可选），到期或被取消时在阶段之间中止
             
         Returns:
             完整的回溯结果，包括工具复盘分析
@@ -211,108 +214,117 @@ class TaskRetrospectionEngine:
         logger.info(f"🔍 开始任务回溯流程: {retrospection_id}")
         
         try:
-            # ==================== 阶段一：选择 (Select) ====================
-            logger.info("📋 阶段一：智能任务选择")
-            
-            if target_task_id:
-                # 指定任务回溯
-                selected_task = self._get_task_by_id(state_manager, target_task_id)
-                if not selected_task:
-                    raise ValueError(f"指定的任务ID不存在: {target_task_id}")
-            else:
-                # 智能任务选择
-                used_strategy = strategy or self.config["task_selection"]["default_strategy"]
-                selected_task = self.select_task_for_review(state_manager, used_strategy)
+            with deadline_scope(deadline):
+                # ==================== 阶段一：选择 (Select) ====================
+                logger.info("📋 阶段一：智能任务选择")
                 
-                if not selected_task:
-                    logger.warning("🤷 未找到合适的回溯任务")
-                    return self._create_empty_result(retrospection_id, start_time)
-            
-            logger.info(f"✅ 选中回溯任务: {selected_task.task_id}")
-            logger.info(f"   选择原因: {selected_task.selection_reason}")
-            logger.info(f"   原始问题: {selected_task.original_turn.user_input[:50]}...")
-            
-            # ==================== 阶段二：创想 (Ideate) ====================
-            logger.info("💡 阶段二：双重创想激活")
-            
-            llm_dimensions = []
-            aha_paths = []
-            
-            # 2a) 主动激活LLMDrivenDimensionCreator
-            if (self.config["ideation"]["enable_llm_dimensions"] and 
-                self.llm_dimension_creator):
+                if target_task_id:
+                    # 指定任务回溯
+                    selected_task = self._get_task_by_id(state_manager, target_task_id)
+                    if not selected_task:
+                        raise ValueError(f"指定的任务ID不存在: {target_task_id}")
+                else:
+                    # 智能任务选择
+                    used_strategy = strategy or self.config["task_selection"]["default_strategy"]
+                    selected_task = self.select_task_for_review(state_manager, used_strategy)
+                    
+                    if not selected_task:
+                        logger.warning("🤷 未找到合适的回溯任务")
+                        return self._create_empty_result(retrospection_id, start_time)
                 
-                logger.info("🧠 激活LLM维度创想...")
-                llm_dimensions = self._activate_llm_dimension_creation(selected_task)
-                logger.info(f"   生成LLM维度: {len(llm_dimensions)} 个")
-            
-            # 2b) 主动激活Aha-Moment机制
-            if (self.config["ideation"]["enable_aha_moment"] and 
-                self.path_generator):
+                logger.info(f"✅ 选中回溯任务: {selected_task.task_id}")
+                logger.info(f"   选择原因: {selected_task.selection_reason}")
+                logger.info(f"   原始问题: {selected_task.original_turn.user_input[:50]}...")
                 
-                logger.info("💥 激活Aha-Moment创意突破...")
-                aha_paths = self._activate_aha_moment_creation(selected_task)
-                logger.info(f"   生成创意路径: {len(aha_paths)} 条")
-            
-            # ==================== 阶段三：沉淀 (Assimilate) ====================
-            logger.info("🧩 阶段三：知识沉淀融合")
-            
-            assimilated_strategies = []
-            mab_updates = []
-            
-            if self.config["assimilation"]["enable_mab_injection"] and self.mab_converger:
-                assimilated_strategies, mab_updates = self._assimilate_new_knowledge(
-                    llm_dimensions, aha_paths
+                # ==================== 阶段二：创想 (Ideate) ====================
+                check_current_deadline("ideate")
+                logger.info("💡 阶段二：双重创想激活")
+                
+                llm_dimensions = []
+                aha_paths = []
+                
+                # 2a) 主动激活LLMDrivenDimensionCreator
+                if (self.config["ideation"]["enable_llm_dimensions"] and 
+                    self.llm_dimension_creator):
+                    
+                    logger.info("🧠 激活LLM维度创想...")
+                    llm_dimensions = self._activate_llm_dimension_creation(selected_task)
+                    logger.info(f"   生成LLM维度: {len(llm_dimensions)} 个")
+                
+                # 2b) 主动激活Aha-Moment机制
+                check_current_deadline("aha_moment")
+                if (self.config["ideation"]["enable_aha_moment"] and 
+                    self.path_generator):
+                    
+                    logger.info("💥 激活Aha-Moment创意突破...")
+                    aha_paths = self._activate_aha_moment_creation(selected_task)
+                    logger.info(f"   生成创意路径: {len(aha_paths)} 条")
+                
+                # ==================== 阶段三：沉淀 (Assimilate) ====================
+                check_current_deadline("assimilate")
+                logger.info("🧩 阶段三：知识沉淀融合")
+                
+                assimilated_strategies = []
+                mab_updates = []
+                
+                if self.config["assimilation"]["enable_mab_injection"] and self.mab_converger:
+                    assimilated_strategies, mab_updates = self._assimilate_new_knowledge(
+                        llm_dimensions, aha_paths
+                    )
+                    logger.info(f"   沉淀策略: {len(assimilated_strategies)} 个")
+                
+                # ==================== 深度分析与洞察提取 ====================
+                check_current_deadline("analyze")
+                logger.info("🔬 执行深度分析...")
+                
+                # 执行工具复盘分析
+                tool_retrospection = self._perform_tool_retrospection(selected_task)
+                
+                insights = self._extract_insights(selected_task)
+                success_patterns = self._identify_success_patterns(selected_task)
+                failure_causes = self._analyze_failure_causes(selected_task)
+                improvements = self._generate_improvement_suggestions(
+                    selected_task, llm_dimensions, aha_paths
                 )
-                logger.info(f"   沉淀策略: {len(assimilated_strategies)} 个")
-            
-            # ==================== 深度分析与洞察提取 ====================
-            logger.info("🔬 执行深度分析...")
-            
-            # 执行工具复盘分析
-            tool_retrospection = self._perform_tool_retrospection(selected_task)
-            
-            insights = self._extract_insights(selected_task)
-            success_patterns = self._identify_success_patterns(selected_task)
-            failure_causes = self._analyze_failure_causes(selected_task)
-            improvements = self._generate_improvement_suggestions(
-                selected_task, llm_dimensions, aha_paths
-            )
+                
+                # 构建回溯结果
+                execution_time = time.time() - start_time
+                result = RetrospectionResult(
+                    retrospection_id=retrospection_id,
+                    task=selected_task,
+                    llm_dimensions=llm_dimensions,
+                    aha_moment_paths=aha_paths,
+                    insights=insights,
+                    success_patterns=success_patterns,
+                    failure_causes=failure_causes,
+                    improvement_suggestions=improvements,
+                    tool_retrospection=tool_retrospection,
+                    assimilated_strategies=assimilated_strategies,
+                    mab_updates=mab_updates,
+                    execution_time=execution_time
+                )
+                
+                # 更新统计
+                self._update_stats(result)
+                
+                # 记录回溯历史
+                self.retrospection_history.append(result)
+                
+                logger.info(f"✅ 回溯流程完成 (耗时: {execution_time:.2f}s)")
+                logger.info(f"   生成洞察: {len(insights)} 项")
+                logger.info(f"   识别模式: {len(success_patterns)} 个成功模式, {len(failure_causes)} 个失败原因")
+                logger.info(f"   改进建议: {len(improvements)} 条")
+                logger.info(f"   工具复盘: {tool_retrospection.get('analysis_status', 'unknown')} "
+                           f"({tool_retrospection.get('tools_analyzed', 0)} 个工具)")
+                if tool_retrospection.get('tool_optimization_suggestions'):
+                    logger.info(f"   工具优化: {len(tool_retrospection['tool_optimization_suggestions'])} 条建议")
+                
+                return result
             
-            # 构建回溯结果
+        except DeadlineExceeded as e:
             execution_time = time.time() - start_time
-            result = RetrospectionResult(
-                retrospection_id=retrospection_id,
-                task=selected_task,
-                llm_dimensions=llm_dimensions,
-                aha_moment_paths=aha_paths,
-                insights=insights,
-                success_patterns=success_patterns,
-                failure_causes=failure_causes,
-                improvement_suggestions=improvements,
-                tool_retrospection=tool_retrospection,
-                assimilated_strategies=assimilated_strategies,
-                mab_updates=mab_updates,
-                execution_time=execution_time
-            )
-            
-            # 更新统计
-            self._update_stats(result)
-            
-            # 记录回溯历史
-            self.retrospection_history.append(result)
-            
-            logger.info(f"✅ 回溯流程完成 (耗时: {execution_time:.2f}s)")
-            logger.info(f"   生成洞察: {len(insights)} 项")
-            logger.info(f"   识别模式: {len(success_patterns)} 个成功模式, {len(failure_causes)} 个失败原因")
-            logger.info(f"   改进建议: {len(improvements)} 条")
-            logger.info(f"   工具复盘: {tool_retrospection.get('analysis_status', 'unknown')} "
-                       f"({tool_retrospection.get('tools_analyzed', 0)} 个工具)")
-            if tool_retrospection.get('tool_optimization_suggestions'):
-                logger.info(f"   工具优化: {len(tool_retrospection['tool_optimization_suggestions'])} 条建议")
-            
-            return result
-            
+            logger.warning(f"⏰ 回溯流程被中止: {e.reason} (耗时: {execution_time:.2f}s)")
+            return self._create_error_result(retrospection_id, e.reason, start_time, status="interrupted")
         except Exception as e:
             execution_time = time.time() - start_time
             logger.error(f"❌ 回溯流程失败: {e} (耗时: {execution_time:.2f}s)")
@@ -1159,13 +1171,14 @@ class TaskRetrospectionEngine:
     def _create_error_result(self, 
                            retrospection_id: str, 
                            error_msg: str, 
-                           start_time: float) -> RetrospectionResult:
-        """创建错误回溯结果"""
+                           start_time: float,
+                           status: str = "error") -> RetrospectionResult:
+        """创建错误回溯结果（status 为 "interrupted" 表示因截止时间或取消而中止）"""
         return RetrospectionResult(
             retrospection_id=retrospection_id,
             task=None,
             execution_time=time.time() - start_time,
-            insights={"status": "error", "error_message": error_msg}
+            insights={"status": status, "error_message": error_msg}
         )
     
     def _update_stats(self, result: RetrospectionResult):
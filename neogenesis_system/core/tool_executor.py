@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+并行工具执行器 - Parallel Tool Executor
+BaseAsyncToolExecutor 的具体实现：按 Action 之间的依赖关系并行执行 Plan
+
+- 依赖：action.metadata['depends_on'] 列出依赖的 action_id；tool_input 中的
+  "{{obs:<action_id>}}" 占位符会被替换为该行动的输出（同时自动视为依赖）
+- 工作池按类型划分：异步工具直接在事件循环中执行，同步 I/O 工具使用 I/O 线程池，
+  CPU 工具（action.metadata['execution_kind'] == 'cpu'，或数据处理/优化类工具）
+  使用 CPU 线程池或进程池（cpu_executor='process'，载荷无法 pickle 时退回线程池）
+- 每个行动有超时（metadata['timeout']）与带抖动的指数退避重试（metadata['max_retries']，默认不重试）
+- 观察结果按完成顺序产出，output 保留工具返回的原始数据；依赖失败的行动被跳过并记录失败观察；
+  取消 execute_plan_async / iter_plan_async 时在途行动一并取消
+- 未注册的工具可委托给另一个（顺序）执行器的 execute_action，在 I/O 线程池中并行执行；
+  委托的行动原样返回委托执行器的观察输出，只有行动自身声明时才有超时与重试
+"""
+
+import re
+import json
+import time
+import random
+import asyncio
+import logging
+import threading
+import contextvars
+import dataclasses
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+try:
+    from ..abstractions import BaseToolExecutor, BaseAsyncToolExecutor
+    from ..shared.data_structures import Plan, Action, Observation, ExecutionContext, ActionStatus
+    from ..shared.dag_scheduler import DagNode, DependencyScheduler
+    from ..tools.tool_abstraction import BaseTool, AsyncBaseTool, ToolResult, ToolCategory, ToolRegistry
+    from .cognitive_offload import CognitiveProcessPool, is_picklable
+except ImportError:
+    from neogenesis_system.abstractions import BaseToolExecutor, BaseAsyncToolExecutor
+    from neogenesis_system.shared.data_structures import Plan, Action, Observation, ExecutionContext, ActionStatus
+    from neogenesis_system.shared.dag_scheduler import DagNode, DependencyScheduler
+    from neogenesis_system.tools.tool_abstraction import BaseTool, AsyncBaseTool, ToolResult, ToolCategory, ToolRegistry
+    from neogenesis_system.core.cognitive_offload import CognitiveProcessPool, is_picklable
+
+logger = logging.getLogger(__name__)
+
+# 引用其他行动输出的占位符
+OBSERVATION_PLACEHOLDER = re.compile(r"\{\{obs:([^{}]+)\}\}")
+
+# 默认视为 CPU 密集型的工具类别
+CPU_TOOL_CATEGORIES = {ToolCategory.DATA_PROCESSING, ToolCategory.OPTIMIZATION}
+
+DEFAULT_EXECUTOR_CONFIG = {
+    "max_concurrency": 8,           # 同时执行的最大行动数
+    "io_workers": 8,                # 同步 I/O 工具线程数
+    "cpu_workers": 2,               # CPU 工具线程数/进程数
+    "cpu_executor": "thread",       # CPU 工具执行方式: thread | process
+    "default_timeout": 30.0,        # 已注册工具单次尝试的默认超时（秒），委托的行动不使用
+    "max_retries": 0,               # 已注册工具的默认重试次数，委托的行动不使用
+    "retry_base_delay": 0.2,        # 退避基数（秒）
+    "retry_max_delay": 5.0          # 单次退避上限（秒）
+}
+
+
+def _call_tool(tool: Any, kwargs: Dict[str, Any]) -> Any:
+    """在工作线程/进程中执行同步工具（模块级函数，可跨进程传递）"""
+    if isinstance(tool, BaseTool):
+        return tool.execute(**kwargs)
+    return tool(**kwargs)
+
+
+class ParallelToolExecutor(BaseAsyncToolExecutor):
+    """
+    并行工具执行器
+
+    工具来源：register_tool() 注册的工具（BaseTool、AsyncBaseTool、同步函数或协程函数），
+    其次是传入的 ToolRegistry，最后是委托执行器 action_executor。
+    """
+
+    def __init__(self,
+                 tool_registry: Optional[ToolRegistry] = None,
+                 config: Optional[Dict[str, Any]] = None,
+                 name: str = "ParallelToolExecutor",
+                 description: str = "按依赖关系并行执行行动的工具执行器",
+                 action_executor: Optional[BaseToolExecutor] = None):
+        """
+        初始化并行工具执行器
+
+        Args:
+            tool_registry: 工具注册表（可选）
+            config: 覆盖 DEFAULT_EXECUTOR_CONFIG 的配置
+            name: 执行器名称
+            description: 执行器描述
+            action_executor: 委托执行器（可选），执行本执行器无法解析的工具
+        """
+        super().__init__(name, description)
+        self.tool_registry = tool_registry
+        self.action_executor = action_executor
+        self.config = {**DEFAULT_EXECUTOR_CONFIG, **(config or {})}
+
+        self._io_pool: Optional[ThreadPoolExecutor] = None
+        self._cpu_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[CognitiveProcessPool] = None
+        self._pool_lock = threading.Lock()
+
+        self.stats = {
+            "actions_executed": 0,
+            "actions_failed": 0,
+            "actions_skipped": 0,
+            "retries": 0,
+            "timeouts": 0,
+            "process_executions": 0
+        }
+
+    # ==================== 工具解析 ====================
+
+    def _resolve_tool(self, tool_name: str) -> Any:
+        tool = self.available_tools.get(tool_name)
+        if tool is None and self.tool_registry is not None:
+            tool = self.tool_registry.get_tool(tool_name)
+        return tool
+
+    def _delegate(self, action: Action):
+        """把行动交给委托执行器的同步工具函数（在 I/O 线程池中调用），返回委托执行器的观察结果"""
+        executor = self.action_executor
+
+        def call(**kwargs) -> Observation:
+            return executor.execute_action(dataclasses.replace(action, tool_input=kwargs))
+
+        return call
+
+    def validate_action(self, action: Action) -> bool:
+        """行动的工具已注册，或委托执行器接受该行动"""
+        if self._resolve_tool(action.tool_name) is not None:
+            return True
+        return self.action_executor is not None and self.action_executor.validate_action(action)
+
+    def _execution_kind(self, action: Action, tool: Any) -> str:
+        """执行方式: async | io | cpu"""
+        kind = action.metadata.get("execution_kind")
+        if kind in ("io", "cpu"):
+            return kind
+        if isinstance(tool, AsyncBaseTool) or asyncio.iscoroutinefunction(tool):
+            return "async"
+        if isinstance(tool, BaseTool) and tool.category in CPU_TOOL_CATEGORIES:
+            return "cpu"
+        return "io"
+
+    def _pool(self, kind: str) -> ThreadPoolExecutor:
+        with self._pool_lock:
+            if kind == "cpu":
+                if self._cpu_pool is None:
+                    self._cpu_pool = ThreadPoolExecutor(max_workers=self.config["cpu_workers"],
+                                                        thread_name_prefix="neogenesis-cpu-tool")
+                return self._cpu_pool
+            if self._io_pool is None:
+                self._io_pool = ThreadPoolExecutor(max_workers=self.config["io_workers"],
+                                                   thread_name_prefix="neogenesis-io-tool")
+            return self._io_pool
+
+    # ==================== 单个行动 ====================
+
+    async def _invoke(self, action: Action, tool: Any, kwargs: Dict[str, Any]) -> Any:
+        """按执行方式调用一次工具"""
+        kind = self._execution_kind(action, tool)
+        if kind == "async":
+            if isinstance(tool, AsyncBaseTool):
+                return await tool.execute_async(**kwargs)
+            return await tool(**kwargs)
+
+        loop = asyncio.get_running_loop()
+        if kind == "cpu" and self.config["cpu_executor"] == "process" and is_picklable((tool, kwargs)):
+            with self._pool_lock:
+                if self._process_pool is None:
+                    self._process_pool = CognitiveProcessPool(max_workers=self.config["cpu_workers"])
+            self.stats["process_executions"] += 1
+            return await asyncio.wrap_future(self._process_pool.submit(_call_tool, tool, kwargs))
+        return await loop.run_in_executor(self._pool(kind), contextvars.copy_context().run, _call_tool, tool, kwargs)
+
+    def _retry_delay(self, attempt: int) -> float:
+        """带完全抖动的指数退避"""
+        ceiling = min(self.config["retry_max_delay"], self.config["retry_base_delay"] * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    async def _execute_with_retries(self, action: Action, kwargs: Dict[str, Any]) -> Observation:
+        """
+        执行单个行动：每次尝试有超时，失败后带抖动退避重试
+
+        委托给 action_executor 的行动保持委托执行器原有的语义：默认不超时、不重试
+        （非幂等的行动不会被重复执行），只有 metadata 中显式声明 timeout / max_retries 时才启用。
+        """
+        tool = self._resolve_tool(action.tool_name)
+        if tool is not None:
+            timeout = action.metadata.get("timeout", self.config["default_timeout"])
+            max_retries = action.metadata.get("max_retries", self.config["max_retries"])
+        elif self.action_executor is not None:
+            tool = self._delegate(action)
+            timeout = action.metadata.get("timeout")
+            max_retries = action.metadata.get("max_retries", 0)
+        else:
+            return self._failed_observation(action, f"工具 {action.tool_name} 不存在", 0.0)
+
+        start_time = time.time()
+        error = ""
+
+        for attempt in range(max_retries + 1):
+            if attempt:
+                self.stats["retries"] += 1
+                await asyncio.sleep(self._retry_delay(attempt - 1))
+            try:
+                result = await asyncio.wait_for(self._invoke(action, tool, kwargs), timeout=timeout)
+            except asyncio.TimeoutError:
+                self.stats["timeouts"] += 1
+                error = f"执行超时 ({timeout:.1f}s)"
+                logger.warning(f"⏰ 行动 {action.action_id} 第 {attempt + 1} 次尝试超时")
+                continue
+            except Exception as e:
+                error = f"工具执行异常: {e}"
+                logger.warning(f"⚠️ 行动 {action.action_id} 第 {attempt + 1} 次尝试失败: {e}")
+                continue
+
+            if isinstance(result, (ToolResult, Observation)) and not result.success:
+                error = result.error_message or "工具执行失败"
+                continue
+
+            if isinstance(result, Observation):
+                output, metadata = result.output, dict(result.metadata)
+            else:
+                output, metadata = result.data if isinstance(result, ToolResult) else result, {}
+            metadata.setdefault("data", output)
+            metadata["attempts"] = attempt + 1
+            return Observation(
+                action=action,
+                output=output,
+                success=True,
+                execution_time=time.time() - start_time,
+                metadata=metadata
+            )
+
+        return self._failed_observation(action, error, time.time() - start_time, attempts=max_retries + 1)
+
+    @staticmethod
+    def _format_output(data: Any) -> str:
+        """把观察输出转为文本（用于嵌入字符串的占位符）"""
+        if isinstance(data, str):
+            return data
+        try:
+            return json.dumps(data, ensure_ascii=False, default=str)
+        except (TypeError, ValueError):
+            return str(data)
+
+    @staticmethod
+    def _failed_observation(action: Action, error: str, execution_time: float, **metadata) -> Observation:
+        return Observation(action=action, output="", success=False, error_message=error,
+                           execution_time=execution_time, metadata=metadata)
+
+    async def execute_action_async(self, action: Action) -> Observation:
+        """异步执行单个行动（不解析占位符）"""
+        action.start_execution()
+        observation = await self._execute_with_retries(action, dict(action.tool_input))
+        self._finish_action(action, observation)
+        return observation
+
+    def execute_action(self, action: Action) -> Observation:
+        """同步执行单个行动"""
+        return _run_sync(self.execute_action_async(action))
+
+    def _finish_action(self, action: Action, observation: Observation):
+        if observation.success:
+            action.complete_execution()
+            self.stats["actions_executed"] += 1
+        else:
+            action.fail_execution()
+            self.stats["actions_failed"] += 1
+
+    # ==================== 计划执行 ====================
+
+    @staticmethod
+    def action_dependencies(action: Action) -> List[str]:
+        """行动的依赖：显式声明的 depends_on 加上 tool_input 中引用的行动"""
+        dependencies = list(action.metadata.get("depends_on", []))
+
+        def collect(value: Any):
+            if isinstance(value, str):
+                dependencies.extend(OBSERVATION_PLACEHOLDER.findall(value))
+            elif isinstance(value, dict):
+                for item in value.values():
+                    collect(item)
+            elif isinstance(value, (list, tuple)):
+                for item in value:
+                    collect(item)
+
+        collect(action.tool_input)
+        return list(dict.fromkeys(dependencies))
+
+    @staticmethod
+    def _resolve_inputs(value: Any, observations: Dict[str, Observation]) -> Any:
+        """替换占位符：整个值为占位符时保留原始数据类型，否则按文本替换"""
+        if isinstance(value, str):
+            match = OBSERVATION_PLACEHOLDER.fullmatch(value)
+            if match:
+                return observations[match.group(1)].metadata.get("data", observations[match.group(1)].output)
+            return OBSERVATION_PLACEHOLDER.sub(
+                lambda m: ParallelToolExecutor._format_output(observations[m.group(1)].output), value)
+        if isinstance(value, dict):
+            return {key: ParallelToolExecutor._resolve_inputs(item, observations) for key, item in value.items()}
+        if isinstance(value, list):
+            return [ParallelToolExecutor._resolve_inputs(item, observations) for item in value]
+        return value
+
+    async def iter_plan_async(self, plan: Plan) -> AsyncIterator[Observation]:
+        """
+        执行计划，按完成顺序产出观察结果
+
+        依赖失败（或被跳过）的行动不执行，产出一个失败观察；依赖不存在的行动同样视为失败。
+        重复的 action_id（默认 ID 由工具名加毫秒时间戳生成，同一毫秒内创建会重复）会加序号区分，
+        占位符与 depends_on 中的该 ID 指向第一个行动。
+        """
+        actions: Dict[str, Action] = {}
+        for index, action in enumerate(plan.actions):
+            if action.action_id in actions:
+                action.action_id = f"{action.action_id}#{index}"
+            actions[action.action_id] = action
+
+        observations: Dict[str, Observation] = {}
+        nodes = [
+            DagNode(node_id=action.action_id, dependencies=self.action_dependencies(action),
+                    priority=action.metadata.get("priority", 0), order=index, payload=action)
+            for index, action in enumerate(plan.actions)
+        ]
+
+        def should_run(node: DagNode, outcomes) -> bool:
+            return all(dep in observations and observations[dep].success for dep in node.dependencies)
+
+        async def run_action(node: DagNode) -> Observation:
+            action: Action = node.payload
+            action.start_execution()
+            kwargs = self._resolve_inputs(action.tool_input, observations)
+            observation = await self._execute_with_retries(action, kwargs)
+            self._finish_action(action, observation)
+            return observation
+
+        plan.start_execution()
+        scheduler = DependencyScheduler(nodes, max_concurrency=self.config["max_concurrency"])
+        try:
+            async for outcome in scheduler.run(run_action, should_run=should_run):
+                action: Action = outcome.node.payload
+                if outcome.skipped:
+                    failed = [dep for dep in outcome.node.dependencies
+                              if dep not in observations or not observations[dep].success]
+                    action.status = ActionStatus.SKIPPED
+                    self.stats["actions_skipped"] += 1
+                    observation = self._failed_observation(action, f"依赖未满足: {', '.join(failed)}", 0.0,
+                                                           skipped=True)
+                elif outcome.error is not None:
+                    action.fail_execution()
+                    observation = self._failed_observation(action, str(outcome.error), outcome.duration)
+                else:
+                    observation = outcome.result
+                observations[action.action_id] = observation
+                yield observation
+        except BaseException:
+            plan.cancel_execution()
+            raise
+
+        for action_id in scheduler.blocked:
+            action = actions[action_id]
+            action.status = ActionStatus.SKIPPED
+            observation = self._failed_observation(action, "依赖存在环，无法执行", 0.0, skipped=True)
+            observations[action_id] = observation
+            yield observation
+
+        if all(observation.success for observation in observations.values()):
+            plan.complete_execution()
+        else:
+            plan.fail_execution()
+
+    async def execute_plan_async(self, plan: Plan, context: Optional[ExecutionContext] = None) -> List[Observation]:
+        """异步执行计划，返回按完成顺序排列的观察结果"""
+        observations = [observation async for observation in self.iter_plan_async(plan)]
+        if context is not None:
+            for observation in observations:
+                context.add_observation(observation)
+        return observations
+
+    def execute_plan(self, plan: Plan, context: Optional[ExecutionContext] = None) -> List[Observation]:
+        """同步执行计划（内部仍按依赖并行）"""
+        return _run_sync(self.execute_plan_async(plan, context))
+
+    def shutdown(self, wait: bool = False):
+        """关闭工作池"""
+        with self._pool_lock:
+            for pool in (self._io_pool, self._cpu_pool):
+                if pool is not None:
+                    pool.shutdown(wait=wait)
+            if self._process_pool is not None:
+                self._process_pool.shutdown(wait=wait)
+            self._io_pool = self._cpu_pool = self._process_pool = None
+
+
+def _run_sync(coroutine) -> Any:
+    """在同步代码中执行协程；当前线程已有运行中的事件循环时在独立线程中执行"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+
+    result: Dict[str, Any] = {}
+
+    def runner():
+        try:
+            result["value"] = asyncio.run(coroutine)
+        except BaseException as e:
+            result["error"] = e
+
+    thread = threading.Thread(target=runner, name="neogenesis-plan-runner")
+    thread.start()
+    thread.join()
+    if "error" in result:
+        raise result["error"]
+    return result["value"]
@@ -58,10 +58,31 @@ except ImportError:
 
 # 导入工具系统
 from ..tools.tool_abstraction import ToolRegistry, global_tool_registry
+from .tool_executor import ParallelToolExecutor
 
 logger = logging.getLogger(__name__)
 
 
+def _parallel_tool_executor(tool_executor: Optional[Union[BaseToolExecutor, BaseAsyncToolExecutor]],
+                            tool_registry: Optional[ToolRegistry],
+                            config: Optional[Dict]) -> Union[BaseToolExecutor, BaseAsyncToolExecutor]:
+    """
+    选择工作流代理使用的工具执行器
+
+    - 未提供执行器：基于工具注册表创建 ParallelToolExecutor
+    - 提供了异步执行器：直接使用
+    - 提供了顺序执行器：作为委托执行器包装进 ParallelToolExecutor，无依赖的行动并行执行；
+      config['parallel_execution'] = False 时保持原样
+    """
+    config = config or {}
+    executor_config = config.get('executor_config')
+    if tool_executor is None:
+        return ParallelToolExecutor(tool_registry=tool_registry or global_tool_registry, config=executor_config)
+    if isinstance(tool_executor, BaseAsyncToolExecutor) or not config.get('parallel_execution', True):
+        return tool_executor
+    return ParallelToolExecutor(config=executor_config, action_executor=tool_executor)
+
+
 class WorkflowPlanner(BasePlanner):
     """
     工作流规划器 - 专门的战术规划器
@@ -1103,7 +1124,7 @@ class WorkflowGenerationAgent(BaseAgent):
     """
     
     def __init__(self, 
-                 tool_executor: Union[BaseToolExecutor, BaseAsyncToolExecutor],
+                 tool_executor: Optional[Union[BaseToolExecutor, BaseAsyncToolExecutor]],
                  memory: BaseMemory,
                  workflow_planner: Optional[WorkflowPlanner] = None,
                  tool_registry: Optional[ToolRegistry] = None,
@@ -1114,7 +1135,7 @@ class WorkflowGenerationAgent(BaseAgent):
         初始化工作流生成代理
         
         Args:
-            tool_executor: 工具执行器实例
+            tool_executor: 工具执行器实例（None 时使用 ParallelToolExecutor，顺序执行器会被包装为并行执行）
             memory: 记忆模块实例
             workflow_planner: 工作流规划器实例（可选，会自动创建）
             tool_registry: 工具注册表
@@ -1129,6 +1150,8 @@ class WorkflowGenerationAgent(BaseAgent):
                 config=config
             )
         
+        tool_executor = _parallel_tool_executor(tool_executor, tool_registry, config)
+        
         # 初始化BaseAgent
         super().__init__(
             planner=workflow_planner,
@@ -1547,7 +1570,7 @@ class WorkflowGenerationAgent(BaseAgent):
 
 
 # 工厂函数：简化WorkflowGenerationAgent的创建
-def create_workflow_agent(tool_executor: Union[BaseToolExecutor, BaseAsyncToolExecutor],
+def create_workflow_agent(tool_executor: Optional[Union[BaseToolExecutor, BaseAsyncToolExecutor]],
                          memory: BaseMemory,
                          tool_registry: Optional[ToolRegistry] = None,
                          config: Optional[Dict] = None) -> WorkflowGenerationAgent:
@@ -1555,7 +1578,7 @@ def create_workflow_agent(tool_executor: Union[BaseToolExecutor, BaseAsyncToolEx
     工作流代理工厂函数
     
     Args:
-        tool_executor: 工具执行器
+        tool_executor: 工具执行器（None 时使用 ParallelToolExecutor）
         memory: 记忆模块
         tool_registry: 工具注册表
         config: 配置
@@ -58,8 +58,7 @@ def demonstrate_knowledge_exploration():
     logger.info("🔧 创建扩展的认知调度器...")
     exploration_config = {
         "idle_detection": {
-            "min_idle_duration": 2.0,  # 缩短演示时间
-            "check_interval": 1.0
+            "min_idle_duration": 2.0  # 缩短演示时间
         },
         "cognitive_tasks": {
             "exploration_interval": 5.0,  # 5秒后触发探索
@@ -220,8 +220,7 @@ def demonstrate_integrated_workflow():
     
     scheduler_config = {
         "idle_detection": {
-            "min_idle_duration": 1.0,  # 加速演示
-            "check_interval": 0.5
+            "min_idle_duration": 1.0  # 加速演示
         },
         "cognitive_tasks": {
             "exploration_interval": 2.0  # 2秒触发探索
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+异步HTTP连接池 - Async HTTP Pool
+各提供商原生异步客户端共享的 keep-alive 连接池
+
+- 每个 (事件循环, 提供商) 一个 httpx.AsyncClient：httpx 的连接绑定在创建它的事件循环上，
+  同一循环内该提供商的所有客户端实例（不同 API 密钥、不同模型）复用同一组连接
+- 认证头随请求传入，连接池本身不携带凭据
+- 单次调用超时取 调用方 timeout / 配置超时 / 当前截止时间剩余 三者中最紧的一个
+- 取消：调用方取消任务时 CancelledError 直接向上传播，httpx 会释放该请求占用的连接
+- 流式：调用方提前关闭流式生成器时关闭该连接，上游随即停止生成
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+import weakref
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Tuple, Union
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+    httpx = None
+
+from .llm_base import LLMErrorType, LLMResponse, create_error_response
+from ..shared.deadline import clamp_timeout
+
+logger = logging.getLogger(__name__)
+
+# 每个 (事件循环, 提供商) 连接池的上限
+POOL_LIMITS = {
+    "max_connections": 100,
+    "max_keepalive_connections": 20,
+    "keepalive_expiry": 30.0
+}
+
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, Any]]" = weakref.WeakKeyDictionary()
+_pools_lock = threading.Lock()
+
+
+def get_async_http_client(provider: str) -> "httpx.AsyncClient":
+    """
+    获取当前事件循环中该提供商共享的 httpx.AsyncClient（不存在或已关闭时创建）
+
+    Args:
+        provider: 提供商名称（连接池的键）
+
+    Raises:
+        RuntimeError: httpx 未安装或不在事件循环中调用
+    """
+    if not HTTPX_AVAILABLE:
+        raise RuntimeError("httpx未安装，无法使用异步功能。请安装: pip install httpx")
+
+    loop = asyncio.get_running_loop()
+    with _pools_lock:
+        clients = _pools.setdefault(loop, {})
+        client = clients.get(provider)
+        if client is None or client.is_closed:
+            client = clients[provider] = httpx.AsyncClient(
+                limits=httpx.Limits(**POOL_LIMITS),
+                headers={'User-Agent': 'Neogenesis-System/1.0'}
+            )
+            logger.debug(f"🚀 {provider} 异步连接池已创建")
+    return client
+
+
+async def aclose_async_http_clients():
+    """关闭当前事件循环中的所有连接池（之后的请求会按需重建）"""
+    with _pools_lock:
+        clients = _pools.pop(asyncio.get_running_loop(), {})
+    for provider, client in clients.items():
+        await client.aclose()
+        logger.debug(f"🚀 {provider} 异步连接池已关闭")
+
+
+def request_timeout(config_timeout: Union[float, Tuple[float, float]],
+                    override: Optional[float] = None) -> "httpx.Timeout":
+    """
+    计算单次请求的超时
+
+    Args:
+        config_timeout: 配置超时，秒数或 (connect, read) 元组
+        override: 调用方指定的本次超时（秒）
+
+    Returns:
+        httpx.Timeout（已按当前截止时间收紧）
+    """
+    connect, read = config_timeout if isinstance(config_timeout, tuple) else (config_timeout, config_timeout)
+    if override is not None:
+        connect, read = min(connect, override), min(read, override)
+    connect, read = clamp_timeout((connect, read))
+    return httpx.Timeout(read, connect=connect)
+
+
+def error_type_for_status(status_code: int) -> LLMErrorType:
+    """HTTP 状态码 -> 错误类型"""
+    if status_code == 401:
+        return LLMErrorType.AUTHENTICATION
+    if status_code == 403:
+        return LLMErrorType.QUOTA_EXCEEDED
+    if status_code == 429:
+        return LLMErrorType.RATE_LIMIT
+    if status_code in (400, 422):
+        return LLMErrorType.INVALID_REQUEST
+    if status_code == 404:
+        return LLMErrorType.MODEL_ERROR
+    if status_code >= 500:
+        return LLMErrorType.SERVER_ERROR
+    return LLMErrorType.UNKNOWN_ERROR
+
+
+def error_type_for_exception(error: Exception) -> LLMErrorType:
+    """请求异常 -> 错误类型"""
+    if HTTPX_AVAILABLE:
+        if isinstance(error, httpx.TimeoutException):
+            return LLMErrorType.TIMEOUT_ERROR
+        if isinstance(error, httpx.HTTPError):
+            return LLMErrorType.NETWORK_ERROR
+    if isinstance(error, (ValueError, KeyError, IndexError, TypeError)):
+        return LLMErrorType.PARSE_ERROR  # 响应不是 JSON 或结构不符合预期
+    return LLMErrorType.UNKNOWN_ERROR
+
+
+def error_message_from_body(data: Any, status_code: int) -> str:
+    """从错误响应体中提取错误信息（兼容 {"error": {"message": ...}} 与 {"error": "..."} 两种形式）"""
+    error = data.get("error") if isinstance(data, dict) else None
+    if isinstance(error, dict):
+        error = error.get("message")
+    return str(error) if error else f"HTTP {status_code}"
+
+
+async def post_json(provider: str,
+                    url: str,
+                    payload: Dict[str, Any],
+                    headers: Optional[Dict[str, str]] = None,
+                    timeout: Optional["httpx.Timeout"] = None) -> Tuple[int, Any]:
+    """
+    通过共享连接池发送 JSON POST 请求
+
+    Returns:
+        (状态码, 解析后的 JSON)；错误响应的响应体无法解析时为空字典
+
+    Raises:
+        httpx.HTTPError: 网络错误或超时
+        ValueError: 成功响应不是合法 JSON
+    """
+    client = get_async_http_client(provider)
+    response = await client.post(url, json=payload, headers=headers, timeout=timeout)
+    try:
+        data = response.json()
+    except ValueError:
+        if response.status_code == 200:
+            raise
+        data = {}
+    return response.status_code, data
+
+
+def sse_data(line: str) -> Optional[Any]:
+    """解析 SSE 的 data: 行（event:/注释行与结束标记 [DONE] 返回 None）"""
+    if not line.startswith("data:"):
+        return None
+    data = line[5:].strip()
+    if not data or data == "[DONE]":
+        return None
+    return json.loads(data)
+
+
+class StreamStatusError(Exception):
+    """流式请求返回了非 200 状态码"""
+
+    def __init__(self, status_code: int, data: Any):
+        super().__init__(error_message_from_body(data, status_code))
+        self.status_code = status_code
+        self.data = data
+
+
+async def stream_lines(provider: str,
+                       url: str,
+                       payload: Dict[str, Any],
+                       headers: Optional[Dict[str, str]] = None,
+                       timeout: Optional["httpx.Timeout"] = None) -> AsyncIterator[str]:
+    """
+    通过共享连接池发送流式 JSON POST 请求，逐行产出响应体（跳过空行）
+
+    生成器被提前关闭或所在任务被取消时退出 stream 上下文，httpx 关闭该连接
+
+    Raises:
+        StreamStatusError: 非 200 状态码
+        httpx.HTTPError: 网络错误或超时
+    """
+    client = get_async_http_client(provider)
+    async with client.stream("POST", url, json=payload, headers=headers, timeout=timeout) as response:
+        if response.status_code != 200:
+            body = await response.aread()
+            try:
+                data = json.loads(body)
+            except ValueError:
+                data = {}
+            raise StreamStatusError(response.status_code, data)
+        async for line in response.aiter_lines():
+            if line.strip():
+                yield line
+
+
+async def stream_text(llm_client: Any,
+                      url: str,
+                      payload: Dict[str, Any],
+                      headers: Optional[Dict[str, str]],
+                      timeout: Optional["httpx.Timeout"],
+                      extract: Callable[[str], Optional[str]]) -> AsyncIterator[str]:
+    """
+    流式请求并逐段产出回答文本，统一记录客户端统计
+
+    Args:
+        llm_client: 发起请求的 BaseLLMClient（成功/失败计入其统计；被关闭或取消时不计）
+        extract: 单行响应 -> 文本片段（None 或空串表示该行不含文本）
+
+    Raises:
+        ConnectionError: 请求失败或响应无法解析（已计入失败统计）
+    """
+    provider = llm_client.provider.value
+    start_time = time.time()
+    parts = []
+    lines = stream_lines(provider, url, payload, headers, timeout)
+    try:
+        async for line in lines:
+            text = extract(line)
+            if text:
+                parts.append(text)
+                yield text
+    except StreamStatusError as e:
+        error_response = create_error_response(provider, error_type_for_status(e.status_code),
+                                               f"HTTP {e.status_code}: {e}", response_time=time.time() - start_time)
+    except Exception as e:
+        error_response = create_error_response(provider, error_type_for_exception(e), f"{type(e).__name__}: {e}",
+                                               response_time=time.time() - start_time)
+    else:
+        llm_client._update_stats(LLMResponse(success=True, content="".join(parts), provider=provider,
+                                             model=payload.get("model", ""), response_time=time.time() - start_time))
+        return
+    finally:
+        # 调用方提前关闭本生成器时，显式关闭内层生成器以立即释放连接（而不是等垃圾回收）
+        await lines.aclose()
+
+    llm_client._update_stats(error_response)
+    logger.error(f"❌ {provider} 流式请求失败: {error_response.error_message}")
+    raise ConnectionError(f"{provider} 流式API调用失败: {error_response.error_message}")
@@ -8,7 +8,7 @@ Anthropic Claude Client Implementation - Unified LLM Interface
 
 import time
 import logging
-from typing import List, Optional, Union, Dict, Any
+from typing import List, Optional, Union, Dict, Any, AsyncIterator
 
 try:
     import anthropic
@@ -21,9 +21,16 @@ from ..llm_base import (
     BaseLLMClient, LLMConfig, LLMResponse, LLMMessage, LLMUsage, 
     LLMProvider, LLMErrorType, create_error_response
 )
+from ..async_http import (
+    HTTPX_AVAILABLE, post_json, stream_text, sse_data, request_timeout,
+    error_type_for_status, error_type_for_exception, error_message_from_body
+)
+from ...shared.deadline import clamp_timeout
 
 logger = logging.getLogger(__name__)
 
+ANTHROPIC_API_VERSION = "2023-06-01"
+
 
 class AnthropicClient(BaseLLMClient):
     """
@@ -34,6 +41,7 @@ class AnthropicClient(BaseLLMClient):
     - 长上下文处理
     - 高质量推理能力
     - 完整的错误处理
+    - 原生异步接口（httpx 共享连接池，不依赖 anthropic 库）
     """
     
     def __init__(self, config: LLMConfig):
@@ -43,10 +51,15 @@ class AnthropicClient(BaseLLMClient):
         Args:
             config: LLM配置对象
         """
-        if not ANTHROPIC_AVAILABLE:
+        if not ANTHROPIC_AVAILABLE and not HTTPX_AVAILABLE:
             raise ImportError("Anthropic库未安装。请运行: pip install anthropic")
         
         super().__init__(config)
+        self.client = None
+        
+        if not ANTHROPIC_AVAILABLE:
+            logger.warning("⚠️ Anthropic库未安装，仅异步接口可用。请运行: pip install anthropic")
+            return
         
         # 创建Anthropic客户端
         self.client = Anthropic(
@@ -58,6 +71,43 @@ class AnthropicClient(BaseLLMClient):
         
         logger.info(f"🤖 Anthropic客户端已初始化: {config.model_name}")
     
+    def _build_params(self, messages: Union[str, List[LLMMessage]], temperature: Optional[float],
+                      max_tokens: Optional[int], kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """构建 Messages API 请求参数（同步与异步接口共用）"""
+        prepared_messages = self._prepare_messages(messages)
+        
+        # 分离系统消息和对话消息
+        system_message = ""
+        dialogue_messages = []
+        
+        for msg in prepared_messages:
+            if msg.role == "system":
+                system_message = msg.content
+            else:
+                dialogue_messages.append({
+                    "role": msg.role,
+                    "content": msg.content
+                })
+        
+        # 如果没有对话消息，创建一个用户消息
+        if not dialogue_messages:
+            if isinstance(messages, str):
+                dialogue_messages = [{"role": "user", "content": messages}]
+            else:
+                dialogue_messages = [{"role": "user", "content": "Hello"}]
+        
+        params = {
+            "model": kwargs.get('model') or self.config.model_name,
+            "messages": dialogue_messages,
+            "max_tokens": max_tokens or self.config.max_tokens,
+            "temperature": temperature or self.config.temperature
+        }
+        
+        # 添加系统消息（如果存在）
+        if system_message:
+            params["system"] = system_message
+        return params
+    
     def chat_completion(self, 
                        messages: Union[str, List[LLMMessage]], 
                        temperature: Optional[float] = None,
@@ -77,43 +127,23 @@ class AnthropicClient(BaseLLMClient):
         """
         start_time = time.time()
         
+        if self.client is None:
+            error_response = create_error_response(
+                provider=self.provider.value,
+                error_type=LLMErrorType.UNKNOWN_ERROR,
+                error_message="Anthropic库未安装，同步接口不可用。请运行: pip install anthropic"
+            )
+            self._update_stats(error_response)
+            return error_response
+        
         try:
-            # 准备消息格式
-            prepared_messages = self._prepare_messages(messages)
-            
-            # 分离系统消息和对话消息
-            system_message = ""
-            dialogue_messages = []
-            
-            for msg in prepared_messages:
-                if msg.role == "system":
-                    system_message = msg.content
-                else:
-                    dialogue_messages.append({
-                        "role": msg.role,
-                        "content": msg.content
-                    })
-            
-            # 如果没有对话消息，创建一个用户消息
-            if not dialogue_messages:
-                if isinstance(messages, str):
-                    dialogue_messages = [{"role": "user", "content": messages}]
-                else:
-                    dialogue_messages = [{"role": "user", "content": "Hello"}]
-            
-            # 参数处理
-            params = {
-                "model": kwargs.get('model') or self.config.model_name,
-                "messages": dialogue_messages,
-                "max_tokens": max_tokens or self.config.max_tokens,
-                "temperature": temperature or self.config.temperature
-            }
-            
-            # 添加系统消息（如果存在）
-            if system_message:
-                params["system"] = system_message
+            # 准备消息与参数
+            params = self._build_params(messages, temperature, max_tokens, kwargs)
             
             # 调用Anthropic API
+            # 按当前截止时间收紧单次请求超时
+            params["timeout"] = clamp_timeout(self.config.timeout[1])
+            
             logger.debug(f"🤖 调用Anthropic API: {params['model']}")
             response = self.client.messages.create(**params)
             
@@ -213,6 +243,118 @@ class AnthropicClient(BaseLLMClient):
             logger.error(f"❌ Anthropic未知错误: {e}")
             return error_response
     
+    async def achat_completion(self, 
+                              messages: Union[str, List[LLMMessage]], 
+                              temperature: Optional[float] = None,
+                              max_tokens: Optional[int] = None,
+                              **kwargs) -> LLMResponse:
+        """
+        Anthropic异步聊天完成接口实现（httpx 共享连接池，支持取消）
+        
+        Args:
+            messages: 消息内容
+            temperature: 温度参数
+            max_tokens: 最大token数
+            **kwargs: 其他参数（timeout: 本次调用的超时秒数）
+            
+        Returns:
+            LLMResponse: 统一的响应对象
+        """
+        start_time = time.time()
+        
+        try:
+            params = self._build_params(messages, temperature, max_tokens, kwargs)
+            base_url = (self.config.base_url or "https://api.anthropic.com").rstrip('/')
+            headers = {"x-api-key": self.config.api_key, "anthropic-version": ANTHROPIC_API_VERSION}
+            headers.update(self.config.extra_headers or {})
+            
+            logger.debug(f"🤖 异步调用Anthropic API: {params['model']}")
+            status_code, data = await post_json(
+                self.provider.value, f"{base_url}/v1/messages", params, headers,
+                timeout=request_timeout(self.config.timeout, kwargs.get('timeout'))
+            )
+            response_time = time.time() - start_time
+            
+            if status_code == 200:
+                content = "".join(block.get("text", "") for block in data["content"] if block.get("type") == "text")
+                usage_data = data.get("usage")
+                llm_response = LLMResponse(
+                    success=True,
+                    content=content,
+                    provider=self.provider.value,
+                    model=data.get("model", params["model"]),
+                    response_time=response_time,
+                    usage=LLMUsage(
+                        prompt_tokens=usage_data.get("input_tokens", 0),
+                        completion_tokens=usage_data.get("output_tokens", 0),
+                        total_tokens=usage_data.get("input_tokens", 0) + usage_data.get("output_tokens", 0)
+                    ) if usage_data else None,
+                    finish_reason=data.get("stop_reason"),
+                    raw_response=data
+                )
+                self._update_stats(llm_response)
+                logger.info(f"✅ Anthropic异步API调用成功: {content[:50]}...")
+                return llm_response
+            
+            error_response = create_error_response(
+                provider=self.provider.value,
+                error_type=error_type_for_status(status_code),
+                error_message=f"Anthropic API错误 {status_code}: {error_message_from_body(data, status_code)}",
+                response_time=response_time
+            )
+            
+        except Exception as e:
+            error_response = create_error_response(
+                provider=self.provider.value,
+                error_type=error_type_for_exception(e),
+                error_message=f"Anthropic异步请求失败: {type(e).__name__}: {e}",
+                response_time=time.time() - start_time
+            )
+        
+        self._update_stats(error_response)
+        logger.error(f"❌ {error_response.error_message}")
+        return error_response
+    
+    def astream_chat_completion(self, 
+                                messages: Union[str, List[LLMMessage]], 
+                                temperature: Optional[float] = None,
+                                max_tokens: Optional[int] = None,
+                                **kwargs) -> AsyncIterator[str]:
+        """
+        Anthropic流式聊天完成接口实现（SSE，文本增量在 content_block_delta 事件中）
+        
+        Args:
+            messages: 消息内容
+            temperature: 温度参数
+            max_tokens: 最大token数
+            **kwargs: 其他参数（timeout: 本次调用的超时秒数）
+            
+        Returns:
+            AsyncIterator[str]: 回答文本片段（关闭迭代器即关闭连接）
+        """
+        params = self._build_params(messages, temperature, max_tokens, kwargs)
+        params["stream"] = True
+        base_url = (self.config.base_url or "https://api.anthropic.com").rstrip('/')
+        headers = {"x-api-key": self.config.api_key, "anthropic-version": ANTHROPIC_API_VERSION}
+        headers.update(self.config.extra_headers or {})
+        
+        logger.debug(f"🌊 流式调用Anthropic API: {params['model']}")
+        return stream_text(self, f"{base_url}/v1/messages", params, headers,
+                           request_timeout(self.config.timeout, kwargs.get('timeout')),
+                           self._stream_delta)
+    
+    @staticmethod
+    def _stream_delta(line: str) -> Optional[str]:
+        """SSE 行 -> 文本片段（流中途的 error 事件转为异常）"""
+        event = sse_data(line)
+        if not event:
+            return None
+        if event.get("type") == "error":
+            raise ConnectionError(error_message_from_body(event, 200))
+        if event.get("type") == "content_block_delta":
+            return event.get("delta", {}).get("text")
+        return None
+    
     def validate_config(self) -> bool:
         """
         验证Anthropic配置是否有效
@@ -263,6 +405,7 @@ class AnthropicClient(BaseLLMClient):
         return [
             "chat_completion", 
             "text_generation",
+            "streaming",
             "long_context",  # 支持长上下文
             "reasoning",     # 强推理能力
             "analysis",      # 分析能力
@@ -48,6 +48,7 @@ from ..llm_base import (
     BaseLLMClient, LLMConfig, LLMResponse, LLMMessage, LLMUsage, 
     LLMProvider, LLMErrorType, create_error_response
 )
+from ...shared.deadline import get_current_deadline, clamp_timeout
 
 logger = logging.getLogger(__name__)
 
@@ -499,13 +500,24 @@ class DeepSeekClient(BaseLLMClient):
         last_error = None
         
         for attempt in range(self.config.max_retries):
+            # ⏰ 调用方截止时间已到（或任务已取消）时不再发起请求
+            deadline = get_current_deadline()
+            if deadline is not None and deadline.expired:
+                logger.warning("⏰ 截止时间已到，放弃API调用")
+                return last_error or APIResponse(
+                    success=False,
+                    error_type=LLMErrorType.TIMEOUT_ERROR,
+                    error_message="调用方截止时间已到，请求被取消",
+                    response_time=time.time() - start_time
+                )
+            
             try:
                 logger.debug(f"🤖 API调用尝试 {attempt + 1}/{self.config.max_retries}")
                 
                 response = self.session.post(
                     f"{self.config.base_url}/chat/completions",
                     json=request_data,
-                    timeout=self.config.timeout
+                    timeout=clamp_timeout(self.config.timeout)
                 )
                 
                 response_time = time.time() - start_time
@@ -524,8 +536,9 @@ class DeepSeekClient(BaseLLMClient):
                 # 计算等待时间并重试
                 wait_time = self._calculate_retry_delay(error_response.error_type, attempt)
                 logger.warning(f"🔄 等待 {wait_time:.1f}s 后重试...")
-                time.sleep(wait_time)
                 last_error = error_response
+                if not self._wait_before_retry(wait_time):
+                    break
                 
             except requests.exceptions.Timeout as e:
                 response_time = time.time() - start_time
@@ -539,7 +552,8 @@ class DeepSeekClient(BaseLLMClient):
                 if attempt < self.config.max_retries - 1:
                     wait_time = 5 * (attempt + 1)
                     logger.warning(f"⏱️ 超时重试，等待 {wait_time}s...")
-                    time.sleep(wait_time)
+                    if not self._wait_before_retry(wait_time):
+                        break
                 
             except requests.exceptions.ConnectionError as e:
                 response_time = time.time() - start_time
@@ -553,7 +567,8 @@ class DeepSeekClient(BaseLLMClient):
                 if attempt < self.config.max_retries - 1:
                     wait_time = 10 * (attempt + 1)
                     logger.warning(f"🌐 网络错误重试，等待 {wait_time}s...")
-                    time.sleep(wait_time)
+                    if not self._wait_before_retry(wait_time):
+                        break
                     
             except Exception as e:
                 response_time = time.time() - start_time
@@ -566,7 +581,8 @@ class DeepSeekClient(BaseLLMClient):
                 
                 if attempt < self.config.max_retries - 1:
                     logger.warning(f"❌ 未知错误重试，等待 3s...")
-                    time.sleep(3)
+                    if not self._wait_before_retry(3):
+                        break
         
         # 所有重试失败
         logger.error(f"❌ API调用失败: 所有 {self.config.max_retries} 次重试均失败")
@@ -576,6 +592,26 @@ class DeepSeekClient(BaseLLMClient):
             error_message="所有重试尝试均失败"
         )
     
+    def _wait_before_retry(self, wait_time: float) -> bool:
+        """
+        重试前等待，遵守当前上下文的截止时间
+        
+        Returns:
+            是否继续重试（剩余时间不足或任务被取消时返回False）
+        """
+        deadline = get_current_deadline()
+        if deadline is None:
+            time.sleep(wait_time)
+            return True
+        
+        remaining = deadline.remaining()
+        if remaining is not None and remaining <= wait_time:
+            logger.warning("⏰ 剩余时间不足以等待重试，停止重试")
+            return False
+        
+        # 取消事件被设置时提前醒来
+        return not deadline.cancel_event.wait(wait_time)
+    
     def _process_success_response(self, response: requests.Response, response_time: float) -> APIResponse:
         """处理成功响应"""
         try:
@@ -10,14 +10,14 @@ import time
 import logging
 import requests
 import json
-import asyncio
-import aiohttp
-from typing import List, Optional, Union, Dict, Any
+from typing import List, Optional, Union, Dict, Any, AsyncIterator
 
 from ..llm_base import (
     BaseLLMClient, LLMConfig, LLMResponse, LLMMessage, LLMUsage, 
     LLMProvider, LLMErrorType, create_error_response
 )
+from ..async_http import post_json, stream_text, request_timeout, error_type_for_exception
+from ...shared.deadline import clamp_timeout
 
 logger = logging.getLogger(__name__)
 
@@ -51,6 +51,20 @@ class OllamaClient(BaseLLMClient):
         
         logger.info(f"🤖 Ollama客户端已初始化: {config.model_name} @ {self.base_url}")
     
+    def _build_request_data(self, messages: Union[str, List[LLMMessage]], temperature: Optional[float],
+                            max_tokens: Optional[int], kwargs: Dict[str, Any], stream: bool = False) -> Dict[str, Any]:
+        """构建 /api/chat 请求参数（同步、异步与流式接口共用）"""
+        prepared_messages = self._prepare_messages(messages)
+        return {
+            "model": kwargs.get('model') or self.config.model_name,
+            "messages": [{"role": msg.role, "content": msg.content} for msg in prepared_messages],
+            "stream": stream,
+            "options": {
+                "temperature": temperature or self.config.temperature,
+                "num_predict": max_tokens or self.config.max_tokens
+            }
+        }
+    
     def chat_completion(self, 
                        messages: Union[str, List[LLMMessage]], 
                        temperature: Optional[float] = None,
@@ -71,34 +85,15 @@ class OllamaClient(BaseLLMClient):
         start_time = time.time()
         
         try:
-            # 准备消息格式
-            prepared_messages = self._prepare_messages(messages)
-            
-            # 转换为Ollama API格式
-            ollama_messages = []
-            for msg in prepared_messages:
-                ollama_messages.append({
-                    "role": msg.role,
-                    "content": msg.content
-                })
-            
             # 构建请求参数
-            request_data = {
-                "model": kwargs.get('model') or self.config.model_name,
-                "messages": ollama_messages,
-                "stream": False,  # 不使用流式响应
-                "options": {
-                    "temperature": temperature or self.config.temperature,
-                    "num_predict": max_tokens or self.config.max_tokens
-                }
-            }
+            request_data = self._build_request_data(messages, temperature, max_tokens, kwargs)
             
             # 调用Ollama API
             logger.debug(f"🤖 调用Ollama API: {request_data['model']}")
             response = self.session.post(
                 f"{self.base_url}/api/chat",
                 json=request_data,
-                timeout=self.timeout
+                timeout=clamp_timeout(self.timeout)
             )
             
             response_time = time.time() - start_time
@@ -207,163 +202,122 @@ class OllamaClient(BaseLLMClient):
         start_time = time.time()
         
         try:
-            # 准备消息格式
-            prepared_messages = self._prepare_messages(messages)
-            
-            # 转换为Ollama API格式
-            ollama_messages = []
-            for msg in prepared_messages:
-                ollama_messages.append({
-                    "role": msg.role,
-                    "content": msg.content
-                })
-            
             # 构建请求参数
-            request_data = {
-                "model": kwargs.get('model') or self.config.model_name,
-                "messages": ollama_messages,
-                "stream": False,  # 不使用流式响应
-                "options": {
-                    "temperature": temperature or self.config.temperature,
-                    "num_predict": max_tokens or self.config.max_tokens
-                }
-            }
+            request_data = self._build_request_data(messages, temperature, max_tokens, kwargs)
             
-            # 异步调用Ollama API
+            # 异步调用Ollama API（共享连接池）
             logger.debug(f"🤖 异步调用Ollama API: {request_data['model']}")
+            status_code, response_data = await post_json(
+                self.provider.value, f"{self.base_url}/api/chat", request_data,
+                timeout=request_timeout(self.config.timeout, kwargs.get('timeout'))
+            )
+            response_time = time.time() - start_time
             
-            timeout = aiohttp.ClientTimeout(total=self.timeout)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.post(
-                    f"{self.base_url}/api/chat",
-                    json=request_data
-                ) as response:
-                    response_time = time.time() - start_time
-                    
-                    # 检查响应状态
-                    if response.status != 200:
-                        return await self._handle_async_error_response(response, response_time)
-                    
-                    # 解析响应
-                    response_data = await response.json()
-                    content = response_data.get("message", {}).get("content", "")
-                    
-                    # 构建使用统计（Ollama通常不返回详细的token统计）
-                    usage = None
-                    if "usage" in response_data:
-                        usage_data = response_data["usage"]
-                        usage = LLMUsage(
-                            prompt_tokens=usage_data.get("prompt_tokens", 0),
-                            completion_tokens=usage_data.get("completion_tokens", 0),
-                            total_tokens=usage_data.get("total_tokens", 0)
-                        )
-                    
-                    # 构建响应对象
-                    llm_response = LLMResponse(
-                        success=True,
-                        content=content,
-                        provider=self.provider.value,
-                        model=request_data["model"],
-                        response_time=response_time,
-                        usage=usage,
-                        finish_reason=response_data.get("done_reason"),
-                        raw_response=response_data
-                    )
-                    
-                    # 更新统计
-                    self._update_stats(llm_response)
-                    
-                    logger.info(f"✅ Ollama异步API调用成功: {content[:50]}...")
-                    return llm_response
+            # 检查响应状态
+            if status_code != 200:
+                error_response = self._error_response(status_code, response_data, response_time)
+                self._update_stats(error_response)
+                return error_response
             
-        except asyncio.TimeoutError as e:
-            response_time = time.time() - start_time
-            error_response = create_error_response(
-                provider=self.provider.value,
-                error_type=LLMErrorType.TIMEOUT_ERROR,
-                error_message=f"Ollama异步请求超时: {str(e)}",
-                response_time=response_time
-            )
-            self._update_stats(error_response)
-            logger.error(f"❌ Ollama异步请求超时: {e}")
-            return error_response
+            content = response_data.get("message", {}).get("content", "")
             
-        except aiohttp.ClientError as e:
-            response_time = time.time() - start_time
-            error_response = create_error_response(
+            # 构建使用统计（Ollama通常不返回详细的token统计）
+            usage = None
+            if "usage" in response_data:
+                usage_data = response_data["usage"]
+                usage = LLMUsage(
+                    prompt_tokens=usage_data.get("prompt_tokens", 0),
+                    completion_tokens=usage_data.get("completion_tokens", 0),
+                    total_tokens=usage_data.get("total_tokens", 0)
+                )
+            
+            # 构建响应对象
+            llm_response = LLMResponse(
+                success=True,
+                content=content,
                 provider=self.provider.value,
-                error_type=LLMErrorType.NETWORK_ERROR,
-                error_message=f"Ollama异步网络错误: {str(e)}",
-                response_time=response_time
+                model=request_data["model"],
+                response_time=response_time,
+                usage=usage,
+                finish_reason=response_data.get("done_reason"),
+                raw_response=response_data
             )
-            self._update_stats(error_response)
-            logger.error(f"❌ Ollama异步网络错误: {e}")
-            return error_response
+            
+            # 更新统计
+            self._update_stats(llm_response)
+            
+            logger.info(f"✅ Ollama异步API调用成功: {content[:50]}...")
+            return llm_response
             
         except Exception as e:
             response_time = time.time() - start_time
             error_response = create_error_response(
                 provider=self.provider.value,
-                error_type=LLMErrorType.UNKNOWN_ERROR,
-                error_message=f"Ollama异步未知错误: {str(e)}",
+                error_type=error_type_for_exception(e),
+                error_message=f"Ollama异步请求失败: {type(e).__name__}: {e}",
                 response_time=response_time
             )
             self._update_stats(error_response)
-            logger.error(f"❌ Ollama异步未知错误: {e}")
+            logger.error(f"❌ {error_response.error_message}")
             return error_response
     
-    async def _handle_async_error_response(self, response: aiohttp.ClientResponse, response_time: float) -> LLMResponse:
-        """处理异步错误响应"""
-        error_type = LLMErrorType.UNKNOWN_ERROR
-        
-        if response.status == 404:
-            error_type = LLMErrorType.MODEL_ERROR
-            error_message = f"模型未找到: {self.config.model_name}"
-        elif response.status == 400:
-            error_type = LLMErrorType.INVALID_REQUEST
-            error_message = "请求参数无效"
-        elif response.status >= 500:
-            error_type = LLMErrorType.SERVER_ERROR
-            error_message = f"Ollama服务器错误: {response.status}"
-        else:
-            error_message = f"HTTP错误: {response.status}"
-        
-        try:
-            error_data = await response.json()
-            if "error" in error_data:
-                error_message = error_data["error"]
-        except:
-            pass
+    def astream_chat_completion(self, 
+                                messages: Union[str, List[LLMMessage]], 
+                                temperature: Optional[float] = None,
+                                max_tokens: Optional[int] = None,
+                                **kwargs) -> AsyncIterator[str]:
+        """
+        Ollama流式聊天完成接口实现（逐行 JSON，每行携带一段 message.content）
         
-        return create_error_response(
-            provider=self.provider.value,
-            error_type=error_type,
-            error_message=error_message,
-            response_time=response_time
-        )
+        Args:
+            messages: 消息内容
+            temperature: 温度参数
+            max_tokens: 最大token数
+            **kwargs: 其他参数（timeout: 本次调用的超时秒数）
+            
+        Returns:
+            AsyncIterator[str]: 回答文本片段（关闭迭代器即关闭连接）
+        """
+        request_data = self._build_request_data(messages, temperature, max_tokens, kwargs, stream=True)
+        logger.debug(f"🌊 流式调用Ollama API: {request_data['model']}")
+        return stream_text(self, f"{self.base_url}/api/chat", request_data, None,
+                           request_timeout(self.config.timeout, kwargs.get('timeout')),
+                           self._stream_delta)
+    
+    @staticmethod
+    def _stream_delta(line: str) -> Optional[str]:
+        """流式响应行 -> 文本片段"""
+        chunk = json.loads(line)
+        if chunk.get("error"):
+            raise ConnectionError(chunk["error"])
+        return chunk.get("message", {}).get("content")
     
     def _handle_error_response(self, response: requests.Response, response_time: float) -> LLMResponse:
         """处理错误响应"""
+        try:
+            error_data = response.json()
+        except:
+            error_data = {}
+        return self._error_response(response.status_code, error_data, response_time)
+    
+    def _error_response(self, status_code: int, error_data: Any, response_time: float) -> LLMResponse:
+        """根据状态码与响应体构建错误响应（同步与异步接口共用）"""
         error_type = LLMErrorType.UNKNOWN_ERROR
         
-        if response.status_code == 404:
+        if status_code == 404:
             error_type = LLMErrorType.MODEL_ERROR
             error_message = f"模型未找到: {self.config.model_name}"
-        elif response.status_code == 400:
+        elif status_code == 400:
             error_type = LLMErrorType.INVALID_REQUEST
             error_message = "请求参数无效"
-        elif response.status_code >= 500:
+        elif status_code >= 500:
             error_type = LLMErrorType.SERVER_ERROR
-            error_message = f"Ollama服务器错误: {response.status_code}"
+            error_message = f"Ollama服务器错误: {status_code}"
         else:
-            error_message = f"HTTP错误: {response.status_code}"
+            error_message = f"HTTP错误: {status_code}"
         
-        try:
-            error_data = response.json()
-            if "error" in error_data:
-                error_message = error_data["error"]
-        except:
-            pass
+        if isinstance(error_data, dict) and "error" in error_data:
+            error_message = error_data["error"]
         
         return create_error_response(
             provider=self.provider.value,
@@ -437,6 +391,7 @@ class OllamaClient(BaseLLMClient):
         return [
             "chat_completion", 
             "text_generation",
+            "streaming",
             "local_inference",  # 本地推理
             "offline_usage",    # 离线使用
             "open_source",      # 开源模型
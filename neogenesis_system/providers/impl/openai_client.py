@@ -8,7 +8,7 @@ OpenAI Client Implementation - Unified LLM Interface
 
 import time
 import logging
-from typing import List, Optional, Union, Dict, Any
+from typing import List, Optional, Union, Dict, Any, Tuple, AsyncIterator
 
 try:
     import openai
@@ -21,6 +21,11 @@ from ..llm_base import (
     BaseLLMClient, LLMConfig, LLMResponse, LLMMessage, LLMUsage, 
     LLMProvider, LLMErrorType, create_error_response
 )
+from ..async_http import (
+    HTTPX_AVAILABLE, post_json, stream_text, sse_data, request_timeout,
+    error_type_for_status, error_type_for_exception, error_message_from_body
+)
+from ...shared.deadline import clamp_timeout
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +39,7 @@ class OpenAIClient(BaseLLMClient):
     - Azure OpenAI服务
     - 完整的聊天完成功能
     - 错误处理和重试机制
+    - 原生异步接口（httpx 共享连接池，不依赖 openai 库）
     """
     
     def __init__(self, config: LLMConfig):
@@ -43,29 +49,32 @@ class OpenAIClient(BaseLLMClient):
         Args:
             config: LLM配置对象
         """
-        if not OPENAI_AVAILABLE:
+        if not OPENAI_AVAILABLE and not HTTPX_AVAILABLE:
             raise ImportError("OpenAI库未安装。请运行: pip install openai")
         
         super().__init__(config)
+        self.client = None
         
         # 根据提供商类型创建客户端
         if config.provider == LLMProvider.AZURE_OPENAI:
             # Azure OpenAI配置
-            azure_endpoint = config.base_url or config.extra_params.get('azure_endpoint')
-            api_version = config.extra_params.get('api_version', '2024-02-15-preview')
+            extra_params = config.extra_params or {}
+            azure_endpoint = config.base_url or extra_params.get('azure_endpoint')
+            api_version = extra_params.get('api_version', '2024-02-15-preview')
             
             if not azure_endpoint:
                 raise ValueError("Azure OpenAI需要提供base_url或azure_endpoint")
             
-            self.client = AzureOpenAI(
-                api_key=config.api_key,
-                azure_endpoint=azure_endpoint,
-                api_version=api_version,
-                timeout=config.timeout[1]  # 使用读取超时
-            )
-            logger.info(f"🤖 Azure OpenAI客户端已初始化: {azure_endpoint}")
-            
-        else:
+            if OPENAI_AVAILABLE:
+                self.client = AzureOpenAI(
+                    api_key=config.api_key,
+                    azure_endpoint=azure_endpoint,
+                    api_version=api_version,
+                    timeout=config.timeout[1]  # 使用读取超时
+                )
+                logger.info(f"🤖 Azure OpenAI客户端已初始化: {azure_endpoint}")
+        
+        elif OPENAI_AVAILABLE:
             # 标准OpenAI配置
             self.client = OpenAI(
                 api_key=config.api_key,
@@ -74,6 +83,38 @@ class OpenAIClient(BaseLLMClient):
                 max_retries=config.max_retries
             )
             logger.info(f"🤖 OpenAI客户端已初始化: {config.model_name}")
+        
+        if self.client is None:
+            logger.warning("⚠️ OpenAI库未安装，仅异步接口可用。请运行: pip install openai")
+    
+    def _build_params(self, messages: Union[str, List[LLMMessage]], temperature: Optional[float],
+                      max_tokens: Optional[int], kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """构建 Chat Completions 请求参数（同步与异步接口共用）"""
+        prepared_messages = self._prepare_messages(messages)
+        return {
+            "model": kwargs.get('model') or self.config.model_name,
+            "messages": [{"role": msg.role, "content": msg.content} for msg in prepared_messages],
+            "temperature": temperature or self.config.temperature,
+            "max_tokens": max_tokens or self.config.max_tokens,
+            "top_p": kwargs.get('top_p') or self.config.top_p,
+            "frequency_penalty": kwargs.get('frequency_penalty') or self.config.frequency_penalty,
+            "presence_penalty": kwargs.get('presence_penalty') or self.config.presence_penalty
+        }
+    
+    def _async_endpoint(self, model: str) -> Tuple[str, Dict[str, str]]:
+        """异步接口的请求地址与认证头"""
+        if self.config.provider == LLMProvider.AZURE_OPENAI:
+            extra_params = self.config.extra_params or {}
+            endpoint = (self.config.base_url or extra_params.get('azure_endpoint')).rstrip('/')
+            api_version = extra_params.get('api_version', '2024-02-15-preview')
+            url = f"{endpoint}/openai/deployments/{model}/chat/completions?api-version={api_version}"
+            headers = {"api-key": self.config.api_key}
+        else:
+            base_url = (self.config.base_url or "https://api.openai.com/v1").rstrip('/')
+            url = f"{base_url}/chat/completions"
+            headers = {"Authorization": f"Bearer {self.config.api_key}"}
+        headers.update(self.config.extra_headers or {})
+        return url, headers
     
     def chat_completion(self, 
                        messages: Union[str, List[LLMMessage]], 
@@ -94,30 +135,23 @@ class OpenAIClient(BaseLLMClient):
         """
         start_time = time.time()
         
+        if self.client is None:
+            error_response = create_error_response(
+                provider=self.provider.value,
+                error_type=LLMErrorType.UNKNOWN_ERROR,
+                error_message="OpenAI库未安装，同步接口不可用。请运行: pip install openai"
+            )
+            self._update_stats(error_response)
+            return error_response
+        
         try:
-            # 准备消息格式
-            prepared_messages = self._prepare_messages(messages)
-            
-            # 转换为OpenAI API格式
-            openai_messages = []
-            for msg in prepared_messages:
-                openai_messages.append({
-                    "role": msg.role,
-                    "content": msg.content
-                })
-            
-            # 参数处理
-            params = {
-                "model": kwargs.get('model') or self.config.model_name,
-                "messages": openai_messages,
-                "temperature": temperature or self.config.temperature,
-                "max_tokens": max_tokens or self.config.max_tokens,
-                "top_p": kwargs.get('top_p') or self.config.top_p,
-                "frequency_penalty": kwargs.get('frequency_penalty') or self.config.frequency_penalty,
-                "presence_penalty": kwargs.get('presence_penalty') or self.config.presence_penalty
-            }
+            # 准备消息与参数
+            params = self._build_params(messages, temperature, max_tokens, kwargs)
             
             # 调用OpenAI API
+            # 按当前截止时间收紧单次请求超时
+            params["timeout"] = clamp_timeout(self.config.timeout[1])
+            
             logger.debug(f"🤖 调用OpenAI API: {params['model']}")
             response = self.client.chat.completions.create(**params)
             
@@ -214,6 +248,109 @@ class OpenAIClient(BaseLLMClient):
             logger.error(f"❌ OpenAI未知错误: {e}")
             return error_response
     
+    async def achat_completion(self,
+                              messages: Union[str, List[LLMMessage]],
+                              temperature: Optional[float] = None,
+                              max_tokens: Optional[int] = None,
+                              **kwargs) -> LLMResponse:
+        """
+        OpenAI异步聊天完成接口实现（httpx 共享连接池，支持取消）
+        
+        Args:
+            messages: 消息内容
+            temperature: 温度参数
+            max_tokens: 最大token数
+            **kwargs: 其他参数（timeout: 本次调用的超时秒数）
+        
+        Returns:
+            LLMResponse: 统一的响应对象
+        """
+        start_time = time.time()
+        
+        try:
+            params = self._build_params(messages, temperature, max_tokens, kwargs)
+            url, headers = self._async_endpoint(params["model"])
+            
+            logger.debug(f"🤖 异步调用OpenAI API: {params['model']}")
+            status_code, data = await post_json(
+                self.provider.value, url, params, headers,
+                timeout=request_timeout(self.config.timeout, kwargs.get('timeout'))
+            )
+            response_time = time.time() - start_time
+            
+            if status_code == 200:
+                choice = data["choices"][0]
+                content = choice["message"].get("content") or ""
+                usage_data = data.get("usage")
+                llm_response = LLMResponse(
+                    success=True,
+                    content=content,
+                    provider=self.provider.value,
+                    model=data.get("model", params["model"]),
+                    response_time=response_time,
+                    usage=LLMUsage(
+                        prompt_tokens=usage_data.get("prompt_tokens", 0),
+                        completion_tokens=usage_data.get("completion_tokens", 0),
+                        total_tokens=usage_data.get("total_tokens", 0)
+                    ) if usage_data else None,
+                    finish_reason=choice.get("finish_reason"),
+                    raw_response=data
+                )
+                self._update_stats(llm_response)
+                logger.info(f"✅ OpenAI异步API调用成功: {content[:50]}...")
+                return llm_response
+            
+            error_response = create_error_response(
+                provider=self.provider.value,
+                error_type=error_type_for_status(status_code),
+                error_message=f"OpenAI API错误 {status_code}: {error_message_from_body(data, status_code)}",
+                response_time=response_time
+            )
+        
+        except Exception as e:
+            error_response = create_error_response(
+                provider=self.provider.value,
+                error_type=error_type_for_exception(e),
+                error_message=f"OpenAI异步请求失败: {type(e).__name__}: {e}",
+                response_time=time.time() - start_time
+            )
+        
+        self._update_stats(error_response)
+        logger.error(f"❌ {error_response.error_message}")
+        return error_response
+    
+    def astream_chat_completion(self,
+                                messages: Union[str, List[LLMMessage]],
+                                temperature: Optional[float] = None,
+                                max_tokens: Optional[int] = None,
+                                **kwargs) -> AsyncIterator[str]:
+        """
+        OpenAI流式聊天完成接口实现（SSE，每个 data: 行携带一段 delta，以 [DONE] 结束）
+        
+        Args:
+            messages: 消息内容
+            temperature: 温度参数
+            max_tokens: 最大token数
+            **kwargs: 其他参数（timeout: 本次调用的超时秒数）
+        
+        Returns:
+            AsyncIterator[str]: 回答文本片段（关闭迭代器即关闭连接）
+        """
+        params = self._build_params(messages, temperature, max_tokens, kwargs)
+        params["stream"] = True
+        url, headers = self._async_endpoint(params["model"])
+        logger.debug(f"🌊 流式调用OpenAI API: {params['model']}")
+        return stream_text(self, url, params, headers,
+                           request_timeout(self.config.timeout, kwargs.get('timeout')),
+                           self._stream_delta)
+    
+    @staticmethod
+    def _stream_delta(line: str) -> Optional[str]:
+        """SSE 行 -> 文本片段"""
+        event = sse_data(line)
+        choices = event.get("choices") if event else None
+        return choices[0].get("delta", {}).get("content") if choices else None
+    
     def validate_config(self) -> bool:
         """
         验证OpenAI配置是否有效
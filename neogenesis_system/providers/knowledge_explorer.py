@@ -19,11 +19,22 @@ import random
 import logging
 import asyncio
 import hashlib
-from typing import Dict, List, Optional, Any, Tuple, Union
+import threading
+import contextvars
+import pickle
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from concurrent.futures import BrokenExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, List, Optional, Any, Tuple, Union
 from dataclasses import dataclass, field
 from enum import Enum
 from collections import defaultdict
 import json
+from .novelty_index import MinHashLSHIndex
+from ..shared.deadline import (
+    Deadline, DeadlineExceeded, deadline_scope, check_current_deadline, clamp_timeout,
+    get_current_deadline
+)
+
 logger = logging.getLogger(__name__)
 try:
     from .search_tools import WebSearchClient
@@ -51,6 +62,13 @@ class ExplorationStrategy(Enum):
     COMPETITIVE_INTELLIGENCE = "competitive_intelligence" # 竞争情报分析
 
 
+class ExplorationPriority(float, Enum):
+    """探索目标优先级（取值即 ExplorationTarget.priority 的 0-1 分值）"""
+    HIGH = 0.9      # 用户核心查询
+    MEDIUM = 0.6    # 用户查询的上下文/验证扩展
+    LOW = 0.3       # 系统自主探索
+
+
 class KnowledgeQuality(Enum):
     """知识质量等级"""
     EXCELLENT = "excellent"     # 优秀：高可信度、高创新性
@@ -141,6 +159,61 @@ class ExplorationResult:
     context: Dict[str, Any] = field(default_factory=dict)
 
 
+def extract_trend_keywords(contents: List[str], top_k: int = 5) -> List[str]:
+    """
+    从知识内容中提取趋势关键词（纯函数，可在进程池中执行）
+    
+    Args:
+        contents: 知识内容文本列表
+        top_k: 返回的关键词数量上限
+        
+    Returns:
+        出现多于一次的高频关键词
+    """
+    keyword_frequency = defaultdict(int)
+    
+    for content in contents:
+        words = content.lower().split()
+        for word in words:
+            if len(word) > 3:  # 过滤短词
+                keyword_frequency[word] += 1
+    
+    # 返回频次最高的关键词
+    sorted_keywords = sorted(keyword_frequency.items(), key=lambda x: x[1], reverse=True)
+    return [word for word, freq in sorted_keywords[:top_k] if freq > 1]
+
+
+def analyze_trends(items: List[Tuple[str, str]], identified_at: float, max_trends: int = 3) -> List[Dict[str, Any]]:
+    """
+    趋势分析（纯函数，可在进程池中执行）：提取趋势关键词并为每个关键词收集支撑知识
+    
+    Args:
+        items: (knowledge_id, content) 列表
+        identified_at: 识别时间戳（由调用方给出，结果与执行进程无关）
+        max_trends: 返回的趋势数量上限
+        
+    Returns:
+        趋势字典列表
+    """
+    contents = [content for _, content in items]
+    lowered = [content.lower() for content in contents]
+    trends = []
+    
+    for keyword in extract_trend_keywords(contents)[:max_trends]:
+        trends.append({
+            "trend_id": f"trend_{keyword}_{int(identified_at)}",
+            "trend_name": f"{keyword}相关趋势",
+            "confidence": 0.6,
+            "supporting_knowledge": [knowledge_id for (knowledge_id, _), content in zip(items, lowered)
+                                     if keyword in content],
+            "time_horizon": "short_term",
+            "impact_prediction": f"{keyword}将在相关领域产生重要影响",
+            "identified_at": identified_at
+        })
+    
+    return trends
+
+
 class KnowledgeExplorer:
     """
     🌐 自主知识探勘模块 - Agent的"外部智慧连接器"
@@ -163,7 +236,8 @@ class KnowledgeExplorer:
                  llm_client=None,
                  web_search_client=None,
                  semantic_analyzer=None,
-                 config: Optional[Dict[str, Any]] = None):
+                 config: Optional[Dict[str, Any]] = None,
+                 knowledge_store=None):
         """
         初始化知识探勘模块
         
@@ -172,10 +246,12 @@ class KnowledgeExplorer:
             web_search_client: 网络搜索客户端
             semantic_analyzer: 语义分析器（用于智能意图理解和策略选择）
             config: 探勘配置参数
+            knowledge_store: 本地知识库（KnowledgeStore），探索结果会增量写入其倒排索引
         """
         self.llm_client = llm_client
         self.web_search_client = web_search_client
         self.semantic_analyzer = semantic_analyzer
+        self.knowledge_store = knowledge_store
         
         # 配置参数
         self.config = {
@@ -184,7 +260,9 @@ class KnowledgeExplorer:
                 "default_strategy": ExplorationStrategy.DOMAIN_EXPANSION,
                 "strategy_rotation": True,              # 是否轮换策略
                 "max_parallel_explorations": 3,        # 最大并行探索数
-                "exploration_timeout": 120.0           # 探索超时时间
+                "exploration_timeout": 120.0,          # 探索超时时间（每次探索的截止时间）
+                "collection_budget_ratio": 0.7,        # 信息收集最多占用剩余时间的比例，其余留给知识提取
+                "trend_analysis_timeout": 30.0         # 卸载到 cpu_executor 的趋势分析最长等待时间（再受截止时间收紧）
             },
             
             # 质量控制配置
@@ -195,6 +273,15 @@ class KnowledgeExplorer:
                 "quality_decay_factor": 0.1            # 质量衰减因子
             },
             
+            # 新颖性索引配置（MinHash/LSH 近似重复检测）
+            "novelty_index": {
+                "num_perm": 64,                        # MinHash 哈希函数个数
+                "bands": 16,                           # LSH 分带数
+                "shingle_size": 3,                     # 字符分片长度
+                "duplicate_threshold": 0.8,            # 估计相似度超过该值视为重复
+                "persist_path": None                   # 签名持久化路径（None 表示仅内存）
+            },
+            
             # 种子生成配置
             "seed_generation": {
                 "max_seeds_per_exploration": 5,        # 每次探索最大种子数
@@ -208,7 +295,8 @@ class KnowledgeExplorer:
                 "enable_web_search": True,             # 启用网络搜索
                 "enable_api_calls": False,             # 启用API调用
                 "enable_database_query": False,       # 启用数据库查询
-                "max_results_per_source": 10          # 每个信息源最大结果数
+                "max_results_per_source": 10,         # 每个信息源最大结果数
+                "max_concurrent_searches": 9          # 全局搜索并发上限（所有探索共享）
             }
         }
         
@@ -229,6 +317,28 @@ class KnowledgeExplorer:
             except Exception as e:
                 logger.warning(f"⚠️ 网络搜索客户端初始化失败: {e}")
         
+        # CPU密集计算的执行器（如认知调度器的进程池），None 表示在当前线程计算
+        self.cpu_executor = None
+        # 卸载计算完成后的结果发布回调（如 StateManager.publish_cognitive_result），None 表示不发布
+        self.cpu_result_publisher: Optional[Callable[..., None]] = None
+        
+        # 共享搜索线程池（惰性创建），跨探索限制全局搜索并发
+        self._search_executor: Optional[ThreadPoolExecutor] = None
+        self._search_executor_lock = threading.Lock()
+        
+        # 新颖性索引：覆盖所有已发现知识（不随知识缓存裁剪）
+        novelty_config = self.config["novelty_index"]
+        self.novelty_index = MinHashLSHIndex(
+            num_perm=novelty_config["num_perm"],
+            bands=novelty_config["bands"],
+            shingle_size=novelty_config["shingle_size"]
+        )
+        if novelty_config["persist_path"]:
+            try:
+                self.novelty_index.load(novelty_config["persist_path"])
+            except Exception as e:
+                logger.warning(f"⚠️ 新颖性索引加载失败: {e}")
+        
         # 探索历史和统计
         self.exploration_history: List[ExplorationResult] = []
         self.knowledge_cache: Dict[str, KnowledgeItem] = {}
@@ -250,7 +360,8 @@ class KnowledgeExplorer:
             "total_knowledge_discovered": 0,
             "total_seeds_generated": 0,
             "average_quality_score": 0.0,
-            "average_execution_time": 0.0
+            "average_execution_time": 0.0,
+            "duplicate_hits_dropped": 0
         }
         
         logger.info("🌐 KnowledgeExplorer 初始化完成")
@@ -261,7 +372,8 @@ class KnowledgeExplorer:
     def explore_knowledge(self, 
                          targets: List[ExplorationTarget],
                          strategy: Optional[ExplorationStrategy] = None,
-                         user_context: Optional[Dict[str, Any]] = None) -> ExplorationResult:
+                         user_context: Optional[Dict[str, Any]] = None,
+                         deadline: Optional[Deadline] = None) -> ExplorationResult:
         """
         执行知识探勘任务 - 双轨探索系统核心入口
         
@@ -269,6 +381,7 @@ class KnowledgeExplorer:
             targets: 探索目标列表
             strategy: 探索策略（可选）
             user_context: 用户上下文（用于用户指令驱动模式）
+            deadline: 截止时间（可选），到期或被取消时在阶段间中止并返回已完成阶段的部分结果
             
         Returns:
             完整的探索结果
@@ -295,16 +408,27 @@ class KnowledgeExplorer:
             user_query = user_context.get("user_query", "")
             logger.info(f"   🎯 用户查询: {user_query[:50]}...")
         
+        # 每次探索的截止时间：exploration_timeout 与调用方截止时间取较早者，并共享调用方的取消信号
+        exploration_deadline = Deadline(
+            self.config["exploration_strategies"]["exploration_timeout"],
+            cancel_event=deadline.cancel_event if deadline else None
+        )
+        
+        # 创建探索结果对象
+        result = ExplorationResult(
+            exploration_id=exploration_id,
+            strategy=strategy,
+            targets=targets
+        )
+        
         try:
-            # 创建探索结果对象
-            result = ExplorationResult(
-                exploration_id=exploration_id,
-                strategy=strategy,
-                targets=targets
-            )
-            
-            # 执行探索流程
-            self._execute_exploration_pipeline(result)
+            # 执行探索流程（在截止时间上下文内，HTTP调用会收紧到剩余时间）
+            with deadline_scope(deadline), deadline_scope(exploration_deadline):
+                try:
+                    self._execute_exploration_pipeline(result)
+                except DeadlineExceeded as e:
+                    logger.warning(f"⏰ 知识探勘被中止: {exploration_id} - {e.reason}，返回部分结果")
+                    result.context["interrupted"] = e.reason
             
             # 计算执行统计
             result.execution_time = time.time() - start_time
@@ -338,28 +462,34 @@ class KnowledgeExplorer:
         logger.info("🔄 执行探索流水线...")
         
         # 阶段1: 信息收集
+        check_current_deadline("collect")
         logger.info("📡 阶段1: 信息收集")
-        raw_information = self._collect_information(result.targets, result.strategy)
+        raw_information = self._collect_information(result.targets, result.strategy, result.context)
         
         # 阶段2: 知识提取和质量评估
+        check_current_deadline("extract")
         logger.info("🔍 阶段2: 知识提取和质量评估")
+        raw_information = self._deduplicate_raw_information(raw_information)
         result.discovered_knowledge = self._extract_and_evaluate_knowledge(
             raw_information, result.targets
         )
         
         # 阶段3: 思维种子生成
+        check_current_deadline("seed_generation")
         logger.info("🌱 阶段3: 思维种子生成")
         result.generated_seeds = self._generate_thinking_seeds(
             result.discovered_knowledge, result.strategy
         )
         
         # 阶段4: 趋势分析
+        check_current_deadline("trend_analysis")
         logger.info("📈 阶段4: 趋势分析")
         result.identified_trends = self._analyze_trends(
             result.discovered_knowledge, result.targets
         )
         
         # 阶段5: 跨域洞察发现
+        check_current_deadline("cross_domain")
         logger.info("🔗 阶段5: 跨域洞察发现")
         result.cross_domain_insights = self._discover_cross_domain_insights(
             result.discovered_knowledge, result.generated_seeds
@@ -369,19 +499,33 @@ class KnowledgeExplorer:
     
     def _collect_information(self, 
                            targets: List[ExplorationTarget], 
-                           strategy: ExplorationStrategy) -> List[Dict[str, Any]]:
-        """信息收集阶段 - 从多个信息源获取原始信息"""
-        raw_information = []
+                           strategy: ExplorationStrategy,
+                           collection_context: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        信息收集阶段 - 从多个信息源获取原始信息
         
-        for target in targets[:self.config["exploration_strategies"]["max_parallel_explorations"]]:
-            logger.debug(f"🎯 收集目标信息: {target.target_id}")
-            
-            # 网络搜索
-            if (self.web_search_client and 
-                self.config["information_sources"]["enable_web_search"]):
-                web_results = self._search_web_information(target, strategy)
-                raw_information.extend(web_results)
-            
+        所有目标的搜索查询同时提交到共享搜索线程池（全局并发上限 max_concurrent_searches），
+        收集阶段最多占用剩余截止时间的 collection_budget_ratio，到时返回已完成的部分结果。
+        
+        Args:
+            targets: 探索目标列表
+            strategy: 探索策略
+            collection_context: 可选的上下文字典，收集不完整时写入 partial_collection 信息
+        """
+        raw_information = []
+        selected_targets = targets[:self.config["exploration_strategies"]["max_parallel_explorations"]]
+        
+        # 网络搜索：目标级 + 查询级并发
+        search_futures = {}
+        if (self.web_search_client and 
+            self.config["information_sources"]["enable_web_search"]):
+            for target in selected_targets:
+                logger.debug(f"🎯 收集目标信息: {target.target_id}")
+                for query in self._build_search_queries(target, strategy)[:3]:  # 限制查询数量
+                    future = self._submit_search(self._search_web_query, target, query)
+                    search_futures[future] = (target.target_id, query)
+        
+        for target in selected_targets:
             # API调用（预留接口）
             if self.config["information_sources"]["enable_api_calls"]:
                 api_results = self._query_api_sources(target, strategy)
@@ -392,43 +536,79 @@ class KnowledgeExplorer:
                 db_results = self._query_database_sources(target, strategy)
                 raw_information.extend(db_results)
         
+        if search_futures:
+            done, pending = wait(search_futures, timeout=self._collection_budget())
+            for future in done:
+                raw_information.extend(future.result())
+            
+            if pending:
+                for future in pending:
+                    future.cancel()  # 尚未开始的查询直接放弃；执行中的查询受截止时间约束自行结束
+                logger.warning(f"⏰ 信息收集到达截止时间: {len(pending)}/{len(search_futures)} 个搜索未完成，"
+                               f"返回部分结果")
+                if collection_context is not None:
+                    collection_context["partial_collection"] = {
+                        "completed_searches": len(done),
+                        "pending_searches": len(pending),
+                        "pending_queries": [search_futures[future][1] for future in pending]
+                    }
+        
         logger.info(f"📡 信息收集完成: 获取 {len(raw_information)} 条原始信息")
         return raw_information
     
-    def _search_web_information(self, 
-                              target: ExplorationTarget, 
-                              strategy: ExplorationStrategy) -> List[Dict[str, Any]]:
-        """执行网络搜索"""
-        if not self.web_search_client:
-            return []
-        
+    def _submit_search(self, fn, *args) -> Future:
+        """提交搜索任务到共享线程池，并带上当前上下文（截止时间随之传递）"""
+        with self._search_executor_lock:
+            if self._search_executor is None:
+                self._search_executor = ThreadPoolExecutor(
+                    max_workers=self.config["information_sources"]["max_concurrent_searches"],
+                    thread_name_prefix="KnowledgeSearch"
+                )
+        return self._search_executor.submit(contextvars.copy_context().run, fn, *args)
+    
+    def _collection_budget(self) -> Optional[float]:
+        """信息收集阶段可用的等待时间（None 表示不限时）"""
+        deadline = get_current_deadline()
+        remaining = deadline.remaining() if deadline else None
+        if remaining is None:
+            return None
+        return remaining * self.config["exploration_strategies"]["collection_budget_ratio"]
+    
+    def _search_web_query(self, target: ExplorationTarget, query: str) -> List[Dict[str, Any]]:
+        """执行单条网络搜索查询"""
         try:
-            # 构建搜索查询
-            search_queries = self._build_search_queries(target, strategy)
-            web_results = []
+            check_current_deadline("web_search")
+            logger.debug(f"🔍 搜索查询: {query}")
             
-            for query in search_queries[:3]:  # 限制查询数量
-                logger.debug(f"🔍 搜索查询: {query}")
-                
-                results = self.web_search_client.search(query)
-                for result in results:
-                    web_results.append({
-                        "content": result.get("snippet", ""),
-                        "title": result.get("title", ""),
-                        "url": result.get("link", ""),
-                        "source": "web_search",
-                        "query": query,
-                        "target_id": target.target_id,
-                        "collected_at": time.time()
-                    })
+            response = self.web_search_client.search(query)
+            web_results = []
+            for result in response.results:
+                web_results.append({
+                    "content": result.snippet,
+                    "title": result.title,
+                    "url": result.url,
+                    "source": "web_search",
+                    "query": query,
+                    "target_id": target.target_id,
+                    "collected_at": time.time()
+                })
             
             logger.debug(f"🌐 网络搜索完成: {len(web_results)} 条结果")
             return web_results
             
+        except DeadlineExceeded:
+            return []
         except Exception as e:
             logger.error(f"❌ 网络搜索失败: {e}")
             return []
     
+    def shutdown(self):
+        """关闭共享搜索线程池"""
+        with self._search_executor_lock:
+            if self._search_executor is not None:
+                self._search_executor.shutdown(wait=False, cancel_futures=True)
+                self._search_executor = None
+    
     def _build_search_queries(self, 
                             target: ExplorationTarget, 
                             strategy: ExplorationStrategy) -> List[str]:
@@ -437,12 +617,12 @@ class KnowledgeExplorer:
         queries = []
         
         # 🎯 根据探索模式和优先级调整搜索策略
-        is_user_directed = target.metadata.get("exploration_mode") == "user_directed"
+        is_user_directed = target.context.get("exploration_mode") == "user_directed"
         priority_level = target.priority
-        target_type = target.metadata.get("target_type", "general")
-        user_query = target.metadata.get("user_query", "")
+        target_type = target.context.get("target_type", "general")
+        user_query = target.context.get("user_query", "")
         
-        logger.debug(f"🔍 构建搜索查询: 模式={target.metadata.get('exploration_mode')}, "
+        logger.debug(f"🔍 构建搜索查询: 模式={target.context.get('exploration_mode')}, "
                     f"优先级={priority_level}, 查询='{user_query[:30]}...'")
         
         # 🧠 优先尝试语义增强的查询构建
@@ -471,6 +651,10 @@ class KnowledgeExplorer:
         else:
             max_queries = 4  # 低优先级限制查询数量
         
+        # 没有匹配的查询模板时，直接使用目标关键词作为查询
+        if not queries:
+            queries = [keyword for keyword in base_keywords if keyword]
+        
         final_queries = queries[:max_queries]
         logger.debug(f"🔍 最终生成 {len(final_queries)} 个搜索查询 (最大: {max_queries})")
         return final_queries
@@ -511,7 +695,7 @@ class KnowledgeExplorer:
             
             # 基于语义分析结果生成查询
             semantic_queries = self._generate_queries_from_semantics(
-                user_query, intent, domain, semantic_keywords, strategy, target.metadata
+                user_query, intent, domain, semantic_keywords, strategy, target.context
             )
             
             return semantic_queries
@@ -664,7 +848,7 @@ class KnowledgeExplorer:
     def _build_traditional_queries(self, target: ExplorationTarget, strategy: ExplorationStrategy, 
                                  base_keywords: List[str]) -> List[str]:
         """🔄 传统查询构建方法（回退机制）"""
-        is_user_directed = target.metadata.get("exploration_mode") == "user_directed"
+        is_user_directed = target.context.get("exploration_mode") == "user_directed"
         
         if is_user_directed:
             # 用户指令驱动：深入、多样化、高质量搜索
@@ -678,11 +862,11 @@ class KnowledgeExplorer:
                                    base_keywords: List[str]) -> List[str]:
         """🎯 构建用户指令驱动的深入、多样化搜索查询"""
         queries = []
-        search_depth = target.metadata.get("search_depth", "comprehensive")
-        target_type = target.metadata.get("target_type", "primary_focus")
+        search_depth = target.context.get("search_depth", "comprehensive")
+        target_type = target.context.get("target_type", "primary_focus")
         
         # 获取用户查询原文
-        user_query = target.metadata.get("user_query", "")
+        user_query = target.context.get("user_query", "")
         core_keywords = base_keywords[:4]  # 使用前4个关键词
         
         if target_type == "primary_focus":
@@ -704,7 +888,7 @@ class KnowledgeExplorer:
                                 base_keywords: List[str]) -> List[str]:
         """🔄 构建系统自主的宽泛、探索性搜索查询"""
         queries = []
-        target_type = target.metadata.get("target_type", "general")
+        target_type = target.context.get("target_type", "general")
         core_keywords = base_keywords[:3]  # 自主探索使用较少关键词
         
         if target_type == "knowledge_gap_filling":
@@ -985,26 +1169,38 @@ class KnowledgeExplorer:
             return 0.8
     
     def _assess_content_novelty(self, content: str) -> float:
-        """评估内容新颖性"""
-        # 检查是否与已有知识重复
-        for cached_item in list(self.knowledge_cache.values())[-10:]:  # 检查最近10项
-            if self._calculate_content_similarity(content, cached_item.content) > 0.8:
-                return 0.2  # 高度相似，新颖性低
+        """评估内容新颖性（基于新颖性索引检查是否与已有知识重复）"""
+        threshold = self.config["novelty_index"]["duplicate_threshold"]
+        if self.novelty_index.max_similarity(content) > threshold:
+            return 0.2  # 高度相似，新颖性低
         
         return 0.6  # 默认中等新颖性
     
-    def _calculate_content_similarity(self, content1: str, content2: str) -> float:
-        """计算内容相似性（简化实现）"""
-        words1 = set(content1.lower().split())
-        words2 = set(content2.lower().split())
-        
-        if not words1 or not words2:
-            return 0.0
+    def _deduplicate_raw_information(self, raw_information: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """去除同一批原始搜索结果中的近似重复项（不同查询常命中同一页面）"""
+        novelty_config = self.config["novelty_index"]
+        batch_index = MinHashLSHIndex(
+            num_perm=novelty_config["num_perm"],
+            bands=novelty_config["bands"],
+            shingle_size=novelty_config["shingle_size"]
+        )
         
-        intersection = words1.intersection(words2)
-        union = words1.union(words2)
+        unique_information = []
+        for position, info in enumerate(raw_information):
+            content = info.get("content", "")
+            signature = batch_index.signature(content)
+            if (signature is not None and
+                    batch_index.max_similarity(content, signature) > novelty_config["duplicate_threshold"]):
+                continue
+            if signature is not None:
+                batch_index.add(str(position), content, signature)
+            unique_information.append(info)
         
-        return len(intersection) / len(union) if union else 0.0
+        dropped = len(raw_information) - len(unique_information)
+        if dropped:
+            self.stats["duplicate_hits_dropped"] += dropped
+            logger.debug(f"🧹 原始信息去重: 移除 {dropped} 条近似重复结果")
+        return unique_information
     
     def _passes_quality_filter(self, knowledge_item: KnowledgeItem) -> bool:
         """知识质量过滤器"""
@@ -1190,41 +1386,52 @@ class KnowledgeExplorer:
     def _analyze_trends(self, 
                        knowledge_items: List[KnowledgeItem], 
                        targets: List[ExplorationTarget]) -> List[Dict[str, Any]]:
-        """分析识别的趋势"""
-        trends = []
-        
-        # 基于知识内容识别趋势关键词
-        trend_keywords = self._extract_trend_keywords(knowledge_items)
-        
-        for keyword in trend_keywords[:3]:  # 限制趋势数量
-            trend = {
-                "trend_id": f"trend_{keyword}_{int(time.time())}",
-                "trend_name": f"{keyword}相关趋势",
-                "confidence": 0.6,
-                "supporting_knowledge": [k.knowledge_id for k in knowledge_items 
-                                       if keyword.lower() in k.content.lower()],
-                "time_horizon": "short_term",
-                "impact_prediction": f"{keyword}将在相关领域产生重要影响",
-                "identified_at": time.time()
-            }
-            trends.append(trend)
+        """
+        分析识别的趋势
+        
+        配置了 cpu_executor 时整体卸载到执行器，最多等待 trend_analysis_timeout（受当前截止时间收紧）：
+        截止时间已到时抛出 DeadlineExceeded（探索返回部分结果），仅等待超时则放弃趋势返回空列表，
+        都不会在当前线程重新计算；只有执行器损坏、已关闭或载荷无法 pickle 时才回退到当前线程。
+        卸载计算的结果（包括等待超时后才完成的）同时通过 cpu_result_publisher 发布。
+        """
+        items = [(item.knowledge_id, item.content) for item in knowledge_items]
+        identified_at = time.time()
+        trends = None
+        
+        if self.cpu_executor is not None and items:
+            timeout = clamp_timeout(self.config["exploration_strategies"]["trend_analysis_timeout"])
+            try:
+                future = self.cpu_executor.submit(analyze_trends, items, identified_at)
+                self._publish_offloaded_trends(future, identified_at, len(items))
+                trends = future.result(timeout=timeout)
+            except FutureTimeoutError:
+                future.cancel()
+                check_current_deadline("trend_analysis")
+                logger.warning(f"⏰ 趋势分析卸载计算超时 ({timeout:.1f}s)，跳过趋势分析")
+                return []
+            except (BrokenExecutor, RuntimeError, pickle.PicklingError, TypeError, AttributeError) as e:
+                logger.warning(f"⚠️ 趋势分析卸载计算失败，回退到当前线程: {e}")
+        
+        if trends is None:
+            trends = analyze_trends(items, identified_at)
         
         logger.info(f"📈 趋势分析完成: 识别 {len(trends)} 个趋势")
         return trends
     
-    def _extract_trend_keywords(self, knowledge_items: List[KnowledgeItem]) -> List[str]:
-        """提取趋势关键词"""
-        keyword_frequency = defaultdict(int)
+    def _publish_offloaded_trends(self, future: Future, submitted_at: float, knowledge_count: int):
+        """卸载的趋势分析完成时发布结果（已取消或失败的计算不发布）"""
+        publisher = self.cpu_result_publisher
+        if publisher is None:
+            return
         
-        for item in knowledge_items:
-            words = item.content.lower().split()
-            for word in words:
-                if len(word) > 3:  # 过滤短词
-                    keyword_frequency[word] += 1
+        def on_done(done: Future):
+            if done.cancelled() or done.exception() is not None:
+                return
+            publisher(f"trend_analysis_{int(submitted_at * 1000)}", "trend_analysis",
+                      {"identified_trends": done.result(), "knowledge_count": knowledge_count},
+                      execution_time=time.time() - submitted_at)
         
-        # 返回频次最高的关键词
-        sorted_keywords = sorted(keyword_frequency.items(), key=lambda x: x[1], reverse=True)
-        return [word for word, freq in sorted_keywords[:5] if freq > 1]
+        future.add_done_callback(on_done)
     
     def _discover_cross_domain_insights(self, 
                                       knowledge_items: List[KnowledgeItem], 
@@ -1460,10 +1667,11 @@ class KnowledgeExplorer:
             target_id=f"user_primary_{int(time.time())}",
             description=f"用户核心查询深度探索: {user_query}",
             keywords=core_keywords,
+            target_type="primary_focus",
             priority=ExplorationPriority.HIGH,
-            domain=self._identify_query_domain(user_query),
-            expected_quality=KnowledgeQuality.HIGH,
-            metadata={
+            context={
+                "domain": self._identify_query_domain(user_query),
+                "expected_quality": KnowledgeQuality.GOOD,
                 "user_query": user_query,
                 "exploration_mode": "user_directed",
                 "target_type": "primary_focus",
@@ -1483,10 +1691,11 @@ class KnowledgeExplorer:
                 target_id=f"user_context_{int(time.time())}",
                 description=f"用户查询相关上下文探索: {query_intent.get('context_topics', [])}",
                 keywords=self._generate_contextual_keywords(user_query, core_keywords),
+                target_type="contextual_expansion",
                 priority=ExplorationPriority.MEDIUM,
-                domain=self._identify_query_domain(user_query),
-                expected_quality=KnowledgeQuality.HIGH,
-                metadata={
+                context={
+                    "domain": self._identify_query_domain(user_query),
+                    "expected_quality": KnowledgeQuality.GOOD,
                     "user_query": user_query,
                     "exploration_mode": "user_directed",
                     "target_type": "contextual_expansion",
@@ -1503,10 +1712,11 @@ class KnowledgeExplorer:
                 target_id=f"user_verify_{int(time.time())}",
                 description=f"用户查询可行性验证探索: {user_query}",
                 keywords=self._generate_verification_keywords(user_query, core_keywords),
+                target_type="verification_focused",
                 priority=ExplorationPriority.MEDIUM,
-                domain=self._identify_query_domain(user_query),
-                expected_quality=KnowledgeQuality.HIGH,
-                metadata={
+                context={
+                    "domain": self._identify_query_domain(user_query),
+                    "expected_quality": KnowledgeQuality.GOOD,
                     "user_query": user_query,
                     "exploration_mode": "user_directed",
                     "target_type": "verification_focused",
@@ -1532,10 +1742,11 @@ class KnowledgeExplorer:
                 target_id=f"autonomous_gap_{int(time.time())}_{i}",
                 description=f"知识缺口弥补探索: {gap.get('gap_description', '未知领域')}",
                 keywords=gap.get('related_keywords', [])[:8],
+                target_type="knowledge_gap_filling",
                 priority=ExplorationPriority.LOW,  # 自主探索使用低优先级
-                domain=gap.get('domain', '通用'),
-                expected_quality=KnowledgeQuality.MEDIUM,
-                metadata={
+                context={
+                    "domain": gap.get('domain', '通用'),
+                    "expected_quality": KnowledgeQuality.FAIR,
                     "exploration_mode": "autonomous",
                     "target_type": "knowledge_gap_filling",
                     "search_depth": "broad",
@@ -1552,10 +1763,11 @@ class KnowledgeExplorer:
                 target_id=f"autonomous_serendipity_{int(time.time())}_{i}",
                 description=f"偶然发现探索: {opportunity.get('description', '探索未知')}",
                 keywords=opportunity.get('keywords', [])[:6],
+                target_type="serendipitous_discovery",
                 priority=ExplorationPriority.LOW,
-                domain=opportunity.get('domain', '通用'),
-                expected_quality=KnowledgeQuality.MEDIUM,
-                metadata={
+                context={
+                    "domain": opportunity.get('domain', '通用'),
+                    "expected_quality": KnowledgeQuality.FAIR,
                     "exploration_mode": "autonomous",
                     "target_type": "serendipitous_discovery",
                     "search_depth": "exploratory",
@@ -1572,10 +1784,11 @@ class KnowledgeExplorer:
                 target_id=f"autonomous_trend_{int(time.time())}",
                 description="系统自主趋势监控探索",
                 keywords=["最新发展", "技术趋势", "创新应用", "未来方向"],
+                target_type="trend_monitoring",
                 priority=ExplorationPriority.LOW,
-                domain="技术",
-                expected_quality=KnowledgeQuality.MEDIUM,
-                metadata={
+                context={
+                    "domain": "技术",
+                    "expected_quality": KnowledgeQuality.FAIR,
                     "exploration_mode": "autonomous",
                     "target_type": "trend_monitoring",
                     "search_depth": "surface",
@@ -1787,9 +2000,24 @@ class KnowledgeExplorer:
         # 更新探索历史
         self.exploration_history.append(result)
         
-        # 更新知识缓存
+        # 更新知识缓存和新颖性索引
         for knowledge in result.discovered_knowledge:
             self.knowledge_cache[knowledge.knowledge_id] = knowledge
+            self.novelty_index.add(knowledge.knowledge_id, knowledge.content)
+        
+        persist_path = self.config["novelty_index"]["persist_path"]
+        if persist_path and result.discovered_knowledge:
+            try:
+                self.novelty_index.save(persist_path)
+            except Exception as e:
+                logger.warning(f"⚠️ 新颖性索引保存失败: {e}")
+        
+        # 增量写入本地知识库
+        if self.knowledge_store is not None and result.discovered_knowledge:
+            try:
+                self.knowledge_store.add_knowledge_items(result.discovered_knowledge)
+            except Exception as e:
+                logger.warning(f"⚠️ 知识库索引失败: {e}")
         
         # 更新种子缓存
         for seed in result.generated_seeds:
@@ -1897,6 +2125,7 @@ class KnowledgeExplorer:
             "cache_status": {
                 "knowledge_cache_size": len(self.knowledge_cache),
                 "seed_cache_size": len(self.seed_cache),
+                "novelty_index_size": len(self.novelty_index),
                 "exploration_history_size": len(self.exploration_history)
             },
             "recent_explorations": len([r for r in self.exploration_history 
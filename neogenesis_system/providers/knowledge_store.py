@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+本地知识库 - Local Knowledge Store
+持久化保存知识探勘器发现的知识项，并提供 BM25 全文检索
+
+- SQLite 存储文档与倒排索引（词项 -> 文档、词频、文档长度）
+- 中英文混合分词：拉丁字母/数字按词切分，中日韩字符按二元组切分
+- 增量索引：每次探索结束后追加新知识，无需重建
+- 查询只读取查询词项的倒排列表和当前页文档，不把语料加载到内存
+"""
+
+import os
+import re
+import json
+import math
+import time
+import heapq
+import sqlite3
+import logging
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Any, Iterable, Tuple
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+|[぀-ヿ㐀-䶿一-鿿가-힯]+")
+_CJK_PATTERN = re.compile(r"[぀-ヿ㐀-䶿一-鿿가-힯]")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    中英文混合分词
+
+    拉丁字母和数字按连续片段切分为词；中日韩字符串切分为相邻二元组，
+    单个汉字的片段保留为单字。
+    """
+    tokens = []
+    for segment in _TOKEN_PATTERN.findall(text.lower()):
+        if not _CJK_PATTERN.match(segment):
+            tokens.append(segment)
+        elif len(segment) == 1:
+            tokens.append(segment)
+        else:
+            tokens.extend(segment[i:i + 2] for i in range(len(segment) - 1))
+    return tokens
+
+
+class KnowledgeStore:
+    """
+    基于 SQLite 倒排索引的 BM25 知识库
+
+    表结构：
+    - documents: 知识项本体（knowledge_id 唯一）
+    - postings: (term, doc_id) -> 词频 tf 与文档长度 doc_len（检索时无需回表）
+    - terms: term -> 文档频率 df
+    - store_meta: 文档总数与总长度
+    """
+
+    def __init__(self, db_path: str, k1: float = 1.5, b: float = 0.75):
+        """
+        初始化知识库
+
+        Args:
+            db_path: SQLite 数据库文件路径（":memory:" 仅用于单线程测试）
+            k1: BM25 词频饱和参数
+            b: BM25 文档长度归一化参数
+        """
+        self.db_path = db_path
+        self.k1 = k1
+        self.b = b
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        # 所有线程打开的连接（close() 时全部关闭；asyncio.to_thread 的工作线程各自持有一个）
+        self._connections: set = set()
+        self._connections_lock = threading.Lock()
+
+        directory = os.path.dirname(db_path)
+        if directory and db_path != ":memory:":
+            os.makedirs(directory, exist_ok=True)
+
+        self._init_schema()
+        logger.info(f"📚 KnowledgeStore 已就绪: {db_path} ({self.document_count()} 条知识)")
+
+    # ==================== 连接与表结构 ====================
+
+    def _connection(self) -> sqlite3.Connection:
+        """每个线程复用一个连接（close() 之后重新打开）"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or conn not in self._connections:
+            # 连接只在打开它的线程中使用；关闭 check_same_thread 以便 close() 从其他线程关闭
+            conn = sqlite3.connect(self.db_path, timeout=30.0, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            if self.db_path != ":memory:":
+                conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._connections_lock:
+                self._connections.add(conn)
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self):
+        conn = self._connection()
+        with conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS documents (
+                    doc_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    knowledge_id TEXT UNIQUE NOT NULL,
+                    title TEXT,
+                    content TEXT NOT NULL,
+                    source TEXT,
+                    confidence REAL,
+                    metadata TEXT,
+                    created_at REAL,
+                    length INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS postings (
+                    term TEXT NOT NULL,
+                    doc_id INTEGER NOT NULL,
+                    tf INTEGER NOT NULL,
+                    doc_len INTEGER NOT NULL,
+                    PRIMARY KEY (term, doc_id)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS terms (
+                    term TEXT PRIMARY KEY,
+                    df INTEGER NOT NULL
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS store_meta (
+                    key TEXT PRIMARY KEY,
+                    value REAL NOT NULL
+                );
+                INSERT OR IGNORE INTO store_meta (key, value) VALUES ('doc_count', 0), ('total_length', 0);
+            """)
+
+    def close(self):
+        """关闭所有线程打开的连接"""
+        with self._connections_lock:
+            connections, self._connections = self._connections, set()
+        for conn in connections:
+            conn.close()
+        self._local.conn = None
+
+    # ==================== 索引 ====================
+
+    def add_document(self,
+                     knowledge_id: str,
+                     content: str,
+                     title: Optional[str] = None,
+                     source: Optional[str] = None,
+                     confidence: float = 0.5,
+                     metadata: Optional[Dict[str, Any]] = None,
+                     created_at: Optional[float] = None) -> bool:
+        """
+        索引单条知识
+
+        Returns:
+            是否新增（已存在的 knowledge_id 不重复索引）
+        """
+        return self.add_documents([{
+            "knowledge_id": knowledge_id,
+            "content": content,
+            "title": title,
+            "source": source,
+            "confidence": confidence,
+            "metadata": metadata,
+            "created_at": created_at
+        }]) == 1
+
+    def add_documents(self, documents: Iterable[Dict[str, Any]]) -> int:
+        """
+        批量增量索引（单个事务）
+
+        Args:
+            documents: 包含 knowledge_id、content 及可选 title/source/confidence/metadata/created_at 的字典
+
+        Returns:
+            新增的文档数量
+        """
+        added = 0
+        with self._write_lock:
+            conn = self._connection()
+            with conn:
+                for document in documents:
+                    content = document.get("content") or ""
+                    tokens = tokenize(content)
+                    if not tokens:
+                        continue
+
+                    cursor = conn.execute(
+                        "INSERT OR IGNORE INTO documents "
+                        "(knowledge_id, title, content, source, confidence, metadata, created_at, length) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (
+                            document["knowledge_id"],
+                            document.get("title") or content[:40],
+                            content,
+                            document.get("source"),
+                            float(document.get("confidence", 0.5)),
+                            json.dumps(document.get("metadata") or {}, ensure_ascii=False),
+                            document.get("created_at") or time.time(),
+                            len(tokens)
+                        )
+                    )
+                    if cursor.rowcount == 0:
+                        continue  # 已索引
+
+                    doc_id = cursor.lastrowid
+                    term_frequencies = Counter(tokens)
+                    conn.executemany(
+                        "INSERT INTO postings (term, doc_id, tf, doc_len) VALUES (?, ?, ?, ?)",
+                        [(term, doc_id, tf, len(tokens)) for term, tf in term_frequencies.items()]
+                    )
+                    conn.executemany(
+                        "INSERT INTO terms (term, df) VALUES (?, 1) "
+                        "ON CONFLICT(term) DO UPDATE SET df = df + 1",
+                        [(term,) for term in term_frequencies]
+                    )
+                    conn.execute("UPDATE store_meta SET value = value + 1 WHERE key = 'doc_count'")
+                    conn.execute("UPDATE store_meta SET value = value + ? WHERE key = 'total_length'",
+                                 (len(tokens),))
+                    added += 1
+
+        if added:
+            logger.debug(f"📚 知识库增量索引: 新增 {added} 条")
+        return added
+
+    def add_knowledge_items(self, knowledge_items: Iterable[Any]) -> int:
+        """索引知识探勘器的 KnowledgeItem 列表"""
+        return self.add_documents(
+            {
+                "knowledge_id": item.knowledge_id,
+                "content": item.content,
+                "source": item.source,
+                "confidence": item.confidence_score,
+                "metadata": {
+                    "source_type": item.source_type,
+                    "quality": getattr(item.quality, "value", item.quality),
+                    "tags": list(item.tags),
+                    "related_concepts": list(item.related_concepts)
+                },
+                "created_at": item.discovered_at
+            }
+            for item in knowledge_items
+        )
+
+    # ==================== 检索 ====================
+
+    def document_count(self) -> int:
+        """已索引的文档数"""
+        row = self._connection().execute(
+            "SELECT value FROM store_meta WHERE key = 'doc_count'").fetchone()
+        return int(row["value"]) if row else 0
+
+    def search(self, query: str, limit: int = 10, offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        BM25 检索
+
+        Args:
+            query: 查询文本
+            limit: 每页数量
+            offset: 分页偏移
+
+        Returns:
+            (当前页结果, 命中文档总数)；结果包含 score 和按最高分归一化的 relevance
+        """
+        query_terms = list(dict.fromkeys(tokenize(query)))
+        if not query_terms:
+            return [], 0
+
+        conn = self._connection()
+        meta = {row["key"]: row["value"] for row in conn.execute("SELECT key, value FROM store_meta")}
+        doc_count = meta.get("doc_count", 0)
+        if not doc_count:
+            return [], 0
+        avg_length = meta.get("total_length", 0) / doc_count
+
+        placeholders = ",".join("?" * len(query_terms))
+        document_frequencies = {
+            row["term"]: row["df"]
+            for row in conn.execute(f"SELECT term, df FROM terms WHERE term IN ({placeholders})", query_terms)
+        }
+
+        scores: Dict[int, float] = defaultdict(float)
+        for term, df in document_frequencies.items():
+            idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+            for row in conn.execute("SELECT doc_id, tf, doc_len FROM postings WHERE term = ?", (term,)):
+                tf = row["tf"]
+                norm = self.k1 * (1 - self.b + self.b * row["doc_len"] / avg_length)
+                scores[row["doc_id"]] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        if not scores:
+            return [], 0
+
+        ranked = heapq.nlargest(offset + limit, scores.items(), key=lambda item: item[1])
+        best_score = ranked[0][1]
+        page = ranked[offset:offset + limit]
+        if not page:
+            return [], len(scores)
+
+        page_ids = [doc_id for doc_id, _ in page]
+        rows = {
+            row["doc_id"]: row
+            for row in conn.execute(
+                f"SELECT * FROM documents WHERE doc_id IN ({','.join('?' * len(page_ids))})", page_ids)
+        }
+
+        results = []
+        for doc_id, score in page:
+            row = rows[doc_id]
+            results.append({
+                "id": row["knowledge_id"],
+                "title": row["title"],
+                "content": row["content"],
+                "source": row["source"],
+                "confidence": row["confidence"],
+                "metadata": json.loads(row["metadata"]) if row["metadata"] else {},
+                "created_at": row["created_at"],
+                "score": score,
+                "relevance": score / best_score if best_score > 0 else 0.0
+            })
+        return results, len(scores)
@@ -15,6 +15,8 @@ Unified LLM Client Interface - Base classes and data structures for all LLM clie
 import time
 import logging
 import asyncio
+import functools
+import contextvars
 from abc import ABC, abstractmethod
 from typing import Dict, List, Optional, Any, Union, Callable, AsyncIterator, Awaitable
 from dataclasses import dataclass, field
@@ -233,25 +235,58 @@ class BaseLLMClient(ABC):
         """
         pass
     
-    @abstractmethod
     async def achat_completion(self, 
                               messages: Union[str, List[LLMMessage]], 
                               temperature: Optional[float] = None,
                               max_tokens: Optional[int] = None,
                               **kwargs) -> LLMResponse:
         """
-        🚀 异步聊天完成接口 - 核心异步抽象方法
+        🚀 异步聊天完成接口
+        
+        默认实现在线程池中执行同步的 chat_completion（每个在途请求占用一个线程）；
+        支持原生异步的客户端应覆盖此方法，使用 async_http 的共享连接池。
         
         Args:
             messages: 消息内容，可以是字符串或消息列表
             temperature: 温度参数
             max_tokens: 最大token数
-            **kwargs: 其他参数
+            **kwargs: 其他参数（timeout: 本次调用的超时秒数）
             
         Returns:
             LLMResponse: 统一的响应对象
         """
-        pass
+        # 复制上下文，使当前截止时间在工作线程中依然生效
+        call = functools.partial(self.chat_completion, messages, temperature, max_tokens, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(None, contextvars.copy_context().run, call)
+    
+    async def astream_chat_completion(self, 
+                                      messages: Union[str, List[LLMMessage]], 
+                                      temperature: Optional[float] = None,
+                                      max_tokens: Optional[int] = None,
+                                      **kwargs) -> AsyncIterator[str]:
+        """
+        🌊 流式聊天完成接口 - 逐段产出回答文本
+        
+        默认实现等待完整的 achat_completion 结果后一次性产出；支持流式的客户端应覆盖此方法。
+        原生流式实现中，调用方提前关闭生成器（aclose）或取消任务会关闭底层连接，上游随即停止生成。
+        
+        Args:
+            messages: 消息内容，可以是字符串或消息列表
+            temperature: 温度参数
+            max_tokens: 最大token数
+            **kwargs: 其他参数（timeout: 本次调用的超时秒数）
+            
+        Yields:
+            str: 回答文本片段
+            
+        Raises:
+            ConnectionError: 请求失败
+        """
+        response = await self.achat_completion(messages, temperature, max_tokens, **kwargs)
+        if not response.success:
+            raise ConnectionError(f"{self.provider.value} 流式API调用失败: {response.error_message}")
+        if response.content:
+            yield response.content
     
     def call_api(self, prompt: str, 
                  system_message: Optional[str] = None,
@@ -281,12 +316,22 @@ class BaseLLMClient(ABC):
             messages.append(LLMMessage(role="system", content=system_message))
         messages.append(LLMMessage(role="user", content=prompt))
         
+        # 按当前请求预算预留额度（直接使用客户端、不经 LLMManager 的调用）
+        reservation, kwargs = self.reserve_budget(messages, kwargs)
+        
         # 调用chat_completion
-        response = self.chat_completion(
-            messages=messages,
-            temperature=temperature,
-            **kwargs
-        )
+        try:
+            response = self.chat_completion(
+                messages=messages,
+                temperature=temperature,
+                **kwargs
+            )
+        except BaseException:
+            if reservation:
+                reservation.commit()
+            raise
+        if reservation:
+            reservation.commit(response.usage, failed=not response.success)
         
         # 兼容性处理
         if response.success:
@@ -324,8 +369,17 @@ class BaseLLMClient(ABC):
             messages.append(LLMMessage(role="system", content=system_message))
         messages.append(LLMMessage(role="user", content=prompt))
         
+        reservation, kwargs = self.reserve_budget(messages, kwargs)
+        
         # 使用achat_completion执行
-        response = await self.achat_completion(messages, temperature=temperature, **kwargs)
+        try:
+            response = await self.achat_completion(messages, temperature=temperature, **kwargs)
+        except BaseException:
+            if reservation:
+                reservation.commit()
+            raise
+        if reservation:
+            reservation.commit(response.usage, failed=not response.success)
         
         if response.success:
             return response.content
@@ -334,6 +388,34 @@ class BaseLLMClient(ABC):
             logger.error(error_msg)
             raise ConnectionError(error_msg)
     
+    def reserve_budget(self, messages: List[LLMMessage], kwargs: Dict[str, Any]):
+        """
+        按当前请求预算预留一次调用的额度（绕过 call_api、直接调用 chat_completion 时使用）
+        
+        调用方须在调用结束后执行 reservation.commit(response.usage, failed=...)，
+        调用抛出异常时执行 reservation.commit() 释放额度。
+        
+        Returns:
+            (预留或 None, 调用参数)；调用参数中的 max_tokens 已收紧到预留额度以内
+            
+        Raises:
+            ConnectionError: 预算不足，调用未发出
+        """
+        from ..shared.budget import BudgetExceeded, reserve_llm_call
+        try:
+            from ..config import LLM_PROVIDERS_CONFIG
+            rates = LLM_PROVIDERS_CONFIG.get(self.provider.value, {}).get("cost_per_1k_tokens", {})
+        except ImportError:
+            rates = {}
+        
+        try:
+            reservation = reserve_llm_call(messages, kwargs.get('max_tokens') or self.config.max_tokens, rates)
+        except BudgetExceeded as e:
+            raise ConnectionError(f"{self.provider.value} 请求预算不足: {e.reason}")
+        if reservation is None:
+            return None, kwargs
+        return reservation, {**kwargs, 'max_tokens': reservation.max_tokens}
+    
     @abstractmethod
     def validate_config(self) -> bool:
         """
@@ -28,13 +28,18 @@ else:
     logger.warning(f"⚠️ 未找到 .env 文件: {env_path}")
 import os
 import time
+import asyncio
+import threading
 
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Union, AsyncIterator, Tuple
 from dataclasses import dataclass
 from collections import defaultdict
 
-from .llm_base import BaseLLMClient, LLMConfig, LLMProvider, LLMResponse, LLMMessage
+from .llm_base import BaseLLMClient, LLMConfig, LLMProvider, LLMResponse, LLMMessage, LLMUsage
 from .impl.deepseek_client import create_llm_client
+from .provider_router import ProviderRouter, RoutingResult, CircuitState, AttemptRejected
+from .async_http import aclose_async_http_clients
+from ..shared.budget import BudgetExceeded, BudgetReservation, reserve_llm_call
 
 try:
     from neogenesis_system.config import (
@@ -77,7 +82,8 @@ class LLMManager:
     
     功能：
     - 自动发现和初始化可用的LLM提供商
-    - 智能路由和负载均衡
+    - 延迟感知路由：按延迟 EWMA / 错误率排序提供商
+    - 熔断器（关闭/打开/半开探测）与超过 p95 延迟时的对冲请求
     - 自动回退机制
     - 成本跟踪和控制
     - 健康检查和监控
@@ -95,11 +101,19 @@ class LLMManager:
             'successful_requests': 0,
             'failed_requests': 0,
             'fallback_count': 0,
+            'hedged_requests': 0,
             'provider_usage': defaultdict(int),
             'cost_tracking': defaultdict(float),
             'request_history': []
         }
         
+        # 路由：延迟统计、熔断与对冲
+        self.router = ProviderRouter({
+            **LLM_MANAGER_CONFIG.get("routing", {}),
+            "strategy": self.config.get("provider_selection_strategy", "latency")
+        })
+        self._stats_lock = threading.Lock()  # 对冲请求在工作线程中回写统计
+        
         # 初始化状态
         self.initialized = False
         self.last_health_check = 0
@@ -309,14 +323,173 @@ class LLMManager:
             kwargs['temperature'] = temperature
         
         # 执行请求（带回退机制）
-        return self._execute_with_fallback(selected_provider, messages, **kwargs)
+        pinned = provider_name is not None and selected_provider == provider_name
+        return self._execute_with_fallback(selected_provider, messages, pin_first=pinned, **kwargs)
+    
+    async def achat_completion(self, 
+                              messages: Union[str, List[LLMMessage]], 
+                              provider_name: Optional[str] = None,
+                              temperature: Optional[float] = None,
+                              **kwargs) -> LLMResponse:
+        """
+        🚀 异步聊天完成 - 与 chat_completion 相同的路由、熔断与对冲，
+        但调用各客户端的原生异步接口，不为在途请求占用线程；被对冲放弃的请求会被取消
+        
+        Args:
+            messages: 消息内容
+            provider_name: 指定提供商（可选）
+            **kwargs: 其他参数（timeout: 单次调用的超时秒数）
+            
+        Returns:
+            LLMResponse: 统一响应
+        """
+        self.stats['total_requests'] += 1
+        
+        if not self.initialized or not self.providers:
+            return self._create_error_response("没有可用的LLM提供商")
+        
+        if isinstance(messages, str):
+            messages = [LLMMessage(role="user", content=messages)]
+        
+        selected_provider = self._select_provider(provider_name)
+        if not selected_provider:
+            return self._create_error_response("无法选择合适的提供商")
+        
+        if temperature is not None:
+            kwargs['temperature'] = temperature
+        
+        async def call(current_provider: str) -> LLMResponse:
+            logger.info(f"🤖 使用提供商(异步): {current_provider}")
+            reservation, call_kwargs = self._reserve_budget(current_provider, messages, kwargs)
+            try:
+                response = await self.providers[current_provider].achat_completion(messages, **call_kwargs)
+            except BaseException:
+                self._commit_budget(reservation, None)
+                raise
+            self._commit_budget(reservation, response)
+            return response
+        
+        providers_to_try = self._fallback_candidates(selected_provider)
+        pinned = provider_name is not None and selected_provider == provider_name
+        result = await self.router.aexecute(providers_to_try, call, on_result=self._record_attempt, pin_first=pinned)
+        return self._finish_routing(result, providers_to_try)
+    
+    async def astream_chat_completion(self, 
+                                      messages: Union[str, List[LLMMessage]], 
+                                      provider_name: Optional[str] = None,
+                                      temperature: Optional[float] = None,
+                                      **kwargs) -> AsyncIterator[str]:
+        """
+        🌊 流式聊天完成 - 按路由器的排序与熔断选择提供商，逐段产出回答文本
+        
+        流式请求不做对冲：第一个文本片段到达前失败时回退到下一个提供商，之后的失败直接抛出。
+        调用方关闭生成器或取消任务时关闭上游流，只归还探测名额，不计入统计。
+        
+        Args:
+            messages: 消息内容
+            provider_name: 指定提供商（可选）
+            **kwargs: 其他参数（timeout: 单次调用的超时秒数）
+            
+        Yields:
+            str: 回答文本片段
+            
+        Raises:
+            ConnectionError: 没有可用的提供商或所有提供商都失败
+        """
+        self.stats['total_requests'] += 1
+        
+        if not self.initialized or not self.providers:
+            raise ConnectionError("没有可用的LLM提供商")
+        
+        if isinstance(messages, str):
+            messages = [LLMMessage(role="user", content=messages)]
+        
+        selected_provider = self._select_provider(provider_name)
+        if not selected_provider:
+            raise ConnectionError("无法选择合适的提供商")
+        
+        if temperature is not None:
+            kwargs['temperature'] = temperature
+        
+        pinned = provider_name is not None and selected_provider == provider_name
+        error, attempts = "所有提供商均处于熔断状态", 0
+        for current_provider in self.router.rank(self._fallback_candidates(selected_provider), pinned):
+            health = self.router.health(current_provider)
+            if not health.try_acquire():
+                continue
+            if attempts:
+                with self._stats_lock:
+                    self.stats['fallback_count'] += 1
+            attempts += 1
+            
+            logger.info(f"🌊 使用提供商(流式): {current_provider}")
+            start_time = time.perf_counter()
+            started, streamed = False, 0
+            stream = reservation = None
+            try:
+                reservation, call_kwargs = self._reserve_budget(current_provider, messages, kwargs)
+                stream = self.providers[current_provider].astream_chat_completion(messages, **call_kwargs)
+                async for text in stream:
+                    started, streamed = True, streamed + len(text)
+                    yield text
+            except AttemptRejected as e:
+                health.release()
+                with self._stats_lock:
+                    self.stats['failed_requests'] += 1
+                raise ConnectionError(f"请求预算不足: {e}")
+            except (asyncio.CancelledError, GeneratorExit):
+                health.release()
+                self._commit_budget(reservation, None)
+                raise
+            except Exception as e:
+                error = str(e)
+                response_time = time.perf_counter() - start_time
+                health.record(False, response_time)
+                self._record_attempt(current_provider, None, response_time, error)
+                self._commit_budget(reservation, None if started else False)
+                logger.warning(f"⚠️ {current_provider}流式请求失败: {error}")
+                if started:
+                    break
+                continue
+            finally:
+                if stream is not None and hasattr(stream, 'aclose'):
+                    await stream.aclose()
+            
+            # 流式响应没有用量：完成部分按字符数保守计
+            usage = LLMUsage(prompt_tokens=reservation.prompt_tokens, completion_tokens=streamed,
+                             total_tokens=reservation.prompt_tokens + streamed) if reservation else None
+            self._commit_budget(reservation, LLMResponse(success=True, provider=current_provider, usage=usage))
+            response_time = time.perf_counter() - start_time
+            health.record(True, response_time)
+            self._record_attempt(current_provider, LLMResponse(success=True, provider=current_provider),
+                                 response_time, None)
+            with self._stats_lock:
+                self.stats['successful_requests'] += 1
+                self.stats['provider_usage'][current_provider] += 1
+            return
+        
+        with self._stats_lock:
+            self.stats['failed_requests'] += 1
+        raise ConnectionError(f"所有提供商都不可用: {error}")
+    
+    async def aclose(self):
+        """🚀 关闭当前事件循环中的异步连接（共享连接池与客户端自有的异步客户端）"""
+        for client in self.providers.values():
+            if hasattr(client, 'aclose'):
+                await client.aclose()
+        await aclose_async_http_clients()
+    
+    def _is_available(self, provider_name: str) -> bool:
+        """提供商是否可用：已初始化、健康检查通过且熔断器未打开"""
+        return (provider_name in self.providers
+                and self.provider_status[provider_name].healthy
+                and self.router.is_available(provider_name))
     
     def _select_provider(self, preferred_provider: Optional[str] = None) -> Optional[str]:
         """选择提供商"""
         # 如果指定了提供商且可用，直接使用
-        if preferred_provider and preferred_provider in self.providers:
-            if self.provider_status[preferred_provider].healthy:
-                return preferred_provider
+        if preferred_provider and self._is_available(preferred_provider):
+            return preferred_provider
         
         # 检查主要提供商设置
         primary = self.config.get("primary_provider", "auto")
@@ -325,22 +498,46 @@ class LLMManager:
             # 自动选择：按首选顺序选择第一个可用的提供商
             preferred_order = self.config.get("preferred_providers", ["deepseek", "openai", "anthropic","qwen"])
             for provider_name in preferred_order:
-                if provider_name in self.providers and self.provider_status[provider_name].healthy:
+                if self._is_available(provider_name):
                     return provider_name
         else:
             # 使用指定的主要提供商
-            if primary in self.providers and self.provider_status[primary].healthy:
+            if self._is_available(primary):
                 return primary
         
-        # 使用第一个健康的提供商
-        for name, status in self.provider_status.items():
-            if status.healthy and name in self.providers:
+        # 使用第一个可用的提供商
+        for name in self.provider_status:
+            if self._is_available(name):
                 return name
         
         return None
     
-    def _execute_with_fallback(self, provider_name: str, messages: Union[str, List[LLMMessage]], **kwargs) -> LLMResponse:
-        """执行请求（带回退机制）"""
+    def _execute_with_fallback(self, provider_name: str, messages: Union[str, List[LLMMessage]],
+                               pin_first: bool = False, **kwargs) -> LLMResponse:
+        """
+        执行请求（带回退、熔断与对冲）
+        
+        候选为选中的提供商加上回退提供商，由路由器按延迟排序（pin_first 时选中的提供商固定为主提供商）；
+        主提供商超过其 p95 延迟未返回时向次优提供商发送对冲请求，失败时回退到下一个。
+        """
+        providers_to_try = self._fallback_candidates(provider_name)
+        
+        def call(current_provider: str) -> LLMResponse:
+            logger.info(f"🤖 使用提供商: {current_provider}")
+            reservation, call_kwargs = self._reserve_budget(current_provider, messages, kwargs)
+            try:
+                response = self.providers[current_provider].chat_completion(messages, **call_kwargs)
+            except BaseException:
+                self._commit_budget(reservation, None)
+                raise
+            self._commit_budget(reservation, response)
+            return response
+        
+        result = self.router.execute(providers_to_try, call, on_result=self._record_attempt, pin_first=pin_first)
+        return self._finish_routing(result, providers_to_try)
+    
+    def _fallback_candidates(self, provider_name: str) -> List[str]:
+        """候选提供商：选中的提供商加上健康的回退提供商"""
         providers_to_try = [provider_name]
         
         # 添加回退提供商
@@ -350,56 +547,69 @@ class LLMManager:
                 if fallback != provider_name and fallback in self.providers:
                     providers_to_try.append(fallback)
         
-        last_error = None
-        
-        for current_provider in providers_to_try:
-            try:
-                if not self.provider_status[current_provider].healthy:
-                    continue
-                
-                start_time = time.time()
-                client = self.providers[current_provider]
-                
-                logger.info(f"🤖 使用提供商: {current_provider}")
-                response = client.chat_completion(messages, **kwargs)
-                
-                response_time = time.time() - start_time
-                
-                if response.success:
-                    # 更新统计
-                    self._update_provider_stats(current_provider, True, response_time)
-                    self.stats['successful_requests'] += 1
-                    self.stats['provider_usage'][current_provider] += 1
-                    
-                    # 成本跟踪
-                    if response.usage and COST_CONTROL_CONFIG.get("token_usage_tracking", True):
-                        self._track_cost(current_provider, response.usage)
-                    
-                    return response
-                else:
-                    # 记录失败但继续尝试下一个提供商
-                    self._update_provider_stats(current_provider, False, response_time)
-                    last_error = response.error_message
-                    logger.warning(f"⚠️ {current_provider}请求失败: {last_error}")
-                    
-                    if len(providers_to_try) > 1:
-                        self.stats['fallback_count'] += 1
-                        continue
-                    else:
-                        return response
-                        
-            except Exception as e:
-                self._update_provider_stats(current_provider, False, 0)
-                last_error = str(e)
-                logger.error(f"❌ {current_provider}执行异常: {e}")
-                continue
+        return [name for name in providers_to_try if self.provider_status[name].healthy]
+    
+    def _finish_routing(self, result: RoutingResult, providers_to_try: List[str]) -> LLMResponse:
+        """汇总路由结果到管理器统计并返回响应"""
+        with self._stats_lock:
+            self.stats['fallback_count'] += result.fallbacks
+            self.stats['hedged_requests'] += result.hedges
+            if result.success:
+                self.stats['successful_requests'] += 1
+                self.stats['provider_usage'][result.provider] += 1
+                return result.response
+            self.stats['failed_requests'] += 1
+        
+        if len(providers_to_try) == 1 and result.response is not None:
+            return result.response
+        return self._create_error_response(f"所有提供商都不可用: {result.error}")
+    
+    def _reserve_budget(self, provider_name: str, messages: List[LLMMessage],
+                        kwargs: Dict[str, Any]) -> Tuple[Optional[BudgetReservation], Dict[str, Any]]:
+        """
+        按当前请求预算为一次提供商调用预留额度（没有预算时原样返回参数）
         
-        # 所有提供商都失败
-        self.stats['failed_requests'] += 1
-        return self._create_error_response(f"所有提供商都不可用: {last_error}")
+        Returns:
+            (预留, 调用参数)；调用参数中的 max_tokens 已收紧到预留额度以内
+            
+        Raises:
+            AttemptRejected: 预算不足（不计入提供商健康统计）
+        """
+        requested = kwargs.get('max_tokens') or getattr(self.providers[provider_name].config, 'max_tokens', None)
+        try:
+            reservation = reserve_llm_call(messages, requested, self._cost_rates(provider_name))
+        except BudgetExceeded as e:
+            logger.info(f"💸 请求预算不足，跳过 {provider_name} 调用: {e.reason}")
+            raise AttemptRejected(f"请求预算不足: {e.reason}")
+        if reservation is None:
+            return None, kwargs
+        return reservation, {**kwargs, 'max_tokens': reservation.max_tokens}
+    
+    @staticmethod
+    def _commit_budget(reservation: Optional[BudgetReservation], response: Optional[LLMResponse]):
+        """结算预留：成功按用量，失败只计次数；response 为 None（异常或取消）时按预留量保守计费"""
+        if reservation is None:
+            return
+        if response is None:
+            reservation.commit()
+        elif response is False or not response.success:
+            reservation.commit(failed=True)
+        else:
+            reservation.commit(response.usage)
+    
+    def _record_attempt(self, provider_name: str, response: Optional[LLMResponse],
+                        response_time: float, error: Optional[str]):
+        """每次尝试完成时回写统计（包括被对冲放弃、稍后才返回的请求）"""
+        with self._stats_lock:
+            self._update_provider_stats(provider_name, error is None, response_time, error)
+            
+            # 成本跟踪：被放弃的对冲请求同样产生费用
+            if error is None and response.usage and COST_CONTROL_CONFIG.get("token_usage_tracking", True):
+                self._track_cost(provider_name, response.usage)
     
-    def _update_provider_stats(self, provider_name: str, success: bool, response_time: float):
-        """更新提供商统计"""
+    def _update_provider_stats(self, provider_name: str, success: bool, response_time: float,
+                               error: Optional[str] = None):
+        """更新提供商统计（健康与否由路由器的熔断器判断）"""
         if provider_name not in self.provider_status:
             return
         
@@ -409,7 +619,6 @@ class LLMManager:
         if success:
             status.success_count += 1
             status.error_count = 0  # 重置错误计数
-            status.healthy = True
             
             # 更新平均响应时间
             if status.avg_response_time == 0:
@@ -418,17 +627,17 @@ class LLMManager:
                 status.avg_response_time = (status.avg_response_time + response_time) / 2
         else:
             status.error_count += 1
-            
-            # 连续错误过多时标记为不健康
-            if status.error_count >= 3:
-                status.healthy = False
-                logger.warning(f"⚠️ {provider_name}被标记为不健康")
+            status.last_error = error
+    
+    @staticmethod
+    def _cost_rates(provider_name: str) -> Dict[str, float]:
+        """提供商每千 token 的输入/输出单价"""
+        return LLM_PROVIDERS_CONFIG.get(provider_name, {}).get("cost_per_1k_tokens", {})
     
     def _track_cost(self, provider_name: str, usage):
         """跟踪成本"""
         try:
-            provider_config = LLM_PROVIDERS_CONFIG.get(provider_name, {})
-            cost_per_1k = provider_config.get("cost_per_1k_tokens", {})
+            cost_per_1k = self._cost_rates(provider_name)
             
             input_cost = (usage.prompt_tokens / 1000) * cost_per_1k.get("input", 0)
             output_cost = (usage.completion_tokens / 1000) * cost_per_1k.get("output", 0)
@@ -452,18 +661,21 @@ class LLMManager:
     
     def get_provider_status(self) -> Dict[str, Any]:
         """获取提供商状态"""
+        routing = self.router.get_status()
         return {
             'initialized': self.initialized,
             'total_providers': len(self.providers),
-            'healthy_providers': sum(1 for s in self.provider_status.values() if s.healthy),
+            'healthy_providers': sum(1 for name in self.provider_status if self._is_available(name)),
             'providers': {name: {
                 'enabled': status.enabled,
                 'healthy': status.healthy,
                 'success_count': status.success_count,
                 'error_count': status.error_count,
                 'avg_response_time': status.avg_response_time,
-                'last_error': status.last_error
+                'last_error': status.last_error,
+                **routing['providers'].get(name, {'circuit_state': CircuitState.CLOSED.value})
             } for name, status in self.provider_status.items()},
+            'routing': routing['stats'],
             'stats': self.stats.copy()
         }
     
@@ -482,7 +694,7 @@ class LLMManager:
     
     def switch_primary_provider(self, provider_name: str) -> bool:
         """切换主要提供商"""
-        if provider_name in self.providers and self.provider_status[provider_name].healthy:
+        if self._is_available(provider_name):
             self.config["primary_provider"] = provider_name
             logger.info(f"🔄 主要提供商已切换到: {provider_name}")
             return True
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+知识新颖性索引 - MinHash/LSH Novelty Index
+为知识探勘器提供近似重复检测，替代对最近若干条知识的逐条 Jaccard 扫描
+
+- 字符 n-gram 分片（对中文等不以空格分词的文本同样有效）
+- MinHash 签名估计 Jaccard 相似度
+- LSH 分带分桶，查询只比较同桶候选，复杂度与索引规模基本无关
+- 签名与知识缓存分离存储，缓存裁剪不影响去重；可选持久化到磁盘
+"""
+
+import os
+import re
+import zlib
+import logging
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple, Iterable
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_WHITESPACE = re.compile(r"\s+")
+
+
+class MinHashLSHIndex:
+    """
+    MinHash + LSH 近似重复索引
+
+    num_perm 个哈希函数分为 bands 个带，每带 num_perm // bands 行；
+    两段文本在任一带的签名完全相同即成为候选，再用签名估计相似度确认。
+    """
+
+    def __init__(self,
+                 num_perm: int = 64,
+                 bands: int = 16,
+                 shingle_size: int = 3,
+                 seed: int = 42):
+        """
+        初始化索引
+
+        Args:
+            num_perm: MinHash 哈希函数个数
+            bands: LSH 分带数（需整除 num_perm）
+            shingle_size: 字符分片长度
+            seed: 哈希函数随机种子（持久化的签名依赖同一种子）
+        """
+        if num_perm % bands != 0:
+            raise ValueError(f"num_perm ({num_perm}) 必须能被 bands ({bands}) 整除")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.seed = seed
+
+        generator = np.random.RandomState(seed)
+        self._perm_a = generator.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._perm_b = generator.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+        self._lock = threading.RLock()
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._buckets: List[Dict[bytes, List[str]]] = [defaultdict(list) for _ in range(bands)]
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._signatures
+
+    # ==================== 签名 ====================
+
+    def _shingles(self, text: str) -> List[int]:
+        """文本 -> 字符 n-gram 分片哈希"""
+        normalized = _WHITESPACE.sub(" ", text.lower()).strip()
+        if not normalized:
+            return []
+        if len(normalized) <= self.shingle_size:
+            return [zlib.crc32(normalized.encode("utf-8"))]
+
+        return list({
+            zlib.crc32(normalized[i:i + self.shingle_size].encode("utf-8"))
+            for i in range(len(normalized) - self.shingle_size + 1)
+        })
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """计算 MinHash 签名；空文本返回 None"""
+        shingles = self._shingles(text)
+        if not shingles:
+            return None
+
+        values = np.array(shingles, dtype=np.uint64)[:, None]
+        hashed = ((values * self._perm_a + self._perm_b) % _MERSENNE_PRIME) & _MAX_HASH
+        return hashed.min(axis=0)
+
+    def _band_keys(self, signature: np.ndarray) -> Iterable[Tuple[int, bytes]]:
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    # ==================== 查询与更新 ====================
+
+    def add(self, key: str, text: str, signature: Optional[np.ndarray] = None) -> bool:
+        """
+        加入索引（同一 key 只加入一次）
+
+        Returns:
+            是否加入成功
+        """
+        if signature is None:
+            signature = self.signature(text)
+        if signature is None:
+            return False
+
+        with self._lock:
+            if key in self._signatures:
+                return False
+            self._signatures[key] = signature
+            for band, band_key in self._band_keys(signature):
+                self._buckets[band][band_key].append(key)
+        return True
+
+    def query(self, text: str, signature: Optional[np.ndarray] = None) -> List[Tuple[str, float]]:
+        """
+        查询近似文本
+
+        Returns:
+            [(key, 估计 Jaccard 相似度)]，按相似度降序
+        """
+        if signature is None:
+            signature = self.signature(text)
+        if signature is None:
+            return []
+
+        with self._lock:
+            candidates = set()
+            for band, band_key in self._band_keys(signature):
+                candidates.update(self._buckets[band].get(band_key, ()))
+            matches = [(key, float(np.mean(self._signatures[key] == signature))) for key in candidates]
+
+        return sorted(matches, key=lambda match: match[1], reverse=True)
+
+    def max_similarity(self, text: str, signature: Optional[np.ndarray] = None) -> float:
+        """与索引中最相近文本的估计相似度（无候选时为 0）"""
+        matches = self.query(text, signature)
+        return matches[0][1] if matches else 0.0
+
+    # ==================== 持久化 ====================
+
+    def save(self, path: str):
+        """保存签名到磁盘（.npz）"""
+        with self._lock:
+            keys = list(self._signatures.keys())
+            matrix = (np.stack([self._signatures[key] for key in keys])
+                      if keys else np.zeros((0, self.num_perm), dtype=np.uint64))
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, keys=np.array(keys, dtype=str), signatures=matrix,
+                     params=np.array([self.num_perm, self.bands, self.shingle_size, self.seed]))
+        os.replace(tmp_path, path)
+
+    def load(self, path: str) -> int:
+        """
+        从磁盘加载签名（参数不一致时忽略文件）
+
+        Returns:
+            加载的签名数量
+        """
+        if not os.path.exists(path):
+            return 0
+
+        with np.load(path) as data:
+            params = tuple(int(value) for value in data["params"])
+            if params != (self.num_perm, self.bands, self.shingle_size, self.seed):
+                logger.warning(f"⚠️ 新颖性索引参数不一致，忽略持久化文件: {path}")
+                return 0
+            keys = [str(key) for key in data["keys"]]
+            signatures = data["signatures"]
+
+        loaded = sum(1 for key, signature in zip(keys, signatures) if self.add(key, "", signature))
+        logger.info(f"📂 新颖性索引已加载: {loaded} 条签名")
+        return loaded
@@ -0,0 +1,543 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+提供商路由器 - Provider Router
+为 LLMManager 提供延迟感知的路由、熔断与对冲请求
+
+- 每个提供商维护延迟 EWMA、最近成功请求的延迟窗口（用于 p95）和最近结果窗口（用于错误率）
+- 熔断器：closed -> open（连续失败或错误率过高）-> half-open（冷却后放行少量探测请求）-> closed
+- 对冲请求：主提供商超过其 p95 延迟仍未返回时，向次优提供商发送一份重复请求，取先成功者
+- 失败回退：当前所有在途请求都失败后，按排序继续尝试下一个提供商
+- execute() 在线程池中执行同步调用（复制调用方上下文，截止时间与预算随之生效）；
+  aexecute() 在事件循环中执行异步调用，胜出后取消其余在途请求
+- 调用在发出前被拒绝（AttemptRejected，如请求预算不足）时不计入提供商的健康统计
+"""
+
+import math
+import asyncio
+import time
+import logging
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_ROUTING_CONFIG = {
+    "strategy": "latency",                # latency: 按期望延迟排序；priority: 保持给定顺序
+    "ewma_alpha": 0.2,                    # 延迟 EWMA 平滑系数
+    "ewma_decay": 30.0,                   # 没有新样本时期望延迟按 exp(-空闲秒数/该值) 衰减，被冷落的提供商会被重新尝试
+    "latency_window": 100,                # p95 统计的成功请求窗口
+    "min_latency_samples": 10,            # 计算 p95 所需的最少样本
+    "error_window": 20,                   # 错误率统计窗口
+    "breaker": {
+        "consecutive_failures": 3,        # 连续失败达到此数时熔断
+        "error_rate_threshold": 0.5,      # 窗口错误率达到此值时熔断
+        "min_requests": 10,               # 按错误率熔断所需的最少请求数
+        "open_timeout": 30.0,             # 熔断后冷却时间（秒），之后进入半开
+        "half_open_max_probes": 1,        # 半开状态下同时放行的探测请求数
+        "half_open_successes": 1          # 半开状态下连续成功多少次后恢复
+    },
+    "hedging": {
+        "enabled": True,
+        "max_hedges": 1,                  # 每个请求最多额外发送的对冲请求数
+        "quantile": 0.95,                 # 超过主提供商该分位延迟时对冲
+        "min_delay": 0.05,                # 对冲等待下限（秒）
+        "max_delay": 30.0                 # 对冲等待上限；样本不足时使用该值
+    },
+    "max_workers": 16                     # 请求线程池大小（被放弃的慢请求仍占用线程直到返回）
+}
+
+
+class AttemptRejected(Exception):
+    """调用在发出前被拒绝（如请求预算不足）：视为失败，但不计入提供商的延迟与熔断统计"""
+
+
+class CircuitState(Enum):
+    """熔断器状态"""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class ProviderHealth:
+    """单个提供商的延迟/错误统计与熔断器（线程安全）"""
+
+    def __init__(self, name: str, config: Dict[str, Any]):
+        self.name = name
+        self.config = config
+        self.breaker_config = config["breaker"]
+
+        self.state = CircuitState.CLOSED
+        self.latency_ewma: Optional[float] = None
+        self.last_sample_at = 0.0
+        self.latencies: Deque[float] = deque(maxlen=config["latency_window"])
+        self.outcomes: Deque[bool] = deque(maxlen=config["error_window"])
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probes_in_flight = 0
+        self.half_open_successes = 0
+        self.trip_count = 0
+
+        self._lock = threading.Lock()
+
+    # ==================== 统计 ====================
+
+    def latency_quantile(self, quantile: float = 0.95) -> Optional[float]:
+        """成功请求延迟的分位数；样本不足时返回 None"""
+        with self._lock:
+            return self._latency_quantile(quantile)
+
+    def _latency_quantile(self, quantile: float) -> Optional[float]:
+        if len(self.latencies) < self.config["min_latency_samples"]:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[max(0, math.ceil(quantile * len(ordered)) - 1)]  # 最近秩（nearest-rank）
+
+    def error_rate(self) -> float:
+        """最近窗口内的错误率"""
+        with self._lock:
+            return self._error_rate()
+
+    def _error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return 1.0 - sum(self.outcomes) / len(self.outcomes)
+
+    def expected_latency(self) -> float:
+        """
+        期望延迟：EWMA 按成功率放大（失败意味着还要再付一次回退的时间），并随空闲时间衰减；
+        无数据时为 0（优先试探），只有失败时为无穷大
+        """
+        with self._lock:
+            if self.latency_ewma is None:
+                return float('inf') if self.outcomes else 0.0
+            idle = time.monotonic() - self.last_sample_at
+            decayed = self.latency_ewma * math.exp(-idle / self.config["ewma_decay"])
+            return decayed / max(1.0 - self._error_rate(), 0.05)
+
+    # ==================== 熔断器 ====================
+
+    def _cooled_down(self) -> bool:
+        return time.monotonic() - self.opened_at >= self.breaker_config["open_timeout"]
+
+    def is_available(self) -> bool:
+        """是否可能放行请求（不占用探测名额）"""
+        with self._lock:
+            if self.state == CircuitState.CLOSED:
+                return True
+            if self.state == CircuitState.OPEN:
+                return self._cooled_down()
+            return self.probes_in_flight < self.breaker_config["half_open_max_probes"]
+
+    def probe_due(self) -> bool:
+        """熔断器是否在等待探测请求（冷却结束或半开仍有探测名额）"""
+        with self._lock:
+            if self.state == CircuitState.OPEN:
+                return self._cooled_down()
+            return (self.state == CircuitState.HALF_OPEN
+                    and self.probes_in_flight < self.breaker_config["half_open_max_probes"])
+
+    def try_acquire(self) -> bool:
+        """申请发送一次请求：关闭状态直接放行；打开状态冷却后转为半开并放行探测请求"""
+        with self._lock:
+            if self.state == CircuitState.OPEN:
+                if not self._cooled_down():
+                    return False
+                self.state = CircuitState.HALF_OPEN
+                self.probes_in_flight = 0
+                self.half_open_successes = 0
+                logger.info(f"🔌 {self.name} 熔断器半开，放行探测请求")
+            if self.state == CircuitState.HALF_OPEN:
+                if self.probes_in_flight >= self.breaker_config["half_open_max_probes"]:
+                    return False
+                self.probes_in_flight += 1
+            return True
+
+    def release(self):
+        """请求被取消：归还探测名额，结果不计入统计"""
+        with self._lock:
+            if self.state == CircuitState.HALF_OPEN:
+                self.probes_in_flight = max(0, self.probes_in_flight - 1)
+
+    def record(self, success: bool, latency: float):
+        """记录一次请求结果并推进熔断器状态"""
+        with self._lock:
+            self.outcomes.append(success)
+            if self.state == CircuitState.HALF_OPEN:
+                self.probes_in_flight = max(0, self.probes_in_flight - 1)
+
+            if success:
+                self.consecutive_failures = 0
+                # 超过对冲分位的长尾由对冲请求兜底，EWMA 只跟踪常态延迟（持续变慢会很快抬高分位本身）
+                cap = self._latency_quantile(self.config["hedging"]["quantile"])
+                sample = min(latency, cap) if cap is not None else latency
+                self.latencies.append(latency)
+                self.last_sample_at = time.monotonic()
+                alpha = self.config["ewma_alpha"]
+                self.latency_ewma = sample if self.latency_ewma is None else (
+                    alpha * sample + (1 - alpha) * self.latency_ewma)
+                if self.state == CircuitState.HALF_OPEN:
+                    self.half_open_successes += 1
+                    if self.half_open_successes >= self.breaker_config["half_open_successes"]:
+                        self.state = CircuitState.CLOSED
+                        self.outcomes.clear()
+                        self.latency_ewma = latency  # 熔断前的 EWMA 已过时，以探测延迟重新开始
+                        logger.info(f"✅ {self.name} 熔断器恢复关闭")
+                return
+
+            self.consecutive_failures += 1
+            if self.state == CircuitState.HALF_OPEN:
+                self._trip("探测请求失败")
+            elif self.state == CircuitState.CLOSED:
+                if self.consecutive_failures >= self.breaker_config["consecutive_failures"]:
+                    self._trip(f"连续失败 {self.consecutive_failures} 次")
+                elif (len(self.outcomes) >= self.breaker_config["min_requests"]
+                      and self._error_rate() >= self.breaker_config["error_rate_threshold"]):
+                    self._trip(f"错误率 {self._error_rate():.0%}")
+
+    def _trip(self, reason: str):
+        """打开熔断器（需持有锁）"""
+        self.state = CircuitState.OPEN
+        self.opened_at = time.monotonic()
+        self.probes_in_flight = 0
+        self.trip_count += 1
+        logger.warning(f"⚡ {self.name} 熔断器打开: {reason}，{self.breaker_config['open_timeout']}s 后半开")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """状态摘要"""
+        p95 = self.latency_quantile(0.95)
+        with self._lock:
+            return {
+                "circuit_state": self.state.value,
+                "latency_ewma": self.latency_ewma,
+                "p95_latency": p95,
+                "error_rate": self._error_rate(),
+                "consecutive_failures": self.consecutive_failures,
+                "trip_count": self.trip_count
+            }
+
+
+@dataclass
+class RoutingResult:
+    """一次路由执行的结果"""
+    provider: Optional[str] = None          # 返回成功响应的提供商
+    response: Any = None                    # 成功响应；全部失败时为最后一个失败响应（可能为 None）
+    attempted: List[str] = field(default_factory=list)
+    hedges: int = 0                         # 发出的对冲请求数
+    fallbacks: int = 0                      # 失败后回退的次数
+    error: Optional[str] = None
+
+    @property
+    def success(self) -> bool:
+        return self.provider is not None
+
+
+class ProviderRouter:
+    """
+    延迟感知的提供商路由器
+
+    execute() 接收候选提供商与一次调用函数 call(provider_name) -> 响应（带 success 属性），
+    负责排序、熔断过滤、对冲与回退。慢请求被对冲后不会被取消，返回时仍计入统计。
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = {
+            **DEFAULT_ROUTING_CONFIG,
+            "breaker": dict(DEFAULT_ROUTING_CONFIG["breaker"]),
+            "hedging": dict(DEFAULT_ROUTING_CONFIG["hedging"])
+        }
+        if config:
+            self._merge_config(self.config, config)
+
+        self._health: Dict[str, ProviderHealth] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.config["max_workers"],
+                                            thread_name_prefix="llm-route")
+
+        self.stats = {
+            "requests": 0,
+            "hedged_requests": 0,
+            "hedge_wins": 0,
+            "fallbacks": 0,
+            "breaker_rejections": 0
+        }
+
+    def _merge_config(self, base_config: Dict, user_config: Dict):
+        """递归合并配置"""
+        for key, value in user_config.items():
+            if key in base_config and isinstance(base_config[key], dict) and isinstance(value, dict):
+                self._merge_config(base_config[key], value)
+            else:
+                base_config[key] = value
+
+    def health(self, provider_name: str) -> ProviderHealth:
+        """提供商的统计与熔断器（不存在时创建）"""
+        health = self._health.get(provider_name)
+        if health is None:
+            with self._lock:
+                health = self._health.setdefault(provider_name, ProviderHealth(provider_name, self.config))
+        return health
+
+    def is_available(self, provider_name: str) -> bool:
+        """熔断器是否可能放行该提供商"""
+        return self.health(provider_name).is_available()
+
+    def rank(self, candidates: List[str], pin_first: bool = False) -> List[str]:
+        """
+        排序候选提供商：熔断中的排除；latency 策略按期望延迟升序（给定顺序作为并列时的次序），
+        等待探测的提供商排在最前，否则被排在末尾的它永远得不到恢复的机会
+
+        Args:
+            candidates: 按优先级排列的候选提供商
+            pin_first: 第一个候选固定排在最前（调用方显式指定了提供商）
+        """
+        available = [name for name in dict.fromkeys(candidates) if self.is_available(name)]
+        if self.config["strategy"] != "latency":
+            return available
+
+        pinned = available[:1] if pin_first and available and available[0] == candidates[0] else []
+        rest = available[len(pinned):]
+        order = {name: index for index, name in enumerate(rest)}
+        return pinned + sorted(rest, key=lambda name: (not self.health(name).probe_due(),
+                                                       self.health(name).expected_latency(), order[name]))
+
+    def hedge_delay(self, provider_name: str) -> float:
+        """发出对冲请求前等待的时间：提供商的 p95 延迟（限制在上下限之间）"""
+        hedging = self.config["hedging"]
+        quantile = self.health(provider_name).latency_quantile(hedging["quantile"])
+        if quantile is None:
+            return hedging["max_delay"]
+        return min(max(quantile, hedging["min_delay"]), hedging["max_delay"])
+
+    def _attempt(self,
+                 provider_name: str,
+                 call: Callable[[str], Any],
+                 on_result: Optional[Callable[[str, Any, float, Optional[str]], None]]) -> Tuple[Any, Optional[str]]:
+        """在工作线程中执行一次调用并记录结果"""
+        start_time = time.perf_counter()
+        response, error = None, None
+        try:
+            response = call(provider_name)
+            if not getattr(response, "success", False):
+                error = getattr(response, "error_message", "") or "请求失败"
+        except AttemptRejected as e:
+            self.health(provider_name).release()
+            return None, str(e)
+        except Exception as e:
+            error = str(e)
+        latency = time.perf_counter() - start_time
+
+        self.health(provider_name).record(error is None, latency)
+        if on_result:
+            try:
+                on_result(provider_name, response, latency, error)
+            except Exception as e:
+                logger.debug(f"❌ 路由结果回调失败: {e}")
+        return response, error
+
+    def execute(self,
+                candidates: List[str],
+                call: Callable[[str], Any],
+                on_result: Optional[Callable[[str, Any, float, Optional[str]], None]] = None,
+                pin_first: bool = False) -> RoutingResult:
+        """
+        执行一次带对冲与回退的请求
+
+        Args:
+            candidates: 按优先级排列的候选提供商
+            call: call(provider_name) -> 响应对象（success 为真表示成功）
+            on_result: 每次尝试完成时的回调 (提供商, 响应, 延迟, 错误)，包括被放弃的对冲请求
+            pin_first: 第一个候选固定作为主提供商
+
+        Returns:
+            RoutingResult
+        """
+        self.stats["requests"] += 1
+        hedging = self.config["hedging"]
+        queue = deque(self.rank(candidates, pin_first))
+        result = RoutingResult()
+        pending: Dict[Future, str] = {}
+
+        def launch() -> Optional[str]:
+            while queue:
+                provider_name = queue.popleft()
+                if self.health(provider_name).try_acquire():
+                    future = self._executor.submit(contextvars.copy_context().run,
+                                                   self._attempt, provider_name, call, on_result)
+                    pending[future] = provider_name
+                    result.attempted.append(provider_name)
+                    return provider_name
+                self.stats["breaker_rejections"] += 1
+            return None
+
+        current = launch()
+        if current is None:
+            result.error = "所有提供商均处于熔断状态"
+            return result
+        hedge_at = time.perf_counter() + self.hedge_delay(current)
+
+        while pending:
+            timeout = None
+            if hedging["enabled"] and result.hedges < hedging["max_hedges"] and queue and hedge_at is not None:
+                timeout = max(0.0, hedge_at - time.perf_counter())
+
+            done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                # 在途请求超过 p95 仍未返回：向次优提供商发送对冲请求
+                hedge = launch()
+                if hedge is None:
+                    hedge_at = None
+                    continue
+                result.hedges += 1
+                self.stats["hedged_requests"] += 1
+                hedge_at = time.perf_counter() + self.hedge_delay(hedge)
+                logger.info(f"🪁 {current} 超过 p95 未返回，对冲请求发送到 {hedge}")
+                continue
+
+            for future in done:
+                provider_name = pending.pop(future)
+                response, error = future.result()
+                if error is None:
+                    result.provider, result.response, result.error = provider_name, response, None
+                    if result.hedges and provider_name != result.attempted[0]:
+                        self.stats["hedge_wins"] += 1
+                    return result
+                result.response, result.error = response, error
+                logger.warning(f"⚠️ {provider_name}请求失败: {error}")
+
+            if not pending:
+                # 在途请求全部失败：回退到下一个提供商
+                current = launch()
+                if current is not None:
+                    result.fallbacks += 1
+                    self.stats["fallbacks"] += 1
+                    hedge_at = time.perf_counter() + self.hedge_delay(current)
+
+        return result
+
+    async def _aattempt(self,
+                        provider_name: str,
+                        call: Callable[[str], Awaitable[Any]],
+                        on_result: Optional[Callable[[str, Any, float, Optional[str]], None]]) -> Tuple[Any, Optional[str]]:
+        """在事件循环中执行一次异步调用并记录结果；被取消时只归还探测名额"""
+        start_time = time.perf_counter()
+        response, error = None, None
+        try:
+            response = await call(provider_name)
+            if not getattr(response, "success", False):
+                error = getattr(response, "error_message", "") or "请求失败"
+        except asyncio.CancelledError:
+            self.health(provider_name).release()
+            raise
+        except AttemptRejected as e:
+            self.health(provider_name).release()
+            return None, str(e)
+        except Exception as e:
+            error = str(e)
+        latency = time.perf_counter() - start_time
+
+        self.health(provider_name).record(error is None, latency)
+        if on_result:
+            try:
+                on_result(provider_name, response, latency, error)
+            except Exception as e:
+                logger.debug(f"❌ 路由结果回调失败: {e}")
+        return response, error
+
+    async def aexecute(self,
+                       candidates: List[str],
+                       call: Callable[[str], Awaitable[Any]],
+                       on_result: Optional[Callable[[str, Any, float, Optional[str]], None]] = None,
+                       pin_first: bool = False) -> RoutingResult:
+        """
+        execute() 的异步版本：call(provider_name) 为协程函数
+
+        与同步版本的区别：得到成功响应（或调用方取消）后，其余在途请求会被取消，
+        不再占用连接，也不计入延迟统计。
+        """
+        self.stats["requests"] += 1
+        hedging = self.config["hedging"]
+        queue = deque(self.rank(candidates, pin_first))
+        result = RoutingResult()
+        pending: Dict[asyncio.Task, str] = {}
+
+        def launch() -> Optional[str]:
+            while queue:
+                provider_name = queue.popleft()
+                if self.health(provider_name).try_acquire():
+                    task = asyncio.ensure_future(self._aattempt(provider_name, call, on_result))
+                    pending[task] = provider_name
+                    result.attempted.append(provider_name)
+                    return provider_name
+                self.stats["breaker_rejections"] += 1
+            return None
+
+        current = launch()
+        if current is None:
+            result.error = "所有提供商均处于熔断状态"
+            return result
+        hedge_at = time.perf_counter() + self.hedge_delay(current)
+
+        try:
+            while pending:
+                timeout = None
+                if hedging["enabled"] and result.hedges < hedging["max_hedges"] and queue and hedge_at is not None:
+                    timeout = max(0.0, hedge_at - time.perf_counter())
+
+                done, _ = await asyncio.wait(list(pending), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedge = launch()
+                    if hedge is None:
+                        hedge_at = None
+                        continue
+                    result.hedges += 1
+                    self.stats["hedged_requests"] += 1
+                    hedge_at = time.perf_counter() + self.hedge_delay(hedge)
+                    logger.info(f"🪁 {current} 超过 p95 未返回，对冲请求发送到 {hedge}")
+                    continue
+
+                for task in done:
+                    provider_name = pending.pop(task)
+                    response, error = task.result()
+                    if error is None:
+                        result.provider, result.response, result.error = provider_name, response, None
+                        if result.hedges and provider_name != result.attempted[0]:
+                            self.stats["hedge_wins"] += 1
+                        return result
+                    result.response, result.error = response, error
+                    logger.warning(f"⚠️ {provider_name}请求失败: {error}")
+
+                if not pending:
+                    current = launch()
+                    if current is not None:
+                        result.fallbacks += 1
+                        self.stats["fallbacks"] += 1
+                        hedge_at = time.perf_counter() + self.hedge_delay(current)
+        finally:
+            # 已有结果或调用方取消：取消其余在途请求
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        return result
+
+    def get_status(self) -> Dict[str, Any]:
+        """路由统计与各提供商状态"""
+        with self._lock:
+            providers = dict(self._health)
+        return {
+            "stats": dict(self.stats),
+            "providers": {name: health.snapshot() for name, health in providers.items()}
+        }
+
+    def shutdown(self, wait_for_pending: bool = False):
+        """关闭线程池"""
+        self._executor.shutdown(wait=wait_for_pending)
@@ -9,10 +9,16 @@ Search Tool Client - for connecting to external search engines
 import json
 import logging
 import time
-from typing import Dict, List, Optional, Any
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
 import requests
 
+from ..shared.deadline import DeadlineExceeded, clamp_timeout, check_current_deadline, get_current_deadline
+from ..shared.result_cache import ResultCache, stable_digest
+
 # 🔧 新增：支持真实DuckDuckGo搜索
 try:
     from duckduckgo_search import DDGS
@@ -35,27 +41,81 @@ logger = logging.getLogger(__name__)
 
 # 全局搜索请求管理器，用于控制请求频率
 class SearchRateLimiter:
-    """搜索速率限制管理器"""
-    def __init__(self):
-        self.last_request_time = 0
-        # 从配置获取请求间隔，如果配置不存在则使用默认值
-        self.min_interval = RAG_CONFIG.get("search_rate_limit_interval", 1.5)
+    """
+    搜索速率限制管理器（令牌桶）
+    
+    - 桶容量 burst 个令牌，每 min_interval 秒补充一个：突发内的并发请求立即放行，
+      持续请求按 min_interval 限速
+    - 令牌不足时预约下一个令牌，在锁外等待（并发请求的等待互不阻塞）
+    - 等待受当前截止时间约束：预约时刻晚于截止时间时不预约，直接抛出 DeadlineExceeded；
+      等待中截止时间被取消时归还令牌并抛出 DeadlineExceeded
+    """
+    def __init__(self, min_interval: Optional[float] = None, burst: Optional[int] = None):
+        # 从配置获取请求间隔与突发容量，如果配置不存在则使用默认值
+        self.min_interval = (RAG_CONFIG.get("search_rate_limit_interval", 1.5)
+                             if min_interval is None else min_interval)
+        self.burst = max(1, int(RAG_CONFIG.get("search_rate_limit_burst", 3) if burst is None else burst))
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+        self.stats = {"acquired": 0, "waited": 0, "rejected": 0, "total_wait_time": 0.0}
     
-    def wait_if_needed(self):
-        """如果需要，等待到下一个允许的请求时间"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
+    def _refill(self, now: float):
+        if self.min_interval > 0:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) / self.min_interval)
+        else:
+            self._tokens = float(self.burst)
+        self._updated_at = now
+    
+    def wait_if_needed(self) -> float:
+        """
+        获取一个令牌，需要时等待（不超过当前截止时间）
         
-        if time_since_last < self.min_interval:
-            wait_time = self.min_interval - time_since_last
-            logger.debug(f"⏳ 速率限制等待: {wait_time:.1f}秒")
-            time.sleep(wait_time)
+        Returns:
+            float: 等待的秒数
         
-        self.last_request_time = time.time()
+        Raises:
+            DeadlineExceeded: 截止时间之前拿不到令牌，或等待中被取消
+        """
+        deadline = get_current_deadline()
+        with self._lock:
+            self._refill(time.monotonic())
+            wait_time = max(0.0, (1.0 - self._tokens) * self.min_interval)
+            remaining = deadline.remaining() if deadline else None
+            if remaining is not None and (deadline.cancelled or wait_time > remaining):
+                self.stats["rejected"] += 1
+                raise DeadlineExceeded("deadline_exceeded at search_rate_limit")
+            self._tokens -= 1.0
+            self.stats["acquired"] += 1
+            if wait_time > 0:
+                self.stats["waited"] += 1
+                self.stats["total_wait_time"] += wait_time
+        
+        if wait_time > 0:
+            logger.debug(f"⏳ 速率限制等待: {wait_time:.1f}秒")
+            if deadline is None:
+                time.sleep(wait_time)
+            elif deadline.cancel_event.wait(wait_time):
+                with self._lock:
+                    self._tokens += 1.0
+                raise DeadlineExceeded("cancelled at search_rate_limit")
+        return wait_time
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """获取限速统计"""
+        with self._lock:
+            self._refill(time.monotonic())
+            return {**self.stats, "available_tokens": self._tokens}
 
 # 全局速率限制器实例
 _rate_limiter = SearchRateLimiter()
 
+# 想法验证搜索结果的共享缓存：search_tools 每次调用都会新建客户端，缓存放在模块级才能命中
+_query_cache = ResultCache(
+    max_size=RAG_CONFIG.get("search_query_cache_size", 256),
+    ttl=RAG_CONFIG.get("search_query_cache_ttl", 1800)
+)
+
 @dataclass
 class SearchResult:
     """搜索结果数据结构"""
@@ -181,6 +241,10 @@ class WebSearchClient:
         base_delay = RAG_CONFIG.get("search_retry_base_delay", 1.0)
         
         for attempt in range(max_retries):
+            # ⏰ 调用方截止时间已到时不再发起搜索
+            if attempt > 0:
+                check_current_deadline("web_search_retry")
+            
             try:
                 # 应用全局速率限制
                 _rate_limiter.wait_if_needed()
@@ -195,7 +259,7 @@ class WebSearchClient:
                 search_start_time = time.time()
                 
                 # 使用最保守的搜索配置避免速率限制
-                with DDGS() as ddgs:
+                with DDGS(timeout=clamp_timeout(RAG_CONFIG.get("search_timeout", 10))) as ddgs:
                     # 执行搜索，使用默认后端自动选择
                     ddgs_results = list(ddgs.text(
                         keywords=query,
@@ -228,6 +292,9 @@ class WebSearchClient:
                     success=True
                 )
                 
+            except DeadlineExceeded:
+                # ⏰ 截止时间前拿不到速率限制令牌：不降级到模拟搜索，直接交给调用方
+                raise
             except Exception as e:
                 error_msg = str(e).lower()
                 
@@ -335,15 +402,16 @@ class WebSearchClient:
 class IdeaVerificationSearchClient:
     """想法验证专用搜索客户端"""
     
-    def __init__(self, web_search_client: WebSearchClient):
+    def __init__(self, web_search_client: WebSearchClient, query_cache: Optional[ResultCache] = None):
         """
         初始化想法验证搜索客户端
         
         Args:
             web_search_client: 网络搜索客户端
+            query_cache: 查询结果缓存（默认使用模块级共享缓存，跨客户端实例复用）
         """
         self.web_search_client = web_search_client
-        self.verification_cache = {}  # 验证结果缓存
+        self.query_cache = _query_cache if query_cache is None else query_cache
         
         logger.info("🔍 IdeaVerificationSearchClient初始化完成")
     
@@ -358,24 +426,28 @@ class IdeaVerificationSearchClient:
         Returns:
             SearchResponse: 搜索响应
         """
-        # 检查缓存
-        cache_key = f"{idea_text}_{hash(str(context))}"
-        if cache_key in self.verification_cache:
-            logger.debug(f"📋 使用缓存的验证搜索结果: {cache_key}")
-            return self.verification_cache[cache_key]
-        
-        # 构建搜索查询
+        # 构建搜索查询（上下文只通过 domain 影响查询，因此按查询缓存）
         search_query = self._build_verification_query(idea_text, context)
         
+        # 检查缓存
+        cached_response = self.query_cache.get(self._query_cache_key(search_query))
+        if cached_response is not None:
+            logger.debug(f"📋 使用缓存的验证搜索结果: {search_query}")
+            return cached_response
+        
         # 执行搜索
         search_response = self.web_search_client.search(search_query, max_results=5)
         
         # 缓存结果
         if search_response.success:
-            self.verification_cache[cache_key] = search_response
+            self.query_cache.put(self._query_cache_key(search_query), search_response)
         
         return search_response
     
+    def _query_cache_key(self, query: str) -> str:
+        """查询结果的缓存键（区分搜索引擎）"""
+        return stable_digest("idea_verification", getattr(self.web_search_client, "search_engine", ""), query)
+    
     def _build_verification_query(self, idea_text: str, context: Optional[Dict] = None) -> str:
         """
         构建用于想法验证的搜索查询
@@ -420,6 +492,51 @@ class IdeaVerificationSearchClient:
         
         return concepts[:3]  # 返回前3个关键概念
     
+    def _concept_key(self, idea_text: str, context: Optional[Dict] = None) -> Tuple:
+        """
+        想法的概念键：规范化（小写、去重、排序）后的关键概念加上领域
+        
+        没有识别出关键概念的想法无法归并，按文本前缀区分。
+        """
+        domain = context.get('domain') if context else None
+        concepts = tuple(sorted({concept.lower() for concept in self._extract_key_concepts(idea_text)}))
+        if concepts:
+            return ("concepts", concepts, domain)
+        return ("text", idea_text[:50], domain)
+    
+    @staticmethod
+    def _build_concept_query(key: Tuple) -> str:
+        """为概念键构建验证查询"""
+        kind, value, domain = key
+        if kind == "concepts":
+            query = f"'{' '.join(value)}' 可行性 实现方法 技术风险"
+        else:
+            query = f"'{value}' 技术方案 实施指南 挑战"
+        return f"{query} {domain}" if domain else query
+    
+    @staticmethod
+    def _merge_concept_keys(keys: List[Tuple]) -> Dict[Tuple, Tuple]:
+        """
+        归并概念键：同一领域内，概念集合是另一个键子集的键并入该键（共享一次搜索）
+        
+        Returns:
+            概念键 -> 实际执行搜索的代表键
+        """
+        unique_keys = list(dict.fromkeys(keys))
+        representatives = {}
+        chosen = []
+        # 概念多的键先成为代表，子集键再并入；同样大小时保持输入顺序
+        for key in sorted(unique_keys, key=lambda k: -len(k[1]) if k[0] == "concepts" else 0):
+            target = None
+            if key[0] == "concepts":
+                target = next((c for c in chosen if c[0] == "concepts" and c[2] == key[2]
+                               and set(key[1]) <= set(c[1])), None)
+            if target is None:
+                chosen.append(key)
+                target = key
+            representatives[key] = target
+        return representatives
+    
     def verify_idea_feasibility(self, idea_text: str, context: Optional[Dict] = None) -> IdeaVerificationResult:
         """
         验证想法的可行性
@@ -447,22 +564,9 @@ class IdeaVerificationSearchClient:
                     error_message=search_response.error_message
                 )
             
-            # 分析搜索结果计算可行性分数
-            feasibility_score = self._calculate_feasibility_score(search_response.results, idea_text)
-            
-            # 生成分析摘要
-            analysis_summary = self._generate_analysis_summary(search_response.results, idea_text, feasibility_score)
-            
-            logger.info(f"✅ 想法验证完成 - 可行性分数: {feasibility_score:.2f}")
-            
-            return IdeaVerificationResult(
-                idea_text=idea_text,
-                feasibility_score=feasibility_score,
-                analysis_summary=analysis_summary,
-                search_results=search_response.results,
-                success=True,
-                error_message=""
-            )
+            verification_result = self._build_verification_result(idea_text, search_response.results)
+            logger.info(f"✅ 想法验证完成 - 可行性分数: {verification_result.feasibility_score:.2f}")
+            return verification_result
             
         except Exception as e:
             logger.error(f"❌ 想法验证失败: {e}")
@@ -475,6 +579,149 @@ class IdeaVerificationSearchClient:
                 error_message=str(e)
             )
     
+    def verify_ideas_batch(self, ideas: List[str], context: Optional[Dict] = None,
+                           max_workers: int = 4,
+                           contexts: Optional[List[Optional[Dict]]] = None) -> List[IdeaVerificationResult]:
+        """
+        批量验证多个想法的可行性
+        
+        一次决策中的思维种子和各条路径通常共享大部分关键概念。这里先把每个想法规范化为
+        概念键，同一领域内概念集合为另一键子集的想法并入同一条搜索，只并发执行一轮搜索，
+        再用共享的结果池为每个想法评分。搜索受全局速率限制与当前截止时间约束，
+        截止时间前拿不到令牌的搜索按失败处理。
+        
+        Args:
+            ideas: 需要验证的想法文本列表
+            context: 共享的上下文信息
+            max_workers: 最大并发搜索数
+            contexts: 与 ideas 一一对应的上下文（可选），覆盖共享上下文中的同名字段
+            
+        Returns:
+            List[IdeaVerificationResult]: 与 ideas 顺序一致的验证结果
+        """
+        if not ideas:
+            return []
+        
+        idea_contexts = [
+            {**(context or {}), **((contexts[index] if contexts and index < len(contexts) else None) or {})}
+            for index in range(len(ideas))
+        ]
+        keys = [self._concept_key(idea_text, idea_context) for idea_text, idea_context in zip(ideas, idea_contexts)]
+        representatives = self._merge_concept_keys(keys)
+        queries = [self._build_concept_query(representatives[key]) for key in keys]
+        unique_queries = list(dict.fromkeys(queries))
+        logger.info(f"🔍 开始批量验证 {len(ideas)} 个想法，按概念归并后共 {len(unique_queries)} 条搜索")
+        
+        responses = self._search_queries_concurrently(unique_queries, max_workers)
+        
+        # 共享结果池：所有搜索结果按 URL 去重
+        result_pool = {}
+        for query in unique_queries:
+            for result in responses[query].results:
+                result_pool.setdefault(result.url, result)
+        
+        verification_results = []
+        for idea_text, query in zip(ideas, queries):
+            try:
+                verification_results.append(
+                    self._verify_against_result_pool(idea_text, responses[query], list(result_pool.values()))
+                )
+            except Exception as e:
+                logger.error(f"❌ 想法验证失败: {e}")
+                verification_results.append(IdeaVerificationResult(
+                    idea_text=idea_text,
+                    feasibility_score=0.0,
+                    analysis_summary=f"验证过程发生错误: {str(e)}",
+                    search_results=[],
+                    success=False,
+                    error_message=str(e)
+                ))
+        
+        logger.info(f"✅ 批量想法验证完成: {sum(1 for r in verification_results if r.success)}/{len(ideas)} 成功")
+        return verification_results
+    
+    def _search_queries_concurrently(self, queries: List[str], max_workers: int) -> Dict[str, SearchResponse]:
+        """并发执行去重后的搜索查询（已缓存的查询直接复用）"""
+        responses = {}
+        for query in queries:
+            cached_response = self.query_cache.get(self._query_cache_key(query))
+            if cached_response is not None:
+                responses[query] = cached_response
+        pending_queries = [query for query in queries if query not in responses]
+        if not pending_queries:
+            return responses
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pending_queries))),
+                                thread_name_prefix="IdeaVerification") as executor:
+            # 带上当前上下文，调用方的截止时间随之传递到搜索线程
+            futures = {
+                query: executor.submit(contextvars.copy_context().run,
+                                       self.web_search_client.search, query, 5)
+                for query in pending_queries
+            }
+            for query, future in futures.items():
+                try:
+                    responses[query] = future.result()
+                except Exception as e:
+                    logger.warning(f"⚠️ 验证搜索失败: {query[:50]} - {e}")
+                    responses[query] = SearchResponse(
+                        query=query, results=[], total_results=0, search_time=0.0,
+                        success=False, error_message=str(e)
+                    )
+                
+                if responses[query].success:
+                    self.query_cache.put(self._query_cache_key(query), responses[query])
+        
+        return responses
+    
+    def _verify_against_result_pool(self, idea_text: str, own_response: SearchResponse,
+                                    result_pool: List[SearchResult], max_results: int = 5) -> IdeaVerificationResult:
+        """
+        基于共享结果池验证单个想法
+        
+        候选结果为自身查询的结果，以及结果池中提及该想法关键概念的其他结果；
+        按概念命中数排序（同分时自身查询的结果优先），最多取 max_results 条。
+        """
+        key_concepts = [concept.lower() for concept in self._extract_key_concepts(idea_text)]
+        own_urls = {result.url for result in own_response.results} if own_response.success else set()
+        
+        ranked_results = []
+        for result in result_pool:
+            content = (result.title + " " + result.snippet).lower()
+            concept_matches = sum(1 for concept in key_concepts if concept in content)
+            is_own = result.url in own_urls
+            if is_own or concept_matches > 0:
+                ranked_results.append((concept_matches, is_own, result))
+        
+        if not ranked_results and not own_response.success:
+            return IdeaVerificationResult(
+                idea_text=idea_text,
+                feasibility_score=0.0,
+                analysis_summary="搜索失败，无法进行可行性验证",
+                search_results=[],
+                success=False,
+                error_message=own_response.error_message
+            )
+        
+        ranked_results.sort(key=lambda item: (item[0], item[1]), reverse=True)
+        return self._build_verification_result(
+            idea_text, [result for _, _, result in ranked_results[:max_results]]
+        )
+    
+    def _build_verification_result(self, idea_text: str, search_results: List[SearchResult]) -> IdeaVerificationResult:
+        """根据搜索结果计算可行性分数并生成分析摘要"""
+        feasibility_score = self._calculate_feasibility_score(search_results, idea_text)
+        analysis_summary = self._generate_analysis_summary(search_results, idea_text, feasibility_score)
+        
+        return IdeaVerificationResult(
+            idea_text=idea_text,
+            feasibility_score=feasibility_score,
+            analysis_summary=analysis_summary,
+            search_results=search_results,
+            success=True,
+            error_message=""
+        )
+    
     def _calculate_feasibility_score(self, search_results: List[SearchResult], idea_text: str) -> float:
         """
         基于搜索结果计算可行性分数
@@ -148,6 +148,65 @@ def idea_verification(idea_text: str) -> Dict[str, Any]:
     return results_data
 
 
+@tool(
+    category=ToolCategory.SEARCH,
+    batch_support=True,      # 支持批量处理
+    rate_limited=True       # 有速率限制
+)
+def idea_verification_batch(ideas: List[str], domain: Optional[str] = None,
+                            contexts: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    批量验证多个想法的可行性，共享关键概念的搜索只执行一次。
+    
+    输入：想法描述文本列表（如思维种子和各条思维路径）
+    输出：与输入顺序一致的可行性评分、分析摘要和相关搜索结果
+    适用于一次决策中需要同时验证多个候选方案的场景。
+    
+    Args:
+        ideas: 想法描述文本列表
+        domain: 可选的领域信息，附加到验证查询中
+        contexts: 可选的逐个想法上下文（与 ideas 一一对应），覆盖共享的 domain
+        
+    Returns:
+        Dict: 批量验证结果数据
+    """
+    if not ideas:
+        raise ValueError("想法列表为空")
+    
+    logger.info(f"💡 执行批量想法验证: {len(ideas)} 个想法")
+    
+    web_search_client = WebSearchClient(search_engine="duckduckgo", max_results=5)
+    verification_client = IdeaVerificationSearchClient(web_search_client)
+    context = {"domain": domain} if domain else None
+    verification_results = verification_client.verify_ideas_batch(ideas, context, contexts=contexts)
+    
+    results_data = {
+        "results": [
+            {
+                "idea_text": result.idea_text,
+                "feasibility_score": result.feasibility_score,
+                "analysis_summary": result.analysis_summary,
+                "search_results": [
+                    {
+                        "title": search_result.title,
+                        "snippet": search_result.snippet,
+                        "url": search_result.url,
+                        "relevance_score": search_result.relevance_score
+                    }
+                    for search_result in result.search_results
+                ],
+                "success": result.success,
+                "error_message": result.error_message
+            }
+            for result in verification_results
+        ],
+        "search_rounds": web_search_client.get_search_stats()["total_searches"]
+    }
+    
+    logger.info(f"✅ 批量想法验证完成: {len(ideas)} 个想法，{results_data['search_rounds']} 次搜索")
+    return results_data
+
+
 # ============================================================================
 # 📊 新旧对比展示 - 代码量对比
 # ============================================================================
@@ -194,6 +253,10 @@ def create_and_register_search_tools():
         registered_tools["idea_verification"] = "✅ 已自动注册"
         logger.info("✅ idea_verification 工具已自动注册")
     
+    if "idea_verification_batch" in available_tools:
+        registered_tools["idea_verification_batch"] = "✅ 已自动注册"
+        logger.info("✅ idea_verification_batch 工具已自动注册")
+    
     logger.info("🎉 所有搜索工具检查完成 - 装饰器自动注册工作正常！")
     return registered_tools
 
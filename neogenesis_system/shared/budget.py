@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+请求预算 - Request Budget
+限制单次决策（语义分析、种子生成、逐路径验证……）可消耗的 token、成本、LLM 调用次数与时间
+
+使用方式：
+- 调用方创建 Budget，并通过 budget_scope() 设为当前上下文的预算
+- 预算的时间限制只用于降级（到期后不再发起 LLM 调用），不会像 deadline_scope 那样在阶段边界中止决策
+- 每次 LLM 调用前通过 reserve_llm_call() 预留额度：提示按字符数保守估计 token，
+  完成部分的 max_tokens 被收紧到剩余额度以内；调用结束后 commit() 按实际用量结算
+- 规划器、路径生成器、工具协调器在阶段边界读取 current_degradation()，按固定顺序降级：
+  减少验证路径 → 不做 LLM 验证 → 只用启发式（不再发起 LLM 调用）
+"""
+
+import threading
+import contextvars
+from contextlib import contextmanager
+from enum import IntEnum
+from typing import Any, Dict, Iterator, Optional
+
+from .deadline import Deadline
+
+
+class BudgetExceeded(Exception):
+    """预算不足，调用未发出"""
+
+    def __init__(self, reason: str = "budget_exceeded"):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class DegradationLevel(IntEnum):
+    """降级级别（数值越大降级越多，同一预算内只升不降）"""
+    FULL = 0                    # 正常流程
+    REDUCED_PATHS = 1           # 减少生成与验证的路径数
+    NO_LLM_VERIFICATION = 2     # 跳过 LLM/搜索验证
+    HEURISTIC_ONLY = 3          # 只用启发式，不再发起 LLM 调用
+
+
+DEFAULT_BUDGET_CONFIG = {
+    # 剩余比例（各维度中最小者）低于阈值时进入对应级别
+    "degradation_thresholds": {
+        DegradationLevel.REDUCED_PATHS: 0.5,
+        DegradationLevel.NO_LLM_VERIFICATION: 0.3,
+        DegradationLevel.HEURISTIC_ONLY: 0.1
+    },
+    "reduced_max_paths": 2,         # REDUCED_PATHS 级别下的最大路径数
+    "min_completion_tokens": 32,    # 剩余额度不足以容纳该数量的完成 token 时拒绝调用
+    "default_max_tokens": 1000,     # 调用方未指定 max_tokens 时的预留量
+    "message_overhead_tokens": 4    # 每条消息的格式开销
+}
+
+
+def estimate_tokens(messages: Any, overhead: int = DEFAULT_BUDGET_CONFIG["message_overhead_tokens"]) -> int:
+    """
+    保守估计提示的 token 数：按字符计（常见分词器下 token 数不超过字符数）
+
+    Args:
+        messages: 字符串、LLMMessage 列表或 {"role", "content"} 字典列表
+    """
+    if isinstance(messages, str):
+        return len(messages) + overhead
+    total = 0
+    for message in messages or []:
+        content = message.get("content", "") if isinstance(message, dict) else getattr(message, "content", "")
+        total += len(str(content or "")) + overhead
+    return total
+
+
+class BudgetReservation:
+    """一次 LLM 调用的预留额度"""
+
+    def __init__(self, budget: "Budget", prompt_tokens: int, max_tokens: int, rates: Dict[str, float]):
+        self.budget = budget
+        self.prompt_tokens = prompt_tokens
+        self.max_tokens = max_tokens          # 本次调用允许的完成 token 数（已收紧）
+        self.rates = rates
+        self.tokens = prompt_tokens + max_tokens
+        self.cost = budget._cost(prompt_tokens, max_tokens, rates)
+        self._committed = False
+
+    def commit(self, usage: Any = None, failed: bool = False):
+        """
+        结算：有用量按实际用量；成功但没有用量（或异常/被取消）按预留量保守计费；明确失败只计调用次数
+
+        Args:
+            usage: LLMUsage（prompt_tokens / completion_tokens / total_tokens）
+            failed: 请求明确失败且未产生输出
+        """
+        if self._committed:
+            return
+        self._committed = True
+        if usage is not None and getattr(usage, "total_tokens", 0):
+            prompt = getattr(usage, "prompt_tokens", 0)
+            completion = getattr(usage, "completion_tokens", 0) or max(0, usage.total_tokens - prompt)
+            tokens, cost = usage.total_tokens, self.budget._cost(prompt, completion, self.rates)
+        elif failed:
+            tokens, cost = 0, 0.0
+        else:
+            tokens, cost = self.tokens, self.cost
+        self.budget._settle(self, tokens, cost)
+
+
+class Budget:
+    """
+    请求预算
+
+    任一维度未设置（None）表示该维度不限。预留与结算线程安全，
+    并发的对冲请求各自预留，已预留的额度在结算前计入"已用"。
+    """
+
+    def __init__(self,
+                 max_tokens: Optional[int] = None,
+                 max_cost: Optional[float] = None,
+                 max_calls: Optional[int] = None,
+                 timeout: Optional[float] = None,
+                 config: Optional[Dict[str, Any]] = None):
+        """
+        初始化预算
+
+        Args:
+            max_tokens: 最大 token 数（提示 + 完成）
+            max_cost: 最大成本（美元）
+            max_calls: 最大 LLM 调用次数（含对冲与回退）
+            timeout: 距现在的超时秒数
+            config: 覆盖 DEFAULT_BUDGET_CONFIG 的配置
+        """
+        self.config = {**DEFAULT_BUDGET_CONFIG, **(config or {})}
+        self.max_tokens = max_tokens
+        self.max_cost = max_cost
+        self.max_calls = max_calls
+        self.timeout = timeout
+        self.deadline = Deadline(timeout) if timeout is not None else None
+
+        self.tokens_used = 0
+        self.cost_used = 0.0
+        self.calls_used = 0
+        self.rejected_calls = 0
+        self._reserved_tokens = 0
+        self._reserved_cost = 0.0
+        self._reserved_calls = 0
+        self._level = DegradationLevel.FULL
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _cost(prompt_tokens: int, completion_tokens: int, rates: Dict[str, float]) -> float:
+        """按每千 token 单价计算成本"""
+        return (prompt_tokens * rates.get("input", 0.0) + completion_tokens * rates.get("output", 0.0)) / 1000
+
+    def remaining_fraction(self) -> float:
+        """各维度剩余比例中的最小值（已预留视为已用）；不限的维度为 1.0"""
+        with self._lock:
+            fractions = []
+            if self.max_tokens:
+                fractions.append((self.max_tokens - self.tokens_used - self._reserved_tokens) / self.max_tokens)
+            if self.max_cost:
+                fractions.append((self.max_cost - self.cost_used - self._reserved_cost) / self.max_cost)
+            if self.max_calls:
+                fractions.append((self.max_calls - self.calls_used - self._reserved_calls) / self.max_calls)
+        if self.deadline is not None and self.timeout:
+            fractions.append(self.deadline.remaining() / self.timeout)
+        return max(0.0, min(fractions, default=1.0))
+
+    def degradation_level(self) -> DegradationLevel:
+        """当前降级级别（只升不降，保证同一请求内的降级顺序确定）"""
+        fraction = self.remaining_fraction()
+        with self._lock:
+            for level, threshold in sorted(self.config["degradation_thresholds"].items(), reverse=True):
+                if fraction < threshold:
+                    self._level = max(self._level, DegradationLevel(level))
+                    break
+            if self.deadline is not None and self.deadline.expired:
+                self._level = DegradationLevel.HEURISTIC_ONLY
+            return self._level
+
+    def limit_paths(self, max_paths: int) -> int:
+        """按降级级别限制路径数"""
+        if self.degradation_level() >= DegradationLevel.REDUCED_PATHS:
+            return max(1, min(max_paths, self.config["reduced_max_paths"]))
+        return max_paths
+
+    def reserve(self, prompt_tokens: int, max_tokens: Optional[int] = None,
+                rates: Optional[Dict[str, float]] = None) -> BudgetReservation:
+        """
+        为一次 LLM 调用预留额度
+
+        Args:
+            prompt_tokens: 提示 token 数（保守估计）
+            max_tokens: 调用方请求的完成 token 上限
+            rates: 每千 token 单价 {"input": ..., "output": ...}
+
+        Returns:
+            BudgetReservation（max_tokens 已收紧到剩余额度以内）
+
+        Raises:
+            BudgetExceeded: 已进入只用启发式级别，或剩余额度不足以发出调用
+        """
+        rates = rates or {}
+        min_completion = self.config["min_completion_tokens"]
+        completion = max_tokens or self.config["default_max_tokens"]
+
+        with self._lock:
+            reason = None
+            if self.degradation_level() >= DegradationLevel.HEURISTIC_ONLY:
+                reason = "heuristic_only"
+            elif self.max_calls is not None and self.calls_used + self._reserved_calls >= self.max_calls:
+                reason = "max_calls"
+            else:
+                if self.max_tokens is not None:
+                    available = self.max_tokens - self.tokens_used - self._reserved_tokens - prompt_tokens
+                    completion = min(completion, available)
+                    if completion < min_completion:
+                        reason = "max_tokens"
+                price = max(rates.get("input", 0.0), rates.get("output", 0.0)) / 1000
+                if reason is None and self.max_cost is not None and price > 0:
+                    available = (self.max_cost - self.cost_used - self._reserved_cost) / price - prompt_tokens
+                    completion = min(completion, int(available))
+                    if completion < min_completion:
+                        reason = "max_cost"
+
+            if reason is not None:
+                self.rejected_calls += 1
+                raise BudgetExceeded(reason)
+
+            reservation = BudgetReservation(self, prompt_tokens, completion, rates)
+            self._reserved_tokens += reservation.tokens
+            self._reserved_cost += reservation.cost
+            self._reserved_calls += 1
+            return reservation
+
+    def _settle(self, reservation: BudgetReservation, tokens: int, cost: float):
+        """释放预留并计入实际用量"""
+        with self._lock:
+            self._reserved_tokens -= reservation.tokens
+            self._reserved_cost -= reservation.cost
+            self._reserved_calls -= 1
+            self.tokens_used += tokens
+            self.cost_used += cost
+            self.calls_used += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """预算使用情况"""
+        level = self.degradation_level()
+        with self._lock:
+            return {
+                "max_tokens": self.max_tokens,
+                "max_cost": self.max_cost,
+                "max_calls": self.max_calls,
+                "timeout": self.timeout,
+                "tokens_used": self.tokens_used,
+                "cost_used": self.cost_used,
+                "calls_used": self.calls_used,
+                "rejected_calls": self.rejected_calls,
+                "remaining_fraction": self.remaining_fraction(),
+                "degradation_level": level.name.lower()
+            }
+
+
+_current_budget: contextvars.ContextVar = contextvars.ContextVar(
+    "neogenesis_current_budget", default=None
+)
+
+
+def get_current_budget() -> Optional[Budget]:
+    """获取当前上下文的预算"""
+    return _current_budget.get()
+
+
+@contextmanager
+def budget_scope(budget: Optional[Budget]) -> Iterator[Optional[Budget]]:
+    """在上下文内设置当前预算；budget 为 None 时保留外层预算"""
+    token = _current_budget.set(budget if budget is not None else _current_budget.get())
+    try:
+        yield budget
+    finally:
+        _current_budget.reset(token)
+
+
+def current_degradation() -> DegradationLevel:
+    """当前上下文的降级级别；没有预算时为 FULL"""
+    budget = _current_budget.get()
+    return budget.degradation_level() if budget is not None else DegradationLevel.FULL
+
+
+def reserve_llm_call(messages: Any, max_tokens: Optional[int] = None,
+                     rates: Optional[Dict[str, float]] = None) -> Optional[BudgetReservation]:
+    """
+    按当前上下文预算为一次 LLM 调用预留额度；没有预算时返回 None
+
+    Raises:
+        BudgetExceeded: 预算不足
+    """
+    budget = _current_budget.get()
+    if budget is None:
+        return None
+    return budget.reserve(estimate_tokens(messages, budget.config["message_overhead_tokens"]), max_tokens, rates)
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+依赖图调度器 - Dependency Graph Scheduler
+按依赖关系流式调度异步任务：每个节点在其依赖全部完成后立即启动，而不是等待整组完成
+
+- 并发上限：同时运行的节点数不超过 max_concurrency（等价于信号量，但在排队时按优先级放行）
+- 优先级：可启动的节点按 priority（大者优先）、order、加入顺序启动
+- 超时：节点设置 timeout 时，超时记为该节点的错误
+- 结果按完成顺序产出；should_run 可在启动前跳过节点，should_abort 可在某个结果后取消其余在途节点
+- 依赖不在图中的节点不等待该依赖（由 should_run 决定是否执行）；存在环时环上的节点记为阻塞
+"""
+
+import time
+import heapq
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DagNode:
+    """依赖图节点"""
+    node_id: str
+    dependencies: List[str] = field(default_factory=list)
+    priority: int = 0                 # 数值越大越先启动
+    order: int = 0                    # 同优先级时的启动顺序
+    timeout: Optional[float] = None   # 单个节点的超时秒数
+    payload: Any = None               # 调用方附带的数据（如工具计划、Action）
+
+
+@dataclass
+class NodeOutcome:
+    """节点执行结果"""
+    node: DagNode
+    result: Any = None
+    error: Optional[BaseException] = None
+    skipped: bool = False
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def succeeded(self) -> bool:
+        return not self.skipped and self.error is None
+
+    @property
+    def duration(self) -> float:
+        if self.started_at is None or self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.started_at
+
+
+class DependencyScheduler:
+    """依赖图调度器（每个实例调度一次）"""
+
+    def __init__(self, nodes: Sequence[DagNode], max_concurrency: int = 4):
+        """
+        初始化调度器
+
+        Args:
+            nodes: 节点列表（node_id 唯一）
+            max_concurrency: 最大并发节点数
+        """
+        self.nodes: Dict[str, DagNode] = {}
+        for node in nodes:
+            if node.node_id in self.nodes:
+                raise ValueError(f"重复的节点ID: {node.node_id}")
+            self.nodes[node.node_id] = node
+        self.max_concurrency = max(1, max_concurrency)
+
+        self.outcomes: Dict[str, NodeOutcome] = {}
+        self.cancelled: List[str] = []   # 因中止而被取消的在途节点
+        self.blocked: List[str] = []     # 依赖无法满足（环）的节点
+        self.aborted = False
+
+    async def run(self,
+                  runner: Callable[[DagNode], Awaitable[Any]],
+                  should_run: Optional[Callable[[DagNode, Dict[str, NodeOutcome]], bool]] = None,
+                  should_abort: Optional[Callable[[NodeOutcome], bool]] = None) -> AsyncIterator[NodeOutcome]:
+        """
+        调度所有节点，按完成顺序产出结果
+
+        Args:
+            runner: 执行单个节点的协程函数，异常记入 NodeOutcome.error
+            should_run: 依赖完成后、启动前调用，返回 False 时跳过该节点（跳过同样视为完成）
+            should_abort: 每个结果产出前调用，返回 True 时取消其余在途节点并结束调度
+
+        Yields:
+            NodeOutcome，按完成顺序
+        """
+        waiting = {node_id: {dep for dep in node.dependencies if dep in self.nodes and dep != node_id}
+                   for node_id, node in self.nodes.items()}
+        dependents: Dict[str, List[str]] = {node_id: [] for node_id in self.nodes}
+        for node_id, deps in waiting.items():
+            for dep in deps:
+                dependents[dep].append(node_id)
+
+        ready: List = []
+        sequence = 0
+        for node_id, deps in waiting.items():
+            if not deps:
+                heapq.heappush(ready, self._rank(self.nodes[node_id], sequence))
+                sequence += 1
+
+        running: Dict[asyncio.Future, NodeOutcome] = {}
+        finished: List[NodeOutcome] = []
+
+        def complete(outcome: NodeOutcome):
+            nonlocal sequence
+            self.outcomes[outcome.node.node_id] = outcome
+            for dependent in dependents[outcome.node.node_id]:
+                waiting[dependent].discard(outcome.node.node_id)
+                if not waiting[dependent]:
+                    heapq.heappush(ready, self._rank(self.nodes[dependent], sequence))
+                    sequence += 1
+
+        try:
+            while ready or running:
+                # 按优先级启动可运行的节点，直到达到并发上限
+                while ready and len(running) < self.max_concurrency:
+                    node = self.nodes[heapq.heappop(ready)[-1]]
+                    if should_run is not None and not should_run(node, self.outcomes):
+                        outcome = NodeOutcome(node=node, skipped=True)
+                        complete(outcome)
+                        finished.append(outcome)
+                        continue
+                    outcome = NodeOutcome(node=node, started_at=time.perf_counter())
+                    running[asyncio.ensure_future(self._run_node(runner, node))] = outcome
+
+                while finished:
+                    yield finished.pop(0)
+                if not running:
+                    continue
+
+                done, _ = await asyncio.wait(list(running), return_when=asyncio.FIRST_COMPLETED)
+                for future in sorted(done, key=lambda f: running[f].started_at):
+                    outcome = running.pop(future)
+                    outcome.finished_at = time.perf_counter()
+                    try:
+                        outcome.result = future.result()
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception as e:
+                        outcome.error = e
+
+                    if should_abort is not None and should_abort(outcome):
+                        self.outcomes[outcome.node.node_id] = outcome
+                        self.aborted = True
+                        self.cancelled = [pending.node.node_id for future, pending in running.items()
+                                          if not future.done()]
+                        logger.warning(f"🛑 节点 {outcome.node.node_id} 触发中止，取消 {len(self.cancelled)} 个在途节点")
+                        yield outcome
+                        return
+                    complete(outcome)
+                    yield outcome
+
+            self.blocked = [node_id for node_id in self.nodes if node_id not in self.outcomes]
+            if self.blocked:
+                logger.warning(f"⚠️ 依赖无法满足的节点: {self.blocked}")
+        finally:
+            for future in running:
+                future.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+    @staticmethod
+    def _rank(node: DagNode, sequence: int):
+        return (-node.priority, node.order, sequence, node.node_id)
+
+    @staticmethod
+    async def _run_node(runner: Callable[[DagNode], Awaitable[Any]], node: DagNode) -> Any:
+        if node.timeout is not None:
+            return await asyncio.wait_for(runner(node), timeout=node.timeout)
+        return await runner(node)
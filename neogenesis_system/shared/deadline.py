@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+截止时间与协作式取消 - Deadline & Cooperative Cancellation
+为长耗时任务（认知任务、知识探索、回溯分析）传递截止时间和取消信号
+
+使用方式：
+- 调用方创建 Deadline，并通过 deadline_scope() 设为当前上下文的截止时间
+- 各阶段之间调用 deadline.check() 作为取消检查点
+- HTTP 客户端通过 clamp_timeout() 把请求超时收紧到剩余时间，
+  使阻塞中的网络调用在截止时间到达时尽快返回
+"""
+
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Optional, Union, Tuple, Iterator
+
+TimeoutValue = Union[float, int, Tuple[float, float], None]
+
+# 最小网络超时，避免剩余时间接近0时传入非正数超时
+MIN_REQUEST_TIMEOUT = 0.05
+
+
+class DeadlineExceeded(Exception):
+    """截止时间已到或任务已被取消"""
+
+    def __init__(self, reason: str = "deadline_exceeded"):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class Deadline:
+    """
+    截止时间对象
+
+    结合绝对到期时间和可选的取消事件：到期或取消事件被设置都视为"已过期"。
+    """
+
+    def __init__(self, timeout: Optional[float] = None,
+                 cancel_event: Optional[threading.Event] = None):
+        """
+        初始化截止时间
+
+        Args:
+            timeout: 距现在的超时秒数，None 表示不限时
+            cancel_event: 取消事件（如 CognitiveTask.cancel_event）
+        """
+        self.expires_at = time.time() + timeout if timeout is not None else None
+        self.cancel_event = cancel_event or threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        """是否已被显式取消"""
+        return self.cancel_event.is_set()
+
+    @property
+    def expired(self) -> bool:
+        """是否已到期或被取消"""
+        if self.cancelled:
+            return True
+        return self.expires_at is not None and time.time() >= self.expires_at
+
+    def remaining(self) -> Optional[float]:
+        """剩余秒数；不限时返回 None，已过期返回 0"""
+        if self.cancelled:
+            return 0.0
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.time())
+
+    def cancel(self):
+        """取消"""
+        self.cancel_event.set()
+
+    def check(self, stage: str = ""):
+        """
+        取消检查点
+
+        Raises:
+            DeadlineExceeded: 已到期或已取消
+        """
+        if self.cancelled:
+            raise DeadlineExceeded(f"cancelled{f' at {stage}' if stage else ''}")
+        if self.expired:
+            raise DeadlineExceeded(f"deadline_exceeded{f' at {stage}' if stage else ''}")
+
+    def clamp_timeout(self, timeout: TimeoutValue) -> TimeoutValue:
+        """
+        将请求超时收紧到剩余时间以内
+
+        Args:
+            timeout: 原始超时，可以是秒数或 (connect, read) 元组
+
+        Returns:
+            收紧后的超时，格式与输入一致
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        remaining = max(remaining, MIN_REQUEST_TIMEOUT)
+
+        if timeout is None:
+            return remaining
+        if isinstance(timeout, tuple):
+            return tuple(min(part, remaining) for part in timeout)
+        return min(timeout, remaining)
+
+
+_current_deadline: contextvars.ContextVar = contextvars.ContextVar(
+    "neogenesis_current_deadline", default=None
+)
+
+
+def get_current_deadline() -> Optional[Deadline]:
+    """获取当前上下文的截止时间"""
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Deadline]) -> Iterator[Optional[Deadline]]:
+    """
+    在上下文内设置当前截止时间
+
+    嵌套使用时保留更早到期的那个截止时间（取消事件以内层为准）。
+    """
+    outer = _current_deadline.get()
+    effective = deadline
+    if (deadline is not None and outer is not None and outer.expires_at is not None and
+            (deadline.expires_at is None or outer.expires_at < deadline.expires_at)):
+        effective = Deadline(cancel_event=deadline.cancel_event)
+        effective.expires_at = outer.expires_at
+
+    token = _current_deadline.set(effective if effective is not None else outer)
+    try:
+        yield effective
+    finally:
+        _current_deadline.reset(token)
+
+
+def clamp_timeout(timeout: TimeoutValue) -> TimeoutValue:
+    """按当前上下文截止时间收紧请求超时；没有截止时间时原样返回"""
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return timeout
+    return deadline.clamp_timeout(timeout)
+
+
+def check_current_deadline(stage: str = ""):
+    """当前上下文的取消检查点；没有截止时间时不做任何事"""
+    deadline = _current_deadline.get()
+    if deadline is not None:
+        deadline.check(stage)
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+内容寻址结果缓存 - Content-addressed Result Cache
+有容量与 TTL 上限的结果缓存，键为规范化输入的稳定摘要
+
+- stable_digest(): 对输入做规范化 JSON 序列化（键排序、枚举取值、数据类转字典）后取 SHA-256，
+  跨进程稳定（不受 hash() 随机化影响），计算量只与参与摘要的输入大小有关
+- ResultCache: 内存层为 LRU（超出容量淘汰最久未用），条目到期后视为未命中；
+  可选磁盘层（cache_dir）写穿保存，内存未命中时读取并回填，可在进程重启后复用
+- 磁盘条目是带校验和的 JSON 记录（与奖励日志相同的行格式），不使用 pickle，
+  读取不可信的缓存目录不会执行代码；无法 JSON 序列化的值只保存在内存层
+- 磁盘层按条目数与字节数设上限，超出时按 LRU 淘汰（命中时刷新文件 mtime，重启后顺序保持）
+- get() 返回副本，调用方修改返回值不会影响缓存中的条目
+"""
+
+import os
+import copy
+import json
+import time
+import hashlib
+import logging
+import threading
+import dataclasses
+from collections import OrderedDict
+from enum import Enum
+from typing import Any, Callable, Dict, Optional
+
+from .reward_log import encode_record, decode_record
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+DISK_SUFFIX = ".rec"
+LEGACY_SUFFIX = ".pkl"
+DISK_FORMAT_VERSION = 1  # 存放在记录的 seq 字段中
+
+
+def _canonical_default(value: Any) -> Any:
+    """json.dumps 无法直接序列化的值的规范形式"""
+    if isinstance(value, Enum):
+        return value.value
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=repr)
+    if isinstance(value, bytes):
+        return value.hex()
+    return repr(value)
+
+
+def _disk_default(value: Any) -> Any:
+    """磁盘层序列化：枚举取值、数据类转字典，其余无法序列化的值直接报错（不落盘）"""
+    if isinstance(value, Enum):
+        return value.value
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=repr)
+    raise TypeError(f"无法写入磁盘缓存的类型: {type(value).__name__}")
+
+
+def canonical_json(value: Any) -> str:
+    """规范化 JSON：字典键排序、无多余空白，相同内容总是得到相同字符串"""
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(",", ":"),
+                      default=_canonical_default)
+
+
+def stable_digest(*parts: Any) -> str:
+    """输入的稳定摘要（SHA-256 十六进制）"""
+    return hashlib.sha256(canonical_json(list(parts)).encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    有容量与 TTL 上限的结果缓存
+
+    线程安全；值在写入与读取时都会深拷贝。
+    """
+
+    def __init__(self,
+                 max_size: int = 512,
+                 ttl: Optional[float] = 3600.0,
+                 cache_dir: Optional[str] = None,
+                 disk_max_entries: Optional[int] = 4096,
+                 disk_max_bytes: Optional[int] = 64 * 1024 * 1024,
+                 value_decoder: Optional[Callable[[Any], Any]] = None):
+        """
+        初始化结果缓存
+
+        Args:
+            max_size: 内存层最大条目数
+            ttl: 条目存活秒数，None 表示不过期
+            cache_dir: 磁盘层目录，None 表示只用内存
+            disk_max_entries: 磁盘层最大条目数，None 表示不限
+            disk_max_bytes: 磁盘层最大字节数，None 表示不限
+            value_decoder: 把磁盘上的 JSON 值还原为原对象（如数据类）的函数，None 表示原样返回
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.cache_dir = cache_dir
+        self.disk_max_entries = disk_max_entries
+        self.disk_max_bytes = disk_max_bytes
+        self.value_decoder = value_decoder
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self._disk_index: "OrderedDict[str, int]" = OrderedDict()  # 磁盘文件 -> 字节数（LRU 顺序）
+        self._disk_bytes = 0
+        self._lock = threading.RLock()
+        self.stats = {
+            "hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "disk_evictions": 0,
+            "expirations": 0
+        }
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self.prune_disk()
+
+    def _expires_at(self, ttl: Optional[float]) -> Optional[float]:
+        ttl = self.ttl if ttl is None else ttl
+        return time.time() + ttl if ttl is not None else None
+
+    @staticmethod
+    def _is_expired(expires_at: Optional[float]) -> bool:
+        return expires_at is not None and time.time() >= expires_at
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        读取缓存
+
+        Returns:
+            值的副本；未命中或已过期时返回 default
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self._is_expired(entry[0]):
+                    del self._entries[key]
+                    self.stats["expirations"] += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return copy.deepcopy(entry[1])
+
+        value = self._read_disk(key)
+        with self._lock:
+            if value is _MISSING:
+                self.stats["misses"] += 1
+                return default
+            self.stats["disk_hits"] += 1
+            expires_at, value = value
+            self._store(key, expires_at, value)
+            return copy.deepcopy(value)
+
+    def put(self, key: str, value: Any, ttl: Optional[float] = None):
+        """
+        写入缓存（有磁盘层时同时写入磁盘）
+
+        Args:
+            key: 缓存键
+            value: 值（保存其副本）
+            ttl: 覆盖默认存活秒数
+        """
+        expires_at = self._expires_at(ttl)
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._store(key, expires_at, value)
+        self._write_disk(key, expires_at, value)
+
+    def _store(self, key: str, expires_at: Optional[float], value: Any):
+        """写入内存层并按 LRU 淘汰（调用方持有锁）"""
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not self._is_expired(entry[0]):
+                return True
+        return self._read_disk(key) is not _MISSING
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def clear(self, disk: bool = True):
+        """清空缓存（disk=True 时同时清空磁盘层）"""
+        with self._lock:
+            self._entries.clear()
+        if disk and self.cache_dir:
+            for path in list(self._disk_files()):
+                self._remove(path)
+            with self._lock:
+                self._disk_index.clear()
+                self._disk_bytes = 0
+
+    # ==================== 磁盘层 ====================
+
+    def _disk_path(self, key: str) -> str:
+        name = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, name[:2], f"{name}{DISK_SUFFIX}")
+
+    def _disk_files(self):
+        for root, _, files in os.walk(self.cache_dir):
+            for file_name in files:
+                if file_name.endswith(DISK_SUFFIX):
+                    yield os.path.join(root, file_name)
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        with self._lock:
+            self._disk_bytes -= self._disk_index.pop(path, 0)
+
+    @staticmethod
+    def _load_record(path: str) -> Optional[Dict[str, Any]]:
+        """读取并校验磁盘记录，损坏或格式不符时返回 None（文件不存在时抛出 FileNotFoundError）"""
+        with open(path, "rb") as f:
+            record = decode_record(f.read())
+        if record is None or record["seq"] != DISK_FORMAT_VERSION or "key" not in record:
+            return None
+        return record
+
+    def _read_disk(self, key: str) -> Any:
+        """读取磁盘条目，返回 (expires_at, value)；不存在、已过期或损坏时返回 _MISSING"""
+        if not self.cache_dir:
+            return _MISSING
+        path = self._disk_path(key)
+        try:
+            record = self._load_record(path)
+            if record is not None and record["key"] == key and self.value_decoder:
+                record["value"] = self.value_decoder(record["value"])
+        except FileNotFoundError:
+            return _MISSING
+        except Exception as e:
+            logger.debug(f"⚠️ 磁盘缓存条目无法还原: {e}")
+            record = None
+        if record is None:
+            logger.debug(f"⚠️ 磁盘缓存条目损坏，已删除: {path}")
+            self._remove(path)
+            return _MISSING
+        if record["key"] != key:
+            return _MISSING
+        if self._is_expired(record["expires_at"]):
+            self._remove(path)
+            with self._lock:
+                self.stats["expirations"] += 1
+            return _MISSING
+        self._touch_disk(path)
+        return record["expires_at"], record["value"]
+
+    def _touch_disk(self, path: str):
+        """命中后移到 LRU 队尾，并刷新 mtime 以便重启后保持顺序"""
+        with self._lock:
+            if path in self._disk_index:
+                self._disk_index.move_to_end(path)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _write_disk(self, key: str, expires_at: Optional[float], value: Any):
+        """原子写入磁盘条目（先写临时文件再替换），超出上限时淘汰最久未用的条目"""
+        if not self.cache_dir:
+            return
+        try:
+            payload = encode_record({"seq": DISK_FORMAT_VERSION, "key": key, "expires_at": expires_at, "value": value},
+                                    default=_disk_default)
+        except (TypeError, ValueError) as e:
+            logger.debug(f"⚠️ 值无法 JSON 序列化，只保存在内存层: {e}")
+            return
+        path = self._disk_path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(temp_path, "wb") as f:
+                f.write(payload)
+            os.replace(temp_path, path)
+        except Exception as e:
+            logger.debug(f"⚠️ 磁盘缓存写入失败: {e}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return
+        with self._lock:
+            self._disk_bytes += len(payload) - self._disk_index.pop(path, 0)
+            self._disk_index[path] = len(payload)
+        self._evict_disk()
+
+    def _evict_disk(self):
+        """按 LRU 淘汰磁盘条目直到满足条目数与字节数上限"""
+        while True:
+            with self._lock:
+                over_entries = self.disk_max_entries is not None and len(self._disk_index) > self.disk_max_entries
+                over_bytes = self.disk_max_bytes is not None and self._disk_bytes > self.disk_max_bytes
+                if not (over_entries or over_bytes) or not self._disk_index:
+                    return
+                path = next(iter(self._disk_index))
+                self.stats["disk_evictions"] += 1
+            self._remove(path)
+
+    def prune_disk(self) -> int:
+        """删除磁盘层中已过期或损坏的条目，按 mtime 重建 LRU 索引并执行上限，返回删除数量"""
+        if not self.cache_dir:
+            return 0
+        removed = 0
+        survivors = []
+        for root, _, files in os.walk(self.cache_dir):
+            for file_name in files:
+                if file_name.endswith(LEGACY_SUFFIX):  # 旧版 pickle 条目不加载，直接删除
+                    self._remove(os.path.join(root, file_name))
+                    removed += 1
+        for path in list(self._disk_files()):
+            try:
+                record = self._load_record(path)
+                expired = record is None or self._is_expired(record["expires_at"])
+                stat = os.stat(path)
+            except Exception:
+                expired = True
+            if expired:
+                self._remove(path)
+                removed += 1
+            else:
+                survivors.append((stat.st_mtime, path, stat.st_size))
+        with self._lock:
+            self._disk_index = OrderedDict((path, size) for _, path, size in sorted(survivors))
+            self._disk_bytes = sum(self._disk_index.values())
+        self._evict_disk()
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """缓存统计"""
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["disk_hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "disk_enabled": bool(self.cache_dir),
+                "disk_size": len(self._disk_index),
+                "disk_bytes": self._disk_bytes,
+                "hit_rate": (self.stats["hits"] + self.stats["disk_hits"]) / lookups if lookups else 0.0
+            }
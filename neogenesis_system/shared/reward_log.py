@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+追加式奖励日志 - Append-only Reward Log
+每次更新只追加一行带校验和的记录，定期压缩为紧凑快照；启动时由快照加日志重放得到状态
+
+文件布局（path_prefix 为前缀）:
+- <prefix>.log            每行 "<crc32 十六进制> <紧凑 JSON 记录>"，记录带递增的 seq
+- <prefix>.snapshot.json  {"format_version", "seq", "state"}，原子替换写入
+
+- 重放时跳过 seq 不大于快照 seq 的记录（压缩在写快照后、截断日志前崩溃也不会重复应用）
+- 遇到不完整或校验失败的行即视为日志尾部损坏，之后的内容被截断丢弃
+- 全部为 JSON，不使用 pickle，加载不可信的磁盘文件不会执行代码
+"""
+
+import os
+import json
+import zlib
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from .write_coalescer import atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+ApplyFunction = Callable[[Dict[str, Any], Dict[str, Any]], None]
+
+
+def encode_record(record: Dict[str, Any], default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """编码一行日志：校验和 + 紧凑 JSON（default 同 json.dumps）"""
+    payload = json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=default).encode("utf-8")
+    return b"%08x " % zlib.crc32(payload) + payload + b"\n"
+
+
+def decode_record(line: bytes) -> Optional[Dict[str, Any]]:
+    """解码一行日志，行不完整或校验失败时返回 None"""
+    if not line.endswith(b"\n") or len(line) < 10 or line[8:9] != b" ":
+        return None
+    payload = line[9:-1]
+    try:
+        if int(line[:8], 16) != zlib.crc32(payload):
+            return None
+        record = json.loads(payload.decode("utf-8"))
+    except ValueError:
+        return None
+    return record if isinstance(record, dict) and isinstance(record.get("seq"), int) else None
+
+
+class RewardLog:
+    """追加式、带校验和的奖励日志，定期压缩为快照"""
+
+    def __init__(self,
+                 path_prefix: str,
+                 apply: ApplyFunction,
+                 compact_every: int = 1000,
+                 fsync: bool = False):
+        """
+        初始化奖励日志并重放已有记录
+
+        Args:
+            path_prefix: 日志与快照文件的路径前缀
+            apply: 把一条记录应用到状态字典上的函数（追加与重放使用同一函数）
+            compact_every: 追加多少条记录后自动压缩，<= 0 表示只手动压缩
+            fsync: 每次追加后是否 fsync
+        """
+        self.path_prefix = path_prefix
+        self.log_path = f"{path_prefix}.log"
+        self.snapshot_path = f"{path_prefix}.snapshot.json"
+        self.apply = apply
+        self.compact_every = compact_every
+        self.fsync = fsync
+
+        self.state: Dict[str, Any] = {}
+        self.seq = 0
+        self._records_since_snapshot = 0
+        self._lock = threading.RLock()
+        self._file = None
+
+        self.stats = {"appends": 0, "compactions": 0, "replayed": 0, "truncated_bytes": 0}
+
+        directory = os.path.dirname(os.path.abspath(self.log_path))
+        os.makedirs(directory, exist_ok=True)
+        self.replay()
+
+    def replay(self) -> Dict[str, Any]:
+        """从快照与日志重建状态（截断损坏的日志尾部），返回重建后的状态"""
+        with self._lock:
+            self._close_file()
+            state, seq = self._read_snapshot()
+            snapshot_seq = seq
+            replayed = 0
+            good_offset = 0
+
+            if os.path.exists(self.log_path):
+                with open(self.log_path, "rb") as f:
+                    for line in f:
+                        record = decode_record(line)
+                        if record is None:
+                            break
+                        good_offset += len(line)
+                        if record["seq"] <= seq:
+                            continue
+                        self.apply(state, record)
+                        seq = record["seq"]
+                        replayed += 1
+
+                size = os.path.getsize(self.log_path)
+                if good_offset < size:
+                    with open(self.log_path, "r+b") as f:
+                        f.truncate(good_offset)
+                    self.stats["truncated_bytes"] += size - good_offset
+                    logger.warning(f"⚠️ 奖励日志尾部损坏，已截断 {size - good_offset} 字节: {self.log_path}")
+
+            self.state = state
+            self.seq = seq
+            self._records_since_snapshot = seq - snapshot_seq
+            self.stats["replayed"] += replayed
+            self._open_file()
+            return self.state
+
+    def append(self, record: Dict[str, Any]) -> int:
+        """
+        应用并追加一条记录
+
+        Returns:
+            记录的 seq
+        """
+        with self._lock:
+            self.seq += 1
+            entry = {"seq": self.seq, **record}
+            self.apply(self.state, entry)
+            log_file = self._open_file()
+            log_file.write(encode_record(entry))
+            log_file.flush()
+            if self.fsync:
+                os.fsync(log_file.fileno())
+            self.stats["appends"] += 1
+            self._records_since_snapshot += 1
+
+            if 0 < self.compact_every <= self._records_since_snapshot:
+                self.compact()
+            return self.seq
+
+    def compact(self):
+        """把当前状态写为快照并清空日志"""
+        with self._lock:
+            atomic_write_json(self.snapshot_path, {
+                "format_version": SNAPSHOT_FORMAT_VERSION,
+                "seq": self.seq,
+                "state": self.state
+            }, fsync=self.fsync)
+            log_file = self._open_file()
+            log_file.truncate(0)
+            log_file.flush()
+            self._records_since_snapshot = 0
+            self.stats["compactions"] += 1
+
+    def close(self, compact: bool = True):
+        """关闭日志（默认先压缩）；关闭后再追加或压缩会重新打开日志文件"""
+        with self._lock:
+            if self._file is None:
+                return
+            if compact and self._records_since_snapshot:
+                self.compact()
+            self._close_file()
+
+    def _open_file(self):
+        if self._file is None:
+            self._file = open(self.log_path, "ab")
+        return self._file
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _read_snapshot(self):
+        if not os.path.exists(self.snapshot_path):
+            return {}, 0
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            if snapshot.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+                raise ValueError(f"不支持的快照版本: {snapshot.get('format_version')}")
+            return dict(snapshot["state"]), int(snapshot["seq"])
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.error(f"❌ 读取奖励快照失败，仅从日志重放: {e}")
+            return {}, 0
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取日志统计"""
+        return {**self.stats, "seq": self.seq, "records_since_snapshot": self._records_since_snapshot}
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+LRU 会话表 - LRU Session Table
+按最近访问顺序索引的有界会话表：访问、插入、淘汰均为 O(1)
+
+- get()/__getitem__ 会把会话标记为最近使用；peek()/__contains__ 不改变顺序
+- put() 超出容量时逐个淘汰最久未访问的会话，并把被淘汰的条目返回给调用方
+  （由调用方在锁外换出到磁盘），不会出现一次性排序、批量删除的停顿
+- 本身不加锁，由持有它的管理器负责同步
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Tuple
+
+
+class LRUSessionTable:
+    """按最近访问淘汰的有界会话表"""
+
+    def __init__(self, max_size: int = 1000):
+        """
+        初始化会话表
+
+        Args:
+            max_size: 内存中保留的最大会话数
+        """
+        self.max_size = max(1, max_size)
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """获取会话并标记为最近使用"""
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.stats["misses"] += 1
+            return default
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return value
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._entries[key]
+        self._entries.move_to_end(key)
+        return value
+
+    def peek(self, key: str, default: Any = None) -> Any:
+        """获取会话但不改变访问顺序"""
+        return self._entries.get(key, default)
+
+    def put(self, key: str, value: Any) -> List[Tuple[str, Any]]:
+        """
+        插入或更新会话（标记为最近使用）
+
+        Returns:
+            因超出容量被淘汰的 (key, value) 列表，按最久未使用在前
+        """
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        evicted = []
+        while len(self._entries) > self.max_size:
+            evicted.append(self._entries.popitem(last=False))
+        self.stats["evictions"] += len(evicted)
+        return evicted
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        """移除会话"""
+        return self._entries.pop(key, default)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._entries))
+
+    def keys(self) -> List[str]:
+        return list(self._entries.keys())
+
+    def values(self) -> List[Any]:
+        return list(self._entries.values())
+
+    def items(self) -> List[Tuple[str, Any]]:
+        return list(self._entries.items())
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取命中与淘汰统计"""
+        return {**self.stats, "size": len(self._entries), "max_size": self.max_size}
@@ -113,7 +113,7 @@ class StateManager:
         self.execution_steps: List[ExecutionStep] = []
         
         # 当前状态
-        self.current_phase: TaskPhase = TaskPhase.INITIALIZATION
+        self._current_phase: TaskPhase = TaskPhase.INITIALIZATION
         self.current_goal_id: Optional[str] = None
         self.current_turn_id: Optional[str] = None
         
@@ -136,6 +136,22 @@ class StateManager:
         
         logger.info(f"🏗️ StateManager 初始化完成，会话ID: {self.session_id}")
     
+    @property
+    def current_phase(self) -> TaskPhase:
+        """当前任务阶段"""
+        return self._current_phase
+    
+    @current_phase.setter
+    def current_phase(self, phase: TaskPhase):
+        """设置任务阶段，阶段变化时通知监听器"""
+        previous_phase = self._current_phase
+        self._current_phase = phase
+        if phase != previous_phase:
+            self._notify_state_change("phase_changed", {
+                "previous_phase": previous_phase.value,
+                "current_phase": phase.value
+            })
+    
     def _generate_session_id(self) -> str:
         """生成会话ID"""
         timestamp = str(time.time())
@@ -187,7 +203,11 @@ class StateManager:
                 goal.actual_completion_time = time.time()
                 
             logger.debug(f"🎯 目标进度更新: {goal_id}, 进度: {progress:.2%}")
-            self._notify_state_change("goal_progress", {"goal_id": goal_id, "progress": progress})
+            self._notify_state_change("goal_progress", {
+                "goal_id": goal_id,
+                "progress": progress,
+                "status": goal.status.value
+            })
     
     def _find_goal_by_id(self, goal_id: str) -> Optional[UserGoal]:
         """根据ID查找目标"""
@@ -419,6 +439,23 @@ class StateManager:
         
         return state
     
+    def is_current_task_finished(self) -> bool:
+        """
+        判断当前任务是否已结束（完成阶段或目标已达成/失败）
+        
+        相比 get_current_state()，该方法不构建完整状态字典，
+        适合在状态变化回调等高频路径中调用。
+        
+        Returns:
+            当前任务是否已结束
+        """
+        if self._current_phase == TaskPhase.COMPLETION:
+            return True
+        current_goal = self._find_goal_by_id(self.current_goal_id) if self.current_goal_id else None
+        if current_goal is None:
+            return False
+        return current_goal.status in (GoalStatus.ACHIEVED, GoalStatus.FAILED)
+    
     def get_state_features_for_rl(self) -> Dict[str, float]:
         """
         为RL算法提取状态特征
@@ -580,6 +617,23 @@ class StateManager:
         self.state_change_listeners.append(listener)
         logger.debug(f"🔔 添加状态变化监听器: {listener.__name__}")
     
+    def publish_cognitive_result(self, task_id: str, task_type: str, result: Dict[str, Any], **metadata):
+        """
+        发布后台认知计算结果（如进程池中完成的趋势分析），由监听器合并到各自的认知历史
+        
+        Args:
+            task_id: 认知计算ID
+            task_type: 认知计算类型
+            result: 计算结果
+            **metadata: 附加信息（执行时间等）
+        """
+        self._notify_state_change("cognitive_result", {
+            "task_id": task_id,
+            "task_type": task_type,
+            "result": result,
+            **metadata
+        })
+    
     def _notify_state_change(self, event_type: str, event_data: Dict[str, Any]):
         """通知状态变化"""
         for listener in self.state_change_listeners:
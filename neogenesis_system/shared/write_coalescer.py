@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+写合并持久化 - Write Coalescer
+把高频的状态写入合并为后台定时刷新，每个文件在一个刷新周期内最多写一次
+
+- mark_dirty(path, producer) 只登记“该文件已变脏”，刷新时才调用 producer 生成内容，
+  同一文件在一个周期内的多次登记合并为一次写入
+- producer 在调用方提供的状态锁内执行（得到一致的快照），序列化与写盘在锁外进行
+- 写入使用紧凑 JSON，先写临时文件再 os.replace，进程崩溃时磁盘上只会是旧版本或新版本
+- close() 停止后台线程并做最后一次刷新；首次登记时注册 atexit 兜底
+- flush_interval <= 0 时退化为同步写入
+"""
+
+import os
+import json
+import atexit
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+TEMP_SUFFIX = ".tmp"
+
+PathLike = Union[str, Path]
+
+
+def atomic_write_json(path: PathLike, data: Any, fsync: bool = False):
+    """
+    原子写入紧凑 JSON（先写临时文件再替换）
+
+    Args:
+        path: 目标文件
+        data: 可 JSON 序列化的数据
+        fsync: 替换前是否 fsync 临时文件
+    """
+    path = str(path)
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}{TEMP_SUFFIX}"
+    try:
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def remove_stale_temp_files(directory: PathLike) -> int:
+    """删除崩溃遗留的临时文件，返回删除数量"""
+    removed = 0
+    for temp_file in Path(directory).glob(f"*{TEMP_SUFFIX}"):
+        try:
+            temp_file.unlink()
+            removed += 1
+        except OSError:
+            pass
+    if removed:
+        logger.info(f"🧹 删除了 {removed} 个未完成写入的临时文件: {directory}")
+    return removed
+
+
+class WriteCoalescer:
+    """写合并器：登记脏文件，由后台线程按周期合并写入"""
+
+    def __init__(self,
+                 flush_interval: float = 0.5,
+                 lock: Optional[threading.RLock] = None,
+                 fsync: bool = False,
+                 name: str = "write-coalescer"):
+        """
+        初始化写合并器
+
+        Args:
+            flush_interval: 刷新间隔（秒），<= 0 时每次登记立即写入
+            lock: 保护被持久化状态的锁，producer 在其中执行
+            fsync: 写入时是否 fsync
+            name: 后台线程名
+        """
+        self.flush_interval = flush_interval
+        self.lock = lock or threading.RLock()
+        self.fsync = fsync
+        self.name = name
+
+        self._dirty: "OrderedDict[str, Callable[[], Any]]" = OrderedDict()
+        self._dirty_lock = threading.Lock()
+        self._io_lock = threading.Lock()   # 串行化刷新与删除，避免删除后被旧内容写回
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._atexit_registered = False
+        self._closed = False
+
+        self.stats = {"marks": 0, "coalesced": 0, "writes": 0, "flushes": 0, "errors": 0}
+
+    def mark_dirty(self, path: PathLike, producer: Callable[[], Any]):
+        """
+        登记文件待写入
+
+        Args:
+            path: 目标文件
+            producer: 生成文件内容的函数（刷新时在状态锁内调用）
+        """
+        key = str(path)
+        with self._dirty_lock:
+            self.stats["marks"] += 1
+            if key in self._dirty:
+                self.stats["coalesced"] += 1
+            self._dirty[key] = producer
+
+        if self.flush_interval <= 0 or self._closed:
+            self.flush()
+        else:
+            self._ensure_worker()
+
+    def remove(self, path: PathLike) -> bool:
+        """取消待写入的内容并删除文件，返回是否存在待写入内容或文件"""
+        key = str(path)
+        with self._io_lock:
+            with self._dirty_lock:
+                pending = self._dirty.pop(key, None) is not None
+            try:
+                os.remove(key)
+            except FileNotFoundError:
+                return pending
+            return True
+
+    @property
+    def pending(self) -> int:
+        """待写入的文件数"""
+        with self._dirty_lock:
+            return len(self._dirty)
+
+    def flush(self, paths: Optional[Iterable[PathLike]] = None) -> int:
+        """
+        立即写入脏文件（等待进行中的刷新完成），返回写入数量
+
+        Args:
+            paths: 只写入这些文件；None 表示全部
+        """
+        with self._io_lock:
+            with self.lock:
+                with self._dirty_lock:
+                    if paths is None:
+                        dirty, self._dirty = self._dirty, OrderedDict()
+                    else:
+                        dirty = OrderedDict((str(path), self._dirty.pop(str(path)))
+                                            for path in paths if str(path) in self._dirty)
+                payloads = []
+                for path, producer in dirty.items():
+                    try:
+                        payloads.append((path, producer()))
+                    except Exception as e:
+                        self.stats["errors"] += 1
+                        logger.error(f"❌ 生成持久化内容失败 {path}: {e}")
+
+            written = 0
+            for path, data in payloads:
+                try:
+                    atomic_write_json(path, data, fsync=self.fsync)
+                    written += 1
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    logger.error(f"❌ 持久化写入失败 {path}: {e}")
+
+        if payloads:
+            self.stats["flushes"] += 1
+            self.stats["writes"] += written
+        return written
+
+    def close(self):
+        """停止后台线程并写入剩余内容（可重复调用）"""
+        self._closed = True
+        thread = self._thread
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+            self._thread = None
+        self.flush()
+
+    def _ensure_worker(self):
+        if self._thread is not None:
+            return
+        with self._dirty_lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._flush_loop, name=self.name, daemon=True)
+            self._thread.start()
+            if not self._atexit_registered:
+                atexit.register(self.close)
+                self._atexit_registered = True
+        logger.debug(f"💾 后台持久化线程已启动: 每 {self.flush_interval}s 刷新")
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"❌ 后台持久化刷新失败: {e}")
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取写入统计"""
+        return {**self.stats, "pending": self.pending}
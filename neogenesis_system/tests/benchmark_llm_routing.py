@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+LLMManager 路由基准：对冲请求与熔断器
+使用进程内的模拟提供商（脚本化的延迟与故障），比较两种配置下的尾延迟：
+
+- 基线：按优先级顺序、关闭对冲、熔断阈值设为极大值（相当于旧的逐个回退）
+- 路由：延迟排序 + p95 对冲 + 熔断器（冷却时间缩短以便在基准内观察恢复）
+
+模拟场景：主提供商通常 10ms，每 25 次调用出现一次 300ms 的长尾（4%，低于对冲分位）；
+运行期间有一段时间主提供商连续报错（每次 50ms 后失败）；次提供商稳定 30ms。
+
+用法:
+    python neogenesis_system/tests/benchmark_llm_routing.py [--requests N]
+"""
+
+import argparse
+import math
+import threading
+import time
+
+# 添加项目根目录到路径
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from neogenesis_system.tests.llm_fixtures import make_llm_manager
+from neogenesis_system.providers.llm_base import (
+    BaseLLMClient, LLMConfig, LLMProvider, LLMResponse, LLMErrorType, create_error_response
+)
+
+
+class FakeProvider(BaseLLMClient):
+    """模拟提供商：延迟与是否失败由 behaviour(调用序号, 距开始的秒数) 决定"""
+
+    def __init__(self, name: str, behaviour):
+        super().__init__(LLMConfig(provider=LLMProvider.DEEPSEEK, api_key="fake"))
+        self.name = name
+        self.behaviour = behaviour
+        self.calls = 0
+        self.started_at = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def chat_completion(self, messages, temperature=None, max_tokens=None, **kwargs) -> LLMResponse:
+        with self._lock:
+            index = self.calls
+            self.calls += 1
+        delay, success = self.behaviour(index, time.perf_counter() - self.started_at)
+        time.sleep(delay)
+        if not success:
+            return create_error_response(self.name, LLMErrorType.SERVER_ERROR, "模拟故障")
+        return LLMResponse(success=True, content="ok", provider=self.name)
+
+    async def achat_completion(self, messages, temperature=None, max_tokens=None, **kwargs) -> LLMResponse:
+        return self.chat_completion(messages, temperature, max_tokens, **kwargs)
+
+    def validate_config(self) -> bool:
+        return True
+
+    def get_available_models(self):
+        return [self.name]
+
+
+def primary_behaviour(outage_start: float, outage_end: float):
+    def behaviour(index: int, elapsed: float):
+        if outage_start <= elapsed < outage_end:
+            return 0.05, False
+        return (0.3 if index % 25 == 24 else 0.01), True
+    return behaviour
+
+
+def run_scenario(label: str, routing_config: dict, requests: int, outage: tuple) -> dict:
+    """顺序发送 requests 个请求，返回延迟分布与路由统计"""
+    providers = [FakeProvider("primary", primary_behaviour(*outage)),
+                 FakeProvider("secondary", lambda index, elapsed: (0.03, True))]
+    manager = make_llm_manager(providers, routing_config)
+
+    latencies, failures = [], 0
+    for _ in range(requests):
+        start_time = time.perf_counter()
+        response = manager.chat_completion("基准请求")
+        latencies.append(time.perf_counter() - start_time)
+        failures += not response.success
+
+    manager.router.shutdown(wait_for_pending=True)
+    ordered = sorted(latencies)
+
+    def percentile(q: float) -> float:
+        return ordered[max(0, math.ceil(q * len(ordered)) - 1)] * 1000
+
+    routing = manager.router.get_status()
+    return {
+        'label': label,
+        'p50': percentile(0.50),
+        'p95': percentile(0.95),
+        'p99': percentile(0.99),
+        'max': ordered[-1] * 1000,
+        'failures': failures,
+        'hedged': routing['stats']['hedged_requests'],
+        'trips': routing['providers'].get('primary', {}).get('trip_count', 0),
+        'primary_calls': providers[0].calls
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LLMManager 路由基准")
+    parser.add_argument("--requests", type=int, default=400, help="每种配置的请求数")
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.WARNING)
+
+    outage = (1.5, 3.0)
+    scenarios = [
+        ("基线(无对冲/熔断)", {"strategy": "priority", "hedging": {"enabled": False},
+                           "breaker": {"consecutive_failures": 10 ** 9, "min_requests": 10 ** 9}}),
+        ("对冲+熔断", {"breaker": {"open_timeout": 0.5}, "hedging": {"min_delay": 0.02}})
+    ]
+
+    print("🚀 LLMManager 路由基准（延迟单位 ms）")
+    print("=" * 78)
+    print(f"{'配置':<18} {'p50':>7} {'p95':>7} {'p99':>7} {'max':>7} {'失败':>5} {'对冲':>5} {'熔断':>5} {'主调用':>6}")
+    for label, config in scenarios:
+        result = run_scenario(label, config, args.requests, outage)
+        print(f"{result['label']:<18} {result['p50']:>7.1f} {result['p95']:>7.1f} {result['p99']:>7.1f} "
+              f"{result['max']:>7.1f} {result['failures']:>5} {result['hedged']:>5} {result['trips']:>5} "
+              f"{result['primary_calls']:>6}")
+    print("=" * 78)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
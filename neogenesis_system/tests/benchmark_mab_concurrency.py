@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+MABConverger 并发压力基准
+固定总工作量（选择 + 反馈更新），分别用 1/2/4/8 个线程执行，
+报告吞吐量、相对单线程的加速比，并用原子快照校验计数没有丢失。
+
+用法:
+    python neogenesis_system/tests/benchmark_mab_concurrency.py [--rounds N] [--paths N]
+
+注意: CPython 的 GIL 使纯 Python 的选择逻辑无法在多核上真正并行，
+      该基准主要验证锁分段不会在 GIL 之外引入额外串行化；
+      在无 GIL 解释器（3.13t 等）上加速比即反映锁分段的扩展性。
+"""
+
+import argparse
+import threading
+import time
+
+# 添加项目根目录到路径
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from neogenesis_system.cognitive_engine.mab_converger import MABConverger
+from neogenesis_system.cognitive_engine.path_generator import ReasoningPath
+
+
+def _make_paths(count: int):
+    return [
+        ReasoningPath(path_id=f"path_{i}", path_type=f"type_{i}", description=f"基准路径 {i}",
+                      prompt_template="{query}", strategy_id=f"strategy_{i}")
+        for i in range(count)
+    ]
+
+
+def run_benchmark(threads_count: int, total_rounds: int, paths_count: int) -> dict:
+    """用指定线程数完成 total_rounds 次选择与更新，返回耗时与校验结果"""
+    converger = MABConverger()
+    paths = _make_paths(paths_count)
+    rounds_per_thread = total_rounds // threads_count
+    barrier = threading.Barrier(threads_count + 1)
+    errors = []
+
+    def worker(worker_index: int):
+        barrier.wait()
+        try:
+            for i in range(rounds_per_thread):
+                selected = converger.select_best_path(paths)
+                converger.update_path_performance(selected.strategy_id, success=(worker_index + i) % 3 != 0,
+                                                  reward=0.5)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(threads_count)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start_time = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start_time
+
+    expected = rounds_per_thread * threads_count
+    snapshot = converger.get_analytics_snapshot()
+    updates = sum(arm['success_count'] + arm['failure_count'] for arm in snapshot['path_arms'].values())
+    return {
+        'threads': threads_count,
+        'operations': expected,
+        'elapsed': elapsed,
+        'throughput': expected / elapsed if elapsed > 0 else float('inf'),
+        'consistent': not errors and snapshot['total_path_selections'] == expected and updates == expected,
+        'errors': errors
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MABConverger 并发压力基准")
+    parser.add_argument("--rounds", type=int, default=4000, help="每组的总选择+更新次数")
+    parser.add_argument("--paths", type=int, default=16, help="候选路径数量")
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.INFO)
+
+    print("🚀 MABConverger 并发压力基准")
+    print("=" * 60)
+    print(f"{'线程数':>6} {'操作数':>8} {'耗时(s)':>10} {'吞吐(ops/s)':>14} {'加速比':>8} {'一致性':>6}")
+
+    baseline = None
+    all_consistent = True
+    for threads_count in (1, 2, 4, 8):
+        result = run_benchmark(threads_count, args.rounds, args.paths)
+        baseline = baseline or result['throughput']
+        all_consistent = all_consistent and result['consistent']
+        print(f"{result['threads']:>6} {result['operations']:>8} {result['elapsed']:>10.3f} "
+              f"{result['throughput']:>14.1f} {result['throughput'] / baseline:>8.2f} "
+              f"{'✅' if result['consistent'] else '❌':>6}")
+        for error in result['errors'][:3]:
+            print(f"   ❌ {type(error).__name__}: {error}")
+
+    print("=" * 60)
+    print("✅ 所有并发计数一致" if all_consistent else "❌ 检测到丢失的更新")
+    return 0 if all_consistent else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
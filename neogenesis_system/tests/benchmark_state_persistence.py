@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+状态持久化基准：每秒可完成的会话阶段更新数
+模拟 NeogenesisStateManager 在 auto_save 下处理一批决策（每个决策 5 个阶段），比较两种持久化方式：
+
+- 基线：每次阶段更新同步重写整个会话 JSON（indent=2）和整个 MAB 权重文件
+- 写合并：WriteCoalescer 只登记脏文件，后台线程按刷新周期合并写入紧凑 JSON（原子替换）
+
+用法:
+    python neogenesis_system/tests/benchmark_state_persistence.py [--sessions N] [--flush-interval SECONDS]
+"""
+
+import argparse
+import copy
+import json
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+# 添加项目根目录到路径
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from neogenesis_system.shared.write_coalescer import WriteCoalescer
+
+STAGES = ["thinking_seed", "seed_verification", "path_generation", "path_verification", "mab_decision"]
+
+
+def new_session(session_id: str) -> Dict[str, Any]:
+    """与 DecisionState.to_dict() 形状相同的会话（写合并时 producer 用 deepcopy 模拟 to_dict 的 asdict 复制）"""
+    return {"session_id": session_id, "user_query": "如何设计一个高并发的缓存系统", "current_stage": STAGES[0],
+            "stage_results": {}, "created_at": time.time(), "updated_at": time.time(),
+            "reasoning_paths": [], "verified_paths": [], "selected_path": None}
+
+
+def apply_stage(session: Dict[str, Any], weights: Dict[str, Any], stage: str):
+    """模拟 update_session_stage 的内存更新"""
+    data = {"paths": [{"path_id": f"p{i}", "description": "分层缓存与一致性哈希" * 8} for i in range(4)]}
+    session["current_stage"] = stage
+    session["stage_results"][stage] = {"stage": stage, "success": True, "data": data,
+                                       "execution_time": 0.1, "timestamp": time.time()}
+    session["updated_at"] = time.time()
+    if stage == "mab_decision":
+        weights["total_rounds"] += 1
+        weights["strategy_counts"]["systematic"] = weights["strategy_counts"].get("systematic", 0) + 1
+
+
+def run_baseline(directory: Path, sessions: int) -> float:
+    weights = {"strategy_weights": {}, "strategy_counts": {}, "strategy_rewards": {}, "total_rounds": 0}
+    start = time.perf_counter()
+    for index in range(sessions):
+        session = new_session(f"s{index}")
+        for stage in STAGES:
+            apply_stage(session, weights, stage)
+            with open(directory / f"session_s{index}.json", 'w', encoding='utf-8') as f:
+                json.dump(session, f, ensure_ascii=False, indent=2)
+            with open(directory / "mab_weights.json", 'w', encoding='utf-8') as f:
+                json.dump(weights, f, ensure_ascii=False, indent=2)
+    return time.perf_counter() - start
+
+
+def run_coalesced(directory: Path, sessions: int, flush_interval: float) -> Dict[str, Any]:
+    lock = threading.RLock()
+    coalescer = WriteCoalescer(flush_interval=flush_interval, lock=lock)
+    weights = {"strategy_weights": {}, "strategy_counts": {}, "strategy_rewards": {}, "total_rounds": 0}
+    start = time.perf_counter()
+    for index in range(sessions):
+        session = new_session(f"s{index}")
+        for stage in STAGES:
+            with lock:
+                apply_stage(session, weights, stage)
+            coalescer.mark_dirty(directory / f"session_s{index}.json",
+                                  lambda session=session: copy.deepcopy(session))
+            if stage == "mab_decision":
+                coalescer.mark_dirty(directory / "mab_weights.json", lambda: copy.deepcopy(weights))
+    elapsed = time.perf_counter() - start
+    close_start = time.perf_counter()
+    coalescer.close()
+    return {"elapsed": elapsed, "close": time.perf_counter() - close_start, "stats": coalescer.get_stats()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="状态持久化基准")
+    parser.add_argument("--sessions", type=int, default=400, help="决策会话数（每个 5 个阶段）")
+    parser.add_argument("--flush-interval", type=float, default=0.5, help="写合并刷新间隔（秒）")
+    args = parser.parse_args()
+    updates = args.sessions * len(STAGES)
+
+    with tempfile.TemporaryDirectory() as baseline_dir, tempfile.TemporaryDirectory() as coalesced_dir:
+        baseline = run_baseline(Path(baseline_dir), args.sessions)
+        coalesced = run_coalesced(Path(coalesced_dir), args.sessions, args.flush_interval)
+
+    stats = coalesced["stats"]
+    print("🚀 状态持久化基准（auto_save 下的阶段更新吞吐）")
+    print("=" * 62)
+    print(f"{'方式':<12} {'阶段更新/秒':>12} {'文件写入次数':>12}")
+    print(f"{'基线同步写':<12} {updates / baseline:>12.0f} {updates * 2:>12}")
+    print(f"{'写合并':<12} {updates / coalesced['elapsed']:>12.0f} {stats['writes']:>12}")
+    print("=" * 62)
+    print(f"关闭时刷新耗时: {coalesced['close'] * 1000:.1f} ms，合并的登记次数: {stats['coalesced']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+工具结果缓存键基准：长执行计划下的缓存键生成耗时
+模拟 NeogenesisToolCoordinator 执行一条长计划（每个工具只依赖前一个工具），比较两种缓存键：
+
+- 基线：hash('_'.join([..., str(custom_config), str([所有已完成结果的 data])]))，
+  每次查找都把全部历史结果转成字符串，耗时随计划长度线性增长；且 hash() 跨进程不稳定
+- 内容寻址：stable_digest(工具名, 阶段, 查询, 配置, 声明依赖的输出)，耗时与历史长度无关
+
+同时报告 ResultCache 在容量上限下的条目数。
+
+用法:
+    python neogenesis_system/tests/benchmark_tool_cache.py [--steps N] [--payload BYTES]
+"""
+
+import argparse
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+# 添加项目根目录到路径
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from neogenesis_system.shared.result_cache import ResultCache, stable_digest
+
+
+@dataclass
+class StepResult:
+    """与 ExecutionResult 相同的关键字段"""
+    tool_name: str
+    success: bool
+    data: Any
+    dependencies: List[str] = field(default_factory=list)
+
+
+def baseline_key(tool_name: str, query: str, config: Dict[str, Any], previous: Dict[str, StepResult]) -> str:
+    key_components = [
+        tool_name,
+        query,
+        str(config),
+        str([r.data for r in previous.values() if r.success])
+    ]
+    return f"cache_{hash('_'.join(key_components))}"
+
+
+def digest_key(tool_name: str, query: str, config: Dict[str, Any], previous: Dict[str, StepResult],
+               dependencies: List[str]) -> str:
+    return stable_digest(tool_name, "stage", query, config,
+                         {name: previous[name].data for name in dependencies
+                          if name in previous and previous[name].success})
+
+
+def run(steps: int, payload: int, cache_size: int) -> List[Dict[str, float]]:
+    """执行一条长计划，记录每个检查点附近的平均键生成耗时（微秒）"""
+    query = "如何设计一个高并发的缓存系统"
+    config = {"max_paths": 4, "domain": "engineering"}
+    cache = ResultCache(max_size=cache_size)
+    previous: Dict[str, StepResult] = {}
+    checkpoints = sorted({max(1, steps // 10), steps // 4, steps // 2, steps})
+    rows = []
+    baseline_time = digest_time = 0.0
+    window = 0
+
+    for step in range(1, steps + 1):
+        tool_name = f"tool_{step}"
+        dependencies = [f"tool_{step - 1}"] if step > 1 else []
+
+        start = time.perf_counter()
+        baseline_key(tool_name, query, config, previous)
+        baseline_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        key = digest_key(tool_name, query, config, previous, dependencies)
+        digest_time += time.perf_counter() - start
+        window += 1
+
+        result = StepResult(tool_name, True, {"output": f"{step}:" + "x" * payload})
+        cache.put(key, result)
+        previous[tool_name] = result
+
+        if step in checkpoints:
+            rows.append({"step": step, "baseline_us": baseline_time / window * 1e6,
+                         "digest_us": digest_time / window * 1e6, "cache_size": len(cache)})
+            baseline_time = digest_time = 0.0
+            window = 0
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="工具结果缓存键基准")
+    parser.add_argument("--steps", type=int, default=2000, help="计划中的工具数")
+    parser.add_argument("--payload", type=int, default=2048, help="每个结果的数据字节数")
+    parser.add_argument("--cache-size", type=int, default=512, help="ResultCache 容量")
+    args = parser.parse_args()
+
+    print("🚀 工具结果缓存键基准（每次查找的平均耗时，单位 µs）")
+    print("=" * 62)
+    print(f"{'计划位置':>8} {'基线 hash(str)':>16} {'稳定摘要':>12} {'加速比':>8} {'缓存条目':>8}")
+    for row in run(args.steps, args.payload, args.cache_size):
+        print(f"{row['step']:>8} {row['baseline_us']:>16.1f} {row['digest_us']:>12.1f} "
+              f"{row['baseline_us'] / max(row['digest_us'], 1e-9):>7.1f}x {row['cache_size']:>8}")
+    print("=" * 62)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
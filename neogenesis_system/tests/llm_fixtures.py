@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+LLM 测试夹具
+用模拟客户端构造 LLMManager，供提供商路由、异步提供商、流式输出、预算测试与路由基准共用
+"""
+
+import time
+from typing import Any, Dict, Iterable, Optional, Union
+
+from neogenesis_system.providers.llm_manager import LLMManager, ProviderStatus
+from neogenesis_system.providers.provider_router import ProviderRouter
+
+
+def make_llm_manager(clients: Union[Iterable[Any], Dict[str, Any]],
+                     routing_config: Optional[Dict[str, Any]] = None,
+                     **config) -> LLMManager:
+    """
+    用模拟客户端构造 LLMManager（跳过真实提供商的初始化）
+
+    Args:
+        clients: 客户端列表（按 client.name 注册）或 {名称: 客户端} 字典；
+                 默认按给出的顺序全部作为首选与回退提供商
+        routing_config: ProviderRouter 配置
+        **config: 覆盖 manager.config 的配置项（如 primary_provider、fallback_providers）
+
+    Returns:
+        已初始化的 LLMManager
+    """
+    providers = dict(clients) if isinstance(clients, dict) else {client.name: client for client in clients}
+    names = list(providers)
+
+    manager = LLMManager()
+    manager.providers = providers
+    manager.provider_status = {
+        name: ProviderStatus(name=name, enabled=True, healthy=True, last_check=time.time(),
+                             error_count=0, success_count=0, avg_response_time=0.0)
+        for name in names
+    }
+    manager.config.update({
+        "primary_provider": "auto",
+        "preferred_providers": names,
+        "fallback_providers": names,
+        **config
+    })
+    manager.router = ProviderRouter(routing_config)
+    manager.initialized = True
+    return manager
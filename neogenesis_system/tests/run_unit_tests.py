@@ -25,6 +25,9 @@ from tests.unit.test_rag_seed_generator import (
 from tests.unit.test_mab_converger import (
     TestMABConverger, 
     TestMABConvergerGoldenTemplateManagement,
+    TestMABConvergerGoldenTemplateIndex,
+    TestMABConvergerConcurrency,
+    TestMABConvergerSnapshot,
     TestMABConvergerConfidenceSystem
 )
 
@@ -77,7 +80,9 @@ class UnitTestRunner:
             },
             'mab_converger': {
                 'name': 'MABConverger（MAB收敛器）',
-                'test_classes': [TestMABConverger, TestMABConvergerGoldenTemplateManagement, TestMABConvergerConfidenceSystem],
+                'test_classes': [TestMABConverger, TestMABConvergerGoldenTemplateManagement, TestMABConvergerGoldenTemplateIndex,
+                                 TestMABConvergerConcurrency, TestMABConvergerSnapshot,
+                                 TestMABConvergerConfidenceSystem],
                 'description': '测试路径选择算法、性能更新和黄金模板系统'
             }
         }
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+原生异步LLM客户端单元测试
+使用本地 aiohttp 模拟服务（返回 OpenAI / Anthropic / Ollama 格式的响应），
+测试响应解析、共享连接池、单次调用超时、取消以及 LLMManager 的异步路由
+"""
+
+import unittest
+import asyncio
+import time
+
+# 添加项目根目录到路径
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from aiohttp import web
+
+from neogenesis_system.providers.async_http import get_async_http_client, aclose_async_http_clients
+from neogenesis_system.providers.impl.openai_client import OpenAIClient
+from neogenesis_system.providers.impl.anthropic_client import AnthropicClient
+from neogenesis_system.providers.impl.ollama_client import OllamaClient
+from neogenesis_system.providers.llm_manager import LLMManager
+from neogenesis_system.tests.llm_fixtures import make_llm_manager
+from neogenesis_system.providers.llm_base import (
+    BaseLLMClient, LLMConfig, LLMProvider, LLMResponse, LLMMessage, LLMErrorType
+)
+
+
+class MockLLMServer:
+    """本地模拟服务：model 为 "slow" 时挂起直到服务关闭，为 "missing" 时返回 404"""
+
+    def __init__(self):
+        self.released = asyncio.Event()
+        self.requests = []
+        self.peers = set()
+        self.runner = None
+        self.base_url = ""
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post('/v1/chat/completions', self.openai)
+        app.router.add_post('/v1/messages', self.anthropic)
+        app.router.add_post('/api/chat', self.ollama)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}"
+
+    async def stop(self):
+        self.released.set()
+        await self.runner.cleanup()
+
+    async def _receive(self, request):
+        body = await request.json()
+        self.requests.append((request.path, dict(request.headers), body))
+        self.peers.add(request.transport.get_extra_info('peername')[1])
+        if body.get('model') == 'slow':
+            await self.released.wait()
+        return body
+
+    async def openai(self, request):
+        body = await self._receive(request)
+        if body['model'] == 'missing':
+            return web.json_response({"error": {"message": "The model does not exist"}}, status=404)
+        return web.json_response({
+            "id": "chatcmpl-1",
+            "model": body['model'],
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": "openai:" + body['messages'][-1]['content']},
+                         "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 5, "completion_tokens": 7, "total_tokens": 12}
+        })
+
+    async def anthropic(self, request):
+        body = await self._receive(request)
+        return web.json_response({
+            "id": "msg_1",
+            "type": "message",
+            "model": body['model'],
+            "content": [{"type": "text", "text": "anthropic:"}, {"type": "text", "text": body.get('system', '')}],
+            "stop_reason": "end_turn",
+            "usage": {"input_tokens": 3, "output_tokens": 4}
+        })
+
+    async def ollama(self, request):
+        body = await self._receive(request)
+        return web.json_response({
+            "model": body['model'],
+            "message": {"role": "assistant", "content": "ollama:" + body['messages'][-1]['content']},
+            "done": True,
+            "done_reason": "stop"
+        })
+
+
+class TestNativeAsyncClients(unittest.IsolatedAsyncioTestCase):
+    """OpenAI / Anthropic / Ollama 原生异步客户端测试"""
+
+    async def asyncSetUp(self):
+        """启动模拟服务"""
+        self.server = MockLLMServer()
+        await self.server.start()
+
+    async def asyncTearDown(self):
+        """关闭连接池与模拟服务"""
+        await aclose_async_http_clients()
+        await self.server.stop()
+
+    def make_openai(self, **kwargs) -> OpenAIClient:
+        return OpenAIClient(LLMConfig(provider=LLMProvider.OPENAI, api_key="sk-test-key-123",
+                                      base_url=f"{self.server.base_url}/v1", **kwargs))
+
+    async def test_openai_response(self):
+        """OpenAI 格式：内容、用量、认证头"""
+        response = await self.make_openai().achat_completion("你好", model="gpt-test")
+
+        self.assertTrue(response.success)
+        self.assertEqual(response.content, "openai:你好")
+        self.assertEqual(response.model, "gpt-test")
+        self.assertEqual(response.usage.total_tokens, 12)
+        self.assertEqual(response.finish_reason, "stop")
+        self.assertEqual(self.server.requests[0][1]['Authorization'], "Bearer sk-test-key-123")
+
+    async def test_anthropic_response(self):
+        """Anthropic 格式：系统消息单独传递，多个文本块拼接"""
+        client = AnthropicClient(LLMConfig(provider=LLMProvider.ANTHROPIC, api_key="sk-ant-test-key",
+                                           base_url=self.server.base_url))
+        response = await client.achat_completion([LLMMessage(role="system", content="系统"),
+                                                  LLMMessage(role="user", content="你好")])
+
+        self.assertTrue(response.success)
+        self.assertEqual(response.content, "anthropic:系统")
+        self.assertEqual(response.usage.total_tokens, 7)
+        _, headers, body = self.server.requests[0]
+        self.assertEqual(headers['x-api-key'], "sk-ant-test-key")
+        self.assertEqual(body['messages'], [{"role": "user", "content": "你好"}])
+
+    async def test_ollama_response(self):
+        """Ollama 格式"""
+        client = OllamaClient(LLMConfig(provider=LLMProvider.OLLAMA, api_key="", base_url=self.server.base_url))
+        response = await client.achat_completion("你好")
+
+        self.assertTrue(response.success)
+        self.assertEqual(response.content, "ollama:你好")
+        self.assertEqual(response.finish_reason, "stop")
+
+    async def test_error_status(self):
+        """错误状态码映射为错误类型"""
+        response = await self.make_openai().achat_completion("你好", model="missing")
+
+        self.assertFalse(response.success)
+        self.assertEqual(response.error_type, LLMErrorType.MODEL_ERROR)
+        self.assertIn("does not exist", response.error_message)
+
+    async def test_clients_share_keep_alive_pool(self):
+        """同一提供商的多个客户端实例复用同一个连接池与连接"""
+        first, second = self.make_openai(), self.make_openai(model_name="gpt-other")
+        for _ in range(3):
+            self.assertTrue((await first.achat_completion("a")).success)
+            self.assertTrue((await second.achat_completion("b")).success)
+
+        self.assertEqual(len(self.server.peers), 1)
+        self.assertIs(get_async_http_client("openai"), get_async_http_client("openai"))
+
+    async def test_per_call_timeout(self):
+        """单次调用超时"""
+        start_time = time.perf_counter()
+        response = await self.make_openai().achat_completion("你好", model="slow", timeout=0.1)
+
+        self.assertFalse(response.success)
+        self.assertEqual(response.error_type, LLMErrorType.TIMEOUT_ERROR)
+        self.assertLess(time.perf_counter() - start_time, 2.0)
+
+    async def test_cancellation_propagates(self):
+        """取消任务时 CancelledError 向上传播，不记为失败"""
+        client = self.make_openai()
+        task = asyncio.ensure_future(client.achat_completion("你好", model="slow"))
+        await asyncio.sleep(0.1)
+        task.cancel()
+
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertEqual(client.stats['failed_requests'], 0)
+
+
+class AsyncScriptedClient(BaseLLMClient):
+    """按固定延迟返回的异步模拟客户端，记录被取消的次数"""
+
+    def __init__(self, name: str, delay: float):
+        super().__init__(LLMConfig(provider=LLMProvider.DEEPSEEK, api_key="fake"))
+        self.name = name
+        self.delay = delay
+        self.cancelled = 0
+
+    def chat_completion(self, messages, temperature=None, max_tokens=None, **kwargs) -> LLMResponse:
+        raise AssertionError("异步路径不应调用同步接口")
+
+    async def achat_completion(self, messages, temperature=None, max_tokens=None, **kwargs) -> LLMResponse:
+        try:
+            await asyncio.sleep(self.delay() if callable(self.delay) else self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return LLMResponse(success=True, content=self.name, provider=self.name)
+
+    def validate_config(self) -> bool:
+        return True
+
+    def get_available_models(self):
+        return [self.name]
+
+
+class TestLLMManagerAsync(unittest.IsolatedAsyncioTestCase):
+    """LLMManager 异步路由测试"""
+
+    def make_manager(self, clients) -> LLMManager:
+        return make_llm_manager(clients, {"hedging": {"min_delay": 0.02}})
+
+    async def test_hedge_cancels_slow_primary(self):
+        """主提供商超过 p95 时对冲到次优提供商，胜出后取消主提供商的在途请求"""
+        slow = asyncio.Event()
+        primary = AsyncScriptedClient("primary", lambda: 1.0 if slow.is_set() else 0.002)
+        secondary = AsyncScriptedClient("secondary", 0.02)
+        manager = self.make_manager([primary, secondary])
+
+        for _ in range(20):
+            self.assertTrue((await manager.achat_completion("预热")).success)
+        slow.set()
+
+        start_time = time.perf_counter()
+        response = await manager.achat_completion("慢请求")
+
+        self.assertEqual(response.content, "secondary")
+        self.assertLess(time.perf_counter() - start_time, 0.5)
+        self.assertEqual(primary.cancelled, 1)
+        self.assertEqual(manager.stats['hedged_requests'], 1)
+
+    async def test_concurrent_requests_without_threads(self):
+        """并发请求在同一事件循环中完成"""
+        manager = self.make_manager([AsyncScriptedClient("only", 0.05)])
+
+        start_time = time.perf_counter()
+        responses = await asyncio.gather(*(manager.achat_completion(f"请求{i}") for i in range(50)))
+
+        self.assertTrue(all(response.success for response in responses))
+        self.assertLess(time.perf_counter() - start_time, 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
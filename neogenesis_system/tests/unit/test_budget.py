@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+请求预算单元测试
+- Budget 的预留、收紧、结算与确定的降级顺序
+- LLMManager 在预算内调用报告用量的模拟客户端：用量从不超出预算，拒绝不影响熔断
+- 直接调用客户端（call_api、PriorReasoner）同样通过 reserve_budget 受预算约束
+- NeogenesisPlanner 在不同预算下按顺序降级，且始终给出有效决策
+"""
+
+import unittest
+from unittest.mock import Mock
+
+# 添加项目根目录到路径
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from neogenesis_system.shared.budget import (
+    Budget, BudgetExceeded, DegradationLevel, budget_scope, get_current_budget, current_degradation
+)
+from neogenesis_system.providers.llm_base import (
+    BaseLLMClient, LLMConfig, LLMProvider, LLMResponse, LLMUsage, LLMMessage
+)
+from neogenesis_system.providers.llm_manager import LLMManager
+from neogenesis_system.providers.provider_router import CircuitState
+from neogenesis_system.tests.llm_fixtures import make_llm_manager
+from neogenesis_system.core.neogenesis_planner import NeogenesisPlanner
+from neogenesis_system.cognitive_engine.path_generator import PathGenerator
+from neogenesis_system.cognitive_engine.data_structures import ReasoningPath
+from neogenesis_system.cognitive_engine.reasoner import (
+    PriorReasoner, TriageClassification, TaskComplexity, TaskDomain, TaskIntent, TaskUrgency, RouteStrategy
+)
+
+
+class UsageReportingClient(BaseLLMClient):
+    """报告 token 用量的模拟客户端：提示按两个字符一个 token 计，完成部分用满 max_tokens"""
+
+    def __init__(self, name: str = "fake"):
+        super().__init__(LLMConfig(provider=LLMProvider.DEEPSEEK, api_key="fake", max_tokens=200))
+        self.name = name
+        self.requested_max_tokens = []
+
+    def chat_completion(self, messages, temperature=None, max_tokens=None, **kwargs) -> LLMResponse:
+        if isinstance(messages, str):
+            messages = [LLMMessage(role="user", content=messages)]
+        max_tokens = max_tokens or self.config.max_tokens
+        self.requested_max_tokens.append(max_tokens)
+        prompt_tokens = sum(len(message.content) for message in messages) // 2
+        return LLMResponse(success=True, content="好" * max_tokens, provider=self.name,
+                           usage=LLMUsage(prompt_tokens=prompt_tokens, completion_tokens=max_tokens,
+                                          total_tokens=prompt_tokens + max_tokens))
+
+    def validate_config(self) -> bool:
+        return True
+
+    def get_available_models(self):
+        return [self.name]
+
+
+def make_manager(client: UsageReportingClient) -> LLMManager:
+    return make_llm_manager([client], primary_provider=client.name)
+
+
+class TestBudget(unittest.TestCase):
+    """Budget 预留与降级"""
+
+    def test_reserve_clamps_completion_tokens(self):
+        """完成 token 上限被收紧到剩余额度以内，结算按实际用量"""
+        budget = Budget(max_tokens=500)
+        reservation = budget.reserve(prompt_tokens=100, max_tokens=1000)
+
+        self.assertEqual(reservation.max_tokens, 400)
+        reservation.commit(LLMUsage(prompt_tokens=80, completion_tokens=20, total_tokens=100))
+        self.assertEqual(budget.tokens_used, 100)
+        self.assertEqual(budget.calls_used, 1)
+
+    def test_reserve_rejects_when_exhausted(self):
+        """剩余额度不足以容纳最少完成 token 时拒绝，且不计入已用"""
+        budget = Budget(max_tokens=100)
+
+        with self.assertRaises(BudgetExceeded) as ctx:
+            budget.reserve(prompt_tokens=90)
+        self.assertEqual(ctx.exception.reason, "max_tokens")
+        self.assertEqual(budget.rejected_calls, 1)
+        self.assertEqual(budget.tokens_used, 0)
+
+    def test_max_calls_and_cost(self):
+        """调用次数与成本上限"""
+        budget = Budget(max_calls=1)
+        budget.reserve(prompt_tokens=10).commit(failed=True)
+        with self.assertRaises(BudgetExceeded):
+            budget.reserve(prompt_tokens=10)
+
+        budget = Budget(max_cost=0.01)
+        reservation = budget.reserve(prompt_tokens=1000, max_tokens=10000, rates={"input": 0.001, "output": 0.002})
+        self.assertLessEqual(reservation.cost, 0.01)
+        reservation.commit()
+        self.assertLessEqual(budget.cost_used, 0.01)
+
+    def test_degradation_order(self):
+        """降级顺序确定：减少路径 → 不做LLM验证 → 只用启发式，且只升不降"""
+        budget = Budget(max_tokens=1000)
+        levels = [budget.degradation_level()]
+        for _ in range(10):
+            budget.reserve(prompt_tokens=50, max_tokens=50).commit()
+            levels.append(budget.degradation_level())
+
+        self.assertEqual(levels, sorted(levels))
+        self.assertEqual(list(dict.fromkeys(levels)), list(DegradationLevel))
+        self.assertEqual(budget.limit_paths(4), 2)
+
+        budget.tokens_used = 0
+        self.assertEqual(budget.degradation_level(), DegradationLevel.HEURISTIC_ONLY)
+
+    def test_expired_timeout_is_heuristic_only(self):
+        """时间用完后只用启发式，不再发起调用"""
+        budget = Budget(timeout=0.0)
+
+        self.assertEqual(budget.degradation_level(), DegradationLevel.HEURISTIC_ONLY)
+        with self.assertRaises(BudgetExceeded):
+            budget.reserve(prompt_tokens=1)
+
+    def test_scope(self):
+        """预算只在作用域内生效"""
+        budget = Budget(max_tokens=100)
+        with budget_scope(budget):
+            self.assertIs(get_current_budget(), budget)
+        self.assertIsNone(get_current_budget())
+        self.assertEqual(current_degradation(), DegradationLevel.FULL)
+
+
+class TestBudgetedLLMManager(unittest.TestCase):
+    """LLMManager 预算控制"""
+
+    def test_usage_never_exceeds_budget(self):
+        """重复调用直至预算耗尽：实际用量不超出预算，超出后不再发出请求"""
+        client = UsageReportingClient()
+        manager = make_manager(client)
+        budget = Budget(max_tokens=1000, max_calls=10)
+
+        with budget_scope(budget):
+            for _ in range(20):
+                try:
+                    manager.call_api("请分析这个问题" * 10)
+                except Exception:
+                    pass
+
+        self.assertLessEqual(budget.tokens_used, budget.max_tokens)
+        self.assertLessEqual(budget.calls_used, budget.max_calls)
+        self.assertEqual(budget.calls_used, len(client.requested_max_tokens))
+        self.assertGreater(budget.rejected_calls, 0)
+        self.assertTrue(all(max_tokens <= 200 for max_tokens in client.requested_max_tokens))
+
+    def test_rejection_does_not_trip_breaker(self):
+        """预算拒绝不计入提供商健康统计"""
+        client = UsageReportingClient()
+        manager = make_manager(client)
+
+        with budget_scope(Budget(max_calls=1)):
+            self.assertTrue(manager.chat_completion("第一次").success)
+            for _ in range(5):
+                self.assertFalse(manager.chat_completion("被拒绝").success)
+
+        health = manager.router.health(client.name)
+        self.assertEqual(health.state, CircuitState.CLOSED)
+        self.assertEqual(health.consecutive_failures, 0)
+        self.assertTrue(manager.chat_completion("预算外").success)
+
+    def test_direct_client_call_is_budgeted(self):
+        """不经 LLMManager 直接调用客户端同样受预算约束"""
+        client = UsageReportingClient()
+        budget = Budget(max_tokens=300)
+
+        with budget_scope(budget):
+            self.assertTrue(client.call_api("你好"))
+            with self.assertRaises(ConnectionError):
+                for _ in range(5):
+                    client.call_api("你好")
+
+        self.assertLessEqual(budget.tokens_used, 300)
+        self.assertEqual(budget.calls_used, len(client.requested_max_tokens))
+
+    def test_reasoner_direct_client_is_budgeted(self):
+        """PriorReasoner 直接调用客户端时通过 reserve_budget 预留并结算额度"""
+        client = UsageReportingClient()
+        reasoner = PriorReasoner(enable_llm=False)
+        reasoner.enable_llm, reasoner.ollama_client = True, client
+        budget = Budget(max_tokens=300)
+
+        with budget_scope(budget):
+            self.assertIsNotNone(reasoner._call_llm("你好", max_tokens=500))
+            for _ in range(5):
+                reasoner._call_llm("你好", max_tokens=500)
+
+        self.assertLessEqual(budget.tokens_used, 300)
+        self.assertLess(client.requested_max_tokens[0], 500)
+        self.assertEqual(budget.calls_used, len(client.requested_max_tokens))
+
+
+def make_planner(manager: LLMManager) -> NeogenesisPlanner:
+    """种子生成、路径分析与验证都通过 manager 调用 LLM 的规划器"""
+
+    def get_thinking_seed(user_query, execution_context=None):
+        try:
+            return manager.call_api(f"为问题生成思维种子: {user_query}", max_tokens=100)[:40]
+        except Exception:
+            return f"启发式种子: {user_query}"
+
+    def verify_ideas_batch(requests):
+        results = []
+        for idea_text, _ in requests:
+            try:
+                manager.call_api(f"验证: {idea_text}", max_tokens=100)
+                results.append({'feasibility_analysis': {'feasibility_score': 0.8}, 'reward_score': 0.5})
+            except Exception:
+                results.append({'feasibility_analysis': {'feasibility_score': 0.5}, 'reward_score': 0.0,
+                                'fallback': True})
+        return results
+
+    prior_reasoner = Mock()
+    prior_reasoner.llm_manager = None
+    prior_reasoner.classify_and_route.return_value = TriageClassification(
+        complexity=TaskComplexity.COMPLEX, domain=TaskDomain.GENERAL, intent=TaskIntent.QUESTION,
+        urgency=TaskUrgency.MEDIUM, route_strategy=RouteStrategy.MULTI_STAGE_PROCESSING,
+        confidence=0.7, reasoning="测试", key_factors=[])
+    prior_reasoner.get_thinking_seed.side_effect = get_thinking_seed
+    mab_converger = Mock()
+    mab_converger.select_best_path.side_effect = lambda paths: paths[0]
+    tool_registry = Mock()
+    tool_registry.has_tool.return_value = False
+
+    planner = NeogenesisPlanner(prior_reasoner=prior_reasoner, path_generator=PathGenerator(llm_client=manager),
+                                mab_converger=mab_converger, tool_registry=tool_registry)
+    planner._verify_ideas_batch = verify_ideas_batch
+    return planner
+
+
+class TestBudgetedPlanner(unittest.TestCase):
+    """NeogenesisPlanner 在预算内的降级"""
+
+    def decide(self, budget: Budget):
+        client = UsageReportingClient()
+        planner = make_planner(make_manager(client))
+        with budget_scope(budget):
+            decision = planner._make_decision_logic("如何设计一个高并发的缓存系统")
+        return decision, planner
+
+    def assert_valid(self, decision, budget: Budget):
+        self.assertIsInstance(decision['chosen_path'], ReasoningPath)
+        self.assertIn(decision['chosen_path'], decision['available_paths'])
+        self.assertLessEqual(budget.tokens_used, budget.max_tokens)
+
+    def test_generous_budget_runs_full_pipeline(self):
+        """预算充足：完整验证"""
+        budget = Budget(max_tokens=100000)
+        decision, _ = self.decide(budget)
+
+        self.assert_valid(decision, budget)
+        self.assertTrue(decision['verification_enabled'])
+        self.assertEqual(decision['selection_algorithm'], 'verification_enhanced_mab')
+        self.assertEqual(decision['budget']['degradation_level'], 'full')
+
+    def test_low_budget_reduces_paths(self):
+        """剩余不足一半：减少路径"""
+        budget = Budget(max_tokens=100000)
+        budget.tokens_used = 60000
+        decision, _ = self.decide(budget)
+
+        self.assert_valid(decision, budget)
+        self.assertLessEqual(decision['path_count'], budget.config['reduced_max_paths'])
+        self.assertTrue(decision['verification_enabled'])
+
+    def test_lower_budget_skips_verification(self):
+        """剩余不足三成：不做LLM验证，也不向MAB反馈学习信号"""
+        budget = Budget(max_tokens=100000)
+        budget.tokens_used = 75000
+        decision, planner = self.decide(budget)
+
+        self.assert_valid(decision, budget)
+        self.assertFalse(decision['verification_enabled'])
+        self.assertEqual(decision['selection_algorithm'], 'mab_without_verification')
+        planner.mab_converger.update_path_performance.assert_not_called()
+
+    def test_exhausted_budget_is_heuristic_only(self):
+        """预算几近耗尽：不再发起LLM调用，仍给出有效决策"""
+        budget = Budget(max_tokens=100000)
+        budget.tokens_used = 95000
+        decision, _ = self.decide(budget)
+
+        self.assert_valid(decision, budget)
+        self.assertEqual(budget.calls_used, 0)
+        self.assertTrue(decision['thinking_seed'].startswith("启发式种子"))
+        self.assertEqual(decision['budget']['degradation_level'], 'heuristic_only')
+
+    def test_tight_budget_degrades_during_decision(self):
+        """紧预算：决策过程中逐步降级，用量不超出预算，结果仍然有效"""
+        budget = Budget(max_tokens=600)
+        decision, _ = self.decide(budget)
+
+        self.assert_valid(decision, budget)
+        self.assertGreater(budget.calls_used, 0)
+        self.assertGreaterEqual(budget.degradation_level(), DegradationLevel.NO_LLM_VERIFICATION)
+
+    def test_configured_budget(self):
+        """规划器配置的请求预算在没有外层预算时生效"""
+        planner = make_planner(make_manager(UsageReportingClient()))
+        planner.config['request_budget'] = {'max_tokens': 600}
+        decision = planner._make_decision_logic("如何设计一个高并发的缓存系统")
+
+        self.assertIsInstance(decision['chosen_path'], ReasoningPath)
+        self.assertLessEqual(decision['budget']['tokens_used'], 600)
+        self.assertIsNone(get_current_budget())
+
+
+if __name__ == '__main__':
+    unittest.main()
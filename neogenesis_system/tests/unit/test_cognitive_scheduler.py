@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+cognitive_scheduler.py 单元测试
+测试认知调度器的事件驱动调度逻辑
+"""
+
+import unittest
+import threading
+import time
+from queue import Empty
+from unittest.mock import Mock, patch
+
+# 添加项目根目录到路径
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from neogenesis_system.shared.state_manager import StateManager, TaskPhase, GoalStatus
+from neogenesis_system.core.cognitive_scheduler import (
+    CognitiveScheduler, CognitiveMode, CognitiveTask, CognitiveTaskQueue
+)
+from neogenesis_system.core.cognitive_offload import CognitiveProcessPool
+from neogenesis_system.providers.knowledge_explorer import (
+    KnowledgeExplorer, KnowledgeItem, KnowledgeQuality, analyze_trends
+)
+from neogenesis_system.shared.deadline import (
+    Deadline, DeadlineExceeded, clamp_timeout, deadline_scope, get_current_deadline
+)
+from concurrent.futures import Future
+
+
+def _make_task(task_id: str, priority: int, user_directed: bool = False) -> CognitiveTask:
+    context = {"exploration_mode": "user_directed"} if user_directed else {}
+    return CognitiveTask(task_id=task_id, task_type="knowledge_exploration",
+                         priority=priority, context=context)
+
+
+class TestCognitiveSchedulerEventLoop(unittest.TestCase):
+    """事件驱动调度循环测试"""
+    
+    def setUp(self):
+        """测试前的设置"""
+        self.state_manager = StateManager(session_id="test_session")
+        self.scheduler = CognitiveScheduler(
+            self.state_manager,
+            llm_client=None,
+            config={
+                "idle_detection": {"min_idle_duration": 0.2},
+                "cognitive_tasks": {"max_concurrent_tasks": 1}
+            }
+        )
+    
+    def tearDown(self):
+        """测试后的清理"""
+        if self.scheduler.is_running:
+            self.scheduler.stop()
+    
+    def _wait_for(self, predicate, timeout: float = 2.0) -> bool:
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if predicate():
+                return True
+            time.sleep(0.01)
+        return predicate()
+    
+    def test_sleeps_without_events(self):
+        """没有状态事件时主循环应休眠，而不是周期性轮询"""
+        self.scheduler.start()
+        time.sleep(0.5)
+        
+        # 启动时唤醒一次，之后没有事件也没有到期定时器
+        self.assertLessEqual(self.scheduler.stats["scheduler_wakeups"], 2)
+    
+    def test_idle_detection_does_not_build_full_state(self):
+        """空闲检测不应调用 get_current_state 构建完整状态"""
+        with patch.object(self.state_manager, 'get_current_state',
+                          wraps=self.state_manager.get_current_state) as mock_state:
+            self.scheduler.start()
+            goal_id = self.state_manager.add_user_goal("测试查询")
+            self.state_manager.update_goal_progress(goal_id, 0.5, GoalStatus.IN_PROGRESS)
+            time.sleep(0.1)
+            
+            self.assertFalse(self.scheduler.is_idle)
+            self.assertEqual(mock_state.call_count, 0)
+    
+    def test_goal_completion_wakes_scheduler_into_idle(self):
+        """目标完成事件应唤醒调度器，并在最小空闲时长到期后进入空闲模式"""
+        self.scheduler.start()
+        goal_id = self.state_manager.add_user_goal("测试查询")
+        
+        start_time = time.time()
+        self.state_manager.update_goal_progress(goal_id, 1.0, GoalStatus.ACHIEVED)
+        
+        self.assertTrue(self._wait_for(lambda: self.scheduler.is_idle))
+        elapsed = time.time() - start_time
+        
+        self.assertGreaterEqual(elapsed, 0.2)
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual(self.scheduler.current_mode, CognitiveMode.COGNITIVE_IDLE)
+        self.assertEqual(self.scheduler.stats["total_idle_periods"], 1)
+    
+    def test_phase_change_event_exits_idle(self):
+        """阶段变化事件应立即让调度器退出空闲模式"""
+        self.scheduler.start()
+        self.state_manager.current_phase = TaskPhase.COMPLETION
+        self.assertTrue(self._wait_for(lambda: self.scheduler.is_idle))
+        
+        self.state_manager.current_phase = TaskPhase.ANALYSIS
+        self.assertTrue(self._wait_for(lambda: not self.scheduler.is_idle, timeout=0.5))
+        self.assertEqual(self.scheduler.current_mode, CognitiveMode.TASK_DRIVEN)
+    
+    def test_stop_wakes_sleeping_loop(self):
+        """停止调度器时应立即唤醒休眠中的主循环"""
+        self.scheduler.start()
+        time.sleep(0.05)
+        
+        start_time = time.time()
+        self.scheduler.stop()
+        
+        self.assertLess(time.time() - start_time, 1.0)
+        self.assertFalse(self.scheduler.scheduler_thread.is_alive())
+
+
+
+class TestCognitiveTaskQueue(unittest.TestCase):
+    """双轨优先级任务队列测试"""
+    
+    def test_priority_order_within_lane(self):
+        """同一通道内按优先级出队"""
+        queue = CognitiveTaskQueue(aging_rate=0.0)
+        queue.put(_make_task("low", 2))
+        queue.put(_make_task("high", 8))
+        queue.put(_make_task("mid", 5))
+        
+        order = []
+        for _ in range(3):
+            task = queue.get_nowait()
+            order.append(task.task_id)
+            queue.task_done(task)
+        
+        self.assertEqual(order, ["high", "mid", "low"])
+    
+    def test_user_directed_lane_first(self):
+        """用户指令任务优先于自主任务"""
+        queue = CognitiveTaskQueue(aging_rate=0.0)
+        queue.put(_make_task("autonomous", 7))
+        queue.put(_make_task("user", 10, user_directed=True))
+        
+        self.assertEqual(queue.get_nowait().task_id, "user")
+    
+    def test_aging_prevents_starvation(self):
+        """长时间等待的低优先级任务通过老化超过新到的高优先级任务"""
+        queue = CognitiveTaskQueue(aging_rate=100.0)
+        queue.put(_make_task("old_autonomous", 3))
+        time.sleep(0.1)  # 约 +10 优先级
+        queue.put(_make_task("new_user", 10, user_directed=True))
+        
+        self.assertEqual(queue.get_nowait().task_id, "old_autonomous")
+    
+    def test_lane_concurrency_limit(self):
+        """通道达到并发上限时不再出队该通道的任务"""
+        queue = CognitiveTaskQueue(max_concurrent={CognitiveTaskQueue.AUTONOMOUS: 1})
+        queue.put(_make_task("a1", 5))
+        queue.put(_make_task("a2", 5))
+        
+        first = queue.get_nowait()
+        with self.assertRaises(Empty):
+            queue.get_nowait()
+        
+        queue.task_done(first)
+        self.assertEqual(queue.get_nowait().task_id, "a2")
+    
+    def test_cancelled_tasks_are_dropped(self):
+        """排队期间被取消的任务不会出队"""
+        queue = CognitiveTaskQueue()
+        cancelled = _make_task("cancelled", 9)
+        queue.put(cancelled)
+        queue.put(_make_task("kept", 1))
+        cancelled.cancel("test")
+        
+        self.assertEqual(queue.get_nowait().task_id, "kept")
+        self.assertEqual(queue.stats["dropped_cancelled"], 1)
+    
+    def test_close_wakes_blocked_get(self):
+        """关闭队列时阻塞中的 get 返回 None"""
+        queue = CognitiveTaskQueue()
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(queue.get()))
+        waiter.start()
+        time.sleep(0.05)
+        queue.close()
+        waiter.join(timeout=1.0)
+        
+        self.assertEqual(results, [None])
+    
+    def test_user_task_preempts_running_autonomous(self):
+        """所有工作线程忙时，用户任务到达会协作式取消自主任务"""
+        scheduler = CognitiveScheduler(StateManager(), llm_client=None,
+                                       config={"cognitive_tasks": {"max_concurrent_tasks": 1}})
+        scheduler.cognitive_task_queue.put(_make_task("autonomous", 3))
+        running = scheduler.cognitive_task_queue.get_nowait()
+        
+        scheduler.schedule_user_directed_exploration("最新的机器学习趋势")
+        
+        self.assertTrue(running.is_cancelled)
+        self.assertIn("preempted_by", running.cancel_reason)
+        
+        scheduler.cognitive_task_queue.task_done(running)
+        next_task = scheduler.cognitive_task_queue.get_nowait()
+        self.assertTrue(next_task.is_user_directed)
+
+
+
+class TestCognitiveTaskDeadlines(unittest.TestCase):
+    """认知任务截止时间与挂起工作线程替换测试"""
+    
+    def setUp(self):
+        """测试前的设置"""
+        self.scheduler = CognitiveScheduler(
+            StateManager(),
+            llm_client=None,
+            config={"cognitive_tasks": {"max_concurrent_tasks": 1,
+                                        "task_timeout": 0.2,
+                                        "hung_worker_grace": 0.2}}
+        )
+    
+    def tearDown(self):
+        """测试后的清理"""
+        if self.scheduler.is_running:
+            self.scheduler.stop()
+    
+    def test_deadline_propagates_to_task_execution(self):
+        """任务执行期间的截止时间应收紧网络超时"""
+        observed = {}
+        
+        def fake_ideation(task):
+            observed["deadline"] = get_current_deadline()
+            observed["timeout"] = clamp_timeout(30.0)
+            return {}
+        
+        task = CognitiveTask(task_id="ideation_1", task_type="ideation", priority=5)
+        with patch.object(self.scheduler, '_execute_ideation_task', side_effect=fake_ideation):
+            self.scheduler._execute_cognitive_task(task, "TestWorker")
+        
+        self.assertIs(observed["deadline"], task.deadline)
+        self.assertLessEqual(observed["timeout"], 0.2)
+        self.assertEqual(self.scheduler.stats["cognitive_tasks_completed"], 1)
+    
+    def test_expired_deadline_interrupts_exploration(self):
+        """截止时间已到时知识探勘应中止并返回部分结果"""
+        from neogenesis_system.providers.knowledge_explorer import KnowledgeExplorer, ExplorationTarget
+        
+        explorer = KnowledgeExplorer()
+        target = ExplorationTarget(target_id="t1", target_type="concept",
+                                   description="测试目标", keywords=["测试"])
+        result = explorer.explore_knowledge([target], deadline=Deadline(0.0))
+        
+        self.assertIn("interrupted", result.context)
+        self.assertEqual(result.discovered_knowledge, [])
+    
+    def test_hung_worker_is_replaced(self):
+        """超时且超过宽限期仍未返回的工作线程应被替换，后续任务继续执行"""
+        release = threading.Event()
+        calls = []
+        
+        def fake_ideation(task):
+            calls.append(task.task_id)
+            if len(calls) == 1:
+                release.wait(5.0)  # 模拟不响应截止时间的阻塞调用
+            return {}
+        
+        with patch.object(self.scheduler, '_execute_ideation_task', side_effect=fake_ideation):
+            self.scheduler.start()
+            hung_task = CognitiveTask(task_id="hung", task_type="ideation", priority=5)
+            self.scheduler.cognitive_task_queue.put(hung_task)
+            
+            deadline = time.time() + 3.0
+            while self.scheduler.stats["replaced_workers"] == 0 and time.time() < deadline:
+                time.sleep(0.02)
+            
+            self.assertEqual(self.scheduler.stats["replaced_workers"], 1)
+            self.assertTrue(hung_task.is_cancelled)
+            
+            self.scheduler.cognitive_task_queue.put(
+                CognitiveTask(task_id="next", task_type="ideation", priority=5))
+            deadline = time.time() + 2.0
+            while self.scheduler.stats["cognitive_tasks_completed"] == 0 and time.time() < deadline:
+                time.sleep(0.02)
+            
+            self.assertEqual(calls, ["hung", "next"])
+            self.assertEqual(self.scheduler.stats["cognitive_tasks_completed"], 1)
+            release.set()
+
+
+
+class RecordingProcessPool(CognitiveProcessPool):
+    """记录提交函数的进程池"""
+    
+    def __init__(self):
+        super().__init__(max_workers=1)
+        self.submitted = []
+    
+    def submit(self, fn, *args):
+        self.submitted.append(fn)
+        return super().submit(fn, *args)
+
+
+class TestCognitiveProcessOffload(unittest.TestCase):
+    """趋势分析的进程池执行测试"""
+    
+    CONTENTS = [
+        "multimodal agents reshape enterprise search",
+        "enterprise teams deploy multimodal agents",
+        "agents need evaluation before deployment"
+    ]
+    
+    def setUp(self):
+        self.explorer = KnowledgeExplorer(web_search_client=None,
+                                          config={"information_sources": {"enable_web_search": False}})
+        self.addCleanup(self.explorer.shutdown)
+        self.items = [
+            KnowledgeItem(knowledge_id=f"k{i}", content=content, source="test", source_type="web_search",
+                          quality=KnowledgeQuality.GOOD)
+            for i, content in enumerate(self.CONTENTS)
+        ]
+    
+    def test_analyze_trends_is_pure(self):
+        """趋势分析只依赖传入的数据：关键词与支撑知识"""
+        trends = analyze_trends([(item.knowledge_id, item.content) for item in self.items], identified_at=100.0)
+        
+        self.assertEqual(trends[0]["trend_name"], "agents相关趋势")
+        self.assertEqual(trends[0]["supporting_knowledge"], ["k0", "k1", "k2"])
+        self.assertTrue(all(trend["identified_at"] == 100.0 for trend in trends))
+    
+    def test_trend_analysis_runs_in_process_pool(self):
+        """配置进程池后整个趋势分析在子进程执行，结果与线程内计算一致"""
+        inline = self.explorer._analyze_trends(self.items, [])
+        
+        pool = RecordingProcessPool()
+        self.addCleanup(pool.shutdown, wait=True)
+        self.explorer.cpu_executor = pool
+        offloaded = self.explorer._analyze_trends(self.items, [])
+        
+        self.assertEqual(pool.submitted, [analyze_trends])
+        strip = lambda trends: [{k: v for k, v in trend.items() if k not in ("trend_id", "identified_at")}
+                                for trend in trends]
+        self.assertEqual(strip(offloaded), strip(inline))
+    
+    def test_offload_failure_falls_back_to_thread(self):
+        """执行器失败时回退到当前线程计算"""
+        executor = Mock()
+        executor.submit.side_effect = RuntimeError("进程池已损坏")
+        self.explorer.cpu_executor = executor
+        
+        trends = self.explorer._analyze_trends(self.items, [])
+        
+        executor.submit.assert_called_once()
+        self.assertEqual(trends[0]["supporting_knowledge"], ["k0", "k1", "k2"])
+    
+    def _hung_executor(self):
+        """提交后永不完成的执行器"""
+        executor = Mock()
+        executor.submit.return_value = Future()
+        self.explorer.cpu_executor = executor
+        return executor
+    
+    def test_offload_timeout_skips_trends(self):
+        """卸载计算超时后返回空列表，不在当前线程重新计算"""
+        self._hung_executor()
+        self.explorer.config["exploration_strategies"]["trend_analysis_timeout"] = 0.05
+        
+        with patch("neogenesis_system.providers.knowledge_explorer.analyze_trends") as inline:
+            self.assertEqual(self.explorer._analyze_trends(self.items, []), [])
+        inline.assert_not_called()
+    
+    def test_late_offload_result_still_published(self):
+        """等待超时后才完成（已在子进程运行、无法取消）的卸载计算结果仍会发布"""
+        executor = self._hung_executor()
+        executor.submit.return_value.set_running_or_notify_cancel()
+        published = []
+        self.explorer.cpu_result_publisher = lambda *args, **kwargs: published.append((args, kwargs))
+        self.explorer.config["exploration_strategies"]["trend_analysis_timeout"] = 0.01
+        
+        self.assertEqual(self.explorer._analyze_trends(self.items, []), [])
+        executor.submit.return_value.set_result([{"trend_id": "late"}])
+        
+        (task_id, task_type, result), metadata = published[0]
+        self.assertEqual(task_type, "trend_analysis")
+        self.assertEqual(result["identified_trends"], [{"trend_id": "late"}])
+        self.assertEqual(result["knowledge_count"], 3)
+        self.assertIn("execution_time", metadata)
+    
+    def test_offload_deadline_exceeded(self):
+        """截止时间先到时抛出 DeadlineExceeded，不在当前线程重新计算"""
+        self._hung_executor()
+        
+        with patch("neogenesis_system.providers.knowledge_explorer.analyze_trends") as inline:
+            with deadline_scope(Deadline(0.05)):
+                with self.assertRaises(DeadlineExceeded):
+                    self.explorer._analyze_trends(self.items, [])
+        inline.assert_not_called()
+    
+    def test_scheduler_wires_pool_to_explorer(self):
+        """启用进程池时调度器把它交给知识探勘器；回溯与知识综合仍在工作线程执行"""
+        state_manager = StateManager()
+        scheduler = CognitiveScheduler(
+            state_manager,
+            llm_client=None,
+            config={"cognitive_tasks": {"process_pool": {"enabled": True, "max_workers": 1}}}
+        )
+        scheduler.knowledge_explorer = self.explorer
+        scheduler.start()
+        try:
+            self.assertIs(self.explorer.cpu_executor, scheduler._process_pool)
+            
+            task = CognitiveTask(task_id="synthesis_1", task_type="knowledge_synthesis", priority=4,
+                                 context={"cognitive_history": [{"task_type": "ideation"}]})
+            scheduler._execute_cognitive_task(task, "TestWorker")
+        finally:
+            scheduler.stop()
+        
+        self.assertEqual(scheduler.cognitive_history[-1]["worker_name"], "TestWorker")
+        self.assertIsNone(scheduler._process_pool._executor)
+        self.assertIsNone(self.explorer.cpu_executor)
+        self.assertIsNone(self.explorer.cpu_result_publisher)
+    
+    def test_offloaded_trends_merged_through_state_manager(self):
+        """进程池中的趋势分析结果通过 StateManager 事件合并到调度器的认知历史"""
+        state_manager = StateManager()
+        events = []
+        state_manager.add_state_change_listener(lambda event_type, data, manager: events.append(event_type))
+        scheduler = CognitiveScheduler(
+            state_manager,
+            llm_client=None,
+            config={"cognitive_tasks": {"process_pool": {"enabled": True, "max_workers": 1}}}
+        )
+        scheduler.knowledge_explorer = self.explorer
+        scheduler.start()
+        try:
+            trends = self.explorer._analyze_trends(self.items, [])
+            deadline = time.time() + 5.0
+            while scheduler.stats["merged_offloaded_results"] == 0 and time.time() < deadline:
+                time.sleep(0.02)
+        finally:
+            scheduler.stop()
+        
+        self.assertIn("cognitive_result", events)
+        merged = [entry for entry in scheduler.cognitive_history if entry["task_type"] == "trend_analysis"]
+        self.assertEqual(len(merged), 1)
+        self.assertEqual(merged[0]["result"]["identified_trends"], trends)
+
+
+if __name__ == '__main__':
+    unittest.main()
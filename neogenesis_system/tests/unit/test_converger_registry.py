@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+converger_registry.py 单元测试
+测试每个命名空间只创建一个收敛器、从快照热启动、引用计数下的释放，以及不计引用的借用
+"""
+
+import unittest
+import importlib.util
+import os
+import tempfile
+import threading
+import time
+
+# 添加项目根目录到路径
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+
+from neogenesis_system.cognitive_engine.mab_converger import MABConverger
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+
+try:
+    from neogenesis_langchain import converger_registry
+except (ImportError, SyntaxError):
+    # neogenesis_langchain 包的 __init__ 导入失败时直接按文件加载（模块本身只依赖标准库）
+    _spec = importlib.util.spec_from_file_location(
+        "converger_registry", os.path.join(PROJECT_ROOT, "neogenesis_langchain", "converger_registry.py"))
+    converger_registry = importlib.util.module_from_spec(_spec)
+    _spec.loader.exec_module(converger_registry)
+
+MABConvergerRegistry = converger_registry.MABConvergerRegistry
+
+
+class CountingFactory:
+    """记录创建次数的工厂（创建较慢，放大并发创建的竞争窗口）"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.created = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        time.sleep(self.delay)
+        with self._lock:
+            self.created += 1
+        return MABConverger()
+
+
+class TestSharedInstances(unittest.TestCase):
+    """每个命名空间一个实例"""
+
+    def setUp(self):
+        self.factory = CountingFactory()
+        self.registry = MABConvergerRegistry(factory=self.factory)
+
+    def test_same_namespace_shares_instance(self):
+        """同一命名空间返回同一实例，不同命名空间相互隔离"""
+        first = self.registry.get("tenant_a")
+        self.assertIs(self.registry.get("tenant_a"), first)
+        self.assertIsNot(self.registry.get("tenant_b"), first)
+
+        self.assertEqual(self.factory.created, 2)
+        self.assertEqual(sorted(self.registry.namespaces()), ["tenant_a", "tenant_b"])
+
+    def test_learning_shared_across_holders(self):
+        """一个持有者的反馈对其他持有者可见"""
+        self.registry.get().update_path_performance("strategy_0", success=True, reward=1.0)
+
+        self.assertEqual(self.registry.get().path_arms["strategy_0"].success_count, 1)
+
+    def test_concurrent_get_creates_once(self):
+        """并发首次获取只创建一次"""
+        factory = CountingFactory(delay=0.05)
+        registry = MABConvergerRegistry(factory=factory)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(registry.get("shared"))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(factory.created, 1)
+        self.assertTrue(all(converger is results[0] for converger in results))
+        self.assertEqual(registry.refcount("shared"), 8)
+
+    def test_peek_does_not_create(self):
+        """peek 不创建收敛器，也不增加引用"""
+        self.assertIsNone(self.registry.peek("missing"))
+        self.registry.get("present")
+
+        self.assertIsNotNone(self.registry.peek("present"))
+        self.assertEqual(self.registry.refcount("present"), 1)
+        self.assertEqual(self.factory.created, 1)
+
+    def test_borrow_does_not_count(self):
+        """borrow 创建或返回共享实例，但不增加引用"""
+        borrowed = self.registry.borrow("tools")
+        self.assertEqual(self.registry.refcount("tools"), 0)
+        self.assertIs(self.registry.borrow("tools"), borrowed)
+
+        self.assertIs(self.registry.get("tools"), borrowed)
+        self.assertEqual(self.registry.refcount("tools"), 1)
+        self.assertEqual(self.factory.created, 1)
+
+
+class TestSnapshotsAndRelease(unittest.TestCase):
+    """快照热启动与释放"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.snapshot_path = os.path.join(self.temp_dir.name, "mab.snapshot")
+        self.registry = MABConvergerRegistry()
+
+    def tearDown(self):
+        self.registry.shutdown(final_snapshot=False)
+        self.temp_dir.cleanup()
+
+    def test_warm_start_from_snapshot(self):
+        """创建时从已有快照恢复决策臂"""
+        trained = MABConverger()
+        for _ in range(3):
+            trained.update_path_performance("strategy_0", success=True, reward=1.0)
+        trained.save_snapshot(self.snapshot_path)
+
+        converger = self.registry.get("warm", snapshot_path=self.snapshot_path, snapshot_interval=0)
+        self.assertEqual(converger.path_arms["strategy_0"].success_count, 3)
+
+    def test_release_waits_for_last_reference(self):
+        """释放一次引用不移除收敛器，最后一个引用释放时写入最终快照并移除"""
+        first = self.registry.get("shared", snapshot_path=self.snapshot_path, snapshot_interval=0)
+        second = self.registry.get("shared")
+        self.assertIs(first, second)
+        self.assertEqual(self.registry.refcount("shared"), 2)
+
+        first.update_path_performance("strategy_1", success=True, reward=1.0)
+        self.assertTrue(self.registry.release("shared"))
+        self.assertIs(self.registry.peek("shared"), first)
+        self.assertFalse(os.path.exists(self.snapshot_path))
+
+        self.assertTrue(self.registry.release("shared"))
+        self.assertIsNone(self.registry.peek("shared"))
+        self.assertEqual(self.registry.refcount("shared"), 0)
+        self.assertTrue(os.path.exists(self.snapshot_path))
+        self.assertFalse(self.registry.release("shared"))
+
+        # 重新获取时创建新实例，并从最终快照热启动
+        reopened = self.registry.get("shared", snapshot_path=self.snapshot_path, snapshot_interval=0)
+        self.assertIsNot(reopened, first)
+        self.assertEqual(reopened.path_arms["strategy_1"].success_count, 1)
+
+    def test_borrowers_do_not_block_release(self):
+        """借用者不影响引用计数：持有者释放最后一个引用时写入最终快照"""
+        owner = self.registry.get("shared", snapshot_path=self.snapshot_path, snapshot_interval=0)
+        for _ in range(5):
+            self.assertIs(self.registry.borrow("shared"), owner)
+
+        self.assertTrue(self.registry.release("shared"))
+        self.assertIsNone(self.registry.peek("shared"))
+        self.assertTrue(os.path.exists(self.snapshot_path))
+
+    def test_release_without_final_snapshot(self):
+        """final_snapshot=False 时不写快照"""
+        self.registry.get("shared", snapshot_path=self.snapshot_path, snapshot_interval=0)
+        self.registry.release("shared", final_snapshot=False)
+
+        self.assertFalse(os.path.exists(self.snapshot_path))
+
+    def test_force_release_and_shutdown(self):
+        """force=True 与 shutdown() 忽略剩余引用"""
+        self.registry.get("a")
+        self.registry.get("a")
+        self.registry.get("b", snapshot_path=self.snapshot_path, snapshot_interval=60)
+        self.assertTrue(self.registry.release("a", force=True))
+        self.assertIsNone(self.registry.peek("a"))
+
+        self.registry.shutdown()
+        self.assertEqual(self.registry.namespaces(), [])
+        self.assertTrue(os.path.exists(self.snapshot_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
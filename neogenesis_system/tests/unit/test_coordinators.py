@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+coordinators.py 单元测试
+测试依赖图执行中关键工具失败时的处理：启用回退时继续执行其余工具，未启用时取消在途工具
+"""
+
+import unittest
+import asyncio
+import time
+
+# 添加项目根目录到路径
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+
+try:
+    from neogenesis_langchain.execution.coordinators import (
+        NeogenesisToolCoordinator, ExecutionContext, ExecutionMode, ToolExecutionPlan, ToolPriority
+    )
+    from neogenesis_langchain.state.state_management import DecisionStage
+    COORDINATORS_AVAILABLE = True
+except (ImportError, SyntaxError):
+    COORDINATORS_AVAILABLE = False
+
+
+class FailingTool:
+    """总是失败的模拟工具"""
+
+    def run(self, **kwargs):
+        raise RuntimeError("关键工具故障")
+
+
+class SlowTool:
+    """固定耗时的模拟工具"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def run(self, **kwargs):
+        time.sleep(self.delay)
+        return {"done": True}
+
+
+@unittest.skipUnless(COORDINATORS_AVAILABLE, "neogenesis_langchain 不可导入")
+class TestCriticalFailureHandling(unittest.TestCase):
+    """关键工具失败时的执行流程"""
+
+    def setUp(self):
+        self.coordinator = NeogenesisToolCoordinator()
+        self.addCleanup(self.coordinator.thread_pool.shutdown, wait=False)
+
+    def run_plan(self, fallback_enabled: bool):
+        plan = [
+            ToolExecutionPlan(stage=DecisionStage.THINKING_SEED, tool_name="critical_tool",
+                              tool_instance=FailingTool(), priority=ToolPriority.CRITICAL),
+            ToolExecutionPlan(stage=DecisionStage.PATH_GENERATION, tool_name="slow_tool",
+                              tool_instance=SlowTool(0.2), priority=ToolPriority.MEDIUM)
+        ]
+        context = ExecutionContext(session_id="session", user_query="测试查询",
+                                   execution_mode=ExecutionMode.PARALLEL,
+                                   enable_caching=False, fallback_enabled=fallback_enabled)
+        return asyncio.run(self.coordinator.execute_plan_async(plan, context))
+
+    def test_fallback_enabled_keeps_running(self):
+        """启用回退时，关键工具失败（且无回退工具）不会取消其余工具"""
+        results = self.run_plan(fallback_enabled=True)
+
+        self.assertFalse(results["critical_tool"].success)
+        self.assertTrue(results["slow_tool"].success)
+
+    def test_fallback_disabled_aborts(self):
+        """未启用回退时，关键工具失败后取消其余在途工具"""
+        results = self.run_plan(fallback_enabled=False)
+
+        self.assertFalse(results["critical_tool"].success)
+        self.assertNotIn("slow_tool", results)
+
+
+if __name__ == '__main__':
+    unittest.main()
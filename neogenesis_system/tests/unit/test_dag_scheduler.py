@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+依赖图调度器单元测试
+使用按脚本延迟的模拟工具，测试流式调度（总耗时等于关键路径而不是各组最大值之和）、
+并发上限、优先级、超时、跳过、中止与取消
+"""
+
+import unittest
+import asyncio
+import time
+
+# 添加项目根目录到路径
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from neogenesis_system.shared.dag_scheduler import DagNode, DependencyScheduler
+
+
+class ScriptedTools:
+    """按脚本延迟的模拟工具，记录启动/结束时间、峰值并发与被取消的节点"""
+
+    def __init__(self, delays, failures=()):
+        self.delays = delays
+        self.failures = set(failures)
+        self.started = {}
+        self.finished = {}
+        self.cancelled = []
+        self.active = 0
+        self.peak = 0
+        self.origin = time.perf_counter()
+
+    async def run(self, node: DagNode):
+        self.started[node.node_id] = time.perf_counter() - self.origin
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delays[node.node_id])
+        except asyncio.CancelledError:
+            self.cancelled.append(node.node_id)
+            raise
+        finally:
+            self.active -= 1
+        self.finished[node.node_id] = time.perf_counter() - self.origin
+        if node.node_id in self.failures:
+            raise RuntimeError(f"{node.node_id} 失败")
+        return node.node_id.upper()
+
+
+async def collect(scheduler: DependencyScheduler, tools: ScriptedTools, **kwargs):
+    return [outcome async for outcome in scheduler.run(tools.run, **kwargs)]
+
+
+class TestDependencyScheduler(unittest.IsolatedAsyncioTestCase):
+    """DependencyScheduler"""
+
+    async def test_makespan_is_critical_path(self):
+        """
+        seed → {slow_verify, paths}，paths → path_verify → decision
+        按执行顺序分组需要 0.1 + 0.4 + 0.1 + 0.1 = 0.7s；按依赖流式调度只需关键路径 0.5s
+        """
+        tools = ScriptedTools({"seed": 0.1, "slow_verify": 0.4, "paths": 0.1, "path_verify": 0.1, "decision": 0.1})
+        nodes = [
+            DagNode("seed"),
+            DagNode("slow_verify", ["seed"], order=10),
+            DagNode("paths", ["seed"], order=10),
+            DagNode("path_verify", ["paths"], order=20),
+            DagNode("decision", ["path_verify"], order=30)
+        ]
+
+        start = time.perf_counter()
+        outcomes = await collect(DependencyScheduler(nodes, max_concurrency=4), tools)
+        makespan = time.perf_counter() - start
+
+        self.assertTrue(all(outcome.succeeded for outcome in outcomes))
+        self.assertGreaterEqual(makespan, 0.5)
+        self.assertLess(makespan, 0.65)
+        # 下游工具无需等待慢速验证
+        self.assertLess(tools.finished["decision"], tools.finished["slow_verify"])
+
+    async def test_results_in_completion_order(self):
+        """结果按完成顺序产出，依赖总在其后"""
+        tools = ScriptedTools({"a": 0.15, "b": 0.05, "c": 0.01})
+        nodes = [DagNode("a"), DagNode("b"), DagNode("c", ["b"])]
+        outcomes = await collect(DependencyScheduler(nodes), tools)
+
+        self.assertEqual([outcome.node.node_id for outcome in outcomes], ["b", "c", "a"])
+        self.assertEqual(outcomes[0].result, "B")
+
+    async def test_bounded_concurrency_and_priority(self):
+        """并发不超过上限，排队节点按优先级启动"""
+        tools = ScriptedTools({name: 0.05 for name in "abcdef"})
+        nodes = [DagNode(name, priority=priority) for name, priority in zip("abcdef", [0, 1, 2, 3, 4, 5])]
+        await collect(DependencyScheduler(nodes, max_concurrency=2), tools)
+
+        self.assertEqual(tools.peak, 2)
+        self.assertEqual(sorted(tools.started, key=tools.started.get)[:2], ["f", "e"])
+        self.assertLess(tools.started["e"], tools.started["a"])
+
+    async def test_timeout(self):
+        """超时记为节点错误，不影响其他节点"""
+        tools = ScriptedTools({"slow": 1.0, "fast": 0.01})
+        nodes = [DagNode("slow", timeout=0.05), DagNode("fast")]
+        start = time.perf_counter()
+        outcomes = {outcome.node.node_id: outcome for outcome in await collect(DependencyScheduler(nodes), tools)}
+
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertIsInstance(outcomes["slow"].error, asyncio.TimeoutError)
+        self.assertTrue(outcomes["fast"].succeeded)
+
+    async def test_should_run_skips(self):
+        """should_run 返回 False 的节点被跳过，跳过同样释放其下游"""
+        tools = ScriptedTools({"a": 0.01, "optional": 0.01, "b": 0.01})
+        nodes = [DagNode("a"), DagNode("optional", ["a"]), DagNode("b", ["optional"])]
+        outcomes = await collect(DependencyScheduler(nodes), tools,
+                                 should_run=lambda node, done: node.node_id != "optional")
+
+        self.assertEqual([(o.node.node_id, o.skipped) for o in outcomes],
+                         [("a", False), ("optional", True), ("b", False)])
+        self.assertNotIn("optional", tools.started)
+
+    async def test_abort_cancels_outstanding(self):
+        """关键节点失败时取消其余在途节点，下游不再启动"""
+        tools = ScriptedTools({"critical": 0.05, "long": 1.0, "downstream": 0.01}, failures={"critical"})
+        nodes = [DagNode("critical"), DagNode("long"), DagNode("downstream", ["critical"])]
+        scheduler = DependencyScheduler(nodes)
+
+        start = time.perf_counter()
+        outcomes = await collect(scheduler, tools,
+                                 should_abort=lambda outcome: outcome.node.node_id == "critical" and not outcome.succeeded)
+
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertTrue(scheduler.aborted)
+        self.assertEqual([outcome.node.node_id for outcome in outcomes], ["critical"])
+        self.assertEqual(scheduler.cancelled, ["long"])
+        self.assertEqual(tools.cancelled, ["long"])
+        self.assertNotIn("downstream", tools.started)
+
+    async def test_cycle_is_blocked(self):
+        """环上的节点记为阻塞，其余节点正常完成"""
+        tools = ScriptedTools({"a": 0.01, "x": 0.01, "y": 0.01})
+        scheduler = DependencyScheduler([DagNode("a"), DagNode("x", ["y"]), DagNode("y", ["x"])])
+        outcomes = await collect(scheduler, tools)
+
+        self.assertEqual([outcome.node.node_id for outcome in outcomes], ["a"])
+        self.assertEqual(sorted(scheduler.blocked), ["x", "y"])
+
+    async def test_consumer_cancellation_cancels_nodes(self):
+        """调度任务被取消时在途节点一并取消"""
+        tools = ScriptedTools({"a": 1.0, "b": 1.0})
+        task = asyncio.ensure_future(collect(DependencyScheduler([DagNode("a"), DagNode("b")]), tools))
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertEqual(sorted(tools.cancelled), ["a", "b"])
+
+    def test_duplicate_ids_rejected(self):
+        """节点ID必须唯一"""
+        with self.assertRaises(ValueError):
+            DependencyScheduler([DagNode("a"), DagNode("a")])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+knowledge_explorer.py 单元测试
+测试知识探勘器的信息收集（含经过真实搜索客户端与速率限制的路径）、截止时间与新颖性索引
+"""
+
+import unittest
+import threading
+import time
+from unittest.mock import patch
+
+# 添加项目根目录到路径
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from neogenesis_system.providers.knowledge_explorer import (
+    KnowledgeExplorer, ExplorationTarget, ExplorationStrategy
+)
+from neogenesis_system.providers.novelty_index import MinHashLSHIndex
+from neogenesis_system.providers import search_client
+from neogenesis_system.providers.search_client import (
+    SearchRateLimiter, SearchResponse, SearchResult, WebSearchClient
+)
+from neogenesis_system.shared.deadline import Deadline, deadline_scope
+
+
+class FakeSearchClient:
+    """模拟网络搜索客户端：每次搜索固定耗时，包含 slow 的查询耗时更长"""
+
+    def __init__(self, delay: float = 0.2, slow_delay: float = 1.0):
+        self.delay = delay
+        self.slow_delay = slow_delay
+        self.queries = []
+
+    def search(self, query: str, max_results=None) -> SearchResponse:
+        self.queries.append(query)
+        time.sleep(self.slow_delay if "slow" in query else self.delay)
+        return SearchResponse(
+            query=query,
+            results=[SearchResult(title=query, snippet=f"{query} 的搜索摘要", url=f"https://example.com/{query}")],
+            total_results=1,
+            search_time=self.delay
+        )
+
+
+def _make_target(index: int, keywords) -> ExplorationTarget:
+    return ExplorationTarget(target_id=f"target_{index}", target_type="trend",
+                             description=f"目标{index}", keywords=list(keywords))
+
+
+class TestKnowledgeExplorerCollection(unittest.TestCase):
+    """信息收集阶段测试"""
+
+    def setUp(self):
+        """测试前的设置"""
+        self.search_client = FakeSearchClient()
+        self.explorer = KnowledgeExplorer(web_search_client=self.search_client)
+        self.strategy = ExplorationStrategy.TREND_MONITORING
+
+    def tearDown(self):
+        """测试后的清理"""
+        self.explorer.shutdown()
+
+    def test_targets_and_queries_are_searched_concurrently(self):
+        """3个目标 x 3条查询应并发执行，耗时接近单次搜索"""
+        targets = [_make_target(i, [f"kw{i}_a", f"kw{i}_b", f"kw{i}_c"]) for i in range(3)]
+
+        start_time = time.time()
+        raw_information = self.explorer._collect_information(targets, self.strategy)
+        elapsed = time.time() - start_time
+
+        self.assertEqual(len(self.search_client.queries), 9)
+        self.assertEqual(len(raw_information), 9)
+        self.assertEqual({item["target_id"] for item in raw_information},
+                         {"target_0", "target_1", "target_2"})
+        self.assertLess(elapsed, 0.6)
+
+    def test_global_search_concurrency_cap(self):
+        """搜索并发受 max_concurrent_searches 限制"""
+        explorer = KnowledgeExplorer(
+            web_search_client=self.search_client,
+            config={"information_sources": {"max_concurrent_searches": 3}}
+        )
+        targets = [_make_target(i, [f"kw{i}_a", f"kw{i}_b", f"kw{i}_c"]) for i in range(3)]
+
+        try:
+            start_time = time.time()
+            explorer._collect_information(targets, self.strategy)
+            elapsed = time.time() - start_time
+        finally:
+            explorer.shutdown()
+
+        # 9 次搜索、3 个并发：至少 3 轮
+        self.assertGreaterEqual(elapsed, 0.55)
+
+    def test_deadline_returns_partial_results(self):
+        """截止时间到达时返回已完成的搜索结果"""
+        targets = [_make_target(0, ["fast_a", "slow_b", "fast_c"])]
+        context = {}
+
+        start_time = time.time()
+        with deadline_scope(Deadline(0.5)):
+            raw_information = self.explorer._collect_information(targets, self.strategy, context)
+        elapsed = time.time() - start_time
+
+        self.assertLess(elapsed, 0.9)
+        self.assertEqual(len(raw_information), 2)
+        self.assertEqual(context["partial_collection"]["pending_searches"], 1)
+        self.assertEqual(context["partial_collection"]["pending_queries"], ["slow_b"])
+
+    def test_exploration_timeout_bounds_exploration(self):
+        """exploration_timeout 作为每次探索的截止时间"""
+        explorer = KnowledgeExplorer(
+            web_search_client=FakeSearchClient(delay=2.0),
+            config={"exploration_strategies": {"exploration_timeout": 0.5}}
+        )
+
+        try:
+            start_time = time.time()
+            result = explorer.explore_knowledge([_make_target(0, ["a", "b", "c"])], self.strategy)
+            elapsed = time.time() - start_time
+        finally:
+            explorer.shutdown()
+
+        self.assertLess(elapsed, 1.5)
+        self.assertIn("partial_collection", result.context)
+
+
+class FakeDDGS:
+    """替换 duckduckgo_search.DDGS 的传输层：每次查询固定耗时"""
+
+    delay = 0.2
+    calls = []
+    lock = threading.Lock()
+
+    def __init__(self, timeout=None):
+        self.timeout = timeout
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def text(self, keywords, max_results=5, **kwargs):
+        with FakeDDGS.lock:
+            FakeDDGS.calls.append(keywords)
+        time.sleep(FakeDDGS.delay)
+        return [{"title": keywords, "body": f"{keywords} 的搜索摘要", "href": f"https://example.com/{keywords}"}]
+
+
+class TestRealSearchClientCollection(unittest.TestCase):
+    """经过 WebSearchClient 真实搜索路径（含全局速率限制器）的信息收集"""
+
+    def setUp(self):
+        FakeDDGS.calls = []
+        self.targets = [_make_target(i, [f"kw{i}_a", f"kw{i}_b", f"kw{i}_c"]) for i in range(3)]
+        self.strategy = ExplorationStrategy.TREND_MONITORING
+        for patcher in (patch.object(search_client, "DDGS", FakeDDGS, create=True),
+                        patch.object(search_client, "REAL_SEARCH_AVAILABLE", True),
+                        patch.dict(search_client.RAG_CONFIG, {"enable_real_web_search": True})):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.explorer = KnowledgeExplorer(web_search_client=WebSearchClient())
+        self.addCleanup(self.explorer.shutdown)
+
+    def test_rate_limiter_admits_concurrent_searches(self):
+        """令牌桶容量足够时 9 条查询并发经过速率限制器"""
+        with patch.object(search_client, "_rate_limiter", SearchRateLimiter(min_interval=3.0, burst=9)):
+            start_time = time.time()
+            raw_information = self.explorer._collect_information(self.targets, self.strategy)
+            elapsed = time.time() - start_time
+
+        self.assertEqual(len(FakeDDGS.calls), 9)
+        self.assertEqual(len(raw_information), 9)
+        self.assertLess(elapsed, 0.6)
+
+    def test_rate_limit_wait_respects_deadline(self):
+        """令牌不足时不睡过截止时间：拿不到令牌的查询立即放弃，收集阶段提前结束"""
+        limiter = SearchRateLimiter(min_interval=3.0, burst=3)
+        context = {}
+        with patch.object(search_client, "_rate_limiter", limiter):
+            start_time = time.time()
+            with deadline_scope(Deadline(2.0)):
+                raw_information = self.explorer._collect_information(self.targets, self.strategy, context)
+            elapsed = time.time() - start_time
+
+        self.assertEqual(len(FakeDDGS.calls), 3)
+        self.assertEqual(len(raw_information), 3)
+        self.assertEqual(limiter.get_stats()["rejected"], 6)
+        self.assertLess(elapsed, 0.6)
+        self.assertNotIn("partial_collection", context)
+
+
+class TestNoveltyIndex(unittest.TestCase):
+    """MinHash/LSH 新颖性索引测试"""
+
+    BASE_TEXT = "大语言模型的推理效率可以通过投机解码、量化和批处理调度显著提升，同时保持生成质量基本不变"
+
+    def test_near_duplicate_detected_beyond_recent_window(self):
+        """早于最近10条的近似重复内容也能被识别"""
+        explorer = KnowledgeExplorer(web_search_client=None, config={"information_sources": {"enable_web_search": False}})
+        explorer.novelty_index.add("old", self.BASE_TEXT)
+        for i in range(50):
+            explorer.novelty_index.add(f"filler_{i}", f"第{i}条完全不同的知识内容，主题编号{i * 7919}")
+
+        self.assertEqual(explorer._assess_content_novelty(self.BASE_TEXT + "。"), 0.2)
+        self.assertEqual(explorer._assess_content_novelty("区块链共识机制与拜占庭容错的工程实践"), 0.6)
+
+    def test_query_similarity_estimate(self):
+        """相同文本估计相似度为1，无关文本没有候选"""
+        index = MinHashLSHIndex()
+        index.add("a", self.BASE_TEXT)
+
+        self.assertEqual(index.max_similarity(self.BASE_TEXT), 1.0)
+        self.assertEqual(index.query("completely unrelated english sentence about cooking pasta"), [])
+
+    def test_save_and_load(self):
+        """签名持久化后可重新加载"""
+        import tempfile
+        index = MinHashLSHIndex()
+        index.add("a", self.BASE_TEXT)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "novelty.npz")
+            index.save(path)
+            restored = MinHashLSHIndex()
+            self.assertEqual(restored.load(path), 1)
+
+        self.assertIn("a", restored)
+        self.assertEqual(restored.max_similarity(self.BASE_TEXT), 1.0)
+
+    def test_raw_hits_deduplicated_before_extraction(self):
+        """不同查询命中的相同页面只保留一条"""
+        explorer = KnowledgeExplorer(web_search_client=None, config={"information_sources": {"enable_web_search": False}})
+        raw_information = [
+            {"content": self.BASE_TEXT, "query": "q1"},
+            {"content": self.BASE_TEXT + " ", "query": "q2"},
+            {"content": "知识图谱与检索增强生成结合的最新研究进展", "query": "q3"}
+        ]
+
+        unique_information = explorer._deduplicate_raw_information(raw_information)
+
+        self.assertEqual([info["query"] for info in unique_information], ["q1", "q3"])
+        self.assertEqual(explorer.stats["duplicate_hits_dropped"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+knowledge_store.py 单元测试
+测试本地知识库的分词、BM25 排序、分页、持久化、增量索引与跨线程连接的关闭
+"""
+
+import unittest
+import sqlite3
+import tempfile
+import threading
+
+# 添加项目根目录到路径
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from neogenesis_system.providers.knowledge_store import KnowledgeStore, tokenize
+from neogenesis_system.providers.knowledge_explorer import (
+    KnowledgeExplorer, KnowledgeItem, KnowledgeQuality, ExplorationResult, ExplorationStrategy
+)
+
+
+class TestKnowledgeStore(unittest.TestCase):
+    """KnowledgeStore 测试"""
+
+    def setUp(self):
+        """测试前的设置"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "knowledge.db")
+        self.store = KnowledgeStore(self.db_path)
+        self.store.add_documents([
+            {"knowledge_id": "k1", "content": "大语言模型推理优化：投机解码与量化"},
+            {"knowledge_id": "k2", "content": "知识图谱构建方法与实体链接"},
+            {"knowledge_id": "k3", "content": "大语言模型的训练数据清洗流程"},
+            {"knowledge_id": "k4", "content": "Transformer attention kernels on GPU"}
+        ])
+
+    def tearDown(self):
+        """测试后的清理"""
+        self.store.close()
+        self.tmp_dir.cleanup()
+
+    def test_tokenize_mixed_text(self):
+        """中文按二元组切分，英文按词切分"""
+        self.assertEqual(tokenize("大模型 GPU推理"), ["大模", "模型", "gpu", "推理"])
+        self.assertEqual(tokenize("图"), ["图"])
+
+    def test_chinese_query_ranking(self):
+        """BM25 排序：同时命中多个查询词的文档排在前面"""
+        results, total = self.store.search("大语言模型推理")
+
+        self.assertEqual(total, 2)
+        self.assertEqual([r["id"] for r in results], ["k1", "k3"])
+        self.assertEqual(results[0]["relevance"], 1.0)
+        self.assertLess(results[1]["relevance"], 1.0)
+
+    def test_pagination(self):
+        """分页返回对应区间，total 为总命中数"""
+        first_page, total = self.store.search("大语言模型推理", limit=1, offset=0)
+        second_page, _ = self.store.search("大语言模型推理", limit=1, offset=1)
+        empty_page, _ = self.store.search("大语言模型推理", limit=1, offset=5)
+
+        self.assertEqual(total, 2)
+        self.assertEqual(first_page[0]["id"], "k1")
+        self.assertEqual(second_page[0]["id"], "k3")
+        self.assertEqual(empty_page, [])
+
+    def test_incremental_indexing_and_persistence(self):
+        """重复 id 不重复索引；重新打开后索引仍可用"""
+        self.assertEqual(self.store.add_documents([
+            {"knowledge_id": "k1", "content": "大语言模型推理优化：投机解码与量化"},
+            {"knowledge_id": "k5", "content": "知识图谱与检索增强生成"}
+        ]), 1)
+
+        reopened = KnowledgeStore(self.db_path)
+        try:
+            self.assertEqual(reopened.document_count(), 5)
+            results, total = reopened.search("知识图谱")
+            self.assertEqual(total, 2)
+            self.assertEqual({r["id"] for r in results}, {"k2", "k5"})
+        finally:
+            reopened.close()
+
+    def test_close_closes_every_thread_connection(self):
+        """close() 关闭所有工作线程打开的连接，之后再次使用时重新打开"""
+        connections = []
+
+        def search():
+            self.store.search("知识图谱")
+            connections.append(self.store._connection())
+
+        threads = [threading.Thread(target=search) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(set(map(id, connections))), 4)
+
+        self.store.close()
+
+        for conn in connections:
+            with self.assertRaises(sqlite3.ProgrammingError):
+                conn.execute("SELECT 1")
+        _, total = self.store.search("知识图谱")
+        self.assertEqual(total, 1)
+
+    def test_explorer_indexes_discovered_knowledge(self):
+        """知识探勘器的探索结果增量写入知识库"""
+        explorer = KnowledgeExplorer(
+            config={"information_sources": {"enable_web_search": False}},
+            knowledge_store=self.store
+        )
+        knowledge = KnowledgeItem(
+            knowledge_id="explored_1", content="多智能体协作中的任务分解策略",
+            source="https://example.com", source_type="web_search", quality=KnowledgeQuality.GOOD
+        )
+        result = ExplorationResult(
+            exploration_id="exp_1", strategy=ExplorationStrategy.DOMAIN_EXPANSION,
+            targets=[], discovered_knowledge=[knowledge]
+        )
+
+        explorer._update_caches_and_stats(result)
+        results, _ = self.store.search("任务分解")
+
+        self.assertEqual(results[0]["id"], "explored_1")
+        self.assertEqual(results[0]["metadata"]["quality"], "good")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -771,6 +771,216 @@ class TestMABConvergerGoldenTemplateManagement(unittest.TestCase):
         self.assertEqual(self.mab_converger.template_usage_stats['template_1'], 5)
 
 
+class TestMABConvergerGoldenTemplateIndex(unittest.TestCase):
+    """黄金模板索引测试"""
+    
+    def setUp(self):
+        """测试前的设置"""
+        self.mab_converger = MABConverger()
+    
+    def _template(self, strategy_id, path_type, description="系统 分析 方法"):
+        return {
+            'strategy_id': strategy_id,
+            'path_id': strategy_id,
+            'path_type': path_type,
+            'description': description,
+            'success_rate': 0.95,
+            'created_timestamp': time.time()
+        }
+    
+    def test_index_follows_dict_mutations(self):
+        """直接写入、更新、删除模板时索引保持一致"""
+        templates = self.mab_converger.golden_templates
+        templates['s1'] = self._template('s1', 'analytical')
+        templates.update({'s2': self._template('s2', 'creative')})
+        
+        self.assertEqual(templates.candidates('s1', 'other'), {'s1'})
+        self.assertEqual(templates.candidates('unknown', 'creative'), {'s2'})
+        
+        templates['s2']['path_type'] = 'systematic'
+        templates.reindex('s2')
+        self.assertEqual(templates.candidates('unknown', 'creative'), set())
+        self.assertEqual(templates.candidates('unknown', 'systematic'), {'s2'})
+        
+        templates.pop('s1')
+        self.assertEqual(templates.candidates('s1', 'analytical'), set())
+        self.mab_converger.clear_golden_templates()
+        self.assertEqual(templates.candidates('unknown', 'systematic'), set())
+    
+    def test_match_scores_only_indexed_candidates(self):
+        """模板数量增长时，只对索引命中的模板计算匹配分数"""
+        for i in range(50):
+            self.mab_converger.golden_templates[f'other_{i}'] = self._template(f'other_{i}', 'analytical')
+        self.mab_converger.golden_templates['golden'] = self._template('golden', 'analytical', "直接 推理 路径")
+        
+        paths = [
+            ReasoningPath(path_id=f"p{i}", path_type="analytical", description="直接 推理 路径",
+                          prompt_template="{query}", strategy_id=strategy_id)
+            for i, strategy_id in enumerate(['golden', 'new_a', 'new_b'])
+        ]
+        
+        with patch.object(self.mab_converger, '_calculate_template_match_score',
+                          wraps=self.mab_converger._calculate_template_match_score) as score_mock:
+            match = self.mab_converger._check_golden_template_match(paths)
+        
+        self.assertEqual(match['template_id'], 'golden')
+        self.assertEqual(match['path'].strategy_id, 'golden')
+        self.assertEqual(score_mock.call_count, 1)
+    
+    def test_force_promote_and_revoke(self):
+        """强制提升和撤销黄金模板同步更新索引"""
+        arm = EnhancedDecisionArm(path_id='forced', option='analytical')
+        self.mab_converger.path_arms['forced'] = arm
+        
+        result = self.mab_converger.force_promote_to_golden('forced')
+        self.assertTrue(result['success'])
+        self.assertEqual(self.mab_converger.golden_templates.candidates('forced', ''), {'forced'})
+        
+        result = self.mab_converger.revoke_golden_status('forced')
+        self.assertTrue(result['success'])
+        self.assertEqual(self.mab_converger.golden_templates.candidates('forced', ''), set())
+
+
+class TestMABConvergerConcurrency(unittest.TestCase):
+    """并发选择与更新测试"""
+    
+    def setUp(self):
+        """测试前的设置"""
+        self.mab_converger = MABConverger()
+        self.paths = [
+            ReasoningPath(path_id=f"path_{i}", path_type=f"type_{i}", description=f"路径 {i}",
+                          prompt_template="{query}", strategy_id=f"strategy_{i}")
+            for i in range(8)
+        ]
+    
+    def test_concurrent_select_and_update_keep_counts_consistent(self):
+        """多线程并发选择、更新和读取分析数据时不丢失更新"""
+        import threading
+        threads_count, rounds = 8, 200
+        errors = []
+        
+        def worker(worker_index):
+            try:
+                for i in range(rounds):
+                    self.mab_converger.select_best_path(self.paths)
+                    self.mab_converger.update_path_performance(
+                        f"strategy_{(worker_index + i) % len(self.paths)}", success=i % 3 != 0, reward=0.5
+                    )
+                    if i % 50 == 0:
+                        self.mab_converger.get_system_path_summary()
+                        self.mab_converger.get_trial_ground_analytics()
+            except Exception as e:  # pragma: no cover - 失败时记录
+                errors.append(e)
+        
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(threads_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(errors, [])
+        snapshot = self.mab_converger.get_analytics_snapshot()
+        self.assertEqual(snapshot['total_path_selections'], threads_count * rounds)
+        total_updates = sum(arm['success_count'] + arm['failure_count'] for arm in snapshot['path_arms'].values())
+        self.assertEqual(total_updates, threads_count * rounds)
+        # 选择和反馈更新都会增加激活次数
+        self.assertEqual(sum(arm['activation_count'] for arm in snapshot['path_arms'].values()),
+                         2 * threads_count * rounds)
+    
+    def test_snapshot_is_a_copy(self):
+        """快照与内部状态相互独立"""
+        self.mab_converger.update_path_performance("strategy_0", success=True, reward=1.0)
+        snapshot = self.mab_converger.get_analytics_snapshot()
+        
+        snapshot['path_arms']['strategy_0']['rl_reward_history'].append(99)
+        self.mab_converger.update_path_performance("strategy_0", success=True, reward=1.0)
+        
+        self.assertEqual(snapshot['path_arms']['strategy_0']['success_count'], 1)
+        self.assertNotIn(99, self.mab_converger.path_arms['strategy_0'].rl_reward_history)
+
+
+class TestMABConvergerSnapshot(unittest.TestCase):
+    """二进制快照与热启动测试"""
+    
+    def setUp(self):
+        """测试前的设置"""
+        import tempfile
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.snapshot_path = os.path.join(self.tmp_dir.name, "mab_snapshot.npz")
+        self.mab_converger = MABConverger()
+        self.paths = [
+            ReasoningPath(path_id=f"path_{i}", path_type=f"type_{i}", description=f"路径 {i}",
+                          prompt_template="{query}", strategy_id=f"strategy_{i}")
+            for i in range(3)
+        ]
+    
+    def tearDown(self):
+        """测试后的清理"""
+        self.mab_converger.stop_background_snapshots(final_snapshot=False)
+        self.tmp_dir.cleanup()
+    
+    def test_save_and_load_round_trip(self):
+        """决策臂、工具臂、试炼场与黄金模板完整恢复"""
+        for i in range(6):
+            self.mab_converger.select_best_path(self.paths)
+            self.mab_converger.update_path_performance(f"strategy_{i % 3}", success=i % 2 == 0, reward=0.7)
+        self.mab_converger.select_best_tool(["web_search", "calculator"])
+        self.mab_converger.update_path_performance("web_search", success=True, reward=1.0)
+        self.mab_converger.trial_ground["exploration_boost_active"]["strategy_1"] = 4
+        self.mab_converger.trial_ground["culling_candidates"].add("strategy_2")
+        self.mab_converger._promote_to_golden_template("strategy_0", self.mab_converger.path_arms["strategy_0"])
+        
+        self.assertEqual(self.mab_converger.save_snapshot(self.snapshot_path), 5)
+        restored = MABConverger()
+        self.assertEqual(restored.load_snapshot(self.snapshot_path), 5)
+        
+        for arm_id, arm in self.mab_converger.path_arms.items():
+            self.assertEqual(restored.path_arms[arm_id], arm)
+        self.assertEqual(restored.tool_arms["web_search"], self.mab_converger.tool_arms["web_search"])
+        self.assertEqual(restored.trial_ground["exploration_boost_active"]["strategy_1"], 4)
+        self.assertEqual(restored.trial_ground["culling_candidates"], {"strategy_2"})
+        self.assertEqual(restored.total_path_selections, 6)
+        self.assertEqual(restored.golden_templates.candidates("strategy_0", "unknown"), {"strategy_0"})
+        self.assertEqual(dict(restored.algorithm_performance), dict(self.mab_converger.algorithm_performance))
+    
+    def test_load_replaces_feedback_source_tracking(self):
+        """恢复快照时反馈来源统计被替换，快照中没有的来源（如旧快照）不保留当前实例的旧计数"""
+        older = MABConverger()
+        older.feedback_source_tracking.clear()
+        older.save_snapshot(self.snapshot_path)
+        for _ in range(3):
+            self.mab_converger.update_path_performance("strategy_0", success=True, reward=1.0, source="retrospection")
+        self.assertEqual(self.mab_converger.feedback_source_tracking["retrospection"]["count"], 3)
+        
+        self.mab_converger.load_snapshot(self.snapshot_path)
+        
+        self.assertEqual(self.mab_converger.feedback_source_tracking,
+                         MABConverger().feedback_source_tracking)
+    
+    def test_load_missing_or_incompatible_snapshot(self):
+        """文件不存在或版本不兼容时不修改状态"""
+        self.assertEqual(self.mab_converger.load_snapshot(self.snapshot_path), 0)
+        
+        self.mab_converger.update_path_performance("strategy_0", success=True, reward=1.0)
+        self.mab_converger.save_snapshot(self.snapshot_path)
+        with patch("neogenesis_system.cognitive_engine.mab_snapshot.SNAPSHOT_FORMAT_VERSION", 99):
+            self.assertEqual(MABConverger().load_snapshot(self.snapshot_path), 0)
+    
+    def test_background_snapshots_while_selecting(self):
+        """后台快照与选择并行进行，停止时写入最终快照"""
+        self.mab_converger.start_background_snapshots(self.snapshot_path, interval=0.02)
+        for i in range(50):
+            self.mab_converger.select_best_path(self.paths)
+            self.mab_converger.update_path_performance(f"strategy_{i % 3}", success=True, reward=0.5)
+            time.sleep(0.002)
+        self.mab_converger.stop_background_snapshots()
+        
+        restored = MABConverger()
+        restored.load_snapshot(self.snapshot_path)
+        self.assertEqual(restored.total_path_selections, 50)
+        self.assertEqual(sum(arm.success_count for arm in restored.path_arms.values()), 50)
+
+
 class TestMABConvergerConfidenceSystem(unittest.TestCase):
     """置信度系统测试"""
     
@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+mab_optimization.py 单元测试
+测试 LinUCB 模型（Sherman–Morrison 更新与直接求逆一致、缓冲区按容量倍增、冷启动臂），
+以及按臂增量保存（只写入变化的臂）/ 加载往返、旧格式迁移与后台自动保存
+"""
+
+import unittest
+import importlib.util
+import threading
+import types
+import numpy as np
+
+# 添加项目根目录到路径
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+
+
+def _load_mab_optimization():
+    """
+    按文件加载 mab_optimization.py
+
+    neogenesis_langchain 包（及其 storage / optimization 子包）的 __init__ 导入失败，
+    这里在独立的包名下逐个按文件加载模块及其依赖，满足模块内的相对导入。
+    """
+    package = "_neogenesis_langchain_by_path"
+
+    def load(name, *path):
+        spec = importlib.util.spec_from_file_location(
+            f"{package}.{name}", os.path.join(PROJECT_ROOT, "neogenesis_langchain", *path))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[spec.name] = module
+        spec.loader.exec_module(module)
+        return module
+
+    for name in ("", ".storage", ".state", ".optimization"):
+        sys.modules.setdefault(package + name, types.ModuleType(package + name)).__path__ = []
+    persistent_storage = load("storage.persistent_storage", "storage", "persistent_storage.py")
+    distributed_state = load("state.distributed_state", "state", "distributed_state.py")
+    # mab_optimization 以 .persistent_storage / .distributed_state 相对导入
+    sys.modules[f"{package}.optimization.persistent_storage"] = persistent_storage
+    sys.modules[f"{package}.optimization.distributed_state"] = distributed_state
+    return load("optimization.mab_optimization", "optimization", "mab_optimization.py")
+
+
+try:
+    from neogenesis_langchain.optimization import mab_optimization
+except (ImportError, SyntaxError):
+    mab_optimization = _load_mab_optimization()
+
+IntelligentMABEngine = mab_optimization.IntelligentMABEngine
+LinUCBModel = mab_optimization.LinUCBModel
+MABAlgorithm = mab_optimization.MABAlgorithm
+MABArm = mab_optimization.MABArm
+MABConfiguration = mab_optimization.MABConfiguration
+MABContext = mab_optimization.MABContext
+
+
+class RecordingStorage:
+    """记录每次写入与删除的内存存储"""
+
+    def __init__(self):
+        self.data = {}
+        self.writes = []
+        self.deletes = []
+
+    def store(self, key, data):
+        self.data[key] = data
+        self.writes.append(key)
+        return True
+
+    def retrieve(self, key):
+        return self.data.get(key)
+
+    def store_many(self, items):
+        for key, data in items.items():
+            self.store(key, data)
+        return len(items)
+
+    def delete_many(self, keys):
+        self.deletes.extend(keys)
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+
+def make_engine(storage=None, **config):
+    config.setdefault("algorithm", MABAlgorithm.LINUCB)
+    config.setdefault("context_dimension", 8)
+    config.setdefault("auto_save_interval", 0)
+    config.setdefault("enable_cold_start", False)
+    return IntelligentMABEngine(MABConfiguration(**config), storage_engine=storage)
+
+
+class TestLinUCBModel(unittest.TestCase):
+    """LinUCBModel"""
+
+    def test_sherman_morrison_matches_direct_inverse(self):
+        """多次秩一更新后的 A⁻¹ 与 theta 等于直接求逆的结果"""
+        rng = np.random.default_rng(3)
+        model = LinUCBModel(dimension=6, ridge_lambda=0.5)
+        model.add_arm("a")
+        A, b = 0.5 * np.eye(6), np.zeros(6)
+        for _ in range(50):
+            x, reward = rng.normal(size=6), rng.random()
+            model.update("a", x, reward)
+            A += np.outer(x, x)
+            b += reward * x
+
+        np.testing.assert_allclose(model.A_inv[0], np.linalg.inv(A), rtol=1e-8, atol=1e-10)
+        np.testing.assert_allclose(model.theta[0], np.linalg.solve(A, b), rtol=1e-8, atol=1e-10)
+
+    def test_capacity_grows_geometrically(self):
+        """逐个添加臂时缓冲区倍增，只重新分配对数次；移除臂不重新分配"""
+        model = LinUCBModel(dimension=4)
+        capacities = set()
+        for index in range(100):
+            model.add_arm(f"arm_{index}")
+            capacities.add(model.capacity)
+
+        self.assertEqual(len(model), 100)
+        self.assertEqual(model.A_inv.shape, (100, 4, 4))
+        self.assertLessEqual(len(capacities), 5)
+
+        buffer = model._A_inv
+        model.remove_arm("arm_0")
+        self.assertIs(model._A_inv, buffer)
+        self.assertEqual(model.arm_ids[0], "arm_99")
+        self.assertEqual(model.arm_index["arm_99"], 0)
+
+    def test_remove_keeps_other_arms(self):
+        """移除臂后其余臂的参数不变"""
+        model = LinUCBModel(dimension=4)
+        for arm_id in ("a", "b", "c"):
+            model.add_arm(arm_id)
+        model.update("c", np.array([1.0, 2.0, 0.0, 0.0]), 1.0)
+        expected = model.arm_state("c")
+        model.remove_arm("a")
+
+        self.assertEqual(model.arm_state("c"), expected)
+
+    def test_growth_preserves_parameters(self):
+        """缓冲区扩容时已有臂的参数原样迁移"""
+        rng = np.random.default_rng(7)
+        model = LinUCBModel(dimension=4)
+        for index in range(LinUCBModel.INITIAL_CAPACITY):
+            model.add_arm(f"arm_{index}")
+            model.update(f"arm_{index}", rng.normal(size=4), rng.random())
+        before = {arm_id: model.arm_state(arm_id) for arm_id in model.arm_ids}
+        capacity = model.capacity
+
+        model.add_arm("overflow")
+
+        self.assertGreater(model.capacity, capacity)
+        for arm_id, state in before.items():
+            self.assertEqual(model.arm_state(arm_id), state)
+            row = model.arm_index[arm_id]
+            np.testing.assert_allclose(model.theta[row], model.A_inv[row] @ model.b[row])
+
+    def test_load_arm_state_round_trip(self):
+        """arm_state / load_arm_state 在新模型中还原参数与更新次数"""
+        model = LinUCBModel(dimension=4)
+        model.add_arm("a")
+        model.update("a", np.array([1.0, 0.0, 2.0, 0.0]), 0.5)
+        model.update("a", np.array([1.0, 1.0, 0.0, 0.0]), 1.0)
+
+        restored = LinUCBModel(dimension=4)
+        restored.load_arm_state("a", model.arm_state("a"))
+
+        self.assertEqual(restored.arm_state("a"), model.arm_state("a"))
+        np.testing.assert_allclose(restored.theta[0], model.theta[0])
+
+    def test_cold_start_arm_has_no_state(self):
+        """从未更新的臂仍为先验，不产生需要持久化的参数"""
+        model = LinUCBModel(dimension=4, ridge_lambda=2.0)
+        model.add_arm("new")
+
+        self.assertIsNone(model.arm_state("new"))
+        np.testing.assert_allclose(model.A_inv[0], np.eye(4) / 2.0)
+        self.assertTrue(np.all(model.theta[0] == 0))
+
+
+class TestLinUCBPersistence(unittest.TestCase):
+    """按臂保存 LinUCB 参数"""
+
+    def setUp(self):
+        self.storage = RecordingStorage()
+        self.engine = make_engine(self.storage)
+        for arm_id in ("a", "b", "c"):
+            self.engine.add_arm(MABArm(arm_id=arm_id, name=arm_id))
+
+    def update(self, arm_id, reward, **features):
+        self.engine.update_reward(arm_id, reward, MABContext("ctx", features=features))
+
+    def test_round_trip(self):
+        """保存后加载，各臂参数与选择结果一致，未更新的臂保持冷启动"""
+        self.update("a", 1.0, domain="医疗")
+        self.update("b", 0.2, domain="金融")
+        self.update("a", 0.8, domain="医疗")
+        self.assertTrue(self.engine.save_state())
+
+        restored = make_engine(self.storage)
+        self.assertTrue(restored.load_state())
+        original, loaded = self.engine.contextual_models["linucb"], restored.contextual_models["linucb"]
+        for arm_id in ("a", "b"):
+            np.testing.assert_allclose(loaded.A_inv[loaded.arm_index[arm_id]],
+                                       original.A_inv[original.arm_index[arm_id]])
+            np.testing.assert_allclose(loaded.theta[loaded.arm_index[arm_id]],
+                                       original.theta[original.arm_index[arm_id]])
+        self.assertIsNone(loaded.arm_state("c"))
+        self.assertEqual(loaded.update_count, 3)
+
+        context = MABContext("query", features={"domain": "医疗"})
+        x, _ = original.vectorize(context.features)
+        np.testing.assert_allclose(loaded.scores(x, 1.0), original.scores(x, 1.0))
+
+    def test_only_updated_arm_written(self):
+        """一次奖励更新只重写该臂的记录与头部，不重写整个模型"""
+        self.engine.save_state()
+        self.storage.writes.clear()
+
+        self.update("b", 1.0, domain="医疗")
+        self.engine.save_state()
+
+        self.assertEqual(sorted(self.storage.writes), ["mab_state", "mab_state:arm:b"])
+        self.assertIn("linucb", self.storage.data["mab_state:arm:b"])
+        self.assertNotIn("linucb", self.storage.data["mab_state:arm:a"])
+        self.assertNotIn("mab_state:linucb", self.storage.data)
+
+    def test_legacy_model_blob_migrated(self):
+        """旧格式的整体模型记录被拆分到各臂记录中，全量保存后删除"""
+        self.update("a", 1.0, domain="医疗")
+        legacy = self.engine.contextual_models["linucb"]
+        self.storage.data["mab_state:linucb"] = {
+            "dimension": legacy.dimension,
+            "ridge_lambda": legacy.ridge_lambda,
+            "arm_ids": list(legacy.arm_ids),
+            "A_inv": legacy.A_inv.tolist(),
+            "b": legacy.b.tolist(),
+            "update_count": legacy.update_count
+        }
+        self.engine.save_state()
+        for arm_id in ("a", "b", "c"):
+            self.storage.data[f"mab_state:arm:{arm_id}"].pop("linucb", None)
+        self.storage.data["mab_state"]["contextual_model"] = True
+
+        restored = make_engine(self.storage)
+        self.assertTrue(restored.load_state())
+        model = restored.contextual_models["linucb"]
+        np.testing.assert_allclose(model.theta[model.arm_index["a"]], legacy.theta[legacy.arm_index["a"]])
+
+        self.assertTrue(restored.save_state())
+        self.assertIn("mab_state:linucb", self.storage.deletes)
+        self.assertNotIn("mab_state:linucb", self.storage.data)
+        self.assertIn("linucb", self.storage.data["mab_state:arm:a"])
+
+    def test_dimension_mismatch_resets_model(self):
+        """保存时的维度与当前配置不一致时丢弃各臂参数"""
+        self.update("a", 1.0, domain="医疗")
+        self.engine.save_state()
+
+        self.storage.data["mab_state"]["config"]["context_dimension"] = 16
+        restored = make_engine(self.storage, context_dimension=16)
+        self.assertTrue(restored.load_state())
+
+        model = restored.contextual_models["linucb"]
+        self.assertEqual(model.dimension, 16)
+        self.assertIsNone(model.arm_state("a"))
+
+
+class FailingStorage(RecordingStorage):
+    """批量写入失败的存储"""
+
+    def store_many(self, items):
+        return 0
+
+
+class TestIncrementalSave(unittest.TestCase):
+    """只写入变化的臂"""
+
+    def setUp(self):
+        self.storage = RecordingStorage()
+        self.engine = make_engine(self.storage, algorithm=MABAlgorithm.UCB1)
+        for index in range(10):
+            self.engine.add_arm(MABArm(arm_id=f"arm_{index}", name=f"臂{index}"))
+        self.assertTrue(self.engine.save_state())
+        self.storage.writes.clear()
+
+    def test_first_save_writes_all_arms(self):
+        """首次保存写入全部臂与头部"""
+        self.assertEqual(len([key for key in self.storage.data if ":arm:" in key]), 10)
+        self.assertEqual(self.storage.data["mab_state"]["arm_ids"], [f"arm_{index}" for index in range(10)])
+
+    def test_only_dirty_arms_written(self):
+        """同一臂的多次更新合并为一次写入，其余臂不重写"""
+        for _ in range(5):
+            self.engine.update_reward("arm_3", 1.0)
+        self.engine.update_reward("arm_7", 0.0)
+        self.assertTrue(self.engine.save_state())
+
+        self.assertEqual(sorted(self.storage.writes), ["mab_state", "mab_state:arm:arm_3", "mab_state:arm:arm_7"])
+        self.assertEqual(self.storage.data["mab_state:arm:arm_3"]["total_pulls"], 5)
+
+    def test_no_changes_no_writes(self):
+        """没有变化时不写入"""
+        self.assertTrue(self.engine.save_state())
+        self.assertEqual(self.storage.writes, [])
+        self.assertFalse(self.engine.has_pending_changes())
+
+    def test_removed_arm_deleted(self):
+        """移除的臂在下次保存时删除"""
+        self.engine.remove_arm("arm_0")
+        self.engine.save_state()
+
+        self.assertEqual(self.storage.deletes, ["mab_state:arm:arm_0"])
+        self.assertNotIn("mab_state:arm:arm_0", self.storage.data)
+        self.assertNotIn("arm_0", self.storage.data["mab_state"]["arm_ids"])
+
+    def test_failed_save_requeues(self):
+        """写入失败时变化放回待写入集合，下次保存重试"""
+        self.engine.update_reward("arm_1", 1.0)
+        self.engine.storage_engine = FailingStorage()
+        self.assertFalse(self.engine.save_state())
+        self.assertTrue(self.engine.has_pending_changes())
+
+        self.engine.storage_engine = self.storage
+        self.assertTrue(self.engine.save_state())
+        self.assertIn("mab_state:arm:arm_1", self.storage.writes)
+
+    def test_legacy_single_blob_migrated(self):
+        """旧格式（所有臂保存在头部记录中）加载后，下次保存全量转换为按臂存储"""
+        legacy_storage = RecordingStorage()
+        legacy_storage.data["mab_state"] = {
+            "config": {"algorithm": "ucb1", "context_dimension": 8},
+            "arms": {
+                "a": {"arm_id": "a", "name": "臂a", "total_pulls": 4, "total_reward": 3.0},
+                "b": {"arm_id": "b", "name": "臂b", "total_pulls": 2, "total_reward": 0.5}
+            },
+            "total_rounds": 6
+        }
+        engine = make_engine(legacy_storage, algorithm=MABAlgorithm.UCB1)
+        self.assertTrue(engine.load_state())
+        self.assertEqual(engine.arms["a"].total_pulls, 4)
+
+        self.assertTrue(engine.save_state())
+        header = legacy_storage.data["mab_state"]
+        self.assertNotIn("arms", header)
+        self.assertEqual(sorted(header["arm_ids"]), ["a", "b"])
+        self.assertEqual(legacy_storage.data["mab_state:arm:b"]["total_reward"], 0.5)
+
+        reloaded = make_engine(legacy_storage, algorithm=MABAlgorithm.UCB1)
+        self.assertTrue(reloaded.load_state())
+        self.assertEqual(reloaded.arms["a"].total_reward, 3.0)
+        self.assertEqual(reloaded.total_rounds, 6)
+
+
+class SignallingStorage(RecordingStorage):
+    """每次批量写入后发出信号"""
+
+    def __init__(self):
+        super().__init__()
+        self.flushed = threading.Event()
+
+    def store_many(self, items):
+        written = super().store_many(items)
+        self.flushed.set()
+        return written
+
+
+class TestAutoSaver(unittest.TestCase):
+    """后台自动保存"""
+
+    def setUp(self):
+        self.storage = SignallingStorage()
+
+    def make_engine(self, **config):
+        engine = make_engine(self.storage, algorithm=MABAlgorithm.UCB1, **config)
+        self.addCleanup(engine.stop_auto_save)
+        for index in range(4):
+            engine.add_arm(MABArm(arm_id=f"arm_{index}", name=f"臂{index}"))
+        return engine
+
+    def test_backlog_triggers_early_save(self):
+        """待写入的臂达到上限时不等间隔，立即保存"""
+        engine = self.make_engine(auto_save_interval=3600, auto_save_max_dirty=3)
+        self.assertIsNotNone(engine._auto_save_thread)
+
+        self.assertTrue(self.storage.flushed.wait(5))
+        self.assertIn("mab_state:arm:arm_3", self.storage.data)
+        self.assertFalse(engine.has_pending_changes())
+
+    def test_stop_joins_thread(self):
+        """stop_auto_save 唤醒并等待后台线程退出，可重复调用"""
+        engine = self.make_engine(auto_save_interval=3600)
+        thread = engine._auto_save_thread
+        engine.stop_auto_save()
+
+        self.assertFalse(thread.is_alive())
+        self.assertIsNone(engine._auto_save_thread)
+        engine.stop_auto_save()
+
+    def test_cleanup_saves_pending_changes(self):
+        """cleanup 停止后台线程并保存剩余的变化"""
+        engine = self.make_engine(auto_save_interval=3600)
+        engine.update_reward("arm_2", 1.0)
+        engine.cleanup()
+
+        self.assertIsNone(engine._auto_save_thread)
+        self.assertEqual(self.storage.data["mab_state:arm:arm_2"]["total_pulls"], 1)
+        self.assertFalse(engine.has_pending_changes())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+persistent_storage.py 单元测试
+测试各存储后端的批量写入 store_many 与批量删除 delete_many
+"""
+
+import unittest
+import importlib.util
+import os
+import tempfile
+
+# 添加项目根目录到路径
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+
+try:
+    from neogenesis_langchain.storage import persistent_storage
+except (ImportError, SyntaxError):
+    # storage 包的 __init__ 导入失败时直接按文件加载（模块本身只依赖标准库）
+    _spec = importlib.util.spec_from_file_location(
+        "persistent_storage", os.path.join(PROJECT_ROOT, "neogenesis_langchain", "storage", "persistent_storage.py"))
+    persistent_storage = importlib.util.module_from_spec(_spec)
+    _spec.loader.exec_module(persistent_storage)
+
+StorageBackend = persistent_storage.StorageBackend
+StorageConfig = persistent_storage.StorageConfig
+PersistentStorageEngine = persistent_storage.PersistentStorageEngine
+
+
+class BatchOperationsMixin:
+    """各后端共用的批量操作测试"""
+
+    backend = None
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.engine = PersistentStorageEngine(StorageConfig(backend=self.backend,
+                                                            storage_path=self.temp_dir.name))
+
+    def tearDown(self):
+        self.engine.cleanup()
+        self.temp_dir.cleanup()
+
+    def test_store_many(self):
+        """批量写入全部条目，返回写入数量"""
+        items = {f"mab_state:arm:{index}": {"arm_id": str(index), "total_reward": index * 0.5}
+                 for index in range(20)}
+        self.assertEqual(self.engine.store_many(items), 20)
+
+        for key, data in items.items():
+            self.assertEqual(self.engine.retrieve(key), data)
+
+    def test_store_many_overwrites(self):
+        """批量写入覆盖已有条目"""
+        self.engine.store("mab_state:arm:a", {"total_reward": 1.0})
+        self.engine.store_many({"mab_state:arm:a": {"total_reward": 2.0}, "mab_state:arm:b": {"total_reward": 3.0}})
+
+        self.assertEqual(self.engine.retrieve("mab_state:arm:a"), {"total_reward": 2.0})
+        self.assertEqual(self.engine.retrieve("mab_state:arm:b"), {"total_reward": 3.0})
+
+    def test_store_many_empty(self):
+        """空批次不写入"""
+        self.assertEqual(self.engine.store_many({}), 0)
+
+    def test_delete_many(self):
+        """批量删除只影响指定的键"""
+        self.engine.store_many({"a": 1, "b": 2, "c": 3})
+        self.assertGreaterEqual(self.engine.delete_many(["a", "c"]), 2)
+
+        self.assertIsNone(self.engine.retrieve("a"))
+        self.assertIsNone(self.engine.retrieve("c"))
+        self.assertEqual(self.engine.retrieve("b"), 2)
+        self.assertEqual(self.engine.delete_many([]), 0)
+
+
+class TestFileSystemBackend(BatchOperationsMixin, unittest.TestCase):
+    backend = StorageBackend.FILE_SYSTEM
+
+
+class TestSQLiteBackend(BatchOperationsMixin, unittest.TestCase):
+    backend = StorageBackend.SQLITE
+
+
+class TestMemoryBackend(BatchOperationsMixin, unittest.TestCase):
+    backend = StorageBackend.MEMORY
+
+
+@unittest.skipUnless(persistent_storage.LMDB_AVAILABLE, "lmdb 未安装")
+class TestLMDBBackend(BatchOperationsMixin, unittest.TestCase):
+    backend = StorageBackend.LMDB
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+provider_router.py 单元测试
+测试熔断器状态转换、延迟感知排序、对冲请求、调用方上下文传递以及与 LLMManager 的集成
+"""
+
+import unittest
+import threading
+import time
+
+# 添加项目根目录到路径
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from neogenesis_system.providers.provider_router import ProviderRouter, ProviderHealth, CircuitState
+from neogenesis_system.tests.llm_fixtures import make_llm_manager
+from neogenesis_system.providers.llm_base import (
+    BaseLLMClient, LLMConfig, LLMProvider, LLMResponse, LLMErrorType, create_error_response
+)
+from neogenesis_system.shared.deadline import Deadline, deadline_scope, get_current_deadline
+
+
+class ScriptedLLMClient(BaseLLMClient):
+    """按脚本返回的模拟客户端：script(第 n 次调用) -> (延迟, 是否成功)"""
+
+    def __init__(self, name: str, script):
+        super().__init__(LLMConfig(provider=LLMProvider.DEEPSEEK, api_key="fake"))
+        self.name = name
+        self.script = script
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def chat_completion(self, messages, temperature=None, max_tokens=None, **kwargs) -> LLMResponse:
+        with self._lock:
+            index = self.calls
+            self.calls += 1
+        delay, success = self.script(index)
+        time.sleep(delay)
+        if not success:
+            return create_error_response(self.name, LLMErrorType.SERVER_ERROR, f"{self.name} 模拟故障")
+        return LLMResponse(success=True, content=f"{self.name}:{index}", provider=self.name)
+
+    async def achat_completion(self, messages, temperature=None, max_tokens=None, **kwargs) -> LLMResponse:
+        return self.chat_completion(messages, temperature, max_tokens, **kwargs)
+
+    def validate_config(self) -> bool:
+        return True
+
+    def get_available_models(self):
+        return [self.name]
+
+
+class TestProviderHealth(unittest.TestCase):
+    """ProviderHealth 熔断器测试"""
+
+    def setUp(self):
+        """测试前的设置"""
+        self.router = ProviderRouter({"breaker": {"open_timeout": 0.05}})
+        self.health = self.router.health("primary")
+
+    def test_breaker_opens_and_recovers_through_half_open(self):
+        """连续失败后打开，冷却后放行一个探测请求，探测成功后关闭"""
+        for _ in range(3):
+            self.assertTrue(self.health.try_acquire())
+            self.health.record(False, 0.01)
+
+        self.assertEqual(self.health.state, CircuitState.OPEN)
+        self.assertFalse(self.health.try_acquire())
+
+        time.sleep(0.06)
+        self.assertTrue(self.health.probe_due())
+        self.assertTrue(self.health.try_acquire())
+        self.assertEqual(self.health.state, CircuitState.HALF_OPEN)
+        self.assertFalse(self.health.try_acquire())  # 只放行一个探测请求
+
+        self.health.record(True, 0.01)
+        self.assertEqual(self.health.state, CircuitState.CLOSED)
+        self.assertEqual(self.health.error_rate(), 0.0)
+
+    def test_failed_probe_reopens(self):
+        """探测请求失败时重新打开"""
+        for _ in range(3):
+            self.health.record(False, 0.01)
+        time.sleep(0.06)
+        self.health.try_acquire()
+
+        self.health.record(False, 0.01)
+
+        self.assertEqual(self.health.state, CircuitState.OPEN)
+        self.assertEqual(self.health.trip_count, 2)
+        self.assertFalse(self.health.is_available())
+
+    def test_error_rate_trips_without_consecutive_failures(self):
+        """错误率达到阈值时即使没有连续失败也会打开"""
+        for i in range(10):
+            self.health.record(i % 2 == 0, 0.01)
+
+        self.assertEqual(self.health.state, CircuitState.OPEN)
+
+    def test_latency_quantile(self):
+        """p95 需要足够样本"""
+        health = ProviderHealth("p", self.router.config)
+        for i in range(9):
+            health.record(True, 0.01)
+        self.assertIsNone(health.latency_quantile(0.95))
+
+        for i in range(11):
+            health.record(True, 0.01 * (i + 1))
+        self.assertAlmostEqual(health.latency_quantile(0.95), 0.10)
+
+
+class TestProviderRouter(unittest.TestCase):
+    """ProviderRouter 路由测试"""
+
+    def test_rank_by_expected_latency(self):
+        """按期望延迟排序；熔断中的提供商被排除；pin_first 固定主提供商"""
+        router = ProviderRouter()
+        router.health("slow").record(True, 0.5)
+        router.health("fast").record(True, 0.05)
+        for _ in range(3):
+            router.health("broken").record(False, 0.01)
+
+        self.assertEqual(router.rank(["slow", "fast", "broken", "new"]), ["new", "fast", "slow"])
+        self.assertEqual(router.rank(["slow", "fast"], pin_first=True), ["slow", "fast"])
+        self.assertEqual(ProviderRouter({"strategy": "priority"}).rank(["slow", "fast"]), ["slow", "fast"])
+
+    def test_all_providers_fail(self):
+        """全部失败时返回最后的错误"""
+        router = ProviderRouter()
+        result = router.execute(["a", "b"], lambda name: create_error_response(
+            name, LLMErrorType.SERVER_ERROR, f"{name} 故障"))
+
+        self.assertFalse(result.success)
+        self.assertEqual(result.attempted, ["a", "b"])
+        self.assertEqual(result.fallbacks, 1)
+        self.assertIn("故障", result.error)
+
+    def test_caller_deadline_visible_in_attempt(self):
+        """调用方设置的截止时间在工作线程中的 _attempt 内可见"""
+        router = ProviderRouter()
+        seen = []
+
+        def call(name):
+            seen.append((threading.current_thread() is threading.main_thread(), get_current_deadline()))
+            return LLMResponse(success=True, content="ok", provider=name, model="m")
+
+        deadline = Deadline(timeout=30)
+        with deadline_scope(deadline):
+            result = router.execute(["a"], call)
+
+        self.assertTrue(result.success)
+        self.assertEqual(seen, [(False, deadline)])
+        self.assertIsNone(get_current_deadline())
+
+
+class TestLLMManagerRouting(unittest.TestCase):
+    """LLMManager 对冲与熔断集成测试"""
+
+    def test_hedged_request_beats_slow_primary(self):
+        """主提供商超过 p95 未返回时，对冲到次优提供商并返回其结果"""
+        slow = threading.Event()
+        primary = ScriptedLLMClient("primary", lambda i: (0.5 if slow.is_set() else 0.005, True))
+        secondary = ScriptedLLMClient("secondary", lambda i: (0.03, True))
+        manager = make_llm_manager([primary, secondary], {"hedging": {"min_delay": 0.02}})
+
+        for _ in range(30):
+            self.assertTrue(manager.chat_completion("预热").success)
+        slow.set()
+
+        start_time = time.perf_counter()
+        response = manager.chat_completion("慢请求")
+        elapsed = time.perf_counter() - start_time
+
+        self.assertTrue(response.success)
+        self.assertEqual(response.provider, "secondary")
+        self.assertLess(elapsed, 0.3)
+        self.assertEqual(manager.stats['hedged_requests'], 1)
+
+    def test_breaker_skips_failing_provider_and_recovers(self):
+        """故障提供商熔断后不再被调用，冷却后探测成功即恢复"""
+        primary = ScriptedLLMClient("primary", lambda i: (0.001, i >= 3))
+        secondary = ScriptedLLMClient("secondary", lambda i: (0.001, True))
+        manager = make_llm_manager([primary, secondary], {
+            "strategy": "priority",
+            "breaker": {"open_timeout": 0.1}
+        })
+
+        for _ in range(6):
+            self.assertTrue(manager.chat_completion("请求").success)
+        self.assertEqual(primary.calls, 3)
+        self.assertEqual(manager.get_provider_status()['providers']['primary']['circuit_state'], "open")
+
+        time.sleep(0.12)
+        response = manager.chat_completion("探测")
+
+        self.assertEqual(response.provider, "primary")
+        self.assertEqual(manager.router.health("primary").state, CircuitState.CLOSED)
+
+
+if __name__ == '__main__':
+    unittest.main()
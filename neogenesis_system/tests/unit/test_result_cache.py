@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+内容寻址结果缓存单元测试
+测试稳定摘要、LRU 容量上限、TTL 过期、返回副本以及可选的磁盘层（校验和 JSON 格式、容量上限）
+"""
+
+import unittest
+import os
+import pickle
+import subprocess
+import tempfile
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Dict
+
+# 添加项目根目录到路径
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from neogenesis_system.shared.result_cache import ResultCache, stable_digest, canonical_json
+from neogenesis_system.shared.reward_log import decode_record
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+
+
+class Stage(Enum):
+    SEED = "thinking_seed"
+
+
+@dataclass
+class FakeResult:
+    """与 ExecutionResult 形状相同的结果"""
+    tool_name: str
+    data: Any = None
+    cache_hit: bool = False
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+class Exploit:
+    """反序列化时会创建标记文件的对象"""
+
+    def __init__(self, marker: str):
+        self.marker = marker
+
+    def __reduce__(self):
+        return (open, (self.marker, "w"))
+
+
+class TestStableDigest(unittest.TestCase):
+    """稳定摘要"""
+
+    def test_independent_of_dict_order(self):
+        """字典键顺序不影响摘要"""
+        self.assertEqual(stable_digest("tool", {"a": 1, "b": [1, 2]}),
+                         stable_digest("tool", {"b": [1, 2], "a": 1}))
+        self.assertNotEqual(stable_digest("tool", {"a": 1}), stable_digest("tool", {"a": 2}))
+
+    def test_enum_and_dataclass(self):
+        """枚举按值、数据类按字段规范化"""
+        self.assertEqual(canonical_json(Stage.SEED), '"thinking_seed"')
+        self.assertEqual(stable_digest(FakeResult("t", {"x": 1})), stable_digest({"tool_name": "t", "data": {"x": 1},
+                                                                                   "cache_hit": False, "metadata": {}}))
+
+    def test_stable_across_processes(self):
+        """不同哈希种子的进程得到相同摘要"""
+        code = ("from neogenesis_system.shared.result_cache import stable_digest;"
+                "print(stable_digest('tool', {'query': '缓存', 'paths': {'b': 2, 'a': 1}}))")
+        digests = set()
+        for seed in ("1", "2"):
+            output = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True,
+                                    env={**os.environ, "PYTHONHASHSEED": seed}, check=True)
+            digests.add(output.stdout.strip())
+
+        self.assertEqual(digests, {stable_digest('tool', {'query': '缓存', 'paths': {'a': 1, 'b': 2}})})
+
+
+class TestResultCache(unittest.TestCase):
+    """内存层"""
+
+    def test_lru_eviction(self):
+        """超出容量时淘汰最久未用的条目"""
+        cache = ResultCache(max_size=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        self.assertEqual(len(cache), 2)
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertEqual(cache.get_stats()["evictions"], 1)
+
+    def test_ttl_expiry(self):
+        """过期条目视为未命中"""
+        cache = ResultCache(ttl=0.05)
+        cache.put("a", 1)
+        cache.put("b", 2, ttl=60)
+        time.sleep(0.1)
+
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("b"), 2)
+        self.assertEqual(cache.get_stats()["expirations"], 1)
+
+    def test_returns_copies(self):
+        """命中返回副本：修改返回值或原对象都不影响缓存"""
+        cache = ResultCache()
+        result = FakeResult("thinking_seed", {"thinking_seed": "种子"})
+        cache.put("key", result)
+        result.data["thinking_seed"] = "已修改"
+
+        hit = cache.get("key")
+        hit.cache_hit = True
+        hit.data["extra"] = True
+
+        again = cache.get("key")
+        self.assertFalse(again.cache_hit)
+        self.assertEqual(again.data, {"thinking_seed": "种子"})
+        self.assertIsNot(hit, again)
+
+
+class TestDiskTier(unittest.TestCase):
+    """磁盘层"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = self.temp_dir.name
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_survives_new_instance(self):
+        """新实例（如进程重启后）从磁盘层读取并用 value_decoder 还原，回填内存层"""
+        ResultCache(cache_dir=self.cache_dir).put("key", FakeResult("path_generator", ["路径"]))
+
+        cache = ResultCache(cache_dir=self.cache_dir, value_decoder=lambda data: FakeResult(**data))
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.get("key"), FakeResult("path_generator", ["路径"]))
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.get_stats()["disk_hits"], 1)
+
+    def test_evicted_entries_served_from_disk(self):
+        """内存层淘汰的条目仍可从磁盘层读取"""
+        cache = ResultCache(max_size=1, cache_dir=self.cache_dir)
+        cache.put("a", 1)
+        cache.put("b", 2)
+
+        self.assertEqual(cache.get("a"), 1)
+
+    def test_expired_and_corrupt_entries_removed(self):
+        """过期与损坏的磁盘条目在启动时清理"""
+        cache = ResultCache(ttl=0.05, cache_dir=self.cache_dir)
+        cache.put("expired", 1)
+        cache.put("kept", 2, ttl=60)
+        cache.put("corrupt", 3, ttl=60)
+        with open(cache._disk_path("corrupt"), "wb") as f:
+            f.write(b"not a pickle")
+        time.sleep(0.1)
+
+        reopened = ResultCache(cache_dir=self.cache_dir)
+        self.assertIsNone(reopened.get("expired"))
+        self.assertIsNone(reopened.get("corrupt"))
+        self.assertEqual(reopened.get("kept"), 2)
+        self.assertEqual(len(list(reopened._disk_files())), 1)
+
+    def test_record_is_checksummed_json(self):
+        """磁盘条目是带校验和的 JSON 记录，改动内容后视为损坏"""
+        cache = ResultCache(cache_dir=self.cache_dir)
+        cache.put("a", {"query": "缓存"}, ttl=60)
+        path = cache._disk_path("a")
+        with open(path, "rb") as f:
+            record = decode_record(f.read())
+        self.assertEqual(record["key"], "a")
+        self.assertEqual(record["value"], {"query": "缓存"})
+
+        with open(path, "rb") as f:
+            tampered = f.read().replace("缓存".encode("utf-8"), "篡改".encode("utf-8"))
+        with open(path, "wb") as f:
+            f.write(tampered)
+        self.assertIsNone(ResultCache(cache_dir=self.cache_dir).get("a"))
+        self.assertFalse(os.path.exists(path))
+
+    def test_pickle_files_never_loaded(self):
+        """旧版 pickle 条目在启动时直接删除，不会被反序列化"""
+        legacy_path = os.path.join(self.cache_dir, "ab", "ab" + "0" * 62 + ".pkl")
+        os.makedirs(os.path.dirname(legacy_path))
+        marker = os.path.join(self.cache_dir, "unpickled")
+        with open(legacy_path, "wb") as f:
+            pickle.dump(Exploit(marker), f)
+
+        ResultCache(cache_dir=self.cache_dir)
+        self.assertFalse(os.path.exists(marker))
+        self.assertFalse(os.path.exists(legacy_path))
+
+    def test_unserializable_value_memory_only(self):
+        """无法 JSON 序列化的值只保存在内存层"""
+        cache = ResultCache(cache_dir=self.cache_dir)
+        cache.put("a", object())
+
+        self.assertIn("a", cache)
+        self.assertEqual(list(cache._disk_files()), [])
+
+    def test_entry_limit_evicts_least_recently_used(self):
+        """超出条目上限时淘汰最久未用的磁盘条目，命中会刷新顺序"""
+        cache = ResultCache(max_size=1, cache_dir=self.cache_dir, disk_max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)  # 内存层只有 b，a 从磁盘读取并刷新
+        cache.put("c", 3)
+
+        self.assertEqual(len(list(cache._disk_files())), 2)
+        self.assertFalse(os.path.exists(cache._disk_path("b")))
+        self.assertEqual(cache.get_stats()["disk_evictions"], 1)
+
+    def test_byte_limit(self):
+        """磁盘层总字节数不超过上限"""
+        cache = ResultCache(cache_dir=self.cache_dir, disk_max_entries=None, disk_max_bytes=1000)
+        for index in range(20):
+            cache.put(f"key_{index}", "x" * 100)
+
+        total = sum(os.path.getsize(path) for path in cache._disk_files())
+        self.assertLessEqual(total, 1000)
+        self.assertEqual(total, cache.get_stats()["disk_bytes"])
+        self.assertTrue(os.path.exists(cache._disk_path("key_19")))
+
+    def test_lru_order_survives_restart(self):
+        """重启后按文件 mtime 恢复 LRU 顺序并执行上限"""
+        cache = ResultCache(cache_dir=self.cache_dir)
+        for index, key in enumerate(("a", "b", "c")):
+            cache.put(key, index)
+            os.utime(cache._disk_path(key), (1000 + index, 1000 + index))
+        os.utime(cache._disk_path("a"), (2000, 2000))
+
+        reopened = ResultCache(cache_dir=self.cache_dir, disk_max_entries=2)
+        self.assertFalse(os.path.exists(reopened._disk_path("b")))
+        self.assertEqual(reopened.get("a"), 0)
+        self.assertEqual(reopened.get("c"), 2)
+
+    def test_clear(self):
+        """清空同时删除磁盘条目"""
+        cache = ResultCache(cache_dir=self.cache_dir)
+        cache.put("a", 1)
+        cache.clear()
+
+        self.assertIsNone(ResultCache(cache_dir=self.cache_dir).get("a"))
+
+
+if __name__ == '__main__':
+    unittest.main()
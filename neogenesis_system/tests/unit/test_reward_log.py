@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+追加式奖励日志单元测试
+测试损坏尾部的恢复、重放结果与内存状态一致（含压缩中途崩溃）、非 pickle 格式，
+以及单策略更新流下的写入吞吐
+"""
+
+import unittest
+import json
+import os
+import pickle
+import random
+import tempfile
+import time
+
+# 添加项目根目录到路径
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from neogenesis_system.shared.reward_log import RewardLog, encode_record, decode_record
+
+
+def apply_reward(weights, record):
+    """与 MABPersistentWeights 相同的移动平均"""
+    weight = weights.get(record["strategy_id"], 0.5)
+    weights[record["strategy_id"]] = 0.9 * weight + 0.1 * record["reward"]
+
+
+class RewardLogTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.prefix = os.path.join(self.temp_dir.name, "mab_weights")
+        self.logs = []
+
+    def tearDown(self):
+        for log in self.logs:
+            log.close(compact=False)
+        self.temp_dir.cleanup()
+
+    def open_log(self, **kwargs) -> RewardLog:
+        log = RewardLog(self.prefix, apply=apply_reward, **kwargs)
+        self.logs.append(log)
+        return log
+
+
+class TestRecordFormat(unittest.TestCase):
+    """日志行格式"""
+
+    def test_round_trip_and_checksum(self):
+        """编码后可解码；改动任一字节或缺少换行都被拒绝"""
+        line = encode_record({"seq": 1, "strategy_id": "系统分析", "reward": 0.8})
+        self.assertEqual(decode_record(line), {"seq": 1, "strategy_id": "系统分析", "reward": 0.8})
+
+        tampered = line.replace(b"0.8", b"0.9")
+        self.assertIsNone(decode_record(tampered))
+        self.assertIsNone(decode_record(line[:-1]))
+        self.assertIsNone(decode_record(b"garbage\n"))
+
+
+class TestRewardLog(RewardLogTestCase):
+    """RewardLog"""
+
+    def test_replay_matches_live_state(self):
+        """重放（跨多次压缩）得到与内存中完全相同的权重"""
+        rng = random.Random(7)
+        log = self.open_log(compact_every=37)
+        for _ in range(500):
+            log.append({"strategy_id": f"s{rng.randrange(10)}", "reward": rng.random()})
+        expected = dict(log.state)
+        log.close(compact=False)
+
+        reopened = self.open_log()
+        self.assertEqual(reopened.state, expected)
+        self.assertEqual(reopened.seq, 500)
+        self.assertGreater(log.get_stats()["compactions"], 0)
+
+    def test_truncated_tail_recovery(self):
+        """写到一半的最后一行被丢弃并截断，之前的记录完整恢复，之后可继续追加"""
+        log = self.open_log(compact_every=0)
+        for reward in (1.0, 0.0, 1.0):
+            log.append({"strategy_id": "a", "reward": reward})
+        expected = dict(log.state)
+        log.close(compact=False)
+
+        intact_size = os.path.getsize(log.log_path)
+        with open(log.log_path, "ab") as f:
+            f.write(encode_record({"seq": 4, "strategy_id": "a", "reward": 0.0})[:-7])
+
+        reopened = self.open_log(compact_every=0)
+        self.assertEqual(reopened.state, expected)
+        self.assertEqual(os.path.getsize(log.log_path), intact_size)
+        self.assertEqual(reopened.get_stats()["truncated_bytes"], len(encode_record(
+            {"seq": 4, "strategy_id": "a", "reward": 0.0})) - 7)
+
+        self.assertEqual(reopened.append({"strategy_id": "a", "reward": 0.0}), 4)
+        reopened.close(compact=False)
+        self.assertEqual(self.open_log().seq, 4)
+
+    def test_corrupt_record_stops_replay(self):
+        """校验失败的记录及其之后的内容被丢弃"""
+        log = self.open_log(compact_every=0)
+        for strategy in ("a", "b", "c"):
+            log.append({"strategy_id": strategy, "reward": 1.0})
+        log.close(compact=False)
+
+        with open(log.log_path, "rb") as f:
+            lines = f.readlines()
+        lines[1] = lines[1].replace(b'"b"', b'"x"')
+        with open(log.log_path, "wb") as f:
+            f.writelines(lines)
+
+        self.assertEqual(set(self.open_log().state), {"a"})
+
+    def test_crash_between_snapshot_and_truncate(self):
+        """压缩写完快照、未截断日志时崩溃：日志中已包含在快照里的记录不会重复应用"""
+        log = self.open_log(compact_every=0)
+        for reward in (1.0, 1.0, 0.0):
+            log.append({"strategy_id": "a", "reward": reward})
+        expected = dict(log.state)
+
+        with open(log.log_path, "rb") as f:
+            log_bytes = f.read()
+        log.compact()
+        log.close(compact=False)
+        with open(log.log_path, "wb") as f:
+            f.write(log_bytes)
+
+        self.assertEqual(self.open_log().state, expected)
+
+    def test_append_and_compact_after_close(self):
+        """关闭后仍可继续追加与压缩（重新打开日志文件）"""
+        log = self.open_log(compact_every=0)
+        log.append({"strategy_id": "a", "reward": 1.0})
+        log.close()
+
+        log.compact()
+        log.append({"strategy_id": "a", "reward": 0.0})
+        expected = dict(log.state)
+        log.close(compact=False)
+
+        self.assertEqual(self.open_log().state, expected)
+
+    def test_snapshot_is_json(self):
+        """快照与日志都是 JSON 文本，不含 pickle"""
+        log = self.open_log()
+        log.append({"strategy_id": "a", "reward": 1.0})
+        log.close()
+
+        with open(log.snapshot_path, "r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+        self.assertEqual(snapshot["seq"], 1)
+        self.assertEqual(snapshot["state"], {"a": 0.55})
+        self.assertEqual(os.path.getsize(log.log_path), 0)
+
+    def test_write_throughput(self):
+        """
+        单策略更新流：追加一行记录远快于每次更新都 pickle 整个权重字典（500 个策略）
+        """
+        updates = 3000
+        strategies = [f"strategy_{i}" for i in range(500)]
+
+        baseline_weights = {strategy: 0.5 for strategy in strategies}
+        baseline_path = os.path.join(self.temp_dir.name, "baseline.pkl")
+        start = time.perf_counter()
+        for index in range(updates):
+            apply_reward(baseline_weights, {"strategy_id": strategies[index % 500], "reward": 1.0})
+            with open(baseline_path, "wb") as f:
+                pickle.dump(baseline_weights, f)
+        baseline = time.perf_counter() - start
+
+        log = self.open_log(compact_every=1000)
+        log.state.update({strategy: 0.5 for strategy in strategies})
+        start = time.perf_counter()
+        for index in range(updates):
+            log.append({"strategy_id": strategies[index % 500], "reward": 1.0})
+        appended = time.perf_counter() - start
+
+        self.assertEqual(log.state, baseline_weights)
+        self.assertLess(appended, baseline / 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
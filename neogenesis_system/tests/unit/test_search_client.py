@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+search_client.py 单元测试
+测试想法验证客户端的批量验证（概念归并、共享缓存、逐个想法上下文、截止时间）与令牌桶速率限制
+"""
+
+import unittest
+import threading
+import time
+
+# 添加项目根目录到路径
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from neogenesis_system.providers import search_client
+from neogenesis_system.providers.search_client import (
+    IdeaVerificationSearchClient, SearchRateLimiter, SearchResponse, SearchResult, WebSearchClient
+)
+from neogenesis_system.shared.deadline import Deadline, DeadlineExceeded, deadline_scope
+from neogenesis_system.shared.result_cache import ResultCache
+
+
+class FakeWebSearchClient:
+    """模拟网络搜索客户端：记录查询，每次搜索固定耗时"""
+
+    def __init__(self, delay: float = 0.2, failing_queries=()):
+        self.delay = delay
+        self.failing_queries = failing_queries
+        self.queries = []
+        self._lock = threading.Lock()
+
+    def search(self, query: str, max_results=None) -> SearchResponse:
+        with self._lock:
+            self.queries.append(query)
+        time.sleep(self.delay)
+        if any(failing in query for failing in self.failing_queries):
+            return SearchResponse(query=query, results=[], total_results=0, search_time=self.delay,
+                                  success=False, error_message="模拟搜索失败")
+        return SearchResponse(
+            query=query,
+            results=[SearchResult(title=f"{query} 实现方法", snippet=f"{query} 技术解决方案与开发实践",
+                                  url=f"https://example.com/{len(self.queries)}")],
+            total_results=1,
+            search_time=self.delay
+        )
+
+
+class FakeDDGS:
+    """替换 duckduckgo_search.DDGS 的传输层：每次查询固定耗时"""
+
+    delay = 0.1
+
+    def __init__(self, timeout=None):
+        self.timeout = timeout
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def text(self, keywords, max_results=5, **kwargs):
+        time.sleep(FakeDDGS.delay)
+        return [{"title": f"{keywords} 实现方法", "body": "技术解决方案", "href": f"https://example.com/{keywords}"}]
+
+
+def make_client(web_client) -> IdeaVerificationSearchClient:
+    """使用独立缓存的验证客户端，测试之间互不影响"""
+    return IdeaVerificationSearchClient(web_client, query_cache=ResultCache())
+
+
+class TestIdeaVerificationBatch(unittest.TestCase):
+    """批量想法验证测试"""
+
+    def test_shared_concepts_searched_once(self):
+        """关键概念相同的想法共享一次搜索"""
+        web_client = FakeWebSearchClient()
+        client = make_client(web_client)
+        ideas = [
+            "构建基于API的数据库同步系统",
+            "系统性方法: 通过API和数据库实现增量同步",
+            "批判性思考: 评估API调用数据库的风险"
+        ]
+
+        results = client.verify_ideas_batch(ideas)
+
+        self.assertEqual(len(web_client.queries), 1)
+        self.assertEqual([r.idea_text for r in results], ideas)
+        self.assertTrue(all(r.success for r in results))
+        self.assertTrue(all(r.feasibility_score > 0 for r in results))
+
+    def test_distinct_searches_run_concurrently(self):
+        """去重后的不同搜索并发执行"""
+        web_client = FakeWebSearchClient(delay=0.3)
+        client = make_client(web_client)
+        ideas = ["API 与 数据库 集成", "机器学习 系统 优化", "分布式 微服务 架构设计", "完全没有技术关键词的想法描述"]
+
+        start_time = time.time()
+        results = client.verify_ideas_batch(ideas)
+        elapsed = time.time() - start_time
+
+        self.assertEqual(len(web_client.queries), 4)
+        self.assertEqual(len(results), 4)
+        self.assertLess(elapsed, 0.6)
+
+    def test_pool_results_shared_across_ideas(self):
+        """自身搜索失败时，使用结果池中提及相同概念的结果评分"""
+        web_client = FakeWebSearchClient(delay=0.0, failing_queries=("优化",))
+        client = make_client(web_client)
+
+        results = client.verify_ideas_batch(["API 与 数据库 集成", "API 性能 优化"])
+
+        self.assertTrue(results[1].success)
+        self.assertEqual(results[1].search_results[0].url, results[0].search_results[0].url)
+
+    def test_failed_search_without_pool_matches(self):
+        """自身搜索失败且结果池没有相关结果时返回失败结果"""
+        web_client = FakeWebSearchClient(delay=0.0, failing_queries=("区块链",))
+        client = make_client(web_client)
+
+        results = client.verify_ideas_batch(["API 与 数据库 集成", "区块链 共识机制研究与落地"])
+
+        self.assertTrue(results[0].success)
+        self.assertFalse(results[1].success)
+        self.assertEqual(results[1].error_message, "模拟搜索失败")
+
+    def test_query_cache_reused_across_batches(self):
+        """成功的查询结果在后续批次中复用"""
+        web_client = FakeWebSearchClient(delay=0.0)
+        client = make_client(web_client)
+
+        client.verify_ideas_batch(["API 与 数据库 集成"])
+        client.verify_ideas_batch(["API 与 数据库 集成", "构建 API 数据库 网关"])
+
+        self.assertEqual(len(web_client.queries), 1)
+
+    def test_subset_concepts_share_search(self):
+        """概念集合是另一想法子集的想法并入同一条搜索，概念顺序与大小写不影响归并"""
+        web_client = FakeWebSearchClient(delay=0.0)
+        client = make_client(web_client)
+
+        results = client.verify_ideas_batch(["API 数据库 系统 设计", "数据库 与 API", "API 调用", "分布式 缓存"])
+
+        self.assertEqual(len(web_client.queries), 2)
+        self.assertTrue(all(r.success for r in results))
+
+    def test_per_idea_context(self):
+        """逐个想法的上下文覆盖共享上下文，不同领域的想法不归并"""
+        web_client = FakeWebSearchClient(delay=0.0)
+        client = make_client(web_client)
+
+        client.verify_ideas_batch(["API 数据库 集成", "API 数据库 同步", "API 数据库 迁移"],
+                                  context={"domain": "金融"},
+                                  contexts=[None, {"stage": "reasoning_path"}, {"domain": "医疗"}])
+
+        self.assertEqual(len(web_client.queries), 2)
+        self.assertTrue(web_client.queries[0].endswith("金融"))
+        self.assertTrue(web_client.queries[1].endswith("医疗"))
+
+    def test_cache_shared_across_clients(self):
+        """默认使用模块级共享缓存：每次调用新建客户端（search_tools 的用法）也能命中"""
+        web_client = FakeWebSearchClient(delay=0.0)
+        with patch.object(search_client, "_query_cache", ResultCache()):
+            IdeaVerificationSearchClient(web_client).verify_ideas_batch(["API 与 数据库 集成"])
+            IdeaVerificationSearchClient(web_client).verify_ideas_batch(["构建 API 数据库 网关"])
+            IdeaVerificationSearchClient(web_client).search_for_idea_verification("API 数据库 网关")
+
+        self.assertEqual(len(web_client.queries), 2)
+
+    def test_batch_respects_deadline_through_rate_limiter(self):
+        """经过真实搜索路径：截止时间前拿不到令牌的搜索立即失败，不睡过截止时间"""
+        ideas = ["API 与 数据库 集成", "机器学习 模型 训练", "分布式 微服务 架构设计", "容器 云计算 部署"]
+        limiter = SearchRateLimiter(min_interval=3.0, burst=2)
+        with patch.object(search_client, "DDGS", FakeDDGS, create=True), \
+                patch.object(search_client, "REAL_SEARCH_AVAILABLE", True), \
+                patch.dict(search_client.RAG_CONFIG, {"enable_real_web_search": True}), \
+                patch.object(search_client, "_rate_limiter", limiter):
+            start_time = time.time()
+            with deadline_scope(Deadline(2.0)):
+                results = make_client(WebSearchClient()).verify_ideas_batch(ideas)
+            elapsed = time.time() - start_time
+
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual(sum(1 for r in results if r.success), 2)
+        self.assertEqual(limiter.get_stats()["rejected"], 2)
+
+
+class TestSearchRateLimiter(unittest.TestCase):
+    """令牌桶速率限制测试"""
+
+    def test_burst_allows_concurrent_requests(self):
+        """桶内令牌足够时并发请求不需要等待"""
+        limiter = SearchRateLimiter(min_interval=3.0, burst=4)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            waits = list(executor.map(lambda _: limiter.wait_if_needed(), range(4)))
+
+        self.assertEqual(waits, [0.0] * 4)
+
+    def test_sustained_requests_are_spaced(self):
+        """令牌用完后按 min_interval 依次预约，等待在锁外并发进行"""
+        limiter = SearchRateLimiter(min_interval=0.1, burst=1)
+        limiter.wait_if_needed()
+
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            waits = sorted(executor.map(lambda _: limiter.wait_if_needed(), range(3)))
+        elapsed = time.time() - start
+
+        for expected, wait in zip((0.1, 0.2, 0.3), waits):
+            self.assertAlmostEqual(wait, expected, delta=0.03)
+        self.assertLess(elapsed, 0.4)
+
+    def test_wait_beyond_deadline_is_rejected(self):
+        """预约时刻晚于截止时间时立即拒绝，不消耗令牌"""
+        limiter = SearchRateLimiter(min_interval=3.0, burst=1)
+        limiter.wait_if_needed()
+
+        start = time.time()
+        with deadline_scope(Deadline(0.5)):
+            with self.assertRaises(DeadlineExceeded):
+                limiter.wait_if_needed()
+        self.assertLess(time.time() - start, 0.1)
+        self.assertEqual(limiter.get_stats()["rejected"], 1)
+        self.assertEqual(limiter.get_stats()["acquired"], 1)
+
+    def test_cancel_interrupts_wait(self):
+        """等待中截止时间被取消时立即返回并归还令牌"""
+        limiter = SearchRateLimiter(min_interval=1.0, burst=1)
+        limiter.wait_if_needed()
+        deadline = Deadline(5.0)
+        threading.Timer(0.1, deadline.cancel).start()
+
+        start = time.time()
+        with deadline_scope(deadline):
+            with self.assertRaises(DeadlineExceeded):
+                limiter.wait_if_needed()
+        self.assertLess(time.time() - start, 0.5)
+        self.assertGreater(limiter.get_stats()["available_tokens"], -0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
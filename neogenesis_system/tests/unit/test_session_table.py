@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+LRU 会话表单元测试
+测试按最近访问淘汰、逐个换出、换出后经写合并器落盘并按需加载，
+NeogenesisStateManager 的换出、换出后更新的回写与加载前的写入，
+以及数十万会话持续流量下的内存上限与单次操作延迟（浸泡测试）
+"""
+
+import unittest
+import gc
+import importlib.util
+import json
+import os
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# 添加项目根目录到路径
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from neogenesis_system.shared.session_table import LRUSessionTable
+from neogenesis_system.shared.write_coalescer import WriteCoalescer
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+
+try:
+    from neogenesis_langchain.state import state_management
+except (ImportError, SyntaxError):
+    # neogenesis_langchain 包的 __init__ 导入失败时直接按文件加载（第三阶段组件的相对导入失败时模块自行降级）
+    _spec = importlib.util.spec_from_file_location(
+        "state_management", os.path.join(PROJECT_ROOT, "neogenesis_langchain", "state", "state_management.py"))
+    state_management = importlib.util.module_from_spec(_spec)
+    _spec.loader.exec_module(state_management)
+
+DecisionStage = state_management.DecisionStage
+NeogenesisStateManager = state_management.NeogenesisStateManager
+
+
+def make_session(session_id: str) -> dict:
+    """与 DecisionState.to_dict() 形状相近的会话"""
+    return {"session_id": session_id, "user_query": "如何设计一个高并发的缓存系统",
+            "current_stage": "thinking_seed", "stage_results": {},
+            "reasoning_paths": [{"path_id": f"{session_id}_{i}", "description": "分层缓存" * 4} for i in range(2)]}
+
+
+class SoakSession:
+    """浸泡测试用会话：约 1KB 载荷，统计存活实例数"""
+    live = 0
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.payload = "x" * 1024
+        SoakSession.live += 1
+
+    def __del__(self):
+        SoakSession.live -= 1
+
+
+def peak_rss_mb() -> float:
+    """进程峰值 RSS（MB，Linux 下 ru_maxrss 单位为 KB，macOS 为字节）"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class TestLRUSessionTable(unittest.TestCase):
+    """LRUSessionTable"""
+
+    def test_evicts_least_recently_used(self):
+        """按最近访问而不是创建顺序淘汰"""
+        table = LRUSessionTable(max_size=3)
+        for key in "abc":
+            table.put(key, key.upper())
+        table.get("a")
+
+        self.assertEqual(table.put("d", "D"), [("b", "B")])
+        self.assertEqual(table.keys(), ["c", "a", "d"])
+
+    def test_peek_and_contains_do_not_touch(self):
+        """peek 与 in 不改变访问顺序"""
+        table = LRUSessionTable(max_size=2)
+        table.put("a", 1)
+        table.put("b", 2)
+        self.assertEqual(table.peek("a"), 1)
+        self.assertIn("a", table)
+
+        self.assertEqual(table.put("c", 3), [("a", 1)])
+
+    def test_update_existing_does_not_evict(self):
+        """更新已有会话不会触发淘汰"""
+        table = LRUSessionTable(max_size=2)
+        table.put("a", 1)
+        table.put("b", 2)
+
+        self.assertEqual(table.put("a", 10), [])
+        self.assertEqual(table.get_stats()["evictions"], 0)
+        self.assertEqual(table.put("c", 3), [("b", 2)])
+
+    def test_page_out_and_lazy_reload(self):
+        """换出的会话经写合并器落盘，加载时先写入尚未落盘的内容"""
+        with tempfile.TemporaryDirectory() as directory:
+            coalescer = WriteCoalescer(flush_interval=60)
+            table = LRUSessionTable(max_size=2)
+
+            def path(key):
+                return os.path.join(directory, f"session_{key}.json")
+
+            for key in ("s1", "s2", "s3"):
+                session = make_session(key)
+                for evicted_key, evicted in table.put(key, session):
+                    coalescer.mark_dirty(path(evicted_key), lambda evicted=evicted: dict(evicted))
+
+            self.assertNotIn("s1", table)
+            self.assertFalse(os.path.exists(path("s1")))
+
+            # 按需加载：只写入该会话
+            self.assertEqual(coalescer.flush([path("s1")]), 1)
+            with open(path("s1"), 'r', encoding='utf-8') as f:
+                reloaded = json.load(f)
+            self.assertEqual(reloaded["session_id"], "s1")
+            s2 = table.peek("s2")
+            self.assertEqual(table.put("s1", reloaded), [("s2", s2)])
+            coalescer.close()
+
+
+class TestStateManagerPaging(unittest.TestCase):
+    """NeogenesisStateManager 的会话换出、回写与按需加载（刷新间隔足够长，只有显式 flush 才落盘）"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.managers = []
+
+    def tearDown(self):
+        for manager in self.managers:
+            manager.close()
+        self.temp_dir.cleanup()
+
+    def make_manager(self, auto_save: bool) -> "NeogenesisStateManager":
+        manager = NeogenesisStateManager(storage_path=self.temp_dir.name, max_sessions=2,
+                                         auto_save=auto_save, flush_interval=60)
+        self.managers.append(manager)
+        return manager
+
+    def session_file(self, session_id: str) -> str:
+        return os.path.join(self.temp_dir.name, f"session_{session_id}.json")
+
+    def read_session_file(self, session_id: str) -> dict:
+        with open(self.session_file(session_id), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def test_eviction_pages_out_session(self):
+        """auto_save 关闭时淘汰的会话登记写入，之后仍能从磁盘加载"""
+        manager = self.make_manager(auto_save=False)
+        for session_id in ("s1", "s2", "s3"):
+            manager.create_session(session_id, f"查询 {session_id}")
+
+        self.assertNotIn("s1", manager.active_sessions)
+        self.assertFalse(os.path.exists(self.session_file("s1")))
+        self.assertFalse(os.path.exists(self.session_file("s2")))
+
+        reloaded = manager.get_session("s1")
+        self.assertEqual(reloaded.user_query, "查询 s1")
+        self.assertIs(manager.active_sessions.peek("s1"), reloaded)
+        # 加载 s1 换出了最久未访问的 s2，其内容同样登记待写入
+        self.assertNotIn("s2", manager.active_sessions)
+        self.assertEqual(manager.flush(), 1)
+        self.assertEqual(self.read_session_file("s2")["user_query"], "查询 s2")
+
+    def test_update_after_eviction_written_back(self):
+        """会话在读取后、更新前被换出并已落盘时，更新重新写入磁盘"""
+        manager = self.make_manager(auto_save=False)
+        manager.create_session("s1", "查询 s1")
+        manager.create_session("s2", "查询 s2")
+        get_session = manager.get_session
+
+        def get_then_evict(session_id):
+            session = get_session(session_id)
+            # 模拟并发：其他请求创建会话换出 s1，后台线程随即写入换出的内容
+            manager.create_session("s3", "查询 s3")
+            manager.create_session("s4", "查询 s4")
+            manager.flush()
+            return session
+
+        manager.get_session = get_then_evict
+        self.assertTrue(manager.update_session_stage("s1", DecisionStage.THINKING_SEED, True,
+                                                     {"thinking_seed": "种子"}, 0.1))
+        self.assertNotIn("s1", manager.active_sessions)
+        self.assertIsNone(self.read_session_file("s1")["thinking_seed"])
+
+        manager.flush()
+        self.assertEqual(self.read_session_file("s1")["thinking_seed"], "种子")
+
+    def test_reload_evicted_session_with_pending_writes(self):
+        """换出后尚未落盘的会话再次访问时先写入再加载，得到最新内容"""
+        manager = self.make_manager(auto_save=True)
+        original = manager.create_session("s1", "查询 s1")
+        manager.update_session_stage("s1", DecisionStage.THINKING_SEED, True, {"thinking_seed": "种子"}, 0.1)
+        manager.create_session("s2", "查询 s2")
+        manager.create_session("s3", "查询 s3")
+
+        self.assertNotIn("s1", manager.active_sessions)
+        self.assertFalse(os.path.exists(self.session_file("s1")))
+
+        reloaded = manager.get_session("s1")
+        self.assertIsNot(reloaded, original)
+        self.assertEqual(reloaded.thinking_seed, "种子")
+        self.assertEqual(reloaded.current_stage, DecisionStage.THINKING_SEED)
+        self.assertTrue(reloaded.is_stage_completed(DecisionStage.THINKING_SEED))
+        # 只写入了被加载的会话，其余待写入内容仍由后台线程合并
+        self.assertFalse(os.path.exists(self.session_file("s2")))
+
+
+class TestSessionTableSoak(unittest.TestCase):
+    """浸泡测试：持续创建与访问会话"""
+
+    SESSIONS = 200_000
+    MAX_SESSIONS = 1_000
+
+    def test_bounded_memory_and_latency(self):
+        """
+        20 万个会话（每个约 1KB）流经 1000 容量的表，每个新会话后访问一个近期会话：
+        存活会话数与 RSS 在预热后保持平稳（全部保留约需 200MB），单次操作没有批量排序式的停顿
+        """
+        table = LRUSessionTable(max_size=self.MAX_SESSIONS)
+        paged_out = 0
+        worst = 0.0
+        warm_rss = None
+
+        gc.collect()
+        for index in range(self.SESSIONS):
+            key = f"s{index}"
+            start = time.perf_counter()
+            paged_out += len(table.put(key, SoakSession(key)))
+            table.get(f"s{index - index % 7}")
+            worst = max(worst, time.perf_counter() - start)
+
+            if index + 1 == self.SESSIONS // 4 and resource is not None:
+                warm_rss = peak_rss_mb()
+
+        self.assertEqual(len(table), self.MAX_SESSIONS)
+        self.assertEqual(paged_out, self.SESSIONS - self.MAX_SESSIONS)
+        self.assertEqual(SoakSession.live, self.MAX_SESSIONS)
+        self.assertLess(worst, 0.05)
+        if warm_rss is not None:
+            self.assertLess(peak_rss_mb() - warm_rss, 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+shared_arm_table.py 单元测试
+测试共享内存决策臂表的读写、跨进程累积以及与 MABConverger 的集成
+"""
+
+import unittest
+import multiprocessing
+
+# 添加项目根目录到路径
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from neogenesis_system.cognitive_engine.shared_arm_table import (
+    SharedArmTable, SharedArmTableFullError, fcntl
+)
+from neogenesis_system.cognitive_engine.mab_converger import MABConverger
+from neogenesis_system.cognitive_engine.data_structures import ReasoningPath
+
+
+def _worker_add(name: str, rounds: int):
+    """子进程：接入共享表并累加"""
+    table = SharedArmTable.attach(name)
+    try:
+        for i in range(rounds):
+            table.add(f"path:strategy_{i % 4}", success=1, activation=1, reward=0.5)
+    finally:
+        table.close()
+
+
+class TestSharedArmTable(unittest.TestCase):
+    """SharedArmTable 测试"""
+
+    def setUp(self):
+        """测试前的设置"""
+        self.table = SharedArmTable.create(capacity=64, lock_count=8)
+
+    def tearDown(self):
+        """测试后的清理"""
+        self.table.close()
+        self.table.unlink()
+
+    def test_add_and_get(self):
+        """增量写入返回合并后的记录，读取与之一致"""
+        self.table.add("path:a", success=1, activation=1, reward=0.8, last_used=10.0)
+        record = self.table.add("path:a", failure=1, activation=1, reward=0.2, last_used=5.0)
+
+        self.assertEqual(record, self.table.get("path:a"))
+        self.assertEqual((record['success'], record['failure'], record['activation']), (1, 1, 2))
+        self.assertAlmostEqual(record['total_reward'], 1.0)
+        self.assertEqual(record['last_used'], 10.0)
+        self.assertIsNone(self.table.get("path:missing"))
+        self.assertEqual(len(self.table), 1)
+
+    def test_ensure_keeps_existing_record(self):
+        """ensure 只在记录不存在时写入初始值"""
+        self.table.add("tool:search", success=3)
+
+        record = self.table.ensure("tool:search", {'success': 100})
+
+        self.assertEqual(record['success'], 3)
+        self.assertEqual(self.table.ensure("tool:new", {'success': 7})['success'], 7)
+
+    def test_table_full(self):
+        """容量耗尽时抛出 SharedArmTableFullError"""
+        small_table = SharedArmTable.create(capacity=2, lock_count=1)
+        try:
+            small_table.add("a")
+            small_table.add("b")
+            with self.assertRaises(SharedArmTableFullError):
+                small_table.add("c")
+        finally:
+            small_table.close()
+            small_table.unlink()
+
+    @unittest.skipUnless(fcntl is not None and "fork" in multiprocessing.get_all_start_methods(),
+                         "需要 fcntl 和 fork")
+    def test_concurrent_processes_accumulate(self):
+        """多个进程并发写入时不丢失更新"""
+        context = multiprocessing.get_context("fork")
+        processes = [context.Process(target=_worker_add, args=(self.table.name, 400)) for _ in range(4)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(timeout=30)
+
+        self.assertTrue(all(process.exitcode == 0 for process in processes))
+        snapshot = self.table.snapshot()
+        self.assertEqual(sum(record['success'] for record in snapshot.values()), 1600)
+        self.assertEqual(snapshot["path:strategy_0"]['activation'], 400)
+
+
+class TestMABConvergerSharedArmTable(unittest.TestCase):
+    """MABConverger 共享统计集成测试"""
+
+    def setUp(self):
+        """测试前的设置：两个收敛器模拟两个 worker"""
+        self.table = SharedArmTable.create(capacity=64)
+        self.worker_a = MABConverger()
+        self.worker_b = MABConverger()
+        self.paths = [
+            ReasoningPath(path_id=f"path_{i}", path_type=f"type_{i}", description=f"路径 {i}",
+                          prompt_template="{query}", strategy_id=f"strategy_{i}")
+            for i in range(3)
+        ]
+
+    def tearDown(self):
+        """测试后的清理"""
+        self.table.close()
+        self.table.unlink()
+
+    def test_feedback_visible_to_other_worker(self):
+        """一个 worker 的反馈在另一个 worker 选择时可见"""
+        self.worker_a.attach_shared_arm_table(self.table)
+        self.worker_b.attach_shared_arm_table(self.table)
+
+        for _ in range(5):
+            self.worker_a.update_path_performance("strategy_0", success=True, reward=1.0)
+        self.worker_b.select_best_path(self.paths)
+
+        arm = self.worker_b.path_arms["strategy_0"]
+        self.assertEqual(arm.success_count, 5)
+        self.assertAlmostEqual(arm.total_reward, self.worker_a.path_arms["strategy_0"].total_reward)
+
+    def test_attach_seeds_existing_local_statistics(self):
+        """接入前已有的本地统计作为共享表初始值"""
+        self.worker_a.update_path_performance("strategy_1", success=False, reward=0.0)
+        self.worker_a.attach_shared_arm_table(self.table)
+
+        self.assertEqual(self.table.get("path:strategy_1")['failure'], 1)
+
+        self.worker_a.reset_path("strategy_1")
+        self.assertEqual(self.table.get("path:strategy_1")['failure'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
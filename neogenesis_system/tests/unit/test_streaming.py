@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+端到端流式输出单元测试
+- 提供商原生流式接口（本地 aiohttp 模拟服务，逐行/逐事件输出）
+- NeogenesisPlanner.astream_decision 的阶段事件与首事件延迟
+- /planning/stream SSE 端点：客户端断开时取消上游生成
+"""
+
+import unittest
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+# 添加项目根目录到路径
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from aiohttp import web
+
+from neogenesis_system.providers.async_http import aclose_async_http_clients
+from neogenesis_system.providers.impl.openai_client import OpenAIClient
+from neogenesis_system.providers.impl.anthropic_client import AnthropicClient
+from neogenesis_system.providers.impl.ollama_client import OllamaClient
+from neogenesis_system.providers.llm_base import BaseLLMClient, LLMConfig, LLMProvider, LLMResponse
+from neogenesis_system.tests.llm_fixtures import make_llm_manager
+from neogenesis_system.core.neogenesis_planner import NeogenesisPlanner
+from neogenesis_system.cognitive_engine.data_structures import ReasoningPath
+from neogenesis_system.cognitive_engine.reasoner import (
+    TriageClassification, TaskComplexity, TaskDomain, TaskIntent, TaskUrgency, RouteStrategy
+)
+
+TOKENS = ["流", "式", "输", "出"]
+
+
+class MockStreamingServer:
+    """本地模拟服务：按各提供商的流式格式逐段输出，model 为 "endless" 时持续输出直到连接断开"""
+
+    def __init__(self):
+        self.disconnected = asyncio.Event()
+        self.runner = None
+        self.base_url = ""
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post('/v1/chat/completions', self.openai)
+        app.router.add_post('/v1/messages', self.anthropic)
+        app.router.add_post('/api/chat', self.ollama)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    async def _stream(self, request, lines):
+        body = await request.json()
+        assert body['stream'] is True
+        response = web.StreamResponse()
+        await response.prepare(request)
+        try:
+            index = 0
+            while body['model'] == 'endless' or index < len(TOKENS):
+                await response.write(lines(TOKENS[index % len(TOKENS)]).encode('utf-8'))
+                await asyncio.sleep(0.01)
+                index += 1
+        except (ConnectionResetError, asyncio.CancelledError):
+            self.disconnected.set()
+            raise
+        return response
+
+    async def openai(self, request):
+        response = await self._stream(
+            request, lambda token: f"data: {json.dumps({'choices': [{'delta': {'content': token}}]})}\n\n")
+        await response.write(b"data: [DONE]\n\n")
+        return response
+
+    async def anthropic(self, request):
+        return await self._stream(request, lambda token: (
+            "event: content_block_delta\n"
+            f"data: {json.dumps({'type': 'content_block_delta', 'delta': {'type': 'text_delta', 'text': token}})}\n\n"))
+
+    async def ollama(self, request):
+        return await self._stream(
+            request, lambda token: json.dumps({"message": {"role": "assistant", "content": token}, "done": False}) + "\n")
+
+
+class TestProviderStreaming(unittest.IsolatedAsyncioTestCase):
+    """提供商原生流式接口"""
+
+    async def asyncSetUp(self):
+        self.server = MockStreamingServer()
+        await self.server.start()
+
+    async def asyncTearDown(self):
+        await aclose_async_http_clients()
+        await self.server.stop()
+
+    async def collect(self, client, **kwargs):
+        return [text async for text in client.astream_chat_completion("你好", **kwargs)]
+
+    async def test_openai_sse(self):
+        """OpenAI SSE：逐段产出 delta，计入成功统计"""
+        client = OpenAIClient(LLMConfig(provider=LLMProvider.OPENAI, api_key="sk-test-key-123",
+                                        base_url=f"{self.server.base_url}/v1"))
+        self.assertEqual(await self.collect(client), TOKENS)
+        self.assertEqual(client.stats['successful_requests'], 1)
+
+    async def test_anthropic_sse(self):
+        """Anthropic SSE：只取 content_block_delta 中的文本"""
+        client = AnthropicClient(LLMConfig(provider=LLMProvider.ANTHROPIC, api_key="sk-ant-test-key",
+                                           base_url=self.server.base_url))
+        self.assertEqual(await self.collect(client), TOKENS)
+
+    async def test_ollama_ndjson(self):
+        """Ollama 逐行 JSON"""
+        client = OllamaClient(LLMConfig(provider=LLMProvider.OLLAMA, api_key="", base_url=self.server.base_url))
+        self.assertEqual(await self.collect(client), TOKENS)
+
+    async def test_closing_stream_disconnects_upstream(self):
+        """调用方提前关闭流时断开连接，上游停止生成，不计入失败"""
+        client = OllamaClient(LLMConfig(provider=LLMProvider.OLLAMA, api_key="", base_url=self.server.base_url))
+        stream = client.astream_chat_completion("你好", model="endless")
+        self.assertEqual(await stream.__anext__(), TOKENS[0])
+        await stream.aclose()
+
+        await asyncio.wait_for(self.server.disconnected.wait(), timeout=2.0)
+        self.assertEqual(client.stats['failed_requests'], 0)
+
+
+class FakeStreamingClient(BaseLLMClient):
+    """逐个产出 token 的模拟流式提供商，记录产出数量与是否被取消"""
+
+    def __init__(self, tokens, delay: float):
+        super().__init__(LLMConfig(provider=LLMProvider.DEEPSEEK, api_key="fake"))
+        self.tokens = tokens
+        self.delay = delay
+        self.produced = 0
+        self.cancelled = asyncio.Event()
+
+    def chat_completion(self, messages, temperature=None, max_tokens=None, **kwargs) -> LLMResponse:
+        time.sleep(self.delay * len(self.tokens))
+        return LLMResponse(success=True, content="".join(self.tokens))
+
+    async def astream_chat_completion(self, messages, temperature=None, max_tokens=None, **kwargs):
+        try:
+            for token in self.tokens:
+                await asyncio.sleep(self.delay)
+                self.produced += 1
+                yield token
+        except (asyncio.CancelledError, GeneratorExit):
+            self.cancelled.set()
+            raise
+
+    def validate_config(self) -> bool:
+        return True
+
+    def get_available_models(self):
+        return ["fake"]
+
+
+class TestLLMManagerStreaming(unittest.IsolatedAsyncioTestCase):
+    """LLMManager 流式路由"""
+
+    async def test_fallback_before_first_token(self):
+        """第一个片段到达前失败时回退到下一个提供商"""
+        broken, healthy = FakeStreamingClient([], 0.0), FakeStreamingClient(TOKENS, 0.0)
+
+        async def fail(messages, **kwargs):
+            raise ConnectionError("上游不可用")
+            yield
+
+        broken.astream_chat_completion = fail
+        manager = make_llm_manager({"broken": broken, "healthy": healthy}, {"strategy": "priority"},
+                                   primary_provider="broken", fallback_providers=["healthy"])
+
+        self.assertEqual([text async for text in manager.astream_chat_completion("你好")], TOKENS)
+        self.assertEqual(manager.stats['fallback_count'], 1)
+        self.assertEqual(manager.stats['provider_usage']['healthy'], 1)
+
+
+def make_planner(stage_delay: float) -> NeogenesisPlanner:
+    """组件均为模拟对象的规划器：路径生成耗时 stage_delay，路径全部验证通过"""
+    paths = [ReasoningPath(path_id=f"path_{name}", path_type=name, description=f"{name}路径",
+                           prompt_template=f"按{name}方式回答") for name in ("systematic_analytical", "practical_pragmatic")]
+
+    def generate_paths(**kwargs):
+        time.sleep(stage_delay)
+        return paths
+
+    prior_reasoner = Mock()
+    prior_reasoner.llm_manager = None
+    prior_reasoner.classify_and_route.return_value = TriageClassification(
+        complexity=TaskComplexity.MODERATE, domain=TaskDomain.GENERAL, intent=TaskIntent.QUESTION,
+        urgency=TaskUrgency.MEDIUM, route_strategy=RouteStrategy.MULTI_STAGE_PROCESSING,
+        confidence=0.7, reasoning="测试", key_factors=[])
+    prior_reasoner.get_thinking_seed.return_value = "思维种子"
+    path_generator = Mock()
+    path_generator.generate_paths.side_effect = generate_paths
+    mab_converger = Mock()
+    mab_converger.select_best_path.return_value = paths[0]
+    tool_registry = Mock()
+    tool_registry.has_tool.return_value = False
+
+    planner = NeogenesisPlanner(prior_reasoner=prior_reasoner, path_generator=path_generator,
+                                mab_converger=mab_converger, tool_registry=tool_registry)
+    planner._verify_ideas_batch = lambda requests: [
+        {'feasibility_analysis': {'feasibility_score': 0.8}, 'reward_score': 0.5} for _ in requests]
+    return planner
+
+
+class TestStreamingDecision(unittest.IsolatedAsyncioTestCase):
+    """NeogenesisPlanner.astream_decision"""
+
+    async def test_stage_events_then_tokens(self):
+        """事件顺序：analysis → paths → selection → token... → done"""
+        planner = make_planner(stage_delay=0.0)
+        events = [event async for event in planner.astream_decision(
+            "如何设计缓存", llm_client=FakeStreamingClient(TOKENS, 0.0))]
+
+        self.assertEqual([event['event'] for event in events],
+                         ['analysis', 'paths', 'selection'] + ['token'] * len(TOKENS) + ['done'])
+        self.assertEqual(events[0]['data']['thinking_seed'], "思维种子")
+        self.assertEqual(len(events[1]['data']['paths']), 2)
+        self.assertEqual(events[2]['data']['path']['path_type'], "systematic_analytical")
+        self.assertEqual("".join(event['data']['text'] for event in events if event['event'] == 'token'),
+                         "".join(TOKENS))
+
+    async def test_time_to_first_event_falls(self):
+        """首个事件在分析完成时即到达，不必等待路径生成、决策与完整回答"""
+        planner = make_planner(stage_delay=0.2)
+        llm = FakeStreamingClient(TOKENS, 0.05)
+
+        start_time = time.perf_counter()
+        await asyncio.get_running_loop().run_in_executor(None, planner.make_strategic_decision, "如何设计缓存")
+        await llm.achat_completion("回答")
+        blocking_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        stream = planner.astream_decision("如何设计缓存", llm_client=llm)
+        first_event = await stream.__anext__()
+        time_to_first_event = time.perf_counter() - start_time
+        remaining = [event async for event in stream]
+
+        self.assertEqual(first_event['event'], 'analysis')
+        self.assertLess(time_to_first_event, 0.1)
+        self.assertGreater(blocking_time, 0.35)
+        self.assertEqual(remaining[-1]['event'], 'done')
+
+    async def test_closing_stream_cancels_generation(self):
+        """关闭决策流时关闭上游 LLM 流"""
+        planner = make_planner(stage_delay=0.0)
+        llm = FakeStreamingClient(TOKENS * 10, 0.01)
+        stream = planner.astream_decision("如何设计缓存", llm_client=llm)
+        async for event in stream:
+            if event['event'] == 'token':
+                break
+        await stream.aclose()
+
+        self.assertTrue(llm.cancelled.is_set())
+        self.assertLess(llm.produced, len(TOKENS) * 10)
+
+    async def test_decision_error_event(self):
+        """决策失败时产出 error 事件并结束"""
+        planner = make_planner(stage_delay=0.0)
+        planner.prior_reasoner.classify_and_route.side_effect = RuntimeError("路由失败")
+        events = [event async for event in planner.astream_decision("如何设计缓存")]
+
+        self.assertEqual([event['event'] for event in events], ['error'])
+        self.assertIn("路由失败", events[0]['data']['message'])
+
+
+class TestStreamingEndpoint(unittest.IsolatedAsyncioTestCase):
+    """/planning/stream SSE 端点（直接以 ASGI 协议调用，模拟客户端断开）"""
+
+    async def asyncSetUp(self):
+        from neogenesis_system.api import main
+        self.main = main
+        self.previous_agent = main.neogenesis_agent
+        self.llm = FakeStreamingClient(TOKENS * 50, 0.01)
+        planner = make_planner(stage_delay=0.0)
+        planner.prior_reasoner.llm_manager = self.llm
+        main.neogenesis_agent = SimpleNamespace(planner=planner)
+
+    async def asyncTearDown(self):
+        self.main.neogenesis_agent = self.previous_agent
+
+    async def call(self, disconnect_after_tokens: int):
+        """发送请求，收到指定数量的 token 事件后断开；返回收到的 SSE 事件名"""
+        disconnect = asyncio.Event()
+        body = json.dumps({"query": "如何设计缓存"}).encode('utf-8')
+        messages = [{"type": "http.request", "body": body, "more_body": False}]
+        received, events = [], []
+
+        async def receive():
+            if messages:
+                return messages.pop(0)
+            await disconnect.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            received.append(message)
+            if message["type"] == "http.response.body" and message.get("body"):
+                events.extend(line[len("event: "):] for line in message["body"].decode('utf-8').splitlines()
+                              if line.startswith("event: "))
+                if events.count('token') >= disconnect_after_tokens:
+                    disconnect.set()
+
+        scope = {"type": "http", "method": "POST", "path": "/planning/stream", "raw_path": b"/planning/stream",
+                 "query_string": b"", "root_path": "", "scheme": "http", "http_version": "1.1",
+                 "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+                 "client": ("127.0.0.1", 12345), "server": ("127.0.0.1", 8000)}
+        await asyncio.wait_for(self.main.app(scope, receive, send), timeout=5.0)
+        return received, events
+
+    async def test_sse_stream(self):
+        """SSE 响应头与事件"""
+        self.llm.tokens = TOKENS
+        received, events = await self.call(disconnect_after_tokens=10 ** 9)
+
+        self.assertEqual(received[0]["status"], 200)
+        self.assertIn((b"content-type", b"text/event-stream; charset=utf-8"), received[0]["headers"])
+        self.assertEqual(events, ['analysis', 'paths', 'selection'] + ['token'] * len(TOKENS) + ['done'])
+
+    async def test_client_disconnect_cancels_upstream(self):
+        """客户端断开后上游 LLM 流被取消，不再继续生成"""
+        await self.call(disconnect_after_tokens=3)
+        await asyncio.wait_for(self.llm.cancelled.wait(), timeout=2.0)
+
+        produced = self.llm.produced
+        await asyncio.sleep(0.1)
+        self.assertEqual(self.llm.produced, produced)
+        self.assertLess(produced, len(self.llm.tokens))
+
+
+if __name__ == '__main__':
+    unittest.main()
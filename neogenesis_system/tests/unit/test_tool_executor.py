@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+并行工具执行器单元测试
+使用模拟工具测试并行加速、依赖顺序与观察结果传递、完成顺序、超时重试、依赖失败跳过与取消，
+顺序执行器委托（保留原始输出、默认不超时不重试）与工作流代理默认使用并行执行器
+"""
+
+import unittest
+import asyncio
+import time
+import threading
+from unittest.mock import patch
+
+# 添加项目根目录到路径
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from neogenesis_system.abstractions import BaseToolExecutor, BaseMemory
+from neogenesis_system.core.tool_executor import ParallelToolExecutor
+from neogenesis_system.core.workflow_agent import WorkflowGenerationAgent, create_workflow_agent
+from neogenesis_system.shared.data_structures import Plan, Action, ActionStatus, PlanStatus, Observation
+from neogenesis_system.tools.tool_abstraction import BaseTool, AsyncBaseTool, ToolResult, ToolCategory, ToolCapability
+
+
+class MockCapabilities:
+    """模拟工具的能力描述"""
+
+    @property
+    def capabilities(self) -> ToolCapability:
+        return ToolCapability(supported_inputs=["any"], output_types=["any"])
+
+
+class SleepTool(MockCapabilities, AsyncBaseTool):
+    """按参数延迟的异步模拟工具，记录被取消的调用"""
+
+    def __init__(self):
+        super().__init__("sleep", "异步延迟工具", ToolCategory.SYSTEM)
+        self.cancelled = []
+
+    async def execute_async(self, label: str, delay: float = 0.0, **kwargs) -> ToolResult:
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(label)
+            raise
+        return ToolResult(success=True, data={"label": label, **kwargs})
+
+    def execute(self, *args, **kwargs) -> ToolResult:
+        raise NotImplementedError
+
+
+class BlockingTool(MockCapabilities, BaseTool):
+    """同步阻塞的模拟 I/O 工具"""
+
+    def __init__(self):
+        super().__init__("blocking", "同步阻塞工具", ToolCategory.SEARCH)
+        self.threads = set()
+
+    def execute(self, delay: float = 0.0, text: str = "") -> ToolResult:
+        self.threads.add(threading.current_thread().name)
+        time.sleep(delay)
+        return ToolResult(success=True, data=text.upper())
+
+
+class FlakyTool(MockCapabilities, BaseTool):
+    """前 failures 次调用失败的模拟工具"""
+
+    def __init__(self, failures: int):
+        super().__init__("flaky", "不稳定工具", ToolCategory.SEARCH)
+        self.failures = failures
+        self.calls = 0
+
+    def execute(self, **kwargs) -> ToolResult:
+        self.calls += 1
+        if self.calls <= self.failures:
+            return ToolResult(success=False, data=None, error_message=f"第 {self.calls} 次失败")
+        return ToolResult(success=True, data="ok")
+
+
+class SequentialExecutor(BaseToolExecutor):
+    """逐个执行行动的同步执行器，每个行动阻塞 delay 秒"""
+
+    def __init__(self, delay: float = 0.0):
+        super().__init__("SequentialExecutor", "顺序执行器")
+        self.delay = delay
+        self.calls = []
+
+    def execute_plan(self, plan, context=None):
+        return [self.execute_action(action) for action in plan.actions]
+
+    def execute_action(self, action: Action) -> Observation:
+        time.sleep(self.delay)
+        self.calls.append(action.tool_name)
+        if action.tool_name == "broken":
+            return Observation(action, "", False, error_message="工具损坏")
+        if action.tool_name == "structured":
+            return Observation(action, {"content": "hello"}, True, metadata={"source": "sequential"})
+        return Observation(action, f"{action.tool_name}:{action.tool_input.get('text', '')}", True)
+
+
+class DictMemory(BaseMemory):
+    """字典记忆模块"""
+
+    def __init__(self):
+        super().__init__("DictMemory", "字典记忆")
+        self._data = {}
+
+    def store(self, key, value, metadata=None):
+        self._data[key] = value
+        return True
+
+    def retrieve(self, key):
+        return self._data.get(key)
+
+    def delete(self, key):
+        return self._data.pop(key, None) is not None
+
+    def exists(self, key):
+        return key in self._data
+
+
+def make_plan(*actions: Action) -> Plan:
+    return Plan(thought="测试计划", actions=list(actions))
+
+
+def sleep_action(action_id: str, delay: float, **metadata) -> Action:
+    return Action("sleep", {"label": action_id, "delay": delay}, action_id=action_id, metadata=metadata)
+
+
+class TestParallelToolExecutor(unittest.IsolatedAsyncioTestCase):
+    """ParallelToolExecutor"""
+
+    def setUp(self):
+        self.executor = ParallelToolExecutor(config={"max_retries": 0, "retry_base_delay": 0.01})
+        self.sleep_tool = SleepTool()
+        self.blocking_tool = BlockingTool()
+        self.executor.register_tool("sleep", self.sleep_tool)
+        self.executor.register_tool("blocking", self.blocking_tool)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    async def test_parallel_speedup(self):
+        """独立行动并行执行：总耗时接近最慢行动而不是各行动之和"""
+        plan = make_plan(*[sleep_action(f"a{i}", 0.1) for i in range(4)],
+                         *[Action("blocking", {"delay": 0.1, "text": f"b{i}"}, action_id=f"b{i}") for i in range(4)])
+
+        start = time.perf_counter()
+        observations = await self.executor.execute_plan_async(plan)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(len(observations), 8)
+        self.assertTrue(all(observation.success for observation in observations))
+        self.assertLess(elapsed, 0.4)
+        self.assertTrue(all(name.startswith("neogenesis-io-tool") for name in self.blocking_tool.threads))
+        self.assertEqual(plan.status, PlanStatus.COMPLETED)
+
+    async def test_dependencies_consume_observations(self):
+        """依赖行动在上游完成后启动，并通过占位符获得上游输出"""
+        plan = make_plan(
+            Action("blocking", {"text": "seed"}, action_id="search"),
+            Action("sleep", {"label": "raw", "delay": 0, "found": "{{obs:search}}"}, action_id="raw"),
+            Action("blocking", {"text": "got {{obs:raw}}"}, action_id="summary")
+        )
+        observations = await self.executor.execute_plan_async(plan)
+
+        self.assertEqual([o.action_id for o in observations], ["search", "raw", "summary"])
+        self.assertEqual(observations[1].output, {"label": "raw", "found": "SEED"})
+        self.assertEqual(observations[2].output, 'GOT {"LABEL": "RAW", "FOUND": "SEED"}')
+
+    async def test_completion_order(self):
+        """观察结果按完成顺序产出，依赖总在其后"""
+        plan = make_plan(sleep_action("slow", 0.15), sleep_action("fast", 0.05),
+                         sleep_action("after_fast", 0.01, depends_on=["fast"]))
+        order = [observation.action_id async for observation in self.executor.iter_plan_async(plan)]
+
+        self.assertEqual(order, ["fast", "after_fast", "slow"])
+
+    async def test_timeout_and_retry_with_jitter(self):
+        """每次尝试超时后带抖动退避重试，退避不超过指数上限"""
+        flaky = FlakyTool(failures=2)
+        self.executor.register_tool("flaky", flaky)
+        plan = make_plan(Action("flaky", {}, action_id="flaky", metadata={"max_retries": 2}),
+                         sleep_action("slow", 1.0, timeout=0.05))
+
+        delays = []
+        with patch("neogenesis_system.core.tool_executor.random.uniform",
+                   side_effect=lambda low, high: delays.append(high) or 0.0):
+            observations = {o.action_id: o for o in await self.executor.execute_plan_async(plan)}
+
+        self.assertTrue(observations["flaky"].success)
+        self.assertEqual(observations["flaky"].metadata["attempts"], 3)
+        self.assertEqual(delays, [0.01, 0.02])
+        self.assertFalse(observations["slow"].success)
+        self.assertIn("超时", observations["slow"].error_message)
+        self.assertEqual(self.executor.stats["timeouts"], 1)
+        self.assertEqual(plan.status, PlanStatus.FAILED)
+
+    async def test_retries_are_opt_in(self):
+        """默认配置下失败的行动不重试"""
+        executor = ParallelToolExecutor(config={"retry_base_delay": 0.01})
+        self.addCleanup(executor.shutdown)
+        flaky = FlakyTool(failures=1)
+        executor.register_tool("flaky", flaky)
+        observation = await executor.execute_action_async(Action("flaky", {}, action_id="flaky"))
+
+        self.assertFalse(observation.success)
+        self.assertEqual(flaky.calls, 1)
+        self.assertEqual(executor.stats["retries"], 0)
+
+    async def test_failed_dependency_skips_dependents(self):
+        """上游失败时下游被跳过，独立行动不受影响"""
+        self.executor.register_tool("flaky", FlakyTool(failures=5))
+        plan = make_plan(Action("flaky", {}, action_id="flaky"),
+                         sleep_action("dependent", 0, depends_on=["flaky"]),
+                         sleep_action("independent", 0))
+        observations = {o.action_id: o for o in await self.executor.execute_plan_async(plan)}
+
+        self.assertFalse(observations["flaky"].success)
+        self.assertTrue(observations["dependent"].metadata["skipped"])
+        self.assertEqual(plan.actions[1].status, ActionStatus.SKIPPED)
+        self.assertTrue(observations["independent"].success)
+
+    async def test_cancellation(self):
+        """取消计划执行时在途行动一并取消"""
+        plan = make_plan(sleep_action("a", 1.0), sleep_action("b", 1.0))
+        task = asyncio.ensure_future(self.executor.execute_plan_async(plan))
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertEqual(sorted(self.sleep_tool.cancelled), ["a", "b"])
+        self.assertEqual(plan.status, PlanStatus.CANCELLED)
+
+    def test_sync_execute_plan(self):
+        """同步接口在无事件循环时同样按依赖并行执行"""
+        plan = make_plan(Action("blocking", {"delay": 0.1, "text": "x"}, action_id="x"),
+                         Action("blocking", {"delay": 0.1, "text": "y"}, action_id="y"))
+        start = time.perf_counter()
+        observations = self.executor.execute_plan(plan)
+
+        self.assertLess(time.perf_counter() - start, 0.18)
+        self.assertEqual(sorted(o.output for o in observations), ["X", "Y"])
+
+    async def test_delegates_to_sequential_executor(self):
+        """未注册的工具委托给顺序执行器，独立行动并行执行，占位符在委托前解析"""
+        sequential = SequentialExecutor(delay=0.1)
+        sequential.register_tool("search", None)
+        executor = ParallelToolExecutor(config={"max_retries": 0}, action_executor=sequential)
+        self.addCleanup(executor.shutdown)
+        plan = make_plan(*[Action("search", {"text": f"q{i}"}, action_id=f"q{i}") for i in range(4)],
+                         Action("summarize", {"text": "{{obs:q0}}"}, action_id="summary"),
+                         Action("broken", {}, action_id="broken"))
+
+        start = time.perf_counter()
+        observations = {o.action_id: o for o in await executor.execute_plan_async(plan)}
+        elapsed = time.perf_counter() - start
+
+        self.assertLess(elapsed, 0.35)
+        self.assertEqual(observations["q3"].output, "search:q3")
+        self.assertEqual(observations["summary"].output, "summarize:search:q0")
+        self.assertFalse(observations["broken"].success)
+        self.assertEqual(observations["broken"].error_message, "工具损坏")
+        self.assertTrue(executor.validate_action(plan.actions[0]))
+        self.assertFalse(executor.validate_action(Action("unknown", {})))
+
+    async def test_delegated_output_kept_as_is(self):
+        """委托执行器的结构化输出与元数据原样保留，字符串占位符使用其文本形式"""
+        executor = ParallelToolExecutor(action_executor=SequentialExecutor())
+        self.addCleanup(executor.shutdown)
+        plan = make_plan(Action("structured", {}, action_id="structured"),
+                         Action("echo", {"text": "got {{obs:structured}}"}, action_id="echo"))
+        observations = {o.action_id: o for o in await executor.execute_plan_async(plan)}
+
+        self.assertEqual(observations["structured"].output, {"content": "hello"})
+        self.assertEqual(observations["structured"].metadata["source"], "sequential")
+        self.assertEqual(observations["echo"].output, 'echo:got {"content": "hello"}')
+
+    async def test_delegated_actions_not_retried_or_timed_out(self):
+        """委托的行动默认不重试也不超时；在行动上声明后才启用"""
+        sequential = SequentialExecutor(delay=0.05)
+        executor = ParallelToolExecutor(config={"default_timeout": 0.01, "max_retries": 3,
+                                                "retry_base_delay": 0.01},
+                                        action_executor=sequential)
+        self.addCleanup(executor.shutdown)
+
+        observation = await executor.execute_action_async(Action("broken", {}))
+        self.assertFalse(observation.success)
+        self.assertEqual(sequential.calls, ["broken"])
+        self.assertTrue((await executor.execute_action_async(Action("slow", {}))).success)
+
+        sequential.calls.clear()
+        observation = await executor.execute_action_async(Action("broken", {}, metadata={"max_retries": 1}))
+        self.assertEqual(sequential.calls, ["broken", "broken"])
+        observation = await executor.execute_action_async(Action("slow", {}, metadata={"timeout": 0.01}))
+        self.assertIn("超时", observation.error_message)
+
+    async def test_registered_tool_keeps_structured_output(self):
+        """已注册工具返回的结构化数据直接作为观察输出"""
+        observation = await self.executor.execute_action_async(
+            Action("sleep", {"label": "img", "image_url": "http://x/y.png"}))
+
+        self.assertEqual(observation.output, {"label": "img", "image_url": "http://x/y.png"})
+
+    async def test_duplicate_default_action_ids(self):
+        """同一毫秒内创建的同名工具行动（默认 ID 相同）都会执行"""
+        with patch("neogenesis_system.shared.data_structures.time.time", return_value=1000.0):
+            plan = make_plan(Action("blocking", {"text": "a"}), Action("blocking", {"text": "b"}))
+        self.assertEqual(plan.actions[0].action_id, plan.actions[1].action_id)
+
+        observations = await self.executor.execute_plan_async(plan)
+
+        self.assertEqual(sorted(o.output for o in observations), ["A", "B"])
+        self.assertEqual(len({o.action_id for o in observations}), 2)
+
+
+class TestWorkflowAgentExecutor(unittest.TestCase):
+    """工作流代理的工具执行器选择"""
+
+    def test_defaults_to_parallel_executor(self):
+        """未提供执行器时使用 ParallelToolExecutor"""
+        agent = create_workflow_agent(None, DictMemory())
+        self.assertIsInstance(agent.tool_executor, ParallelToolExecutor)
+
+    def test_wraps_sequential_executor(self):
+        """顺序执行器被包装为委托执行器，可通过配置关闭"""
+        sequential = SequentialExecutor()
+        agent = WorkflowGenerationAgent(sequential, DictMemory())
+        self.assertIsInstance(agent.tool_executor, ParallelToolExecutor)
+        self.assertIs(agent.tool_executor.action_executor, sequential)
+
+        agent = create_workflow_agent(sequential, DictMemory(), config={"parallel_execution": False})
+        self.assertIs(agent.tool_executor, sequential)
+
+    def test_wrapped_executor_keeps_structured_observations(self):
+        """包装后结构化的观察输出仍可被代理识别并提取内容"""
+        agent = WorkflowGenerationAgent(SequentialExecutor(), DictMemory())
+        observation = agent.tool_executor.execute_action(Action("structured", {}))
+
+        self.assertEqual(agent._format_observation_output(observation), "hello")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+写合并持久化单元测试
+测试周期内合并写入、紧凑原子写入、关闭时刷新、删除取消待写入内容，以及进程崩溃后的恢复
+"""
+
+import unittest
+import json
+import os
+import subprocess
+import tempfile
+import textwrap
+import threading
+import time
+from unittest.mock import patch
+
+# 添加项目根目录到路径
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from neogenesis_system.shared.write_coalescer import WriteCoalescer, atomic_write_json, remove_stale_temp_files
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+
+
+def read_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class TestWriteCoalescer(unittest.TestCase):
+    """WriteCoalescer"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "session_a.json")
+        self.state = {"stage": 0}
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_coalesces_within_interval(self):
+        """一个周期内的多次登记只写一次，写入的是最新状态"""
+        coalescer = WriteCoalescer(flush_interval=60)
+        for stage in range(100):
+            self.state["stage"] = stage
+            coalescer.mark_dirty(self.path, lambda: dict(self.state))
+
+        self.assertFalse(os.path.exists(self.path))
+        self.assertEqual(coalescer.flush(), 1)
+        self.assertEqual(read_json(self.path), {"stage": 99})
+        self.assertEqual(coalescer.get_stats()["coalesced"], 99)
+        coalescer.close()
+
+    def test_background_flush(self):
+        """后台线程按周期写入"""
+        coalescer = WriteCoalescer(flush_interval=0.05)
+        coalescer.mark_dirty(self.path, lambda: {"stage": 1})
+        deadline = time.time() + 2
+        while not os.path.exists(self.path) and time.time() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(read_json(self.path), {"stage": 1})
+        coalescer.close()
+
+    def test_close_flushes_pending(self):
+        """关闭时写入剩余内容"""
+        coalescer = WriteCoalescer(flush_interval=60)
+        coalescer.mark_dirty(self.path, lambda: {"stage": "最终"})
+        coalescer.close()
+
+        self.assertEqual(read_json(self.path), {"stage": "最终"})
+        self.assertIsNone(coalescer._thread)
+
+    def test_compact_encoding(self):
+        """紧凑编码，保留非 ASCII 字符"""
+        atomic_write_json(self.path, {"query": "缓存", "paths": [1, 2]})
+        with open(self.path, 'r', encoding='utf-8') as f:
+            self.assertEqual(f.read(), '{"query":"缓存","paths":[1,2]}')
+
+    def test_failed_write_keeps_previous_version(self):
+        """替换失败时旧文件保持完整，临时文件被清理"""
+        atomic_write_json(self.path, {"stage": 1})
+        with patch("neogenesis_system.shared.write_coalescer.os.replace", side_effect=OSError("磁盘已满")):
+            with self.assertRaises(OSError):
+                atomic_write_json(self.path, {"stage": 2})
+
+        self.assertEqual(read_json(self.path), {"stage": 1})
+        self.assertEqual(os.listdir(self.temp_dir.name), ["session_a.json"])
+
+    def test_remove_cancels_pending_write(self):
+        """删除文件时取消尚未写入的内容，之后的刷新不会把文件写回"""
+        coalescer = WriteCoalescer(flush_interval=60)
+        atomic_write_json(self.path, {"stage": 1})
+        coalescer.mark_dirty(self.path, lambda: {"stage": 2})
+        self.assertTrue(coalescer.remove(self.path))
+        coalescer.close()
+
+        self.assertFalse(os.path.exists(self.path))
+        self.assertFalse(coalescer.remove(self.path))
+
+    def test_producer_runs_under_state_lock(self):
+        """producer 在状态锁内执行，得到一致的快照"""
+        lock = threading.RLock()
+        coalescer = WriteCoalescer(flush_interval=60, lock=lock)
+        held = []
+        coalescer.mark_dirty(self.path, lambda: held.append(lock._is_owned()) or {})
+        coalescer.flush()
+
+        self.assertEqual(held, [True])
+
+    def test_synchronous_mode(self):
+        """flush_interval <= 0 时立即写入"""
+        coalescer = WriteCoalescer(flush_interval=0)
+        coalescer.mark_dirty(self.path, lambda: {"stage": 3})
+
+        self.assertEqual(read_json(self.path), {"stage": 3})
+        self.assertIsNone(coalescer._thread)
+
+
+class TestCrashRecovery(unittest.TestCase):
+    """进程崩溃后的恢复"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.directory = self.temp_dir.name
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_crash_leaves_last_flushed_state(self):
+        """
+        进程在两次刷新之间被杀死（不执行 close/atexit）：
+        磁盘上是最后一次刷新的完整内容，崩溃遗留的临时文件在下次启动时被清理
+        """
+        code = textwrap.dedent(f"""
+            import os
+            from neogenesis_system.shared.write_coalescer import WriteCoalescer
+            path = os.path.join({self.directory!r}, "session_a.json")
+            coalescer = WriteCoalescer(flush_interval=60)
+            coalescer.mark_dirty(path, lambda: {{"stage": "path_generation", "paths": list(range(100))}})
+            coalescer.flush()
+            coalescer.mark_dirty(path, lambda: {{"stage": "mab_decision"}})
+            with open(path + ".999.1.tmp", "w") as f:
+                f.write('{{"stage": "mab_')
+            os._exit(1)
+        """)
+        result = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True)
+        self.assertEqual(result.returncode, 1, result.stderr)
+
+        data = read_json(os.path.join(self.directory, "session_a.json"))
+        self.assertEqual(data["stage"], "path_generation")
+        self.assertEqual(len(data["paths"]), 100)
+
+        self.assertEqual(remove_stale_temp_files(self.directory), 1)
+        self.assertEqual(os.listdir(self.directory), ["session_a.json"])
+
+
+if __name__ == '__main__':
+    unittest.main()